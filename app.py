@@ -53,6 +53,12 @@ except ImportError:
 from features.music.music_bot import MusicBot, YTDLSource
 from features.music.music_service import MusicService, _resolve_voice_channel
 from features.tts.tts_handler import speak_tts_unified
+from features.voice.voice_commands import warmup_whisper_model
+from features.voice.transcription_clients import get_transcription_clients
+from features.voice.whisper_registry import get_whisper_registry
+from features.warmup import ModelWarmup
+from chatbot.metrics import EventLoopLagMonitor, MetricsRegistry
+from chatbot.memory_maintenance import MaintenanceScheduler
 from flask_routes import create_flask_app
 
 load_dotenv()
@@ -158,8 +164,49 @@ async def speak_piper_tts(guild_id: int, channel_id: int, text: str) -> Dict[str
 
 music_bot.speak_tts_func = speak_piper_tts
 
+model_warmup = ModelWarmup()
+if os.getenv('WARMUP_ENABLED', 'true').lower() == 'true':
+    if memory_manager and memory_manager.embedding_service:
+        model_warmup.register('embedding', memory_manager.embedding_service.warmup)
+    if music_bot.whisper_provider == 'openai':
+        model_warmup.register('whisper', warmup_whisper_model)
+    if (piper_tts := tts_providers.get('piper')):
+        model_warmup.register('piper', lambda: asyncio.to_thread(piper_tts.warmup))
+
+loop_lag_monitor = EventLoopLagMonitor()
+metrics_registry = MetricsRegistry()
+metrics_registry.register('event_loop_lag', loop_lag_monitor.snapshot)
+maintenance_scheduler = MaintenanceScheduler()
+metrics_registry.register('maintenance', maintenance_scheduler.snapshot)
+metrics_registry.register('transcription', get_transcription_clients().snapshot)
+metrics_registry.register('voice', lambda: {str(guild_id): sink.voice_stats() for guild_id, sink in list(music_bot.voice_sinks.items())})
+if music_bot.whisper_provider == 'openai':
+    metrics_registry.register('whisper', get_whisper_registry().snapshot)
+if memory_manager:
+    metrics_registry.register('memory', memory_manager.get_metrics)
+    maintenance_scheduler.add_job(
+        'memory_cleanup', memory_manager.cleanup_interval, memory_manager.cleanup_old_memories, initial_delay=60
+    )
+    maintenance_scheduler.add_job(
+        'recent_expiry', memory_manager.recent_expiry_interval, memory_manager.expire_recent_interactions
+    )
+    if memory_manager.quotas_enabled:
+        maintenance_scheduler.add_job(
+            'memory_retrieval_marks', memory_manager.retrieval_flush_interval, memory_manager.flush_retrieval_marks
+        )
+        maintenance_scheduler.add_job(
+            'memory_quotas', memory_manager.quota_interval, memory_manager.enforce_memory_quotas, initial_delay=120
+        )
+    if memory_manager.compaction_enabled:
+        if chatbot:
+            memory_manager.summarizer = chatbot.summarize_memories
+        maintenance_scheduler.add_job(
+            'memory_compaction', memory_manager.compaction_interval, memory_manager.compact_memories, initial_delay=300
+        )
+
 flask_app, set_bot_loop = create_flask_app(
-    bot, music_bot, music_service, chatbot, speak_tts, speak_piper_tts
+    bot, music_bot, music_service, chatbot, speak_tts, speak_piper_tts,
+    model_warmup=model_warmup, metrics_registry=metrics_registry, memory_manager=memory_manager
 )
 
 async def forward_to_n8n(msg_data: Dict[str, Any]) -> Optional[int]:
@@ -216,6 +263,13 @@ async def on_ready() -> None:
     music_bot.main_loop = bot_loop
     set_bot_loop(bot_loop)
     logger.info(f'Bot connected as {bot.user}')
+
+    if not model_warmup.started:
+        model_warmup.start()
+    loop_lag_monitor.start()
+    maintenance_scheduler.start()
+    if memory_manager:
+        await memory_manager.resume_reindex_job()
     
     if chatbot:
         chatbot.bot = bot
@@ -258,7 +312,7 @@ async def on_message(message: discord.Message) -> None:
 
             retrieved_memories = {"recent": [], "semantic": []}
             if chatbot.memory_manager:
-                retrieved_memories = await chatbot.memory_manager.retrieve_context(message.content, guild_id, channel_id, user_id)
+                retrieved_memories = await chatbot.memory_manager.retrieve_for_message(message.content, guild_id, channel_id, user_id)
 
             response, tool_calls = await chatbot.generate_response_with_tools(
                 message.content, [], guild_id, channel_id, user_id, music_functions, retrieved_memories
@@ -282,10 +336,19 @@ async def on_error(event: str, *args: Any, **kwargs: Any) -> None:
 def run_flask() -> None:
     flask_app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
 
+async def run_bot() -> None:
+    async with bot:
+        try:
+            await bot.start(DISCORD_BOT_TOKEN)
+        finally:
+            maintenance_scheduler.stop()
+            if memory_manager:
+                await memory_manager.shutdown()
+
 def run_discord() -> None:
     try:
         logger.info('Starting Discord bot...')
-        bot.run(DISCORD_BOT_TOKEN)
+        asyncio.run(run_bot())
     except KeyboardInterrupt:
         logger.info('Bot stopped by user')
     except Exception as e:
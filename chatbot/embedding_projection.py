@@ -0,0 +1,64 @@
+import os
+import logging
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class EmbeddingProjection:
+    def __init__(self, dimensions: int, mean: Optional[np.ndarray] = None, components: Optional[np.ndarray] = None):
+        self.dimensions = dimensions
+        self.mean = mean
+        self.components = components
+
+    @property
+    def method(self) -> str:
+        return 'pca' if self.components is not None else 'truncate'
+
+    @classmethod
+    def fit(cls, vectors: Sequence[Sequence[float]], dimensions: int) -> 'EmbeddingProjection':
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.shape[0] < dimensions:
+            raise ValueError(f"Need at least {dimensions} vectors to fit a {dimensions}-d projection, got {matrix.shape[0]}")
+        mean = matrix.mean(axis=0)
+        _, _, vt = np.linalg.svd(matrix - mean, full_matrices=False)
+        return cls(dimensions, mean.astype(np.float32), vt[:dimensions].astype(np.float32))
+
+    @classmethod
+    def load(cls, path: str, dimensions: int) -> 'EmbeddingProjection':
+        if not Path(path).exists():
+            logger.warning(f"No fitted projection at {path}, truncating embeddings to {dimensions} dimensions")
+            return cls(dimensions)
+        data = np.load(path)
+        components = data['components']
+        if components.shape[0] != dimensions:
+            raise ValueError(f"Projection at {path} has {components.shape[0]} dimensions, expected {dimensions}")
+        return cls(dimensions, data['mean'], components)
+
+    def save(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, mean=self.mean, components=self.components)
+
+    def project(self, vectors: Sequence[Sequence[float]]) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if self.components is None:
+            return _normalize(matrix[:, :self.dimensions])
+        return _normalize((matrix - self.mean) @ self.components.T)
+
+    def project_one(self, vector: List[float]) -> List[float]:
+        return self.project([vector])[0].tolist()
+
+
+def projection_path() -> str:
+    return os.getenv('EMBEDDING_PCA_PATH', './data/embedding_pca.npz')
@@ -1,5 +1,6 @@
 import os
 import logging
+import threading
 from typing import List, Optional
 from abc import ABC, abstractmethod
 
@@ -15,39 +16,56 @@ class EmbeddingService(ABC):
     async def embed_batch(self, texts: List[str]) -> List[List[float]]:
         pass
 
+    @property
+    def model_id(self) -> str:
+        return type(self).__name__
+
+    async def warmup(self) -> bool:
+        embedding = await self.embed_text("warmup")
+        return bool(embedding)
+
 
 class SentenceTransformerEmbeddingService(EmbeddingService):
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", projection=None):
         self.model_name = model_name
+        self.projection = projection
         self._model = None
-        self._lock = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        model_id = f"sentence_transformers:{self.model_name}"
+        if self.projection:
+            model_id += f"@{self.projection.method}{self.projection.dimensions}"
+        return model_id
 
     def _get_model(self):
-        if self._model is None:
-            try:
-                from sentence_transformers import SentenceTransformer
-                import threading
-                self._lock = threading.Lock()
-                with self._lock:
-                    if self._model is None:
-                        logger.info(f"Loading SentenceTransformer model: {self.model_name}")
-                        self._model = SentenceTransformer(self.model_name)
-                        logger.info(f"SentenceTransformer model loaded successfully")
-            except ImportError:
-                logger.error("sentence-transformers package not installed")
-                raise
-            except Exception as e:
-                logger.error(f"Failed to load SentenceTransformer model: {e}")
-                raise
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    logger.info(f"Loading SentenceTransformer model: {self.model_name}")
+                    self._model = SentenceTransformer(self.model_name)
+                    logger.info(f"SentenceTransformer model loaded successfully")
+                except ImportError:
+                    logger.error("sentence-transformers package not installed")
+                    raise
+                except Exception as e:
+                    logger.error(f"Failed to load SentenceTransformer model: {e}")
+                    raise
         return self._model
 
     async def embed_text(self, text: str) -> List[float]:
         if not text or not text.strip():
             return []
         try:
-            model = self._get_model()
             import asyncio
+            model = self._model or await asyncio.to_thread(self._get_model)
             embedding = await asyncio.to_thread(model.encode, text, normalize_embeddings=True)
+            if self.projection:
+                return self.projection.project_one(embedding)
             return embedding.tolist() if hasattr(embedding, 'tolist') else list(embedding)
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
@@ -60,9 +78,11 @@ class SentenceTransformerEmbeddingService(EmbeddingService):
         if not valid_texts:
             return [[] for _ in texts]
         try:
-            model = self._get_model()
             import asyncio
+            model = self._model or await asyncio.to_thread(self._get_model)
             embeddings = await asyncio.to_thread(model.encode, valid_texts, normalize_embeddings=True)
+            if self.projection:
+                embeddings = self.projection.project(embeddings)
             result = []
             text_idx = 0
             for original_text in texts:
@@ -79,11 +99,19 @@ class SentenceTransformerEmbeddingService(EmbeddingService):
 
 
 class OpenAIEmbeddingService(EmbeddingService):
-    def __init__(self, api_key: str, model: str = "text-embedding-3-small"):
+    def __init__(self, api_key: str, model: str = "text-embedding-3-small", dimensions: Optional[int] = None):
         self.api_key = api_key
         self.model = model
+        self.dimensions = dimensions
         self._client = None
 
+    @property
+    def model_id(self) -> str:
+        return f"openai:{self.model}@{self.dimensions}" if self.dimensions else f"openai:{self.model}"
+
+    def _request_options(self) -> dict:
+        return {"dimensions": self.dimensions} if self.dimensions else {}
+
     def _get_client(self):
         if self._client is None:
             try:
@@ -104,7 +132,8 @@ class OpenAIEmbeddingService(EmbeddingService):
             client = self._get_client()
             response = await client.embeddings.create(
                 model=self.model,
-                input=text
+                input=text,
+                **self._request_options()
             )
             return response.data[0].embedding
         except Exception as e:
@@ -121,7 +150,8 @@ class OpenAIEmbeddingService(EmbeddingService):
             client = self._get_client()
             response = await client.embeddings.create(
                 model=self.model,
-                input=valid_texts
+                input=valid_texts,
+                **self._request_options()
             )
             embeddings_dict = {item.index: item.embedding for item in response.data}
             result = []
@@ -138,26 +168,183 @@ class OpenAIEmbeddingService(EmbeddingService):
             return [[] for _ in texts]
 
 
-def create_embedding_service() -> Optional[EmbeddingService]:
-    provider = os.getenv('EMBEDDING_PROVIDER', 'sentence_transformers').lower()
+class HttpEmbeddingService(EmbeddingService):
+    def __init__(
+        self,
+        base_url: str,
+        model_name: str = "all-MiniLM-L6-v2",
+        projection=None,
+        pool_size: int = 8,
+        max_batch_size: int = 256,
+        timeout: float = 30.0
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.model_name = model_name
+        self.projection = projection
+        self.pool_size = pool_size
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self._session = None
+        self._session_loop = None
+
+    @property
+    def model_id(self) -> str:
+        model_id = f"sentence_transformers:{self.model_name}"
+        if self.projection:
+            model_id += f"@{self.projection.method}{self.projection.dimensions}"
+        return model_id
+
+    def _get_session(self):
+        import asyncio
+        import aiohttp
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self.release()
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def _embed_remote(self, texts: List[str]) -> List[List[float]]:
+        session = self._get_session()
+        embeddings = []
+        for start in range(0, len(texts), self.max_batch_size):
+            async with session.post(f"{self.base_url}/embed", json={"texts": texts[start:start + self.max_batch_size]}) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"Embedding sidecar returned {response.status}: {await response.text()}")
+                payload = await response.json()
+            if payload.get("model") != self.model_name:
+                logger.warning(f"Embedding sidecar serves {payload.get('model')}, expected {self.model_name}")
+            embeddings.extend(payload["embeddings"])
+        if self.projection:
+            return self.projection.project(embeddings).tolist()
+        return embeddings
+
+    async def embed_text(self, text: str) -> List[float]:
+        if not text or not text.strip():
+            return []
+        try:
+            return (await self._embed_remote([text]))[0]
+        except Exception as e:
+            logger.error(f"Error generating embedding via sidecar: {e}")
+            return []
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        valid_texts = [t for t in texts if t and t.strip()]
+        if not valid_texts:
+            return [[] for _ in texts]
+        try:
+            embeddings = iter(await self._embed_remote(valid_texts))
+            return [next(embeddings) if t and t.strip() else [] for t in texts]
+        except Exception as e:
+            logger.error(f"Error generating batch embeddings via sidecar: {e}")
+            return [[] for _ in texts]
+
+    def release(self):
+        """Drop the pooled session without waiting for it to close.
+
+        The session belongs to the loop that created it, so the close is
+        scheduled there; if that loop is already closed its connections went
+        with it and the session is only detached.
+        """
+        import asyncio
+        session, loop = self._session, self._session_loop
+        self._session = self._session_loop = None
+        if session is None or session.closed:
+            return
+        if loop is None or loop.is_closed():
+            session.detach()
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.create_task(session.close())
+        else:
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+
+    async def close(self):
+        import asyncio
+        if self._session is not None and self._session_loop is asyncio.get_running_loop():
+            session, self._session, self._session_loop = self._session, None, None
+            if not session.closed:
+                await session.close()
+            return
+        self.release()
+
+
+def _embedding_dimensions() -> Optional[int]:
+    dimensions = os.getenv('EMBEDDING_DIMENSIONS')
+    return int(dimensions) if dimensions else None
+
+
+def _projection(dimensions: Optional[int]):
+    if not dimensions:
+        return None
+    from chatbot.embedding_projection import EmbeddingProjection, projection_path
+    projection = EmbeddingProjection.load(projection_path(), dimensions)
+    logger.info(f"SentenceTransformer embeddings reduced to {dimensions} dimensions via {projection.method}")
+    return projection
+
+
+def _sentence_transformer_service(model_name: str, dimensions: Optional[int]) -> SentenceTransformerEmbeddingService:
+    return SentenceTransformerEmbeddingService(model_name, _projection(dimensions))
+
+
+def _http_service(model_name: str, dimensions: Optional[int]) -> Optional[HttpEmbeddingService]:
+    base_url = os.getenv('EMBEDDING_API_URL')
+    if not base_url:
+        return None
+    return HttpEmbeddingService(
+        base_url,
+        model_name,
+        _projection(dimensions),
+        pool_size=int(os.getenv('EMBEDDING_API_POOL_SIZE', '8')),
+        max_batch_size=int(os.getenv('EMBEDDING_API_MAX_BATCH_SIZE', '256')),
+        timeout=float(os.getenv('EMBEDDING_API_TIMEOUT', '30')),
+    )
+
+
+def create_embedding_service(
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+    dimensions: Optional[int] = None
+) -> Optional[EmbeddingService]:
+    provider = (provider or os.getenv('EMBEDDING_PROVIDER', 'sentence_transformers')).lower()
+    dimensions = dimensions if dimensions is not None else _embedding_dimensions()
     
     if provider == 'openai':
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
-            logger.warning("OPENAI_API_KEY not set, falling back to sentence_transformers")
+            logger.warning("OPENAI_API_KEY not set, falling back to sentence_transformers; stored memories embedded with OpenAI will not match")
             provider = 'sentence_transformers'
+            model = None
         else:
-            model = os.getenv('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
+            model = model or os.getenv('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
             try:
-                return OpenAIEmbeddingService(api_key, model)
+                return OpenAIEmbeddingService(api_key, model, dimensions)
             except Exception as e:
-                logger.warning(f"Failed to initialize OpenAI embedding service: {e}, falling back to sentence_transformers")
+                logger.warning(f"Failed to initialize OpenAI embedding service: {e}, falling back to sentence_transformers; stored memories embedded with OpenAI will not match")
                 provider = 'sentence_transformers'
+                model = None
+    
+    if provider == 'http':
+        model_name = model or os.getenv('SENTENCE_TRANSFORMER_MODEL', 'all-MiniLM-L6-v2')
+        service = _http_service(model_name, dimensions)
+        if service:
+            return service
+        logger.warning("EMBEDDING_API_URL not set, falling back to a local sentence_transformers model")
+        provider = 'sentence_transformers'
     
     if provider == 'sentence_transformers':
-        model_name = os.getenv('SENTENCE_TRANSFORMER_MODEL', 'all-MiniLM-L6-v2')
+        model_name = model or os.getenv('SENTENCE_TRANSFORMER_MODEL', 'all-MiniLM-L6-v2')
         try:
-            return SentenceTransformerEmbeddingService(model_name)
+            return _sentence_transformer_service(model_name, dimensions)
         except Exception as e:
             logger.error(f"Failed to initialize SentenceTransformer embedding service: {e}")
             return None
@@ -165,7 +352,7 @@ def create_embedding_service() -> Optional[EmbeddingService]:
     logger.warning(f"Unknown embedding provider: {provider}, falling back to sentence_transformers")
     model_name = os.getenv('SENTENCE_TRANSFORMER_MODEL', 'all-MiniLM-L6-v2')
     try:
-        return SentenceTransformerEmbeddingService(model_name)
+        return _sentence_transformer_service(model_name, dimensions)
     except Exception as e:
         logger.error(f"Failed to initialize SentenceTransformer embedding service: {e}")
         return None
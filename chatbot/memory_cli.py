@@ -0,0 +1,185 @@
+import os
+import json
+import argparse
+import logging
+from pathlib import Path
+
+from chatbot.embedding_projection import EmbeddingProjection, projection_path
+from chatbot.memory_layout import COLLECTION_METADATA, LAYOUT_PER_GUILD, LAYOUT_SINGLE, CollectionCache, migrate_to_per_guild
+from chatbot.memory_reindex import load_index_state
+from chatbot.memory_snapshot import FORMAT_JSONL, RECORDS_FILES, export_store, import_store
+from chatbot.retrieval_gate import HashedNgramClassifier
+from chatbot.vector_store import VECTOR_STORE_CHROMA, VECTOR_STORE_NUMPY, ChromaVectorStore, vector_store_backend
+
+logger = logging.getLogger(__name__)
+
+
+def _open_client(path: str):
+    import chromadb
+    from chromadb.config import Settings
+
+    Path(path).mkdir(parents=True, exist_ok=True)
+    return chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
+
+
+def _active_location(args: argparse.Namespace):
+    """Store location the bot reads: ``--location`` if given, else the pointer in active_index.json."""
+    if args.location is not None:
+        return args.location or None
+    root = args.numpy_path if args.backend == VECTOR_STORE_NUMPY else args.path
+    return load_index_state(root)['location']
+
+
+def _open_store(args: argparse.Namespace):
+    location = _active_location(args)
+    if args.backend == VECTOR_STORE_NUMPY:
+        from chatbot.numpy_vector_store import NumpyVectorStore
+        return NumpyVectorStore(str(Path(args.numpy_path) / location) if location else args.numpy_path)
+    client = _open_client(args.path)
+    name = location or args.collection
+    if args.layout == LAYOUT_PER_GUILD:
+        return ChromaVectorStore(collections=CollectionCache(client, name))
+    return ChromaVectorStore(collection=client.get_or_create_collection(name=name, metadata=COLLECTION_METADATA))
+
+
+def migrate_layout(args: argparse.Namespace) -> None:
+    client = _open_client(args.path)
+    collection = _active_location(args) or args.collection
+    result = migrate_to_per_guild(
+        client,
+        collection,
+        batch_size=args.batch_size,
+        drop_source=args.drop_source,
+        progress_callback=lambda count: logger.info(f"Migrated {count} memories"),
+    )
+    print(f"Migrated {result['migrated']} memories into {result['guilds']} guild collections")
+    if not args.drop_source:
+        print(f"Source collection {collection} kept; set MEMORY_STORAGE_LAYOUT=per_guild to use the new layout")
+
+
+def sample_embeddings(store, sample_size: int, batch_size: int = 500) -> list:
+    """Read up to ``sample_size`` embeddings, spread evenly over partitions so every guild is represented."""
+    embeddings = []
+    partitions = store.partitions()
+    offsets = {index: 0 for index in range(len(partitions))}
+    while offsets and len(embeddings) < sample_size:
+        share = min(batch_size, -(-(sample_size - len(embeddings)) // len(offsets)))
+        for index in list(offsets):
+            limit = min(share, sample_size - len(embeddings))
+            if limit <= 0:
+                break
+            page = store.get_page(partitions[index], offsets[index], limit)
+            embeddings.extend(list(embedding) for embedding in page['embeddings'])
+            offsets[index] += len(page['ids'])
+            if len(page['ids']) < limit:
+                del offsets[index]
+    return embeddings
+
+
+def fit_projection(args: argparse.Namespace) -> None:
+    store = _open_store(args)
+    try:
+        embeddings = sample_embeddings(store, args.sample)
+    finally:
+        store.close()
+    projection = EmbeddingProjection.fit(embeddings, args.dimensions)
+    projection.save(args.output)
+    print(f"Fitted {args.dimensions}-d projection on {len(embeddings)} embeddings, saved to {args.output}")
+    print(f"Set EMBEDDING_DIMENSIONS={args.dimensions} and re-index stored memories to use it")
+
+
+def export_snapshot(args: argparse.Namespace) -> None:
+    store = _open_store(args)
+    try:
+        manifest = export_store(store, args.output, page_size=args.page_size, records_format=args.format)
+    except FileExistsError as e:
+        raise SystemExit(f"{e}; choose a new --output directory") from None
+    finally:
+        store.close()
+    print(f"Exported {manifest['count']} memories ({manifest['dimensions']}-d) from {args.backend} to {args.output}")
+
+
+def import_snapshot(args: argparse.Namespace) -> None:
+    store = _open_store(args)
+    existing = store.count()
+    if existing and not args.append:
+        store.close()
+        raise SystemExit(f"Target {args.backend} store already holds {existing} memories; use --append to import anyway")
+    imported = import_store(
+        store,
+        args.input,
+        batch_size=args.batch_size,
+        progress_callback=lambda count: logger.info(f"Imported {count} memories"),
+    )
+    store.close()
+    print(f"Imported {imported} memories into {args.backend}")
+
+
+def fit_retrieval_gate(args: argparse.Namespace) -> None:
+    texts, labels = [], []
+    with open(args.input, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                example = json.loads(line)
+                texts.append(example['text'])
+                labels.append(example['mode'])
+    classifier = HashedNgramClassifier.fit(texts, labels, n_features=args.features, epochs=args.epochs)
+    classifier.save(args.output)
+    print(f"Fitted retrieval gate on {len(texts)} examples ({', '.join(classifier.labels)}), saved to {args.output}")
+    print(f"Set RETRIEVAL_GATE_MODEL_PATH={args.output} to use it")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Tangerina memory storage maintenance")
+    parser.add_argument('--path', default=os.getenv('CHROMADB_PATH', './data/chromadb'))
+    parser.add_argument('--collection', default=os.getenv('CHROMADB_COLLECTION_NAME', 'tangerina_memory'))
+    parser.add_argument('--backend', choices=[VECTOR_STORE_CHROMA, VECTOR_STORE_NUMPY], default=vector_store_backend())
+    parser.add_argument('--layout', choices=[LAYOUT_SINGLE, LAYOUT_PER_GUILD], default=os.getenv('MEMORY_STORAGE_LAYOUT', LAYOUT_SINGLE).lower())
+    parser.add_argument('--numpy-path', default=os.getenv('MEMORY_NUMPY_PATH', './data/vectors'))
+    parser.add_argument(
+        '--location',
+        help="Collection name, or directory under --numpy-path, to open instead of the active index in active_index.json; "
+             "an empty value opens --collection or --numpy-path itself"
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    migrate = subparsers.add_parser('migrate-layout', help="Copy the single collection into one collection per guild")
+    migrate.add_argument('--batch-size', type=int, default=500)
+    migrate.add_argument('--drop-source', action='store_true')
+    migrate.set_defaults(func=migrate_layout)
+
+    fit = subparsers.add_parser('fit-projection', help="Fit a PCA projection for SentenceTransformer embeddings")
+    fit.add_argument('--dimensions', type=int, required=True)
+    fit.add_argument('--sample', type=int, default=5000)
+    fit.add_argument('--output', default=projection_path())
+    fit.set_defaults(func=fit_projection)
+
+    export = subparsers.add_parser('export', help="Write the memory store to a columnar snapshot directory")
+    export.add_argument('--output', required=True)
+    export.add_argument('--format', choices=sorted(RECORDS_FILES), default=FORMAT_JSONL)
+    export.add_argument('--page-size', type=int, default=1000)
+    export.set_defaults(func=export_snapshot)
+
+    load = subparsers.add_parser('import', help="Bulk-load a snapshot directory into the memory store")
+    load.add_argument('--input', required=True)
+    load.add_argument('--batch-size', type=int, default=1000)
+    load.add_argument('--append', action='store_true')
+    load.set_defaults(func=import_snapshot)
+
+    gate = subparsers.add_parser('fit-retrieval-gate', help="Train the retrieval gate classifier from labelled JSONL messages")
+    gate.add_argument('--input', required=True, help='JSONL lines of {"text": ..., "mode": "semantic|recent|none"}')
+    gate.add_argument('--output', default='./data/retrieval_gate.npz')
+    gate.add_argument('--features', type=int, default=2048)
+    gate.add_argument('--epochs', type=int, default=300)
+    gate.set_defaults(func=fit_retrieval_gate)
+    return parser
+
+
+def main(argv=None) -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
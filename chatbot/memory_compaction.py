@@ -0,0 +1,74 @@
+import logging
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = "Resumo de conversas anteriores:"
+
+
+def cluster_by_similarity(embeddings: Sequence[Sequence[float]], threshold: float, max_cluster_size: int) -> List[List[int]]:
+    if len(embeddings) == 0:
+        return []
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors = vectors / norms
+    similarities = vectors @ vectors.T
+    unassigned = np.ones(len(vectors), dtype=bool)
+    clusters = []
+    for leader in range(len(vectors)):
+        if not unassigned[leader]:
+            continue
+        candidates = np.flatnonzero(unassigned & (similarities[leader] >= threshold))
+        candidates = candidates[np.argsort(-similarities[leader][candidates], kind='stable')][:max_cluster_size]
+        if leader not in candidates:
+            candidates = np.concatenate([[leader], candidates[:max_cluster_size - 1]])
+        unassigned[candidates] = False
+        clusters.append(sorted(int(i) for i in candidates))
+    return clusters
+
+
+def centroid(embeddings: Sequence[Sequence[float]]) -> List[float]:
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    mean = vectors.mean(axis=0)
+    return (mean / max(float(np.linalg.norm(mean)), 1e-12)).tolist()
+
+
+def _user_part(document: str) -> str:
+    text = document[len("User: "):] if document.startswith("User: ") else document
+    return text.split(" Bot: ", 1)[0].strip()
+
+
+def extractive_summary(documents: List[str], embeddings: Sequence[Sequence[float]], max_chars: int) -> str:
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    ranking = np.argsort(-(vectors @ np.asarray(centroid(embeddings), dtype=np.float32)), kind='stable')
+    parts: List[str] = []
+    seen = set()
+    length = len(SUMMARY_PREFIX)
+    for idx in ranking:
+        part = _user_part(documents[int(idx)])
+        key = part.lower()
+        if not part or key in seen:
+            continue
+        if parts and length + len(part) + 2 > max_chars:
+            break
+        seen.add(key)
+        parts.append(part[:max_chars])
+        length += len(part) + 2
+    return f"{SUMMARY_PREFIX} {'; '.join(parts)}"
+
+
+def summary_metadata(metadatas: List[Dict[str, Any]]) -> Dict[str, Any]:
+    newest = max(metadatas, key=lambda metadata: metadata.get("timestamp_epoch", 0))
+    return {
+        "guild_id": newest.get("guild_id", "none"),
+        "channel_id": newest.get("channel_id", "none"),
+        "user_id": newest.get("user_id", "none"),
+        "timestamp": newest.get("timestamp", ""),
+        "timestamp_epoch": newest.get("timestamp_epoch", 0),
+        "message_type": "summary",
+        "source_count": len(metadatas),
+    }
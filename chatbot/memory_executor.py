@@ -0,0 +1,100 @@
+import os
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from chatbot.metrics import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_READ = 'read'
+EXECUTOR_WRITE = 'write'
+
+
+class ChromaExecutor:
+    def __init__(self, read_workers: Optional[int] = None, max_pending: Optional[int] = None, inline: bool = False):
+        self.read_workers = read_workers or int(os.getenv('MEMORY_EXECUTOR_READ_WORKERS', '4'))
+        self.max_pending = max_pending or int(os.getenv('MEMORY_EXECUTOR_MAX_PENDING', '64'))
+        self.inline = inline
+        self._pools = {
+            EXECUTOR_READ: ThreadPoolExecutor(max_workers=self.read_workers, thread_name_prefix='chroma-read'),
+            EXECUTOR_WRITE: ThreadPoolExecutor(max_workers=1, thread_name_prefix='chroma-write'),
+        }
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats_lock = threading.Lock()
+        self._counters = {kind: {'submitted': 0, 'completed': 0, 'errors': 0, 'in_flight': 0, 'waiting': 0} for kind in self._pools}
+        self._queue_wait = {kind: LatencyStats() for kind in self._pools}
+        self._run_time = {kind: LatencyStats() for kind in self._pools}
+
+    async def read(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        return await self._submit(EXECUTOR_READ, func, args, kwargs)
+
+    async def write(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        return await self._submit(EXECUTOR_WRITE, func, args, kwargs)
+
+    def _get_semaphore(self, kind: str) -> asyncio.Semaphore:
+        if kind not in self._semaphores:
+            self._semaphores[kind] = asyncio.Semaphore(self.max_pending)
+        return self._semaphores[kind]
+
+    def _count(self, kind: str, key: str, delta: int = 1) -> None:
+        with self._stats_lock:
+            self._counters[kind][key] += delta
+
+    def _run_timed(self, kind: str, submitted_at: float, func: Callable, args: tuple, kwargs: dict) -> Any:
+        started_at = time.perf_counter()
+        self._queue_wait[kind].observe((started_at - submitted_at) * 1000)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._run_time[kind].observe((time.perf_counter() - started_at) * 1000)
+
+    async def _submit(self, kind: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+        self._count(kind, 'submitted')
+        if self.inline:
+            return self._run_inline(kind, func, args, kwargs)
+        semaphore = self._get_semaphore(kind)
+        self._count(kind, 'waiting')
+        async with semaphore:
+            self._count(kind, 'waiting', -1)
+            self._count(kind, 'in_flight')
+            try:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._pools[kind], self._run_timed, kind, time.perf_counter(), func, args, kwargs
+                )
+                self._count(kind, 'completed')
+                return result
+            except Exception:
+                self._count(kind, 'errors')
+                raise
+            finally:
+                self._count(kind, 'in_flight', -1)
+
+    def _run_inline(self, kind: str, func: Callable, args: tuple, kwargs: dict) -> Any:
+        try:
+            result = self._run_timed(kind, time.perf_counter(), func, args, kwargs)
+            self._count(kind, 'completed')
+            return result
+        except Exception:
+            self._count(kind, 'errors')
+            raise
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            counters = {kind: dict(values) for kind, values in self._counters.items()}
+        return {
+            kind: {
+                **counters[kind],
+                'queue_wait': self._queue_wait[kind].snapshot(),
+                'run_time': self._run_time[kind].snapshot(),
+            }
+            for kind in self._pools
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
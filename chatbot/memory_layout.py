@@ -0,0 +1,148 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LAYOUT_SINGLE = 'single'
+LAYOUT_PER_GUILD = 'per_guild'
+COLLECTION_METADATA = {"hnsw:space": "cosine"}
+
+
+def guild_collection_name(base_name: str, guild_id: Any) -> str:
+    guild_str = str(guild_id) if guild_id is not None and guild_id != "none" else "none"
+    return f"{base_name}_g{guild_str}"
+
+
+def _collection_names(client) -> List[str]:
+    return [getattr(collection, 'name', collection) for collection in client.list_collections()]
+
+
+class CollectionCache:
+    def __init__(self, client, base_name: str, max_open: Optional[int] = None, metadata: Optional[Dict[str, Any]] = None):
+        self.client = client
+        self.base_name = base_name
+        self.metadata = metadata or COLLECTION_METADATA
+        self.max_open = max_open or int(os.getenv('MEMORY_COLLECTION_CACHE_SIZE', '128'))
+        self._handles: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cached(self, guild_id: Any):
+        name = guild_collection_name(self.base_name, guild_id)
+        with self._lock:
+            collection = self._handles.get(name)
+            if collection is not None:
+                self._handles.move_to_end(name)
+                self.hits += 1
+            return collection
+
+    def get(self, guild_id: Any, create: bool = True):
+        collection = self.cached(guild_id)
+        if collection is not None:
+            return collection
+        return self.get_by_name(guild_collection_name(self.base_name, guild_id), create)
+
+    def get_by_name(self, name: str, create: bool = False):
+        with self._lock:
+            collection = self._handles.get(name)
+            if collection is not None:
+                self._handles.move_to_end(name)
+                self.hits += 1
+                return collection
+            self.misses += 1
+        if create:
+            collection = self.client.get_or_create_collection(name=name, metadata=self.metadata)
+        else:
+            try:
+                collection = self.client.get_collection(name=name)
+            except Exception:
+                return None
+        with self._lock:
+            self._handles[name] = collection
+            self._handles.move_to_end(name)
+            while len(self._handles) > self.max_open:
+                self._handles.popitem(last=False)
+                self.evictions += 1
+        return collection
+
+    def names(self) -> List[str]:
+        prefix = f"{self.base_name}_g"
+        return sorted(name for name in _collection_names(self.client) if name.startswith(prefix))
+
+    def all(self) -> List[Any]:
+        return [collection for collection in (self.get_by_name(name) for name in self.names()) if collection is not None]
+
+    def drop(self, guild_id: Any) -> int:
+        name = guild_collection_name(self.base_name, guild_id)
+        collection = self.get(guild_id, create=False)
+        if collection is None:
+            return 0
+        count = collection.count()
+        with self._lock:
+            self._handles.pop(name, None)
+        self.client.delete_collection(name=name)
+        return count
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            open_handles = len(self._handles)
+        return {
+            'open': open_handles,
+            'max_open': self.max_open,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+def migrate_to_per_guild(
+    client,
+    base_name: str,
+    batch_size: int = 500,
+    drop_source: bool = False,
+    progress_callback: Optional[Callable[[int], None]] = None
+) -> Dict[str, int]:
+    source = client.get_collection(name=base_name)
+    cache = CollectionCache(client, base_name)
+    migrated = 0
+    per_guild: Dict[str, int] = {}
+    offset = 0
+    while True:
+        page = source.get(offset=offset, limit=batch_size, include=["embeddings", "documents", "metadatas"])
+        ids = page.get('ids') or []
+        if not ids:
+            break
+        grouped: Dict[str, Dict[str, list]] = {}
+        for doc_id, embedding, document, metadata in zip(ids, page['embeddings'], page['documents'], page['metadatas']):
+            metadata = dict(metadata or {})
+            if 'timestamp_epoch' not in metadata and metadata.get('timestamp'):
+                try:
+                    timestamp = datetime.fromisoformat(metadata['timestamp'])
+                    metadata['timestamp_epoch'] = int(timestamp.replace(tzinfo=timezone.utc).timestamp())
+                except (ValueError, TypeError):
+                    pass
+            guild_str = metadata.get('guild_id', 'none')
+            group = grouped.setdefault(guild_str, {'ids': [], 'embeddings': [], 'documents': [], 'metadatas': []})
+            group['ids'].append(doc_id)
+            group['embeddings'].append(embedding)
+            group['documents'].append(document)
+            group['metadatas'].append(metadata)
+        for guild_str, group in grouped.items():
+            cache.get(guild_str).upsert(**group)
+            per_guild[guild_str] = per_guild.get(guild_str, 0) + len(group['ids'])
+        migrated += len(ids)
+        offset += len(ids)
+        if progress_callback:
+            progress_callback(migrated)
+        if len(ids) < batch_size:
+            break
+    if drop_source:
+        client.delete_collection(name=base_name)
+    logger.info(f"Migrated {migrated} memories from {base_name} into {len(per_guild)} guild collections")
+    return {'migrated': migrated, 'guilds': len(per_guild)}
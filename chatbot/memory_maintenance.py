@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MaintenanceScheduler:
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def add_job(
+        self,
+        name: str,
+        interval: float,
+        job_func: Callable[[], Awaitable[Any]],
+        initial_delay: Optional[float] = None
+    ) -> None:
+        self._jobs[name] = {
+            'interval': interval,
+            'func': job_func,
+            'initial_delay': interval if initial_delay is None else initial_delay,
+        }
+        self._stats[name] = {'runs': 0, 'errors': 0, 'last_result': None, 'last_duration_ms': None, 'last_run_at': None}
+
+    def start(self) -> None:
+        for name, job in self._jobs.items():
+            task = self._tasks.get(name)
+            if task is None or task.done():
+                self._tasks[name] = asyncio.create_task(self._run_job(name, job))
+
+    def stop(self) -> None:
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+        self._tasks.clear()
+
+    async def run_now(self, name: str) -> Any:
+        return await self._execute(name, self._jobs[name]['func'])
+
+    async def _run_job(self, name: str, job: Dict[str, Any]) -> None:
+        delay = job['initial_delay']
+        while True:
+            try:
+                await asyncio.sleep(delay)
+                await self._execute(name, job['func'])
+                delay = job['interval']
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Maintenance job {name} failed: {e}", exc_info=True)
+                delay = job['interval']
+
+    async def _execute(self, name: str, job_func: Callable[[], Awaitable[Any]]) -> Any:
+        stats = self._stats[name]
+        started_at = time.monotonic()
+        stats['last_run_at'] = time.time()
+        try:
+            result = await job_func()
+            stats['last_result'] = result
+            return result
+        except Exception:
+            stats['errors'] += 1
+            raise
+        finally:
+            stats['runs'] += 1
+            stats['last_duration_ms'] = round((time.monotonic() - started_at) * 1000, 1)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(stats) for name, stats in self._stats.items()}
@@ -1,10 +1,26 @@
 import os
+import asyncio
 import logging
+import shutil
+import time
 import uuid
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from typing import Any, Callable, List, Dict, Optional
+from datetime import datetime, timezone
 from pathlib import Path
-from collections import deque
+
+from chatbot.memory_compaction import SUMMARY_PREFIX, centroid, cluster_by_similarity, extractive_summary, summary_metadata
+from chatbot.memory_executor import ChromaExecutor
+from chatbot.memory_layout import COLLECTION_METADATA, LAYOUT_PER_GUILD, LAYOUT_SINGLE, CollectionCache
+from chatbot.memory_quota import LAST_RETRIEVED_FIELD, EvictionScan, QuotaScan, scope_where
+from chatbot.memory_reindex import (
+    clear_checkpoint, embedding_model_id, legacy_scan_done, load_checkpoint, load_index_state, mark_legacy_scan_done,
+    partition_key, save_checkpoint, save_index_state
+)
+from chatbot.memory_snapshot import FORMAT_JSONL, SnapshotReader, SnapshotWriter
+from chatbot.vector_store import PARTITION_FIELDS, VECTOR_STORE_NUMPY, ChromaVectorStore, VectorStore, vector_store_backend
+from chatbot.recent_buffer import RecentInteraction, RecentInteractionBuffer, RecentInteractionStore
+from chatbot.retrieval_cache import RetrievalCache, embedding_digest, retrieval_scope
+from chatbot.retrieval_gate import MODE_NONE, MODE_RECENT, MODE_SEMANTIC, RetrievalGate
 
 logger = logging.getLogger(__name__)
 
@@ -13,20 +29,72 @@ class MemoryManager:
     def __init__(self, embedding_service=None):
         self.embedding_service = embedding_service
         self._client = None
-        self._collection = None
+        self._store: Optional[VectorStore] = None
         self._initialized = False
+        self._executor = ChromaExecutor()
         
         self.chromadb_path = os.getenv('CHROMADB_PATH', './data/chromadb')
         self.collection_name = os.getenv('CHROMADB_COLLECTION_NAME', 'tangerina_memory')
+        self.vector_store_backend = vector_store_backend()
+        self.numpy_path = os.getenv('MEMORY_NUMPY_PATH', './data/vectors')
+        self.storage_layout = os.getenv('MEMORY_STORAGE_LAYOUT', LAYOUT_SINGLE).lower()
+        if self.storage_layout not in (LAYOUT_SINGLE, LAYOUT_PER_GUILD):
+            logger.warning(f"Unknown MEMORY_STORAGE_LAYOUT {self.storage_layout}, using {LAYOUT_SINGLE}")
+            self.storage_layout = LAYOUT_SINGLE
         self.max_results = int(os.getenv('MAX_RETRIEVAL_RESULTS', '10'))
         threshold = float(os.getenv('MEMORY_SIMILARITY_THRESHOLD', '0.3'))
         self.similarity_threshold = min(threshold, 0.4)
         if threshold > 0.4:
             logger.warning(f"Similarity threshold {threshold} is too high for semantic search, capping at 0.4")
         self.retention_days = int(os.getenv('MEMORY_RETENTION_DAYS', '30'))
+        self.cleanup_interval = float(os.getenv('MEMORY_CLEANUP_INTERVAL_SECONDS', '3600'))
+        self.cleanup_time_budget = float(os.getenv('MEMORY_CLEANUP_TIME_BUDGET_SECONDS', '5'))
+        self.cleanup_page_size = int(os.getenv('MEMORY_CLEANUP_PAGE_SIZE', '500'))
+        self._legacy_scan_offset = 0
+        self._legacy_scan_found = 0
+        self._legacy_scan_done = False
+        self.purge_page_size = int(os.getenv('MEMORY_PURGE_PAGE_SIZE', '500'))
+        self.purge_jobs: Dict[str, Dict[str, Any]] = {}
+        self.compaction_enabled = os.getenv('MEMORY_COMPACTION_ENABLED', 'true').lower() == 'true'
+        self.compaction_interval = float(os.getenv('MEMORY_COMPACTION_INTERVAL_SECONDS', '21600'))
+        self.compaction_min_age_days = int(os.getenv('MEMORY_COMPACTION_MIN_AGE_DAYS', '7'))
+        self.compaction_similarity = float(os.getenv('MEMORY_COMPACTION_SIMILARITY', '0.8'))
+        self.compaction_max_cluster = int(os.getenv('MEMORY_COMPACTION_MAX_CLUSTER', '8'))
+        self.compaction_page_size = int(os.getenv('MEMORY_COMPACTION_PAGE_SIZE', '200'))
+        self.compaction_time_budget = float(os.getenv('MEMORY_COMPACTION_TIME_BUDGET_SECONDS', '30'))
+        self.compaction_summary_chars = int(os.getenv('MEMORY_COMPACTION_SUMMARY_CHARS', '600'))
+        self.summarizer: Optional[Callable[[List[str]], Any]] = None
+        self.snapshot_page_size = int(os.getenv('MEMORY_SNAPSHOT_PAGE_SIZE', '1000'))
+        self._purge_tasks: Dict[str, asyncio.Task] = {}
+        self.reindex_page_size = int(os.getenv('MEMORY_REINDEX_PAGE_SIZE', '256'))
+        self.reindex_concurrency = int(os.getenv('MEMORY_REINDEX_CONCURRENCY', '4'))
+        self.reindex_job: Optional[Dict[str, Any]] = None
+        self._reindex_task: Optional[asyncio.Task] = None
+        self._reindex_pending: Optional[Dict[str, tuple]] = None
+        self._reindex_purges: List[tuple] = []
+        self.index_state: Dict[str, Any] = {'version': 0, 'location': None, 'embedding_model': None}
+        self.retrieval_gate = RetrievalGate.from_env()
+        self.retrieval_cache = RetrievalCache()
+        self.guild_quota = int(os.getenv('MEMORY_GUILD_QUOTA', '0'))
+        self.user_quota = int(os.getenv('MEMORY_USER_QUOTA', '0'))
+        self.quota_interval = float(os.getenv('MEMORY_QUOTA_INTERVAL_SECONDS', '900'))
+        self.quota_time_budget = float(os.getenv('MEMORY_QUOTA_TIME_BUDGET_SECONDS', '5'))
+        self.quota_page_size = int(os.getenv('MEMORY_QUOTA_PAGE_SIZE', '1000'))
+        self.retrieval_flush_interval = float(os.getenv('MEMORY_RETRIEVAL_FLUSH_INTERVAL_SECONDS', '60'))
+        self._retrieved: Dict[str, Dict[str, Any]] = {}
+        self._quota_scan: Optional[QuotaScan] = None
+        self.quota_stats = {'passes': 0, 'evicted': 0, 'retrieval_updates': 0}
         
-        self.recent_interactions: Dict[str, deque] = {}
+        self.recent_interactions = RecentInteractionBuffer()
         self.recent_buffer_size = int(os.getenv('RECENT_MEMORY_BUFFER_SIZE', '3'))
+        self.recent_expiry_interval = float(os.getenv('RECENT_MEMORY_EXPIRY_INTERVAL_SECONDS', '300'))
+        self._recent_store = None
+        recent_db_path = os.getenv('RECENT_MEMORY_DB_PATH', '')
+        if recent_db_path:
+            try:
+                self._recent_store = RecentInteractionStore(recent_db_path)
+            except Exception as e:
+                logger.error(f"Failed to open recent interaction store at {recent_db_path}: {e}")
         
         if not self.embedding_service:
             from chatbot.embedding_service import create_embedding_service
@@ -35,12 +103,65 @@ class MemoryManager:
                 logger.warning("No embedding service available, memory features disabled")
                 return
         
-        self._initialize_chromadb()
+        self._initialize_store()
 
     def _get_conversation_key(self, guild_id: Optional[int], channel_id: int, user_id: int) -> str:
         guild_str = str(guild_id) if guild_id else "none"
         return f"{guild_str}_{channel_id}_{user_id}"
 
+    @property
+    def _collection(self):
+        return self._store.collection if isinstance(self._store, ChromaVectorStore) else None
+
+    @_collection.setter
+    def _collection(self, collection):
+        self._chroma_store().collection = collection
+
+    @property
+    def _collections(self) -> Optional[CollectionCache]:
+        return self._store.collections if isinstance(self._store, ChromaVectorStore) else None
+
+    @_collections.setter
+    def _collections(self, collections: Optional[CollectionCache]):
+        self._chroma_store().collections = collections
+
+    def _chroma_store(self) -> ChromaVectorStore:
+        if not isinstance(self._store, ChromaVectorStore):
+            self._store = ChromaVectorStore()
+        return self._store
+
+    def _index_root(self) -> str:
+        return self.numpy_path if self.vector_store_backend == VECTOR_STORE_NUMPY else self.chromadb_path
+
+    def _open_store(self, location: Optional[str], metadata: Optional[Dict[str, Any]] = None) -> VectorStore:
+        if self.vector_store_backend == VECTOR_STORE_NUMPY:
+            from chatbot.numpy_vector_store import NumpyVectorStore
+            return NumpyVectorStore(str(Path(self.numpy_path) / location) if location else self.numpy_path)
+        name = location or self.collection_name
+        metadata = metadata or COLLECTION_METADATA
+        if self.storage_layout == LAYOUT_PER_GUILD:
+            return ChromaVectorStore(collections=CollectionCache(self._client, name, metadata=metadata))
+        return ChromaVectorStore(collection=self._client.get_or_create_collection(name=name, metadata=metadata))
+
+    def _initialize_store(self):
+        self.index_state = load_index_state(self._index_root())
+        if self.vector_store_backend == VECTOR_STORE_NUMPY:
+            self._initialize_numpy_store()
+        else:
+            self._initialize_chromadb()
+        if self._initialized:
+            self._check_embedding_model()
+
+    def _initialize_numpy_store(self):
+        try:
+            self._store = self._open_store(self.index_state['location'])
+            self._legacy_scan_done = True
+            self._initialized = True
+            logger.info(f"NumPy vector store initialized at {self._store.path}")
+        except Exception as e:
+            logger.error(f"Failed to initialize NumPy vector store: {e}")
+            self._initialized = False
+
     def _initialize_chromadb(self):
         try:
             import chromadb
@@ -53,13 +174,14 @@ class MemoryManager:
                 settings=Settings(anonymized_telemetry=False)
             )
             
-            self._collection = self._client.get_or_create_collection(
-                name=self.collection_name,
-                metadata={"hnsw:space": "cosine"}
-            )
+            self._store = self._open_store(self.index_state['location'])
+            if self.storage_layout == LAYOUT_PER_GUILD:
+                self._legacy_scan_done = True
+            else:
+                self._legacy_scan_done = legacy_scan_done(self.chromadb_path, self._store.collection.name)
             
             self._initialized = True
-            logger.info(f"ChromaDB initialized at {self.chromadb_path}")
+            logger.info(f"ChromaDB initialized at {self.chromadb_path} with {self.storage_layout} layout")
         except ImportError:
             logger.error("chromadb package not installed")
             self._initialized = False
@@ -67,6 +189,30 @@ class MemoryManager:
             logger.error(f"Failed to initialize ChromaDB: {e}")
             self._initialized = False
 
+    def _check_embedding_model(self):
+        current = embedding_model_id(self.embedding_service)
+        stored = self.index_state.get('embedding_model')
+        if current is None or stored == current:
+            return
+        if stored is None:
+            logger.info(f"No embedding model recorded for stored memories, recording {current}")
+            self.index_state['embedding_model'] = current
+            try:
+                save_index_state(self._index_root(), self.index_state)
+            except OSError as e:
+                logger.error(f"Failed to record embedding model: {e}")
+            return
+        logger.warning(
+            f"Stored memories were embedded with {stored} but the embedding service is {current}; "
+            f"semantic retrieval will not match until a reindex to {current} completes"
+        )
+
+    @property
+    def embedding_mismatch(self) -> bool:
+        current = embedding_model_id(self.embedding_service)
+        stored = self.index_state.get('embedding_model')
+        return bool(current and stored and current != stored)
+
     async def store_conversation(
         self,
         user_message: str,
@@ -80,43 +226,49 @@ class MemoryManager:
             return
         
         try:
+            # Capture both so a reindex switch cannot pair an old-model vector with the new store
+            store, embedding_service = self._store, self.embedding_service
+            doc_id = str(uuid.uuid4())
             document = f"User: {user_message} Bot: {bot_response}"
+            now = datetime.utcnow()
             metadata = {
                 "guild_id": str(guild_id) if guild_id is not None else "none",
                 "channel_id": str(channel_id),
                 "user_id": str(user_id),
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": now.isoformat(),
+                "timestamp_epoch": int(now.replace(tzinfo=timezone.utc).timestamp()),
                 "message_type": "conversation",
             }
 
             if tool_calls:
                 metadata["tool_calls"] = str(len(tool_calls))
 
+            if self._reindex_pending is not None:
+                self._reindex_pending[doc_id] = (document, metadata)
+
             conversation_key = self._get_conversation_key(guild_id, channel_id, user_id)
-            if conversation_key not in self.recent_interactions:
-                self.recent_interactions[conversation_key] = deque(maxlen=self.recent_buffer_size)
-
-            self.recent_interactions[conversation_key].append({
-                "user_message": user_message,
-                "bot_response": bot_response,
-                "timestamp": metadata["timestamp"],
-                "metadata": metadata
-            })
+            record = RecentInteraction.from_metadata(user_message, bot_response, metadata)
+            self.recent_interactions.append(conversation_key, record, self.recent_buffer_size)
+            if self._recent_store:
+                try:
+                    await asyncio.to_thread(self._recent_store.append, conversation_key, record, self.recent_buffer_size)
+                except Exception as e:
+                    logger.error(f"Error persisting recent interaction: {e}")
 
-            embedding = await self.embedding_service.embed_text(document)
+            embedding = await embedding_service.embed_text(document)
 
             if not embedding:
                 logger.warning("Failed to generate embedding, skipping vector storage")
                 return
 
-            doc_id = str(uuid.uuid4())
-
-            self._collection.add(
+            await self._executor.write(
+                store.add,
                 ids=[doc_id],
                 embeddings=[embedding],
                 documents=[document],
                 metadatas=[metadata]
             )
+            self.retrieval_cache.invalidate_scope(retrieval_scope(guild_id, channel_id, user_id))
 
             logger.debug(f"Stored conversation memory: {doc_id}")
         except Exception as e:
@@ -131,31 +283,59 @@ class MemoryManager:
         max_results: Optional[int] = None
     ) -> List[Dict]:
         conversation_key = self._get_conversation_key(guild_id, channel_id, user_id)
-        recent_buffer = self.recent_interactions.get(conversation_key, deque())
+        recent_buffer = self.recent_interactions.lookup(conversation_key)
+        if recent_buffer is None and self._recent_store:
+            recent_buffer = await self._load_recent_interactions(conversation_key)
         
         max_results = max_results or self.recent_buffer_size
-        recent_list = list(recent_buffer)[-max_results:]
+        recent_list = list(recent_buffer or ())[-max_results:]
         
         return [
             {
-                "content": f"User: {item['user_message']} Bot: {item['bot_response']}",
-                "metadata": item["metadata"],
+                "content": f"User: {item.user_message} Bot: {item.bot_response}",
+                "metadata": item.metadata,
                 "type": "recent",
-                "timestamp": item["timestamp"]
+                "timestamp": item.timestamp
             }
             for item in recent_list
         ]
 
+    async def _load_recent_interactions(self, conversation_key: str):
+        try:
+            records = await asyncio.to_thread(self._recent_store.load, conversation_key, self.recent_buffer_size)
+        except Exception as e:
+            logger.error(f"Error loading recent interactions for {conversation_key}: {e}")
+            return None
+        if not records:
+            return None
+        return self.recent_interactions.load(conversation_key, records, self.recent_buffer_size)
+
+    async def expire_recent_interactions(self) -> int:
+        expired = self.recent_interactions.expire_idle()
+        if self._recent_store:
+            cutoff_epoch = int(time.time() - self.recent_interactions.idle_seconds)
+            try:
+                await asyncio.to_thread(self._recent_store.delete_older_than, cutoff_epoch)
+            except Exception as e:
+                logger.error(f"Error expiring persisted recent interactions: {e}")
+        if expired:
+            logger.debug(f"Expired {expired} idle recent conversation buffers")
+        return expired
+
     async def retrieve_context(
         self,
         query: str,
         guild_id: Optional[int],
         channel_id: int,
         user_id: int,
-        max_results: Optional[int] = None
+        max_results: Optional[int] = None,
+        mode: str = MODE_SEMANTIC
     ) -> Dict[str, List[Dict]]:
-        if not self._initialized or not self.embedding_service:
+        if not self._initialized or not self.embedding_service or mode == MODE_NONE:
             return {"recent": [], "semantic": []}
+        if mode == MODE_RECENT:
+            recent_memories = await self.retrieve_recent_interactions(guild_id, channel_id, user_id)
+            return {"recent": recent_memories, "semantic": []}
         
         try:
             query_embedding = await self.embedding_service.embed_text(query)
@@ -167,43 +347,33 @@ class MemoryManager:
             
             max_results = max_results or self.max_results
             query_results_count = min(max_results * 2, 20)
+            scope = retrieval_scope(guild_id, channel_id, user_id)
+            digest = embedding_digest(query_embedding)
+            semantic_memories = self.retrieval_cache.get(scope, digest, max_results)
+            if semantic_memories is not None:
+                self._mark_retrieved(semantic_memories)
+                recent_memories = await self.retrieve_recent_interactions(guild_id, channel_id, user_id)
+                return {"recent": recent_memories, "semantic": semantic_memories}
+            generation = self.retrieval_cache.generation
             
-            conditions = [
-                {"channel_id": str(channel_id)},
-                {"user_id": str(user_id)}
-            ]
-            if guild_id is not None:
-                conditions.append({"guild_id": str(guild_id)})
-            else:
-                conditions.append({"guild_id": "none"})
-            where_clause = {"$and": conditions}
-            
-            results = self._collection.query(
-                query_embeddings=[query_embedding],
-                n_results=query_results_count,
-                where=where_clause
+            results = await self._executor.read(
+                self._store.query,
+                query_embedding,
+                guild_id,
+                channel_id,
+                user_id,
+                query_results_count
             )
             
             semantic_memories = []
-            if results and results.get('documents') and results['documents'][0]:
-                documents = results['documents'][0]
-                metadatas = results.get('metadatas', [[]])[0] if results.get('metadatas') else []
-                distances = results.get('distances', [[]])[0] if results.get('distances') else []
-                
+            if results:
                 memory_candidates = []
-                for idx, doc in enumerate(documents):
-                    distance = distances[idx] if idx < len(distances) else 1.0
-                    similarity = 1.0 - distance
-                    
-                    doc_metadata = metadatas[idx] if idx < len(metadatas) else {}
-                    
+                for result in results:
+                    if self._reindex_purges and self._purge_deferred(result["metadata"]):
+                        continue
+                    similarity = 1.0 - result["distance"]
                     if similarity >= self.similarity_threshold:
-                        memory_candidates.append({
-                            "content": doc,
-                            "metadata": doc_metadata,
-                            "similarity": similarity,
-                            "distance": distance
-                        })
+                        memory_candidates.append({**result, "similarity": similarity})
                 
                 memory_candidates.sort(key=lambda x: x["similarity"], reverse=True)
                 
@@ -213,6 +383,7 @@ class MemoryManager:
                     if content_normalized not in seen_content:
                         seen_content.add(content_normalized)
                         semantic_memories.append({
+                            "id": candidate.get("id"),
                             "content": candidate["content"],
                             "metadata": candidate["metadata"],
                             "similarity": candidate["similarity"],
@@ -220,6 +391,8 @@ class MemoryManager:
                         })
                         if len(semantic_memories) >= max_results:
                             break
+            self.retrieval_cache.put(scope, digest, max_results, semantic_memories, generation)
+            self._mark_retrieved(semantic_memories)
             
             recent_memories = await self.retrieve_recent_interactions(guild_id, channel_id, user_id)
             
@@ -232,62 +405,758 @@ class MemoryManager:
             recent_memories = await self.retrieve_recent_interactions(guild_id, channel_id, user_id)
             return {"recent": recent_memories, "semantic": []}
 
-    async def delete_user_memories(self, user_id: int):
-        if not self._initialized:
+    @property
+    def quotas_enabled(self) -> bool:
+        return self.guild_quota > 0 or self.user_quota > 0
+
+    def _mark_retrieved(self, memories: List[Dict]):
+        if not self.quotas_enabled:
             return
+        now = int(time.time())
+        for memory in memories:
+            if memory.get("id"):
+                # The store merges keys, so sending only the mark keeps fields written since the query ran
+                metadata = memory["metadata"]
+                mark = {key: metadata[key] for key in PARTITION_FIELDS if key in metadata}
+                self._retrieved[memory["id"]] = {**mark, LAST_RETRIEVED_FIELD: now}
+
+    async def flush_retrieval_marks(self) -> int:
+        """Write pending last-retrieved timestamps to the store in one batch."""
+        if not self._initialized or not self._retrieved:
+            return 0
+        pending, self._retrieved = self._retrieved, {}
+        try:
+            await self._executor.write(self._store.update_metadatas, list(pending), list(pending.values()))
+        except Exception as e:
+            logger.error(f"Error updating last retrieved timestamps: {e}")
+            return 0
+        self.quota_stats['retrieval_updates'] += len(pending)
+        return len(pending)
+
+    async def retrieve_for_message(
+        self,
+        text: str,
+        guild_id: Optional[int],
+        channel_id: Optional[int],
+        user_id: int
+    ) -> Dict[str, List[Dict]]:
+        """Retrieve context for an incoming message, skipping the embedding and vector search when the gate says so."""
+        mode = self.retrieval_gate.decide(text)
+        return await self.retrieve_context(text, guild_id, channel_id, user_id, mode=mode)
+
+    async def purge_memories(
+        self,
+        where: Dict[str, Any],
+        progress_callback: Optional[Callable[[int], None]] = None,
+        store: Optional[VectorStore] = None
+    ) -> int:
+        store = store or self._store
+        deleted = 0
+        for partition in await self._executor.read(store.partitions):
+            while True:
+                ids = await self._executor.read(store.get_ids, partition, where, self.purge_page_size)
+                if not ids:
+                    break
+                await self._executor.write(store.delete, partition, ids)
+                deleted += len(ids)
+                if progress_callback:
+                    progress_callback(len(ids))
+                if len(ids) < self.purge_page_size:
+                    break
+        return deleted
+
+    async def _purge_scope(
+        self,
+        scope: str,
+        scope_id: Any,
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> int:
+        if self._reindex_pending is not None:
+            # The reindex copy pages the live store by offset, so deleting rows under it would skip others.
+            # The purge waits for the switch and is applied to both indexes; the scope is hidden until then.
+            done = asyncio.get_running_loop().create_future()
+            self._reindex_purges.append((scope, str(scope_id), done))
+            self._forget_scope(scope, scope_id)
+            deleted = await asyncio.shield(done)
+            if progress_callback:
+                progress_callback(deleted)
+            return deleted
+        try:
+            return await self._delete_scope(self._store, scope, scope_id, progress_callback)
+        finally:
+            # Also on failure: a partial purge has already changed the scope
+            self._forget_scope(scope, scope_id)
+
+    async def _delete_scope(
+        self,
+        store: VectorStore,
+        scope: str,
+        scope_id: Any,
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> int:
+        if scope == "guild":
+            deleted = await self._executor.write(store.drop_guild, scope_id)
+            if deleted is not None:
+                if progress_callback:
+                    progress_callback(deleted)
+                return deleted
+        return await self.purge_memories({f"{scope}_id": str(scope_id)}, progress_callback, store)
+
+    def _forget_scope(self, scope: str, scope_id: Any):
+        self.retrieval_cache.forget(scope, scope_id)
+        self._retrieved = {
+            doc_id: metadata for doc_id, metadata in self._retrieved.items()
+            if metadata.get(f"{scope}_id") != str(scope_id)
+        }
+
+    def _purge_deferred(self, metadata: Dict[str, Any]) -> bool:
+        return any(metadata.get(f"{scope}_id") == scope_id for scope, scope_id, _ in self._reindex_purges)
+
+    async def _apply_deferred_purges(self, stores: List[VectorStore]):
+        """Apply purges queued during a reindex, reporting the rows deleted from the first store."""
+        while self._reindex_purges:
+            scope, scope_id, done = self._reindex_purges[0]
+            try:
+                deleted = [await self._delete_scope(store, scope, scope_id) for store in stores]
+            except Exception as e:
+                logger.error(f"Error applying deferred {scope} purge for {scope_id}: {e}", exc_info=True)
+                if not done.done():
+                    done.set_exception(e)
+            else:
+                if not done.done():
+                    done.set_result(deleted[0])
+            finally:
+                self._reindex_purges.pop(0)
+                self._forget_scope(scope, scope_id)
+
+    async def _forget_recent_interactions(self, scope: str, scope_id: Any):
+        self.recent_interactions.forget(scope, scope_id)
+        if self._recent_store:
+            try:
+                await asyncio.to_thread(self._recent_store.forget, scope, scope_id)
+            except Exception as e:
+                logger.error(f"Error forgetting persisted recent interactions: {e}")
+
+    async def delete_user_memories(self, user_id: int) -> int:
+        if not self._initialized:
+            return 0
         
         try:
-            results = self._collection.get(
-                where={"user_id": str(user_id)}
-            )
-            
-            if results and results.get('ids'):
-                self._collection.delete(ids=results['ids'])
-                logger.info(f"Deleted {len(results['ids'])} memories for user {user_id}")
+            await self._forget_recent_interactions("user", user_id)
+            deleted = await self._purge_scope("user", user_id)
+            if deleted:
+                logger.info(f"Deleted {deleted} memories for user {user_id}")
+            return deleted
         except Exception as e:
             logger.error(f"Error deleting user memories: {e}", exc_info=True)
+            return 0
 
-    async def delete_guild_memories(self, guild_id: int):
+    async def delete_guild_memories(self, guild_id: int) -> int:
         if not self._initialized:
-            return
+            return 0
         
         try:
-            results = self._collection.get(
-                where={"guild_id": str(guild_id)}
-            )
-            
-            if results and results.get('ids'):
-                self._collection.delete(ids=results['ids'])
-                logger.info(f"Deleted {len(results['ids'])} memories for guild {guild_id}")
+            await self._forget_recent_interactions("guild", guild_id)
+            deleted = await self._purge_scope("guild", guild_id)
+            if deleted:
+                logger.info(f"Deleted {deleted} memories for guild {guild_id}")
+            return deleted
         except Exception as e:
             logger.error(f"Error deleting guild memories: {e}", exc_info=True)
+            return 0
 
-    async def cleanup_old_memories(self):
+    async def start_purge_job(self, scope: str, scope_id: int) -> Dict[str, Any]:
+        if scope not in ("user", "guild"):
+            raise ValueError(f"Unknown purge scope: {scope}")
         if not self._initialized:
-            return
+            raise RuntimeError("Memory storage is not initialized")
+        
+        job_id = f"{scope}-{scope_id}"
+        job = self.purge_jobs.get(job_id)
+        task = self._purge_tasks.get(job_id)
+        if job and task and not task.done():
+            return dict(job)
+        
+        if job is None or job["status"] == "completed":
+            job = {"job_id": job_id, "scope": scope, "scope_id": str(scope_id), "deleted": 0, "started_at": time.time()}
+        job.update({"status": "running", "error": None, "finished_at": None})
+        self.purge_jobs[job_id] = job
+        self._purge_tasks[job_id] = asyncio.create_task(self._run_purge_job(job))
+        return dict(job)
+
+    async def _run_purge_job(self, job: Dict[str, Any]):
+        await self._forget_recent_interactions(job["scope"], job["scope_id"])
+        
+        def record_progress(count: int):
+            job["deleted"] += count
+            job["updated_at"] = time.time()
+        
+        try:
+            await self._purge_scope(job["scope"], job["scope_id"], record_progress)
+            job["status"] = "completed"
+            logger.info(f"Purge job {job['job_id']} completed, {job['deleted']} memories deleted")
+        except asyncio.CancelledError:
+            job["status"] = "cancelled"
+            raise
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            logger.error(f"Purge job {job['job_id']} failed: {e}", exc_info=True)
+        finally:
+            job["finished_at"] = time.time()
+
+    def get_purge_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.purge_jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def cancel_purge_job(self, job_id: str) -> bool:
+        task = self._purge_tasks.get(job_id)
+        if not task or task.done():
+            return False
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return True
+
+    async def cleanup_old_memories(self, time_budget: Optional[float] = None) -> int:
+        # The reindex copy pages the live store by offset, so deleting rows under it would skip others
+        if not self._initialized or self._reindex_pending is not None:
+            return 0
+        
+        time_budget = self.cleanup_time_budget if time_budget is None else time_budget
+        deadline = time.monotonic() + time_budget
+        cutoff_epoch = int(time.time()) - self.retention_days * 86400
+        deleted = 0
         
         try:
-            cutoff_date = datetime.utcnow() - timedelta(days=self.retention_days)
+            for partition in await self._executor.read(self._store.partitions):
+                if time.monotonic() >= deadline:
+                    break
+                deleted += await self._cleanup_partition(partition, cutoff_epoch, deadline)
             
-            results = self._collection.get()
+            if not self._legacy_scan_done and time.monotonic() < deadline:
+                deleted += await self._cleanup_legacy_memories(cutoff_epoch, deadline)
             
-            if not results or not results.get('ids'):
-                return
+            if deleted:
+                self.retrieval_cache.clear()
+                logger.info(f"Cleaned up {deleted} old memories")
+        except Exception as e:
+            logger.error(f"Error cleaning up old memories: {e}", exc_info=True)
+        return deleted
+
+    async def _cleanup_partition(self, partition: Any, cutoff_epoch: int, deadline: float) -> int:
+        deleted = 0
+        while time.monotonic() < deadline:
+            ids = await self._executor.read(
+                self._store.get_ids,
+                partition,
+                {"timestamp_epoch": {"$lt": cutoff_epoch}},
+                self.cleanup_page_size
+            )
+            if not ids:
+                break
+            await self._executor.write(self._store.delete, partition, ids)
+            deleted += len(ids)
+            if len(ids) < self.cleanup_page_size:
+                break
+        return deleted
+
+    async def _cleanup_legacy_memories(self, cutoff_epoch: int, deadline: float) -> int:
+        """Backfill ``timestamp_epoch`` on rows stored before it existed, deleting the expired ones.
+
+        Cleanups, purges and quota eviction delete rows between runs and shift
+        the offsets this scan pages by, so rows can be skipped. The scan
+        therefore repeats until a full pass finds no legacy rows, and only then
+        records completion so restarts do not scan again.
+        """
+        deleted = 0
+        while time.monotonic() < deadline:
+            results = await self._executor.read(self._store.legacy_page, self._legacy_scan_offset, self.cleanup_page_size)
+            results = results or {'ids': [], 'metadatas': []}
+            ids = results.get('ids') or []
             
-            ids_to_delete = []
-            metadatas = results.get('metadatas', [])
+            expired_ids = []
+            backfill_ids = []
+            backfill_metadatas = []
+            for doc_id, metadata in zip(ids, results.get('metadatas') or []):
+                if not metadata or 'timestamp_epoch' in metadata or 'timestamp' not in metadata:
+                    continue
+                try:
+                    timestamp = datetime.fromisoformat(metadata['timestamp'])
+                except (ValueError, TypeError):
+                    continue
+                epoch = int(timestamp.replace(tzinfo=timezone.utc).timestamp())
+                if epoch < cutoff_epoch:
+                    expired_ids.append(doc_id)
+                else:
+                    backfill_ids.append(doc_id)
+                    mark = {key: metadata[key] for key in PARTITION_FIELDS if key in metadata}
+                    backfill_metadatas.append({**mark, "timestamp_epoch": epoch})
             
-            for idx, metadata in enumerate(metadatas):
-                if metadata and 'timestamp' in metadata:
-                    try:
-                        timestamp = datetime.fromisoformat(metadata['timestamp'])
-                        if timestamp < cutoff_date:
-                            ids_to_delete.append(results['ids'][idx])
-                    except (ValueError, TypeError):
-                        continue
+            if expired_ids:
+                await self._executor.write(self._store.delete, self._collection, expired_ids)
+                deleted += len(expired_ids)
+            if backfill_ids:
+                await self._executor.write(self._store.update_metadatas, backfill_ids, backfill_metadatas)
+            self._legacy_scan_found += len(expired_ids) + len(backfill_ids)
             
-            if ids_to_delete:
-                self._collection.delete(ids=ids_to_delete)
-                logger.info(f"Cleaned up {len(ids_to_delete)} old memories")
+            # Deleted rows are gone from the collection, so the next page starts right after the kept ones
+            self._legacy_scan_offset += len(ids) - len(expired_ids)
+            if len(ids) < self.cleanup_page_size:
+                if self._legacy_scan_found == 0:
+                    await self._finish_legacy_scan()
+                    break
+                self._legacy_scan_offset = 0
+                self._legacy_scan_found = 0
+        return deleted
+
+    async def _finish_legacy_scan(self):
+        self._legacy_scan_done = True
+        if self._collection is None:
+            return
+        try:
+            await asyncio.to_thread(mark_legacy_scan_done, self.chromadb_path, self._collection.name)
+        except OSError as e:
+            logger.error(f"Failed to record legacy timestamp scan completion: {e}")
+
+    async def enforce_memory_quotas(self, time_budget: Optional[float] = None) -> int:
+        """Evict the least recently retrieved memories of guilds and users over their quota.
+
+        Counting pages through store metadata and resumes where the previous run
+        stopped; eviction starts once a full pass is counted.
+        """
+        if not self._initialized or not self.quotas_enabled or self._reindex_pending is not None:
+            return 0
+        
+        time_budget = self.quota_time_budget if time_budget is None else time_budget
+        deadline = time.monotonic() + time_budget
+        evicted = 0
+        
+        try:
+            await self.flush_retrieval_marks()
+            if self._quota_scan is None:
+                self._quota_scan = QuotaScan(await self._executor.read(self._store.partitions))
+            scan = self._quota_scan
+            while not scan.counted and time.monotonic() < deadline:
+                page = await self._executor.read(
+                    self._store.get_metadatas, scan.partitions[scan.index], {}, scan.offset, self.quota_page_size
+                )
+                scan.add_page(page['metadatas'], self.quota_page_size)
+            if not scan.counted:
+                return 0
+            if scan.pending is None:
+                scan.queue_over_quota(self.guild_quota, self.user_quota)
+            while scan.pending and time.monotonic() < deadline:
+                evicted += await self._evict_over_quota(scan, deadline)
+            if not scan.pending:
+                self._quota_scan = None
+                self.quota_stats['passes'] += 1
+            if evicted:
+                self.quota_stats['evicted'] += evicted
+                logger.info(f"Evicted {evicted} memories over quota")
         except Exception as e:
-            logger.error(f"Error cleaning up old memories: {e}", exc_info=True)
+            self._quota_scan = None
+            logger.error(f"Error enforcing memory quotas: {e}", exc_info=True)
+        return evicted
+
+    async def _evict_over_quota(self, scan: QuotaScan, deadline: float) -> int:
+        scope = scan.pending[0]
+        quota = self.guild_quota if scope[0] == 'guild' else self.user_quota
+        if scan.eviction is None:
+            scan.eviction = EvictionScan(scope, scan.locations.get(scope, ()), scan.counts[scope] - quota)
+        eviction = scan.eviction
+        where = scope_where(scope)
+        while not eviction.done:
+            if time.monotonic() >= deadline:
+                return 0
+            page = await self._executor.read(
+                self._store.get_metadatas, scan.partitions[eviction.partition_index], where, eviction.offset, self.quota_page_size
+            )
+            eviction.add_page(page['ids'], page['metadatas'], self.quota_page_size)
+        
+        scan.pending.pop(0)
+        scan.eviction = None
+        evicted = 0
+        # The pass counted the scope again: cleanups and purges may have run since the quota scan
+        for index, ids in eviction.victims(quota).items():
+            await self._executor.write(self._store.delete, scan.partitions[index], ids)
+            evicted += len(ids)
+        if evicted:
+            self.retrieval_cache.forget("guild" if scope[0] == 'guild' else "user", scope[-1])
+        return evicted
+
+    async def compact_memories(self, time_budget: Optional[float] = None) -> int:
+        if not self._initialized or not self.embedding_service or self._reindex_pending is not None:
+            return 0
+        
+        time_budget = self.compaction_time_budget if time_budget is None else time_budget
+        deadline = time.monotonic() + time_budget
+        age_cutoff = int(time.time()) - self.compaction_min_age_days * 86400
+        where = {"$and": [
+            {"timestamp_epoch": {"$lt": age_cutoff}},
+            {"message_type": "conversation"},
+            {"compaction_checked": {"$ne": 1}},
+        ]}
+        compacted = 0
+        
+        try:
+            for partition in await self._executor.read(self._store.partitions):
+                while time.monotonic() < deadline:
+                    records = await self._executor.read(self._store.get_records, partition, where, self.compaction_page_size)
+                    if not records['ids']:
+                        break
+                    compacted += await self._compact_records(partition, records, deadline)
+                    if len(records['ids']) < self.compaction_page_size:
+                        break
+            if compacted:
+                self.retrieval_cache.clear()
+                logger.info(f"Compacted {compacted} memories into summaries")
+        except Exception as e:
+            logger.error(f"Error compacting memories: {e}", exc_info=True)
+        return compacted
+
+    async def _compact_records(self, partition: Any, records: Dict[str, list], deadline: float) -> int:
+        scopes: Dict[tuple, List[int]] = {}
+        for idx, metadata in enumerate(records['metadatas']):
+            key = (metadata.get("guild_id"), metadata.get("channel_id"), metadata.get("user_id"))
+            scopes.setdefault(key, []).append(idx)
+        
+        clusters: List[List[int]] = []
+        singletons: List[int] = []
+        for rows in scopes.values():
+            rows.sort(key=lambda idx: records['metadatas'][idx].get("timestamp_epoch", 0))
+            for cluster in cluster_by_similarity(
+                [records['embeddings'][idx] for idx in rows], self.compaction_similarity, self.compaction_max_cluster
+            ):
+                members = [rows[i] for i in cluster]
+                if len(members) > 1:
+                    clusters.append(members)
+                else:
+                    singletons.extend(members)
+        
+        # Each summary may be an LLM call, so clusters left when the budget runs out wait for the next run
+        summaries = []
+        for members in clusters:
+            if time.monotonic() >= deadline:
+                break
+            summaries.append(await self._summarize_cluster(records, members))
+        clusters = clusters[:len(summaries)]
+        
+        if clusters:
+            embeddings = await self.embedding_service.embed_batch(summaries)
+            summary_embeddings = [
+                embeddings[i] if embeddings and i < len(embeddings) and embeddings[i]
+                else centroid([records['embeddings'][idx] for idx in members])
+                for i, members in enumerate(clusters)
+            ]
+            await self._executor.write(
+                self._store.add,
+                ids=[str(uuid.uuid4()) for _ in clusters],
+                embeddings=summary_embeddings,
+                documents=summaries,
+                metadatas=[summary_metadata([records['metadatas'][idx] for idx in members]) for members in clusters]
+            )
+            await self._executor.write(
+                self._store.delete, partition, [records['ids'][idx] for members in clusters for idx in members]
+            )
+        
+        if singletons:
+            # The store merges keys, so sending only the mark keeps edits made since the page was read
+            marks = []
+            for idx in singletons:
+                metadata = records['metadatas'][idx]
+                marks.append({**{key: metadata[key] for key in PARTITION_FIELDS if key in metadata}, "compaction_checked": 1})
+            await self._executor.write(
+                self._store.update_metadatas, [records['ids'][idx] for idx in singletons], marks
+            )
+        return sum(len(members) for members in clusters)
+
+    async def _summarize_cluster(self, records: Dict[str, list], members: List[int]) -> str:
+        documents = [records['documents'][idx] for idx in members]
+        if self.summarizer:
+            try:
+                summary = await self.summarizer(documents)
+                if summary and summary.strip():
+                    return f"{SUMMARY_PREFIX} {summary.strip()}"[:self.compaction_summary_chars]
+            except Exception as e:
+                logger.warning(f"Summarizer failed, using extractive summary: {e}")
+        return extractive_summary(documents, [records['embeddings'][idx] for idx in members], self.compaction_summary_chars)
+
+    def _reindex_location(self, version: int) -> str:
+        if self.vector_store_backend == VECTOR_STORE_NUMPY:
+            return f"v{version}"
+        return f"{self.collection_name}_v{version}"
+
+    def _drop_location(self, location: str):
+        if self.vector_store_backend == VECTOR_STORE_NUMPY:
+            shutil.rmtree(Path(self.numpy_path) / location, ignore_errors=True)
+            return
+        prefix = f"{location}_g"
+        for collection in self._client.list_collections():
+            name = getattr(collection, 'name', collection)
+            if name == location or name.startswith(prefix):
+                self._client.delete_collection(name=name)
+
+    async def start_reindex_job(self, embedding_service, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if not self._initialized:
+            raise RuntimeError("Memory storage is not initialized")
+        if self._reindex_task and not self._reindex_task.done():
+            return dict(self.reindex_job)
+        
+        model = embedding_model_id(embedding_service) or type(embedding_service).__name__
+        root = self._index_root()
+        checkpoint = await asyncio.to_thread(load_checkpoint, root)
+        if checkpoint and checkpoint.get('embedding_model') != model:
+            logger.warning(f"Discarding reindex checkpoint for {checkpoint.get('embedding_model')}, starting over for {model}")
+            await self._executor.write(self._drop_location, checkpoint['location'])
+            checkpoint = None
+        if checkpoint is None:
+            version = self.index_state['version'] + 1
+            checkpoint = {
+                'version': version,
+                'location': self._reindex_location(version),
+                'embedding_model': model,
+                'config': config or {},
+                'completed': [],
+                'partition': None,
+                'offset': 0,
+                'copied': 0,
+            }
+            await self._executor.write(self._drop_location, checkpoint['location'])
+        
+        self.reindex_job = {
+            "job_id": f"reindex-v{checkpoint['version']}",
+            "status": "running",
+            "version": checkpoint['version'],
+            "embedding_model": model,
+            "resumed": bool(checkpoint['completed'] or checkpoint['offset']),
+            "copied": checkpoint['copied'],
+            "skipped": 0,
+            "error": None,
+            "started_at": time.time(),
+            "finished_at": None,
+        }
+        self._reindex_pending = {}
+        self._reindex_task = asyncio.create_task(self._run_reindex_job(self.reindex_job, checkpoint, embedding_service))
+        return dict(self.reindex_job)
+
+    async def resume_reindex_job(self) -> Optional[Dict[str, Any]]:
+        checkpoint = await asyncio.to_thread(load_checkpoint, self._index_root())
+        if not checkpoint or not self._initialized:
+            return None
+        from chatbot.embedding_service import create_embedding_service
+        embedding_service = create_embedding_service(**checkpoint.get('config', {}))
+        if embedding_service is None:
+            logger.error(f"Cannot resume reindex to {checkpoint.get('embedding_model')}: embedding service unavailable")
+            return None
+        logger.info(f"Resuming reindex to {checkpoint['embedding_model']} from checkpoint")
+        return await self.start_reindex_job(embedding_service, checkpoint.get('config'))
+
+    async def _reembed_rows(self, embedding_service, ids: List[str], documents: List[str], metadatas: List[Dict]) -> Dict[str, list]:
+        rows = {'ids': [], 'embeddings': [], 'documents': [], 'metadatas': []}
+        if not ids:
+            return rows
+        embeddings = await embedding_service.embed_batch(documents)
+        if not any(len(embedding) for embedding in embeddings):
+            raise RuntimeError(f"Embedding service returned no vectors for a batch of {len(ids)} memories")
+        for row in zip(ids, embeddings, documents, metadatas):
+            if len(row[1]):
+                for key, value in zip(('ids', 'embeddings', 'documents', 'metadatas'), row):
+                    rows[key].append(value)
+        return rows
+
+    async def _reembed_page(self, embedding_service, page: Dict[str, list]) -> Dict[str, list]:
+        # Rows stored after the job started are re-embedded from the pending list at switch time
+        keep = [i for i, doc_id in enumerate(page['ids']) if doc_id not in self._reindex_pending]
+        return await self._reembed_rows(
+            embedding_service,
+            [page['ids'][i] for i in keep],
+            [page['documents'][i] for i in keep],
+            [page['metadatas'][i] for i in keep],
+        )
+
+    async def _copy_partition(self, job: Dict[str, Any], checkpoint: Dict[str, Any], partition: Any, target: VectorStore, embedding_service):
+        key = partition_key(partition)
+        offset = checkpoint['offset'] if checkpoint['partition'] == key else 0
+        exhausted = False
+        while not exhausted:
+            pages = []
+            read = 0
+            while len(pages) < self.reindex_concurrency:
+                page = await self._executor.read(self._store.get_page, partition, offset + read, self.reindex_page_size)
+                read += len(page['ids'])
+                if page['ids']:
+                    pages.append(page)
+                if len(page['ids']) < self.reindex_page_size:
+                    exhausted = True
+                    break
+            for rows in await asyncio.gather(*(self._reembed_page(embedding_service, page) for page in pages)):
+                if rows['ids']:
+                    await self._executor.write(target.add, **rows)
+                job['copied'] += len(rows['ids'])
+            offset += read
+            checkpoint.update({'partition': key, 'offset': offset, 'copied': job['copied']})
+            await asyncio.to_thread(save_checkpoint, self._index_root(), checkpoint)
+        checkpoint['completed'].append(key)
+        checkpoint.update({'partition': None, 'offset': 0})
+        await asyncio.to_thread(save_checkpoint, self._index_root(), checkpoint)
+
+    async def _switch_index(self, job: Dict[str, Any], checkpoint: Dict[str, Any], target: VectorStore, embedding_service):
+        while self._reindex_pending:
+            pending, self._reindex_pending = self._reindex_pending, {}
+            ids = list(pending)
+            rows = await self._reembed_rows(
+                embedding_service, ids, [pending[i][0] for i in ids], [pending[i][1] for i in ids]
+            )
+            if rows['ids']:
+                await self._executor.write(target.add, **rows)
+            job['copied'] += len(rows['ids'])
+        
+        # No awaits between the last pending check and the swap, so no store_conversation can slip in between
+        previous_store = self._store
+        self._store = target
+        self.embedding_service = embedding_service
+        self._reindex_pending = None
+        self.retrieval_cache.clear()
+        # Copied legacy rows keep their old metadata, so an unfinished scan starts over on the new collection
+        self._legacy_scan_offset = 0
+        self._legacy_scan_found = 0
+        self.index_state = {
+            'version': checkpoint['version'],
+            'location': checkpoint['location'],
+            'embedding_model': checkpoint['embedding_model'],
+            'previous_location': self.index_state.get('location'),
+        }
+        
+        root = self._index_root()
+        await asyncio.to_thread(save_index_state, root, self.index_state)
+        await asyncio.to_thread(clear_checkpoint, root)
+        # The previous index is kept for rollback, so it must not bring purged memories back
+        await self._apply_deferred_purges([target, previous_store])
+        await self._executor.write(previous_store.close)
+
+    async def _run_reindex_job(self, job: Dict[str, Any], checkpoint: Dict[str, Any], embedding_service):
+        target = None
+        try:
+            target = await self._executor.write(self._open_store, checkpoint['location'], {
+                **COLLECTION_METADATA,
+                'embedding_model': checkpoint['embedding_model'],
+                'index_version': checkpoint['version'],
+            })
+            for partition in await self._executor.read(self._store.partitions):
+                if partition_key(partition) not in checkpoint['completed']:
+                    await self._copy_partition(job, checkpoint, partition, target, embedding_service)
+            await self._switch_index(job, checkpoint, target, embedding_service)
+            job["status"] = "completed"
+            logger.info(f"Reindex to {job['embedding_model']} completed, {job['copied']} memories now served from {checkpoint['location']}")
+        except asyncio.CancelledError:
+            job["status"] = "cancelled"
+            raise
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            logger.error(f"Reindex to {job['embedding_model']} failed, resume from checkpoint later: {e}", exc_info=True)
+        finally:
+            self._reindex_pending = None
+            if self._reindex_purges:
+                # Nothing pages the live store anymore, but purging it shifts the offsets the checkpoint
+                # resumes from, so the partial index is dropped and the next run starts over
+                await self._apply_deferred_purges([self._store])
+                if target is not None:
+                    await self._executor.write(target.close)
+                await asyncio.to_thread(clear_checkpoint, self._index_root())
+                await self._executor.write(self._drop_location, checkpoint['location'])
+            job["finished_at"] = time.time()
+
+    def get_reindex_job(self) -> Optional[Dict[str, Any]]:
+        return dict(self.reindex_job) if self.reindex_job else None
+
+    async def cancel_reindex_job(self) -> bool:
+        task = self._reindex_task
+        if not task or task.done():
+            return False
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return True
+
+    async def export_snapshot(self, path: str, records_format: str = FORMAT_JSONL) -> Dict[str, Any]:
+        if not self._initialized:
+            raise RuntimeError("Memory store is not initialized")
+        
+        page_size = self.snapshot_page_size
+        writer = SnapshotWriter(path, await self._executor.read(self._store.count), records_format)
+        try:
+            for partition in await self._executor.read(self._store.partitions):
+                offset = 0
+                while True:
+                    page = await self._executor.read(self._store.get_page, partition, offset, page_size)
+                    await asyncio.to_thread(writer.write, page)
+                    offset += len(page['ids'])
+                    if len(page['ids']) < page_size:
+                        break
+        except BaseException:
+            await asyncio.to_thread(writer.abort)
+            raise
+        manifest = await asyncio.to_thread(writer.close, self._store.snapshot())
+        logger.info(f"Exported {manifest['count']} memories to {path}")
+        return manifest
+
+    async def import_snapshot(self, path: str) -> int:
+        if not self._initialized:
+            raise RuntimeError("Memory store is not initialized")
+        
+        reader = await asyncio.to_thread(SnapshotReader, path)
+        batches = reader.batches(self.snapshot_page_size)
+        imported = 0
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                break
+            await self._executor.write(self._store.add, **batch)
+            imported += len(batch['ids'])
+        self.retrieval_cache.clear()
+        logger.info(f"Imported {imported} memories from {path}")
+        return imported
+
+    def get_metrics(self) -> Dict:
+        metrics = {"executor": self._executor.snapshot(), "recent": self.recent_interactions.snapshot()}
+        metrics["retrieval_gate"] = self.retrieval_gate.snapshot()
+        metrics["retrieval_cache"] = self.retrieval_cache.snapshot()
+        if self.quotas_enabled:
+            metrics["quota"] = {
+                "guild_quota": self.guild_quota,
+                "user_quota": self.user_quota,
+                "pending_retrieval_updates": len(self._retrieved),
+                "scan_in_progress": self._quota_scan is not None,
+                **self.quota_stats,
+            }
+        metrics["index"] = {
+            "version": self.index_state.get('version', 0),
+            "embedding_model": self.index_state.get('embedding_model'),
+            "embedding_mismatch": self.embedding_mismatch,
+            "reindex": self.get_reindex_job(),
+        }
+        if self._store:
+            metrics["store"] = self._store.snapshot()
+        return metrics
+
+    async def shutdown(self):
+        close_embeddings = getattr(self.embedding_service, 'close', None)
+        if close_embeddings is not None:
+            await close_embeddings()
+        self.close()
+
+    def close(self):
+        release_embeddings = getattr(self.embedding_service, 'release', None)
+        if release_embeddings is not None:
+            release_embeddings()
+        self._executor.shutdown(wait=False)
+        if self._store:
+            self._store.close()
+        if self._recent_store:
+            self._recent_store.close()
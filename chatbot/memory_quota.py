@@ -0,0 +1,126 @@
+import heapq
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+LAST_RETRIEVED_FIELD = 'last_retrieved_epoch'
+
+QuotaScope = Tuple[str, ...]
+
+
+def usefulness(metadata: Dict[str, Any]) -> int:
+    """Eviction rank of a memory: when it was last retrieved, or stored if it never was."""
+    return int(metadata.get(LAST_RETRIEVED_FIELD) or metadata.get('timestamp_epoch') or 0)
+
+
+def guild_scope(guild_str: str) -> QuotaScope:
+    return ('guild', guild_str)
+
+
+def user_scope(guild_str: str, user_str: str) -> QuotaScope:
+    return ('user', guild_str, user_str)
+
+
+def scope_where(scope: QuotaScope) -> Dict[str, Any]:
+    if scope[0] == 'guild':
+        return {"guild_id": scope[1]}
+    return {"$and": [{"guild_id": scope[1]}, {"user_id": scope[2]}]}
+
+
+class QuotaScan:
+    """Incremental pass over every store partition counting memories per guild and per guild user.
+
+    The pass keeps its cursor between maintenance runs, so each run only pages
+    through as much metadata as its time budget allows. Once every partition is
+    counted, the scopes over quota are queued for eviction.
+    """
+
+    def __init__(self, partitions: List[Any]):
+        self.partitions = partitions
+        self.index = 0
+        self.offset = 0
+        self.counts: Counter = Counter()
+        self.locations: Dict[QuotaScope, Set[int]] = {}
+        self.pending: Optional[List[QuotaScope]] = None
+        self.eviction: Optional['EvictionScan'] = None
+
+    @property
+    def counted(self) -> bool:
+        return self.index >= len(self.partitions)
+
+    def add_page(self, metadatas: Iterable[Dict[str, Any]], page_size: int) -> None:
+        rows = 0
+        for metadata in metadatas:
+            rows += 1
+            guild_str = metadata.get("guild_id", "none")
+            for scope in (guild_scope(guild_str), user_scope(guild_str, metadata.get("user_id", "none"))):
+                self.counts[scope] += 1
+                self.locations.setdefault(scope, set()).add(self.index)
+        if rows < page_size:
+            self.index += 1
+            self.offset = 0
+        else:
+            self.offset += rows
+
+    def queue_over_quota(self, guild_quota: int, user_quota: int) -> List[QuotaScope]:
+        """User scopes first, since evicting them may already bring their guild under quota."""
+        users = [scope for scope, count in self.counts.items() if scope[0] == 'user' and user_quota and count > user_quota]
+        guilds = [scope for scope, count in self.counts.items() if scope[0] == 'guild' and guild_quota and count > guild_quota]
+        self.pending = sorted(users) + sorted(guilds)
+        return self.pending
+
+
+def select_evictions(candidates: List[Tuple[int, str, int]], quota: int) -> Dict[int, List[str]]:
+    """Pick the least useful memories beyond ``quota``, grouped by partition index."""
+    excess = len(candidates) - quota
+    if excess <= 0:
+        return {}
+    victims: Dict[int, List[str]] = {}
+    for _, doc_id, partition_index in sorted(candidates)[:excess]:
+        victims.setdefault(partition_index, []).append(doc_id)
+    return victims
+
+
+class EvictionScan:
+    """Pass over one over-quota scope that keeps only its ``keep`` least useful memories.
+
+    Pages are read with the scope's ``where`` filter and the cursor survives
+    between maintenance runs like :class:`QuotaScan`. Nothing is deleted until
+    the pass ends, so deletes never shift the offsets being paged.
+    """
+
+    def __init__(self, scope: QuotaScope, partition_indexes: Iterable[int], keep: int):
+        self.scope = scope
+        self.partition_indexes = sorted(partition_indexes)
+        self.index = 0
+        self.offset = 0
+        self.seen = 0
+        self.keep = max(0, keep)
+        self._kept: List[Tuple[int, str, int]] = []
+
+    @property
+    def done(self) -> bool:
+        return self.index >= len(self.partition_indexes)
+
+    @property
+    def partition_index(self) -> int:
+        return self.partition_indexes[self.index]
+
+    def add_page(self, ids: List[str], metadatas: List[Dict[str, Any]], page_size: int) -> None:
+        for doc_id, metadata in zip(ids, metadatas):
+            self.seen += 1
+            # Max-heap on usefulness via negation: the root is the most useful memory kept so far
+            item = (-usefulness(metadata), doc_id, self.partition_index)
+            if len(self._kept) < self.keep:
+                heapq.heappush(self._kept, item)
+            elif self._kept and item > self._kept[0]:
+                heapq.heapreplace(self._kept, item)
+        if len(ids) < page_size:
+            self.index += 1
+            self.offset = 0
+        else:
+            self.offset += len(ids)
+
+    def victims(self, quota: int) -> Dict[int, List[str]]:
+        candidates = [(-rank, doc_id, partition_index) for rank, doc_id, partition_index in self._kept]
+        excess = min(self.seen - quota, len(candidates))
+        return select_evictions(candidates, len(candidates) - excess) if excess > 0 else {}
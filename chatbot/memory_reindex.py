@@ -0,0 +1,88 @@
+import os
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_STATE_FILE = 'active_index.json'
+CHECKPOINT_FILE = 'reindex_checkpoint.json'
+LEGACY_SCAN_FILE = 'legacy_scan.json'
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to read {path}: {e}")
+        return None
+
+
+def load_index_state(root: str) -> Dict[str, Any]:
+    """Return the active index pointer: version, storage location and embedding model."""
+    state = _read_json(Path(root) / INDEX_STATE_FILE) or {}
+    return {
+        'version': state.get('version', 0),
+        'location': state.get('location'),
+        'embedding_model': state.get('embedding_model'),
+        'previous_location': state.get('previous_location'),
+    }
+
+
+def save_index_state(root: str, state: Dict[str, Any]) -> None:
+    _write_json_atomic(Path(root) / INDEX_STATE_FILE, state)
+
+
+def legacy_scan_done(root: str, location: str) -> bool:
+    """Whether the legacy timestamp backfill already finished for the collection at ``location``."""
+    state = _read_json(Path(root) / LEGACY_SCAN_FILE) or {}
+    return location in state.get('completed', [])
+
+
+def mark_legacy_scan_done(root: str, location: str) -> None:
+    state = _read_json(Path(root) / LEGACY_SCAN_FILE) or {}
+    completed = state.get('completed', [])
+    if location not in completed:
+        _write_json_atomic(Path(root) / LEGACY_SCAN_FILE, {'completed': completed + [location]})
+
+
+def load_checkpoint(root: str) -> Optional[Dict[str, Any]]:
+    return _read_json(Path(root) / CHECKPOINT_FILE)
+
+
+def save_checkpoint(root: str, checkpoint: Dict[str, Any]) -> None:
+    _write_json_atomic(Path(root) / CHECKPOINT_FILE, checkpoint)
+
+
+def clear_checkpoint(root: str) -> None:
+    try:
+        (Path(root) / CHECKPOINT_FILE).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def partition_key(partition: Any) -> str:
+    """Stable identifier for a store partition (a Chroma collection or a NumPy scope key)."""
+    name = getattr(partition, 'name', None)
+    if isinstance(name, str):
+        return name
+    return '/'.join(str(part) for part in partition)
+
+
+def embedding_model_id(embedding_service) -> Optional[str]:
+    model_id = getattr(embedding_service, 'model_id', None)
+    return model_id if isinstance(model_id, str) else None
@@ -0,0 +1,238 @@
+import os
+import json
+import logging
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+EMBEDDINGS_FILE = 'embeddings.npy'
+FORMAT_JSONL = 'jsonl'
+FORMAT_PARQUET = 'parquet'
+RECORDS_FILES = {FORMAT_JSONL: 'records.jsonl', FORMAT_PARQUET: 'records.parquet'}
+PARQUET_COLUMNS = ('guild_id', 'channel_id', 'user_id', 'message_type')
+TRUNCATE_CHUNK_ROWS = 65536
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise RuntimeError("pyarrow package not installed, use the jsonl records format") from None
+
+
+class SnapshotWriter:
+    """Stream store pages into ``embeddings.npy`` plus a records file.
+
+    The embedding matrix is preallocated for ``expected_rows`` so pages are
+    written in place; rows beyond that (memories stored while exporting) are
+    skipped and a short export is truncated on close. Files are written to a
+    sibling staging directory that replaces ``path`` only on close, so a failed
+    export never touches the target and an existing snapshot is never overwritten.
+    """
+
+    def __init__(self, path: str, expected_rows: int, records_format: str = FORMAT_JSONL):
+        if records_format not in RECORDS_FILES:
+            raise ValueError(f"Unknown records format {records_format}, use one of {sorted(RECORDS_FILES)}")
+        self.path = Path(path)
+        if self.path.exists() and (not self.path.is_dir() or any(self.path.iterdir())):
+            raise FileExistsError(f"Snapshot target {self.path} already exists and is not empty")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.staging_path = Path(tempfile.mkdtemp(prefix=f".{self.path.name}.", suffix='.tmp', dir=self.path.parent))
+        self.expected_rows = expected_rows
+        self.records_format = records_format
+        self.rows = 0
+        self.skipped = 0
+        self.dimensions = 0
+        self._matrix: Optional[np.memmap] = None
+        self._records = None
+        self._pyarrow = _require_pyarrow() if records_format == FORMAT_PARQUET else None
+
+    @property
+    def records_path(self) -> Path:
+        return self.staging_path / RECORDS_FILES[self.records_format]
+
+    def _open(self, dimensions: int):
+        self.dimensions = dimensions
+        self._matrix = np.lib.format.open_memmap(
+            self.staging_path / EMBEDDINGS_FILE, mode='w+', dtype=np.float32, shape=(self.expected_rows, dimensions)
+        )
+        if self.records_format == FORMAT_JSONL:
+            self._records = open(self.records_path, 'w', encoding='utf-8')
+
+    def write(self, page: Dict[str, Any]) -> None:
+        if len(page['ids']) == 0:
+            return
+        vectors = np.asarray(page['embeddings'], dtype=np.float32)
+        if self._matrix is None:
+            self._open(vectors.shape[1])
+        elif vectors.shape[1] != self.dimensions:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match snapshot dimension {self.dimensions}")
+        take = min(len(page['ids']), self.expected_rows - self.rows)
+        self.skipped += len(page['ids']) - take
+        if take <= 0:
+            return
+        self._matrix[self.rows:self.rows + take] = vectors[:take]
+        ids, documents, metadatas = page['ids'][:take], page['documents'][:take], page['metadatas'][:take]
+        if self.records_format == FORMAT_JSONL:
+            for doc_id, document, metadata in zip(ids, documents, metadatas):
+                self._records.write(json.dumps({'id': doc_id, 'document': document, 'metadata': metadata}, ensure_ascii=False) + '\n')
+        else:
+            self._write_parquet(ids, documents, metadatas)
+        self.rows += take
+
+    def _write_parquet(self, ids, documents, metadatas):
+        pa = self._pyarrow
+        columns = {
+            'id': pa.array(ids, pa.string()),
+            'document': pa.array(documents, pa.string()),
+            **{name: pa.array([m.get(name) for m in metadatas], pa.string()) for name in PARQUET_COLUMNS},
+            'timestamp_epoch': pa.array([m.get('timestamp_epoch') for m in metadatas], pa.int64()),
+            'metadata': pa.array([json.dumps(m, ensure_ascii=False) for m in metadatas], pa.string()),
+        }
+        table = pa.table(columns)
+        if self._records is None:
+            self._records = pa.parquet.ParquetWriter(str(self.records_path), table.schema)
+        self._records.write_table(table)
+
+    def _truncate_embeddings(self):
+        source = self._matrix
+        self._matrix = None
+        target_path = self.staging_path / f"{EMBEDDINGS_FILE}.tmp"
+        target = np.lib.format.open_memmap(target_path, mode='w+', dtype=np.float32, shape=(self.rows, self.dimensions))
+        for start in range(0, self.rows, TRUNCATE_CHUNK_ROWS):
+            end = min(start + TRUNCATE_CHUNK_ROWS, self.rows)
+            target[start:end] = source[start:end]
+        target.flush()
+        del source, target
+        (self.staging_path / EMBEDDINGS_FILE).unlink()
+        target_path.rename(self.staging_path / EMBEDDINGS_FILE)
+
+    def close(self, source: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if self._records is not None:
+            self._records.close()
+        if self._matrix is None:
+            np.save(self.staging_path / EMBEDDINGS_FILE, np.zeros((0, 0), dtype=np.float32))
+            if self.records_format == FORMAT_JSONL:
+                self.records_path.touch()
+        else:
+            self._matrix.flush()
+            if self.rows < self.expected_rows:
+                self._truncate_embeddings()
+            self._matrix = None
+        if self.skipped:
+            logger.warning(f"Skipped {self.skipped} memories stored after the snapshot started")
+        manifest = {
+            'version': SNAPSHOT_VERSION,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'count': self.rows,
+            'dimensions': self.dimensions,
+            'dtype': 'float32',
+            'records_format': self.records_format,
+            'source': source or {},
+        }
+        with open(self.staging_path / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        if self.path.exists():
+            # An empty target directory was accepted in __init__
+            self.path.rmdir()
+        os.replace(self.staging_path, self.path)
+        return manifest
+
+    def abort(self) -> None:
+        if self._records is not None:
+            self._records.close()
+        self._matrix = None
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+
+
+class SnapshotReader:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        manifest_path = self.path / MANIFEST_FILE
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No snapshot manifest at {manifest_path}")
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {self.manifest.get('version')}")
+        self.embeddings = np.load(self.path / EMBEDDINGS_FILE, mmap_mode='r')
+
+    @property
+    def count(self) -> int:
+        return self.manifest['count']
+
+    def _records(self, batch_size: int) -> Iterator[Dict[str, list]]:
+        records_format = self.manifest['records_format']
+        records_path = self.path / RECORDS_FILES[records_format]
+        if records_format == FORMAT_PARQUET:
+            pa = _require_pyarrow()
+            for batch in pa.parquet.ParquetFile(str(records_path)).iter_batches(
+                batch_size=batch_size, columns=['id', 'document', 'metadata']
+            ):
+                columns = batch.to_pydict()
+                yield {
+                    'ids': columns['id'],
+                    'documents': columns['document'],
+                    'metadatas': [json.loads(metadata) for metadata in columns['metadata']],
+                }
+            return
+        batch = {'ids': [], 'documents': [], 'metadatas': []}
+        with open(records_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                batch['ids'].append(record['id'])
+                batch['documents'].append(record['document'])
+                batch['metadatas'].append(record['metadata'])
+                if len(batch['ids']) >= batch_size:
+                    yield batch
+                    batch = {'ids': [], 'documents': [], 'metadatas': []}
+        if batch['ids']:
+            yield batch
+
+    def batches(self, batch_size: int) -> Iterator[Dict[str, Any]]:
+        offset = 0
+        for records in self._records(batch_size):
+            end = offset + len(records['ids'])
+            records['embeddings'] = np.asarray(self.embeddings[offset:end], dtype=np.float32)
+            offset = end
+            yield records
+        if offset != self.count:
+            raise ValueError(f"Snapshot records ({offset}) do not match manifest count ({self.count})")
+
+
+def export_store(store, path: str, page_size: int = 1000, records_format: str = FORMAT_JSONL) -> Dict[str, Any]:
+    writer = SnapshotWriter(path, store.count(), records_format)
+    try:
+        for partition in store.partitions():
+            offset = 0
+            while True:
+                page = store.get_page(partition, offset, page_size)
+                writer.write(page)
+                offset += len(page['ids'])
+                if len(page['ids']) < page_size:
+                    break
+    except Exception:
+        writer.abort()
+        raise
+    return writer.close(store.snapshot())
+
+
+def import_store(store, path: str, batch_size: int = 1000, progress_callback=None) -> int:
+    reader = SnapshotReader(path)
+    imported = 0
+    for batch in reader.batches(batch_size):
+        store.add(**batch)
+        imported += len(batch['ids'])
+        if progress_callback:
+            progress_callback(imported)
+    return imported
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+LATENCY_SAMPLE_SIZE = 1024
+LOOP_LAG_INTERVAL = 0.5
+
+
+class LatencyStats:
+    def __init__(self, max_samples: int = LATENCY_SAMPLE_SIZE):
+        self._samples: deque = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        with self._lock:
+            self._samples.append(value_ms)
+            self.count += 1
+            self.total_ms += value_ms
+            self.max_ms = max(self.max_ms, value_ms)
+
+    def _percentile(self, ordered: list, fraction: float) -> float:
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            ordered = sorted(self._samples)
+            count = self.count
+            total_ms = self.total_ms
+            max_ms = self.max_ms
+        return {
+            'count': count,
+            'avg_ms': round(total_ms / count, 3) if count else 0.0,
+            'p50_ms': round(self._percentile(ordered, 0.50), 3),
+            'p95_ms': round(self._percentile(ordered, 0.95), 3),
+            'p99_ms': round(self._percentile(ordered, 0.99), 3),
+            'max_ms': round(max_ms, 3),
+        }
+
+
+class EventLoopLagMonitor:
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.lag = LatencyStats()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                expected = time.perf_counter() + self.interval
+                await asyncio.sleep(self.interval)
+                self.lag.observe(max(0.0, time.perf_counter() - expected) * 1000)
+            except asyncio.CancelledError:
+                break
+
+    def snapshot(self) -> Dict[str, float]:
+        return self.lag.snapshot()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._providers: Dict[str, Callable[[], Any]] = {}
+
+    def register(self, name: str, snapshot_func: Callable[[], Any]) -> None:
+        self._providers[name] = snapshot_func
+
+    def collect(self) -> Dict[str, Any]:
+        collected = {}
+        for name, snapshot_func in self._providers.items():
+            try:
+                collected[name] = snapshot_func()
+            except Exception as e:
+                logger.error(f"Error collecting metrics for {name}: {e}")
+                collected[name] = {'error': str(e)}
+        return collected
@@ -337,6 +337,13 @@ def build_system_text(persona_context: str) -> str:
     return SYSTEM_PROMPT_TEMPLATE.format(persona_context=persona_context.strip()).strip()
 
 
+MEMORY_SUMMARY_PROMPT = (
+    "Resuma as conversas abaixo em até três frases curtas em português. "
+    "Preserve fatos duradouros sobre o usuário (nomes, preferências, pedidos recorrentes) "
+    "e descarte cumprimentos e detalhes passageiros. Responda apenas com o resumo."
+)
+
+
 class BaseChatbot(ABC):
     def __init__(self, api_key: str, bot_instance=None, music_bot_instance=None, memory_manager=None, web_search_service=None):
         self._initialize_client(api_key)
@@ -826,6 +833,14 @@ class BaseChatbot(ABC):
             logger.error(f"API request failed: {e}")
             return "Deu ruim aqui do meu lado. Tenta de novo em instantes."
 
+    async def summarize_memories(self, documents: List[str]) -> str:
+        messages = [
+            {"role": "system", "content": MEMORY_SUMMARY_PROMPT},
+            {"role": "user", "content": "\n".join(f"- {document}" for document in documents)}
+        ]
+        response = await self._make_api_request(messages, max_tokens=200)
+        return self._extract_content(response)
+
     def _extract_content(self, response) -> str:
         if hasattr(response, "choices") and response.choices:
             choice = response.choices[0]
@@ -0,0 +1,366 @@
+import os
+import json
+import shutil
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from chatbot.vector_store import VECTOR_STORE_NUMPY, VectorStore
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = 'vectors.f32'
+VECTOR_FILES = {'float32': VECTORS_FILE, 'float16': 'vectors.f16'}
+RECORDS_FILE = 'records.jsonl'
+COMPACTION_MIN_DEAD = 64
+COMPACTION_DEAD_RATIO = 0.3
+
+ScopeKey = Tuple[str, str, str]
+
+
+def _matches(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    for field, condition in where.items():
+        if field == "$and":
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(field)
+            for operator, operand in condition.items():
+                if operator == "$lt":
+                    if value is None or not value < operand:
+                        return False
+                elif operator == "$eq":
+                    if value != operand:
+                        return False
+                elif operator == "$ne":
+                    if value == operand:
+                        return False
+                else:
+                    raise ValueError(f"Unsupported filter operator: {operator}")
+        elif metadata.get(field) != condition:
+            return False
+    return True
+
+
+class _Scope:
+    __slots__ = ('path', 'dtype', 'dim', 'ids', 'documents', 'metadatas', 'alive', 'matrix', 'dead')
+
+    def __init__(self, path: Path, dtype: str = 'float32'):
+        self.path = path
+        self.dtype = dtype
+        self.dim = 0
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.alive = np.zeros(0, dtype=bool)
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.dead = 0
+
+    @property
+    def live_count(self) -> int:
+        return len(self.ids) - self.dead
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.path / VECTOR_FILES[self.dtype]
+
+    def load(self) -> '_Scope':
+        records_path = self.path / RECORDS_FILE
+        if not records_path.exists():
+            return self
+        for dtype, filename in VECTOR_FILES.items():
+            if (self.path / filename).exists():
+                self.dtype = dtype
+                break
+        deleted = set()
+        updates: Dict[str, Dict[str, Any]] = {}
+        with open(records_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if 'delete' in record:
+                    deleted.update(record['delete'])
+                    continue
+                if 'update' in record:
+                    for doc_id, fields in record['update'].items():
+                        updates.setdefault(doc_id, {}).update(fields)
+                    continue
+                self.ids.append(record['id'])
+                self.documents.append(record['document'])
+                self.metadatas.append(record['metadata'])
+        if updates:
+            self.metadatas = [{**metadata, **updates.get(doc_id, {})} for doc_id, metadata in zip(self.ids, self.metadatas)]
+        self.alive = np.array([doc_id not in deleted for doc_id in self.ids], dtype=bool)
+        self.dead = int((~self.alive).sum())
+        self._map_vectors()
+        return self
+
+    def _map_vectors(self):
+        rows = len(self.ids)
+        vectors_path = self.vectors_path
+        if rows == 0 or not vectors_path.exists():
+            self.matrix = np.zeros((0, self.dim), dtype=self.dtype)
+            return
+        self.dim = os.path.getsize(vectors_path) // (np.dtype(self.dtype).itemsize * rows)
+        self.matrix = np.memmap(vectors_path, dtype=self.dtype, mode='r', shape=(rows, self.dim))
+
+    def append(self, ids: List[str], vectors: np.ndarray, documents: List[str], metadatas: List[Dict]):
+        if self.dim and vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match stored dimension {self.dim}")
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.vectors_path, 'ab') as f:
+            f.write(np.ascontiguousarray(vectors, dtype=self.dtype).tobytes())
+        with open(self.path / RECORDS_FILE, 'a', encoding='utf-8') as f:
+            for doc_id, document, metadata in zip(ids, documents, metadatas):
+                f.write(json.dumps({'id': doc_id, 'document': document, 'metadata': metadata}, ensure_ascii=False) + '\n')
+        self.dim = vectors.shape[1]
+        self.ids = self.ids + list(ids)
+        self.documents = self.documents + list(documents)
+        self.metadatas = self.metadatas + list(metadatas)
+        self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+        self._map_vectors()
+
+    def delete(self, ids: List[str]) -> int:
+        targets = set(ids)
+        positions = [i for i, doc_id in enumerate(self.ids) if doc_id in targets and self.alive[i]]
+        if not positions:
+            return 0
+        with open(self.path / RECORDS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'delete': [self.ids[i] for i in positions]}) + '\n')
+        alive = self.alive.copy()
+        alive[positions] = False
+        self.alive = alive
+        self.dead += len(positions)
+        return len(positions)
+
+    def update(self, metadatas_by_id: Dict[str, Dict[str, Any]]) -> int:
+        positions = [i for i, doc_id in enumerate(self.ids) if doc_id in metadatas_by_id and self.alive[i]]
+        if not positions:
+            return 0
+        with open(self.path / RECORDS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'update': {self.ids[i]: metadatas_by_id[self.ids[i]] for i in positions}}, ensure_ascii=False) + '\n')
+        metadatas = list(self.metadatas)
+        for i in positions:
+            metadatas[i] = {**metadatas[i], **metadatas_by_id[self.ids[i]]}
+        self.metadatas = metadatas
+        return len(positions)
+
+    def needs_compaction(self) -> bool:
+        return self.dead >= COMPACTION_MIN_DEAD and self.dead >= COMPACTION_DEAD_RATIO * len(self.ids)
+
+    def compact(self):
+        keep = np.flatnonzero(self.alive)
+        vectors = np.asarray(self.matrix[keep], dtype=self.dtype) if len(keep) else np.zeros((0, self.dim), dtype=self.dtype)
+        vectors_tmp = self.path / f"{VECTOR_FILES[self.dtype]}.tmp"
+        records_tmp = self.path / f"{RECORDS_FILE}.tmp"
+        with open(vectors_tmp, 'wb') as f:
+            f.write(vectors.tobytes())
+        with open(records_tmp, 'w', encoding='utf-8') as f:
+            for i in keep:
+                f.write(json.dumps({'id': self.ids[i], 'document': self.documents[i], 'metadata': self.metadatas[i]}, ensure_ascii=False) + '\n')
+        self.matrix = np.zeros((0, self.dim), dtype=self.dtype)
+        os.replace(vectors_tmp, self.vectors_path)
+        os.replace(records_tmp, self.path / RECORDS_FILE)
+        self.ids = [self.ids[i] for i in keep]
+        self.documents = [self.documents[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        self.alive = np.ones(len(keep), dtype=bool)
+        self.dead = 0
+        self._map_vectors()
+
+
+class NumpyVectorStore(VectorStore):
+    backend = VECTOR_STORE_NUMPY
+
+    def __init__(self, path: Optional[str] = None, max_open_scopes: Optional[int] = None, dtype: Optional[str] = None):
+        self.path = Path(path or os.getenv('MEMORY_NUMPY_PATH', './data/vectors'))
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dtype = (dtype or os.getenv('MEMORY_NUMPY_DTYPE', 'float32')).lower()
+        if self.dtype not in VECTOR_FILES:
+            raise ValueError(f"Unsupported MEMORY_NUMPY_DTYPE {self.dtype}, use one of {sorted(VECTOR_FILES)}")
+        self.max_open_scopes = max_open_scopes or int(os.getenv('MEMORY_NUMPY_CACHE_SIZE', '256'))
+        self._scopes: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+        self.compactions = 0
+
+    def _scope_path(self, key: ScopeKey) -> Path:
+        guild_str, channel_str, user_str = key
+        return self.path / f"g{guild_str}" / f"c{channel_str}_u{user_str}"
+
+    def _scope(self, key: ScopeKey) -> _Scope:
+        with self._lock:
+            scope = self._scopes.get(key)
+            if scope is None:
+                scope = _Scope(self._scope_path(key), self.dtype).load()
+                self._scopes[key] = scope
+                while len(self._scopes) > self.max_open_scopes:
+                    self._scopes.popitem(last=False)
+            else:
+                self._scopes.move_to_end(key)
+            return scope
+
+    @staticmethod
+    def _normalize(embeddings: List[List[float]]) -> np.ndarray:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add(self, ids: List[str], embeddings: List[List[float]], documents: List[str], metadatas: List[Dict]) -> None:
+        vectors = self._normalize(embeddings)
+        grouped: Dict[ScopeKey, List[int]] = {}
+        for idx, metadata in enumerate(metadatas):
+            key = (metadata.get("guild_id", "none"), metadata.get("channel_id", "none"), metadata.get("user_id", "none"))
+            grouped.setdefault(key, []).append(idx)
+        with self._lock:
+            for key, rows in grouped.items():
+                self._scope(key).append(
+                    [ids[i] for i in rows], vectors[rows], [documents[i] for i in rows], [metadatas[i] for i in rows]
+                )
+
+    def query(
+        self,
+        embedding: List[float],
+        guild_id: Optional[int],
+        channel_id: int,
+        user_id: int,
+        n_results: int
+    ) -> List[Dict[str, Any]]:
+        key = (str(guild_id) if guild_id is not None else "none", str(channel_id), str(user_id))
+        with self._lock:
+            scope = self._scope(key)
+            matrix, alive, ids, documents, metadatas = scope.matrix, scope.alive, scope.ids, scope.documents, scope.metadatas
+            live_count = scope.live_count
+        if live_count == 0 or n_results <= 0:
+            return []
+        query_vector = self._normalize([embedding])[0]
+        if query_vector.shape[0] != matrix.shape[1]:
+            raise ValueError(f"Query dimension {query_vector.shape[0]} does not match stored dimension {matrix.shape[1]}")
+        similarities = np.asarray(matrix, dtype=np.float32) @ query_vector
+        similarities[~alive] = -np.inf
+        k = min(n_results, live_count)
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return [
+            {
+                "id": ids[i],
+                "content": documents[i],
+                "metadata": metadatas[i],
+                "distance": float(1.0 - similarities[i]),
+            }
+            for i in top
+        ]
+
+    def partitions(self) -> List[Any]:
+        keys = []
+        for guild_dir in sorted(self.path.glob('g*')):
+            for scope_dir in sorted(guild_dir.glob('c*_u*')):
+                channel_part, user_part = scope_dir.name.split('_u', 1)
+                keys.append((guild_dir.name[1:], channel_part[1:], user_part))
+        return keys
+
+    def get_ids(self, partition: Any, where: Dict[str, Any], limit: int) -> List[str]:
+        with self._lock:
+            scope = self._scope(partition)
+            matched = []
+            for i, (doc_id, metadata) in enumerate(zip(scope.ids, scope.metadatas)):
+                if scope.alive[i] and _matches(metadata, where):
+                    matched.append(doc_id)
+                    if len(matched) >= limit:
+                        break
+            return matched
+
+    def get_records(self, partition: Any, where: Dict[str, Any], limit: int) -> Dict[str, list]:
+        records = {'ids': [], 'embeddings': [], 'documents': [], 'metadatas': []}
+        with self._lock:
+            scope = self._scope(partition)
+            for i, metadata in enumerate(scope.metadatas):
+                if not scope.alive[i] or not _matches(metadata, where):
+                    continue
+                records['ids'].append(scope.ids[i])
+                records['embeddings'].append(np.asarray(scope.matrix[i], dtype=np.float32).tolist())
+                records['documents'].append(scope.documents[i])
+                records['metadatas'].append(metadata)
+                if len(records['ids']) >= limit:
+                    break
+        return records
+
+    def get_page(self, partition: Any, offset: int, limit: int) -> Dict[str, list]:
+        with self._lock:
+            scope = self._scope(partition)
+            rows = np.flatnonzero(scope.alive)[offset:offset + limit]
+            return {
+                'ids': [scope.ids[i] for i in rows],
+                'embeddings': np.asarray(scope.matrix[rows], dtype=np.float32),
+                'documents': [scope.documents[i] for i in rows],
+                'metadatas': [scope.metadatas[i] for i in rows],
+            }
+
+    def get_metadatas(self, partition: Any, where: Dict[str, Any], offset: int, limit: int) -> Dict[str, list]:
+        page = {'ids': [], 'metadatas': []}
+        with self._lock:
+            scope = self._scope(partition)
+            matched = 0
+            for i, metadata in enumerate(scope.metadatas):
+                if not scope.alive[i] or not _matches(metadata, where):
+                    continue
+                matched += 1
+                if matched <= offset:
+                    continue
+                page['ids'].append(scope.ids[i])
+                page['metadatas'].append(metadata)
+                if len(page['ids']) >= limit:
+                    break
+        return page
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict]) -> None:
+        grouped: Dict[ScopeKey, Dict[str, Dict[str, Any]]] = {}
+        for doc_id, metadata in zip(ids, metadatas):
+            key = (metadata.get("guild_id", "none"), metadata.get("channel_id", "none"), metadata.get("user_id", "none"))
+            grouped.setdefault(key, {})[doc_id] = metadata
+        with self._lock:
+            for key, metadatas_by_id in grouped.items():
+                self._scope(key).update(metadatas_by_id)
+
+    def delete(self, partition: Any, ids: List[str]) -> None:
+        with self._lock:
+            scope = self._scope(partition)
+            scope.delete(ids)
+            if scope.needs_compaction():
+                scope.compact()
+                self.compactions += 1
+
+    def count(self) -> int:
+        return sum(self._scope(key).live_count for key in self.partitions())
+
+    def drop_guild(self, guild_id: Any) -> Optional[int]:
+        guild_str = str(guild_id) if guild_id is not None else "none"
+        with self._lock:
+            keys = [key for key in self.partitions() if key[0] == guild_str]
+            dropped = sum(self._scope(key).live_count for key in keys)
+            for key in keys:
+                self._scopes.pop(key, None)
+            shutil.rmtree(self.path / f"g{guild_str}", ignore_errors=True)
+        return dropped
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            open_scopes = len(self._scopes)
+        return {
+            **super().snapshot(),
+            'dtype': self.dtype,
+            'open_scopes': open_scopes,
+            'max_open_scopes': self.max_open_scopes,
+            'compactions': self.compactions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._scopes.clear()
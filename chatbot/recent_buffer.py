@@ -0,0 +1,229 @@
+import os
+import sys
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _intern_id(value: Any) -> str:
+    return sys.intern(str(value) if value is not None else "none")
+
+
+class RecentInteraction:
+    __slots__ = (
+        'user_message', 'bot_response', 'timestamp', 'timestamp_epoch',
+        'guild_id', 'channel_id', 'user_id', 'tool_calls',
+    )
+
+    def __init__(
+        self,
+        user_message: str,
+        bot_response: str,
+        timestamp: str,
+        timestamp_epoch: int,
+        guild_id: Any,
+        channel_id: Any,
+        user_id: Any,
+        tool_calls: Optional[str] = None
+    ):
+        self.user_message = user_message
+        self.bot_response = bot_response
+        self.timestamp = timestamp
+        self.timestamp_epoch = timestamp_epoch
+        self.guild_id = _intern_id(guild_id)
+        self.channel_id = _intern_id(channel_id)
+        self.user_id = _intern_id(user_id)
+        self.tool_calls = tool_calls
+
+    @classmethod
+    def from_metadata(cls, user_message: str, bot_response: str, metadata: Dict[str, Any]) -> 'RecentInteraction':
+        return cls(
+            user_message,
+            bot_response,
+            metadata["timestamp"],
+            metadata["timestamp_epoch"],
+            metadata["guild_id"],
+            metadata["channel_id"],
+            metadata["user_id"],
+            metadata.get("tool_calls"),
+        )
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        metadata = {
+            "guild_id": self.guild_id,
+            "channel_id": self.channel_id,
+            "user_id": self.user_id,
+            "timestamp": self.timestamp,
+            "timestamp_epoch": self.timestamp_epoch,
+            "message_type": "conversation",
+        }
+        if self.tool_calls:
+            metadata["tool_calls"] = self.tool_calls
+        return metadata
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "metadata":
+            return self.metadata
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key == "metadata" or key in self.__slots__
+
+
+class ConversationBuffer(deque):
+    __slots__ = ('last_active',)
+
+    def __init__(self, records: Iterable[RecentInteraction] = (), maxlen: Optional[int] = None):
+        super().__init__(records, maxlen)
+        self.last_active = time.monotonic()
+
+
+class RecentInteractionBuffer(OrderedDict):
+    def __init__(self, max_conversations: Optional[int] = None, idle_seconds: Optional[float] = None):
+        super().__init__()
+        self.max_conversations = max_conversations or int(os.getenv('RECENT_MEMORY_MAX_CONVERSATIONS', '5000'))
+        self.idle_seconds = idle_seconds or float(os.getenv('RECENT_MEMORY_IDLE_SECONDS', '3600'))
+        self.evicted = 0
+        self.expired = 0
+
+    def append(self, conversation_key: str, record: RecentInteraction, maxlen: int) -> ConversationBuffer:
+        conversation_key = sys.intern(conversation_key)
+        buffer = self.get(conversation_key)
+        if buffer is None or buffer.maxlen != maxlen:
+            buffer = ConversationBuffer(buffer or (), maxlen=maxlen)
+            self[conversation_key] = buffer
+        buffer.append(record)
+        self._touch(conversation_key, buffer)
+        return buffer
+
+    def load(self, conversation_key: str, records: List[RecentInteraction], maxlen: int) -> ConversationBuffer:
+        conversation_key = sys.intern(conversation_key)
+        buffer = ConversationBuffer(records, maxlen=maxlen)
+        self[conversation_key] = buffer
+        self._touch(conversation_key, buffer)
+        return buffer
+
+    def lookup(self, conversation_key: str) -> Optional[ConversationBuffer]:
+        buffer = self.get(conversation_key)
+        if buffer is not None:
+            self._touch(conversation_key, buffer)
+        return buffer
+
+    def _touch(self, conversation_key: str, buffer: ConversationBuffer):
+        buffer.last_active = time.monotonic()
+        self.move_to_end(conversation_key)
+        while len(self) > self.max_conversations:
+            self.popitem(last=False)
+            self.evicted += 1
+
+    def expire_idle(self, now: Optional[float] = None) -> int:
+        cutoff = (time.monotonic() if now is None else now) - self.idle_seconds
+        expired = 0
+        while self:
+            oldest_key = next(iter(self))
+            if self[oldest_key].last_active >= cutoff:
+                break
+            del self[oldest_key]
+            expired += 1
+        self.expired += expired
+        return expired
+
+    def forget(self, scope: str, scope_id: Any) -> int:
+        if scope == "user":
+            stale_keys = [key for key in self if key.endswith(f"_{scope_id}")]
+        else:
+            stale_keys = [key for key in self if key.startswith(f"{scope_id}_")]
+        for conversation_key in stale_keys:
+            del self[conversation_key]
+        return len(stale_keys)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            'conversations': len(self),
+            'interactions': sum(len(buffer) for buffer in self.values()),
+            'max_conversations': self.max_conversations,
+            'evicted': self.evicted,
+            'expired': self.expired,
+        }
+
+
+class RecentInteractionStore:
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS recent_interactions ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "conversation_key TEXT NOT NULL, "
+                "user_message TEXT NOT NULL, "
+                "bot_response TEXT NOT NULL, "
+                "timestamp TEXT NOT NULL, "
+                "timestamp_epoch INTEGER NOT NULL, "
+                "guild_id TEXT NOT NULL, "
+                "channel_id TEXT NOT NULL, "
+                "user_id TEXT NOT NULL, "
+                "tool_calls TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_recent_key ON recent_interactions (conversation_key, id)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_recent_epoch ON recent_interactions (timestamp_epoch)"
+            )
+
+    def append(self, conversation_key: str, record: RecentInteraction, maxlen: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO recent_interactions (conversation_key, user_message, bot_response, timestamp, "
+                "timestamp_epoch, guild_id, channel_id, user_id, tool_calls) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    conversation_key, record.user_message, record.bot_response, record.timestamp,
+                    record.timestamp_epoch, record.guild_id, record.channel_id, record.user_id, record.tool_calls,
+                )
+            )
+            self._conn.execute(
+                "DELETE FROM recent_interactions WHERE conversation_key = ? AND id NOT IN ("
+                "SELECT id FROM recent_interactions WHERE conversation_key = ? ORDER BY id DESC LIMIT ?)",
+                (conversation_key, conversation_key, maxlen)
+            )
+
+    def load(self, conversation_key: str, limit: int) -> List[RecentInteraction]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_message, bot_response, timestamp, timestamp_epoch, guild_id, channel_id, user_id, "
+                "tool_calls FROM recent_interactions WHERE conversation_key = ? ORDER BY id DESC LIMIT ?",
+                (conversation_key, limit)
+            ).fetchall()
+        return [RecentInteraction(*row) for row in reversed(rows)]
+
+    def delete_older_than(self, cutoff_epoch: int) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM recent_interactions WHERE timestamp_epoch < ?", (cutoff_epoch,)
+            )
+        return cursor.rowcount
+
+    def forget(self, scope: str, scope_id: Any) -> int:
+        column = "user_id" if scope == "user" else "guild_id"
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM recent_interactions WHERE {column} = ?", (str(scope_id),)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,94 @@
+import os
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Scope = Tuple[str, str, str]
+
+
+def retrieval_scope(guild_id: Any, channel_id: Any, user_id: Any) -> Scope:
+    return (str(guild_id) if guild_id is not None else "none", str(channel_id), str(user_id))
+
+
+def embedding_digest(embedding: Sequence[float]) -> bytes:
+    return hashlib.blake2b(np.asarray(embedding, dtype=np.float32).tobytes(), digest_size=16).digest()
+
+
+class RetrievalCache:
+    """LRU of semantic retrieval results keyed on (scope, query embedding, max_results).
+
+    Entries expire after ``ttl_seconds`` and are dropped whenever a write or
+    delete touches their scope. ``generation`` lets callers discard results of
+    a query that raced with such an invalidation.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = int(os.getenv('MEMORY_RETRIEVAL_CACHE_SIZE', '1024')) if max_entries is None else max_entries
+        self.ttl_seconds = float(os.getenv('MEMORY_RETRIEVAL_CACHE_TTL_SECONDS', '120')) if ttl_seconds is None else ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.invalidated = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, scope: Scope, digest: bytes, max_results: int) -> Optional[List[Dict]]:
+        if not self.enabled:
+            return None
+        key = (scope, digest, max_results)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return list(entry[1])
+
+    def put(self, scope: Scope, digest: bytes, max_results: int, memories: List[Dict], generation: int):
+        if not self.enabled or generation != self.generation:
+            return
+        self._entries[(scope, digest, max_results)] = (time.monotonic() + self.ttl_seconds, list(memories))
+        self._entries.move_to_end((scope, digest, max_results))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    def _drop(self, matches) -> int:
+        self.generation += 1
+        stale_keys = [key for key in self._entries if matches(key[0])]
+        for key in stale_keys:
+            del self._entries[key]
+        self.invalidated += len(stale_keys)
+        return len(stale_keys)
+
+    def invalidate_scope(self, scope: Scope) -> int:
+        return self._drop(lambda entry_scope: entry_scope == scope)
+
+    def forget(self, scope: str, scope_id: Any) -> int:
+        position = 1 if scope == "channel" else 2 if scope == "user" else 0
+        return self._drop(lambda entry_scope: entry_scope[position] == str(scope_id))
+
+    def clear(self) -> int:
+        return self._drop(lambda entry_scope: True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evicted': self.evicted,
+            'invalidated': self.invalidated,
+        }
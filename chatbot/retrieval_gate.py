@@ -0,0 +1,186 @@
+import os
+import re
+import zlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODE_SEMANTIC = 'semantic'
+MODE_RECENT = 'recent'
+MODE_NONE = 'none'
+MODES = (MODE_SEMANTIC, MODE_RECENT, MODE_NONE)
+
+MENTION_PATTERN = re.compile(r'<@[!&]?\d+>')
+WORD_PATTERN = re.compile(r'\w+')
+
+CONTROL_VERBS = {
+    'para', 'parar', 'pula', 'pular', 'pausa', 'pausar', 'continua', 'continuar', 'sai', 'sair',
+    'volume', 'fila', 'stop', 'skip', 'pause', 'resume', 'leave', 'queue',
+}
+PLAY_VERBS = {'toca', 'tocar', 'play', 'coloca', 'bota'}
+SMALL_TALK = {
+    'oi', 'olá', 'ola', 'opa', 'eae', 'salve', 'bom', 'boa', 'dia', 'tarde', 'noite', 'tchau', 'obrigado', 'obrigada',
+    'valeu', 'vlw', 'ok', 'blz', 'beleza', 'sim', 'não', 'nao', 'kkk', 'kkkk', 'kkkkk', 'haha', 'rs', 'legal', 'show',
+}
+MEMORY_CUES = (
+    'lembra', 'lembrar', 'lembrou', 'lembro', 'ontem', 'semana passada', 'mês passado', 'da última vez', 'da ultima vez',
+    'te falei', 'te disse', 'eu disse', 'já falei', 'ja falei', 'meu nome', 'minha música', 'minha musica', 'eu gosto',
+    'eu prefiro', 'você sabe', 'voce sabe', 'de novo', 'aquela música', 'aquela musica', 'como sempre',
+)
+
+
+def _tokens(text: str) -> List[str]:
+    return WORD_PATTERN.findall(text.lower())
+
+
+class HashedNgramClassifier:
+    """Tiny multinomial logistic regression over hashed character trigrams and words."""
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, labels: Sequence[str], threshold: float = 0.6):
+        self.weights = weights
+        self.bias = bias
+        self.labels = list(labels)
+        self.threshold = threshold
+
+    @property
+    def n_features(self) -> int:
+        return self.weights.shape[0]
+
+    @staticmethod
+    def features(texts: Sequence[str], n_features: int) -> np.ndarray:
+        matrix = np.zeros((len(texts), n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            normalized = f" {' '.join(_tokens(text))} "
+            grams = [normalized[i:i + 3] for i in range(len(normalized) - 2)] + normalized.split()
+            for gram in grams:
+                matrix[row, zlib.crc32(gram.encode('utf-8')) % n_features] += 1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @classmethod
+    def fit(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        n_features: int = 2048,
+        epochs: int = 300,
+        learning_rate: float = 2.0,
+        l2: float = 1e-4
+    ) -> 'HashedNgramClassifier':
+        classes = [mode for mode in MODES if mode in set(labels)]
+        unknown = set(labels) - set(MODES)
+        if unknown:
+            raise ValueError(f"Unknown retrieval modes in labels: {sorted(unknown)}")
+        x = cls.features(texts, n_features)
+        y = np.zeros((len(labels), len(classes)), dtype=np.float32)
+        y[np.arange(len(labels)), [classes.index(label) for label in labels]] = 1.0
+        weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+        for _ in range(epochs):
+            probabilities = cls._softmax(x @ weights + bias)
+            gradient = (probabilities - y) / len(labels)
+            weights -= learning_rate * (x.T @ gradient + l2 * weights)
+            bias -= learning_rate * gradient.sum(axis=0)
+        return cls(weights, bias, classes)
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        probabilities = self._softmax(self.features([text], self.n_features) @ self.weights + self.bias)[0]
+        best = int(np.argmax(probabilities))
+        return self.labels[best], float(probabilities[best])
+
+    def save(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, weights=self.weights, bias=self.bias, labels=np.array(self.labels))
+
+    @classmethod
+    def load(cls, path: str, threshold: float = 0.6) -> 'HashedNgramClassifier':
+        data = np.load(path)
+        return cls(data['weights'], data['bias'], [str(label) for label in data['labels']], threshold)
+
+
+class RetrievalGate:
+    """Decide per message whether long-term memory is worth an embedding and a vector search.
+
+    Cheap rules handle the common cases (bare mentions, music controls, small
+    talk, explicit memory cues); an optional classifier settles the rest
+    before falling back to a length heuristic.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        classifier: Optional[HashedNgramClassifier] = None,
+        wake_words: Sequence[str] = ('tangerina',),
+        min_semantic_tokens: int = 4
+    ):
+        self.enabled = enabled
+        self.classifier = classifier
+        self.wake_words = {word.lower() for word in wake_words}
+        self.min_semantic_tokens = min_semantic_tokens
+        self._lock = threading.Lock()
+        self.decisions: Dict[str, int] = {mode: 0 for mode in MODES}
+        self.reasons: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> 'RetrievalGate':
+        classifier = None
+        model_path = os.getenv('RETRIEVAL_GATE_MODEL_PATH', '')
+        if model_path:
+            try:
+                classifier = HashedNgramClassifier.load(model_path, float(os.getenv('RETRIEVAL_GATE_MODEL_THRESHOLD', '0.6')))
+            except Exception as e:
+                logger.warning(f"Failed to load retrieval gate model from {model_path}, using rules only: {e}")
+        return cls(
+            enabled=os.getenv('RETRIEVAL_GATE_ENABLED', 'true').lower() == 'true',
+            classifier=classifier,
+            wake_words=[word.strip() for word in os.getenv('RETRIEVAL_GATE_WAKE_WORDS', 'tangerina').split(',') if word.strip()],
+            min_semantic_tokens=int(os.getenv('RETRIEVAL_GATE_MIN_SEMANTIC_TOKENS', '4')),
+        )
+
+    def _classify(self, text: str) -> Tuple[str, str]:
+        tokens = [token for token in _tokens(MENTION_PATTERN.sub(' ', text)) if token not in self.wake_words]
+        if not tokens:
+            return MODE_NONE, 'bare_mention'
+        normalized = ' '.join(tokens)
+        if any(cue in normalized for cue in MEMORY_CUES):
+            return MODE_SEMANTIC, 'memory_cue'
+        if tokens[0] in CONTROL_VERBS and len(tokens) <= 3:
+            return MODE_NONE, 'control'
+        if tokens[0] in PLAY_VERBS:
+            return MODE_RECENT, 'play'
+        if all(token in SMALL_TALK for token in tokens):
+            return MODE_RECENT, 'small_talk'
+        if self.classifier:
+            mode, confidence = self.classifier.predict(normalized)
+            if confidence >= self.classifier.threshold:
+                return mode, 'model'
+        if len(tokens) >= self.min_semantic_tokens:
+            return MODE_SEMANTIC, 'default'
+        return MODE_RECENT, 'short'
+
+    def decide(self, text: str) -> str:
+        mode, reason = self._classify(text or '') if self.enabled else (MODE_SEMANTIC, 'disabled')
+        with self._lock:
+            self.decisions[mode] += 1
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        return mode
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'model': self.classifier is not None,
+                'decisions': dict(self.decisions),
+                'reasons': dict(self.reasons),
+            }
@@ -0,0 +1,222 @@
+import os
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from chatbot.memory_layout import CollectionCache
+
+logger = logging.getLogger(__name__)
+
+VECTOR_STORE_CHROMA = 'chroma'
+VECTOR_STORE_NUMPY = 'numpy'
+# Metadata keys that locate a row's partition; metadata updates must include them
+PARTITION_FIELDS = ('guild_id', 'channel_id', 'user_id')
+
+
+class VectorStore(ABC):
+    backend = ''
+
+    @abstractmethod
+    def add(self, ids: List[str], embeddings: List[List[float]], documents: List[str], metadatas: List[Dict]) -> None:
+        pass
+
+    @abstractmethod
+    def query(
+        self,
+        embedding: List[float],
+        guild_id: Optional[int],
+        channel_id: int,
+        user_id: int,
+        n_results: int
+    ) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def partitions(self) -> List[Any]:
+        pass
+
+    @abstractmethod
+    def get_ids(self, partition: Any, where: Dict[str, Any], limit: int) -> List[str]:
+        pass
+
+    @abstractmethod
+    def get_records(self, partition: Any, where: Dict[str, Any], limit: int) -> Dict[str, list]:
+        pass
+
+    @abstractmethod
+    def get_page(self, partition: Any, offset: int, limit: int) -> Dict[str, list]:
+        pass
+
+    @abstractmethod
+    def get_metadatas(self, partition: Any, where: Dict[str, Any], offset: int, limit: int) -> Dict[str, list]:
+        pass
+
+    @abstractmethod
+    def delete(self, partition: Any, ids: List[str]) -> None:
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        pass
+
+    def drop_guild(self, guild_id: Any) -> Optional[int]:
+        return None
+
+    def legacy_page(self, offset: int, limit: int) -> Optional[Dict[str, Any]]:
+        return None
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict]) -> None:
+        """Merge the given keys into each row's metadata, like Chroma's ``update``.
+
+        Every entry must carry the row's ``PARTITION_FIELDS`` so the row's
+        partition can be found.
+        """
+        raise NotImplementedError(f"{self.backend} store does not support metadata updates")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'backend': self.backend}
+
+    def close(self) -> None:
+        pass
+
+
+class ChromaVectorStore(VectorStore):
+    backend = VECTOR_STORE_CHROMA
+
+    def __init__(self, collection=None, collections: Optional[CollectionCache] = None):
+        self.collection = collection
+        self.collections = collections
+
+    def _collection_for(self, guild_id: Any, create: bool):
+        if self.collections is None:
+            return self.collection
+        return self.collections.get(guild_id, create)
+
+    def add(self, ids: List[str], embeddings: List[List[float]], documents: List[str], metadatas: List[Dict]) -> None:
+        if self.collections is None:
+            self.collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+            return
+        grouped: Dict[str, Dict[str, list]] = {}
+        for row in zip(ids, embeddings, documents, metadatas):
+            group = grouped.setdefault(row[3].get("guild_id", "none"), {'ids': [], 'embeddings': [], 'documents': [], 'metadatas': []})
+            for key, value in zip(('ids', 'embeddings', 'documents', 'metadatas'), row):
+                group[key].append(value)
+        for guild_str, group in grouped.items():
+            self.collections.get(guild_str).add(**group)
+
+    def query(
+        self,
+        embedding: List[float],
+        guild_id: Optional[int],
+        channel_id: int,
+        user_id: int,
+        n_results: int
+    ) -> List[Dict[str, Any]]:
+        collection = self._collection_for(guild_id, create=False)
+        if collection is None:
+            return []
+        conditions = [
+            {"channel_id": str(channel_id)},
+            {"user_id": str(user_id)}
+        ]
+        if self.collections is None:
+            conditions.append({"guild_id": str(guild_id) if guild_id is not None else "none"})
+        results = collection.query(
+            query_embeddings=[embedding],
+            n_results=n_results,
+            where={"$and": conditions}
+        )
+        if not results or not results.get('documents') or not results['documents'][0]:
+            return []
+        documents = results['documents'][0]
+        ids = results.get('ids', [[]])[0] if results.get('ids') else []
+        metadatas = results.get('metadatas', [[]])[0] if results.get('metadatas') else []
+        distances = results.get('distances', [[]])[0] if results.get('distances') else []
+        return [
+            {
+                "id": ids[idx] if idx < len(ids) else None,
+                "content": doc,
+                "metadata": metadatas[idx] if idx < len(metadatas) else {},
+                "distance": distances[idx] if idx < len(distances) else 1.0,
+            }
+            for idx, doc in enumerate(documents)
+        ]
+
+    def partitions(self) -> List[Any]:
+        if self.collections is None:
+            return [self.collection]
+        return self.collections.all()
+
+    def get_ids(self, partition: Any, where: Dict[str, Any], limit: int) -> List[str]:
+        results = partition.get(where=where, limit=limit, include=[])
+        return (results.get('ids') if results else None) or []
+
+    def get_records(self, partition: Any, where: Dict[str, Any], limit: int) -> Dict[str, list]:
+        results = partition.get(where=where, limit=limit, include=["embeddings", "documents", "metadatas"]) or {}
+        embeddings = results.get('embeddings')
+        return {
+            'ids': results.get('ids') or [],
+            'embeddings': [list(embedding) for embedding in embeddings] if embeddings is not None else [],
+            'documents': results.get('documents') or [],
+            'metadatas': results.get('metadatas') or [],
+        }
+
+    def get_page(self, partition: Any, offset: int, limit: int) -> Dict[str, list]:
+        results = partition.get(offset=offset, limit=limit, include=["embeddings", "documents", "metadatas"]) or {}
+        embeddings = results.get('embeddings')
+        return {
+            'ids': results.get('ids') or [],
+            'embeddings': embeddings if embeddings is not None else [],
+            'documents': results.get('documents') or [],
+            'metadatas': results.get('metadatas') or [],
+        }
+
+    def get_metadatas(self, partition: Any, where: Dict[str, Any], offset: int, limit: int) -> Dict[str, list]:
+        results = partition.get(where=where or None, offset=offset, limit=limit, include=["metadatas"]) or {}
+        return {'ids': results.get('ids') or [], 'metadatas': results.get('metadatas') or []}
+
+    def delete(self, partition: Any, ids: List[str]) -> None:
+        partition.delete(ids=ids)
+
+    def count(self) -> int:
+        return sum(collection.count() for collection in self.partitions())
+
+    def drop_guild(self, guild_id: Any) -> Optional[int]:
+        if self.collections is None:
+            return None
+        return self.collections.drop(guild_id)
+
+    def legacy_page(self, offset: int, limit: int) -> Optional[Dict[str, Any]]:
+        if self.collection is None:
+            return None
+        results = self.collection.get(offset=offset, limit=limit, include=["metadatas"])
+        return results or {'ids': [], 'metadatas': []}
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict]) -> None:
+        if self.collections is None:
+            self.collection.update(ids=ids, metadatas=metadatas)
+            return
+        grouped: Dict[str, Dict[str, list]] = {}
+        for doc_id, metadata in zip(ids, metadatas):
+            group = grouped.setdefault(metadata.get("guild_id", "none"), {'ids': [], 'metadatas': []})
+            group['ids'].append(doc_id)
+            group['metadatas'].append(metadata)
+        for guild_str, group in grouped.items():
+            # A mark flushed after the guild was dropped must not recreate its collection
+            collection = self.collections.get(guild_str, create=False)
+            if collection is not None:
+                collection.update(**group)
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = super().snapshot()
+        if self.collections is not None:
+            snapshot['collections'] = self.collections.snapshot()
+        return snapshot
+
+
+def vector_store_backend() -> str:
+    backend = os.getenv('MEMORY_VECTOR_STORE', VECTOR_STORE_CHROMA).lower()
+    if backend not in (VECTOR_STORE_CHROMA, VECTOR_STORE_NUMPY):
+        logger.warning(f"Unknown MEMORY_VECTOR_STORE {backend}, using {VECTOR_STORE_CHROMA}")
+        return VECTOR_STORE_CHROMA
+    return backend
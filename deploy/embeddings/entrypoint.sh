@@ -0,0 +1,14 @@
+#!/bin/bash
+set -e
+
+echo "Starting embeddings sidecar..."
+echo "SENTENCE_TRANSFORMER_MODEL=${SENTENCE_TRANSFORMER_MODEL:-all-MiniLM-L6-v2}"
+echo "EMBEDDING_MAX_BATCH_SIZE=${EMBEDDING_MAX_BATCH_SIZE:-64}"
+echo "EMBEDDING_MAX_BATCH_WAIT_MS=${EMBEDDING_MAX_BATCH_WAIT_MS:-5}"
+echo "HF_HOME=${HF_HOME:-/app/.cache}"
+echo "EMBEDDING_PORT=${EMBEDDING_PORT:-5003}"
+
+# Ensure cache dir exists (model weights will download on first load)
+mkdir -p "${HF_HOME:-/app/.cache}"
+
+exec "$@"
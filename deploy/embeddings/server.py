@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+import os
+import queue
+import logging
+import threading
+import time
+
+from flask import Flask, jsonify, request
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+app = Flask(__name__)
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = os.getenv("SENTENCE_TRANSFORMER_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_PORT = int(os.getenv("EMBEDDING_PORT", "5003"))
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE") or None
+MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "64"))
+MAX_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_MAX_BATCH_WAIT_MS", "5"))
+MAX_TEXTS_PER_REQUEST = int(os.getenv("EMBEDDING_MAX_TEXTS_PER_REQUEST", "512"))
+REQUEST_TIMEOUT = float(os.getenv("EMBEDDING_REQUEST_TIMEOUT", "30"))
+
+_model = None
+_model_lock = threading.Lock()
+_requests: "queue.Queue[_PendingRequest]" = queue.Queue()
+_stats = {"requests": 0, "texts": 0, "batches": 0, "batched_texts": 0}
+
+
+class _PendingRequest:
+    __slots__ = ("texts", "normalize", "embeddings", "error", "done")
+
+    def __init__(self, texts, normalize):
+        self.texts = texts
+        self.normalize = normalize
+        self.embeddings = None
+        self.error = None
+        self.done = threading.Event()
+
+
+def _load_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                if SentenceTransformer is None:
+                    raise RuntimeError("sentence-transformers not available")
+                _model = SentenceTransformer(EMBEDDING_MODEL_NAME, device=EMBEDDING_DEVICE)
+    return _model
+
+
+def _collect_batch():
+    """Block for one request, then gather more until the batch is full or the wait expires."""
+    batch = [_requests.get()]
+    size = len(batch[0].texts)
+    deadline = time.monotonic() + MAX_BATCH_WAIT_MS / 1000
+    while size < MAX_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            pending = _requests.get(timeout=remaining)
+        except queue.Empty:
+            break
+        batch.append(pending)
+        size += len(pending.texts)
+    return batch
+
+
+def _inference_loop():
+    while True:
+        batch = _collect_batch()
+        # Requests asking for raw and normalized vectors cannot share one encode call
+        for normalize in (True, False):
+            group = [pending for pending in batch if pending.normalize is normalize]
+            if not group:
+                continue
+            texts = [text for pending in group for text in pending.texts]
+            try:
+                vectors = _load_model().encode(texts, batch_size=MAX_BATCH_SIZE, normalize_embeddings=normalize)
+                _stats["batches"] += 1
+                _stats["batched_texts"] += len(texts)
+                offset = 0
+                for pending in group:
+                    pending.embeddings = vectors[offset:offset + len(pending.texts)].tolist()
+                    offset += len(pending.texts)
+            except Exception as exc:
+                logger.error(f"Error embedding batch of {len(texts)} texts: {exc}")
+                for pending in group:
+                    pending.error = str(exc)
+            for pending in group:
+                pending.done.set()
+
+
+@app.route("/health", methods=["GET"])
+def health():
+    return jsonify({
+        "status": "ok",
+        "model": EMBEDDING_MODEL_NAME,
+        "loaded": _model is not None,
+        "queue": _requests.qsize(),
+        **_stats,
+    }), 200
+
+
+@app.route("/embed", methods=["POST"])
+def embed():
+    payload = request.get_json(silent=True) or {}
+    texts = payload.get("texts")
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        return jsonify({"error": "'texts' must be a list of strings"}), 400
+    if len(texts) > MAX_TEXTS_PER_REQUEST:
+        return jsonify({"error": f"At most {MAX_TEXTS_PER_REQUEST} texts per request"}), 413
+    if not texts:
+        return jsonify({"model": EMBEDDING_MODEL_NAME, "embeddings": []}), 200
+
+    pending = _PendingRequest(texts, bool(payload.get("normalize", True)))
+    _stats["requests"] += 1
+    _stats["texts"] += len(texts)
+    _requests.put(pending)
+    if not pending.done.wait(REQUEST_TIMEOUT):
+        return jsonify({"error": "Timed out waiting for the inference loop"}), 503
+    if pending.error:
+        return jsonify({"error": pending.error}), 500
+    return jsonify({"model": EMBEDDING_MODEL_NAME, "embeddings": pending.embeddings}), 200
+
+
+def _warmup():
+    try:
+        _load_model().encode(["warmup"], normalize_embeddings=True)
+        logger.info(f"Embedding model {EMBEDDING_MODEL_NAME} loaded")
+    except Exception as exc:
+        logger.error(f"Failed to load embedding model {EMBEDDING_MODEL_NAME}: {exc}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    threading.Thread(target=_warmup, name="embedding-warmup", daemon=True).start()
+    threading.Thread(target=_inference_loop, name="embedding-inference", daemon=True).start()
+    app.run(host="0.0.0.0", port=EMBEDDING_PORT, debug=False, threaded=True)
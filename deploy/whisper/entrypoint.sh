@@ -4,10 +4,12 @@ set -e
 echo "Starting Whisper ASR sidecar..."
 echo "WHISPER_MODEL=${WHISPER_MODEL:-medium}"
 echo "WHISPER_LANGUAGE=${WHISPER_LANGUAGE:-pt}"
+echo "WHISPER_COMPUTE_TYPE=${WHISPER_COMPUTE_TYPE:-int8}"
+echo "WHISPER_WORKERS=${WHISPER_WORKERS:-2}"
 echo "XDG_CACHE_HOME=${XDG_CACHE_HOME:-/app/.cache}"
 echo "WHISPER_PORT=${WHISPER_PORT:-5002}"
 
-# Ensure cache dir exists (model weights will download on first load)
+# Ensure cache dir exists (model weights download during startup warmup)
 mkdir -p "${XDG_CACHE_HOME:-/app/.cache}"
 
 exec "$@"
@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
+import io
 import os
-import tempfile
+import queue
 import logging
+import threading
+import time
 
+import numpy as np
 from flask import Flask, jsonify, request
 
 try:
-    import whisper
+    from faster_whisper import WhisperModel, decode_audio
+    from faster_whisper.audio import pad_or_trim
+    from faster_whisper.tokenizer import Tokenizer
 except ImportError:
-    whisper = None
+    WhisperModel = None
 
 app = Flask(__name__)
 logger = logging.getLogger(__name__)
@@ -16,46 +22,203 @@ logger = logging.getLogger(__name__)
 WHISPER_MODEL_NAME = os.getenv("WHISPER_MODEL", "medium")
 WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "pt")
 WHISPER_PORT = int(os.getenv("WHISPER_PORT", "5002"))
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cpu")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_WORKERS = int(os.getenv("WHISPER_WORKERS", "2"))
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))
+WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", "1"))
+MAX_BATCH_SIZE = int(os.getenv("WHISPER_MAX_BATCH_SIZE", "8"))
+MAX_BATCH_WAIT_MS = float(os.getenv("WHISPER_MAX_BATCH_WAIT_MS", "20"))
+NO_SPEECH_THRESHOLD = float(os.getenv("WHISPER_NO_SPEECH_THRESHOLD", "0.6"))
+REQUEST_TIMEOUT = float(os.getenv("WHISPER_REQUEST_TIMEOUT", "60"))
+SAMPLE_RATE = 16000
+# Whisper's encoder window; shorter audio can share one padded batch
+WINDOW_SECONDS = 30
 
 _model = None
+_tokenizer = None
+_ready = threading.Event()
+_load_error = None
+_requests: "queue.Queue[_PendingRequest]" = queue.Queue()
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "batches": 0, "batched_requests": 0, "long_form": 0, "audio_seconds": 0.0, "inference_seconds": 0.0}
+
+
+class _PendingRequest:
+    __slots__ = ("audio", "text", "error", "done")
+
+    def __init__(self, audio):
+        self.audio = audio
+        self.text = None
+        self.error = None
+        self.done = threading.Event()
 
 
 def _load_model():
-    global _model
-    if _model is None:
-        if whisper is None:
-            raise RuntimeError("whisper not available")
-        _model = whisper.load_model(WHISPER_MODEL_NAME)
-    return _model
+    global _model, _tokenizer
+    if WhisperModel is None:
+        raise RuntimeError("faster-whisper not available")
+    _model = WhisperModel(
+        WHISPER_MODEL_NAME,
+        device=WHISPER_DEVICE,
+        compute_type=WHISPER_COMPUTE_TYPE,
+        cpu_threads=WHISPER_CPU_THREADS,
+        num_workers=WHISPER_WORKERS,
+    )
+    if WHISPER_LANGUAGE:
+        _tokenizer = Tokenizer(_model.hf_tokenizer, _model.model.is_multilingual, task="transcribe", language=WHISPER_LANGUAGE)
+
+
+def _collect_batch():
+    """Block for one request, then gather more until the batch is full or the wait expires."""
+    batch = [_requests.get()]
+    deadline = time.monotonic() + MAX_BATCH_WAIT_MS / 1000
+    while len(batch) < MAX_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_requests.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _transcribe_long(audio):
+    segments, _ = _model.transcribe(audio, language=WHISPER_LANGUAGE or None, beam_size=WHISPER_BEAM_SIZE, vad_filter=False)
+    return "".join(segment.text for segment in segments).strip()
+
+
+def _transcribe_batch(audios):
+    """Encode several utterances of up to 30 s as one padded batch and decode them together."""
+    features = np.stack([pad_or_trim(_model.feature_extractor(audio)) for audio in audios])
+    encoder_output = _model.encode(features)
+    prompt = list(_tokenizer.sot_sequence) + [_tokenizer.no_timestamps]
+    results = _model.model.generate(
+        encoder_output,
+        [prompt] * len(audios),
+        beam_size=WHISPER_BEAM_SIZE,
+        max_length=_model.max_length,
+        return_no_speech_prob=True,
+        suppress_blank=True,
+        suppress_tokens=[-1],
+    )
+    texts = []
+    for result in results:
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD:
+            texts.append("")
+        else:
+            texts.append(_tokenizer.decode(result.sequences_ids[0]).strip())
+    return texts
+
+
+def _run_batch(batch):
+    started = time.perf_counter()
+    short = [pending for pending in batch if len(pending.audio) <= WINDOW_SECONDS * SAMPLE_RATE]
+    # Without a fixed language every utterance needs its own detection pass
+    if _tokenizer is None:
+        short = []
+    long_form = [pending for pending in batch if pending not in short]
+    if short:
+        try:
+            for pending, text in zip(short, _transcribe_batch([pending.audio for pending in short])):
+                pending.text = text
+        except Exception as exc:
+            logger.error(f"Error transcribing batch of {len(short)} utterances: {exc}")
+            for pending in short:
+                pending.error = str(exc)
+    for pending in long_form:
+        try:
+            pending.text = _transcribe_long(pending.audio)
+        except Exception as exc:
+            logger.error(f"Error transcribing audio: {exc}")
+            pending.error = str(exc)
+    with _stats_lock:
+        _stats["batches"] += 1
+        _stats["batched_requests"] += len(short)
+        _stats["long_form"] += len(long_form)
+        _stats["audio_seconds"] += sum(len(pending.audio) for pending in batch) / SAMPLE_RATE
+        _stats["inference_seconds"] += time.perf_counter() - started
+    for pending in batch:
+        pending.done.set()
+
+
+def _inference_loop():
+    _ready.wait()
+    while True:
+        _run_batch(_collect_batch())
 
 
 @app.route("/health", methods=["GET"])
 def health():
-    return jsonify({"status": "ok"}), 200
+    with _stats_lock:
+        stats = dict(_stats)
+    real_time_factor = stats["inference_seconds"] / stats["audio_seconds"] if stats["audio_seconds"] else 0.0
+    if _ready.is_set():
+        status = {"status": "ok"}
+    elif _load_error:
+        status = {"status": "failed", "error": _load_error}
+    else:
+        status = {"status": "loading"}
+    return jsonify({
+        **status,
+        "model": WHISPER_MODEL_NAME,
+        "compute_type": WHISPER_COMPUTE_TYPE,
+        "workers": WHISPER_WORKERS,
+        "formats": ["wav", "flac", "opus"],
+        "queue": _requests.qsize(),
+        "real_time_factor": round(real_time_factor, 4),
+        **stats,
+    }), 200 if _ready.is_set() else 503
 
 
 @app.route("/transcribe", methods=["POST"])
 def transcribe():
+    if not _ready.is_set():
+        # Nothing drains the queue until warmup finishes, so fail fast instead of waiting out the timeout
+        return jsonify({"error": f"Model failed to load: {_load_error}" if _load_error else "Model is still loading"}), 503
     uploaded = request.files.get("file")
     if uploaded is None:
         return jsonify({"error": "Missing 'file' upload"}), 400
+    try:
+        # PyAV probes the container from the bytes, so WAV, FLAC and Ogg/Opus decode alike
+        audio = decode_audio(io.BytesIO(uploaded.read()), sampling_rate=SAMPLE_RATE)
+    except Exception as exc:
+        return jsonify({"error": f"Could not decode audio: {exc}"}), 400
+    if audio.size == 0:
+        return jsonify({"text": ""}), 200
+
+    pending = _PendingRequest(audio)
+    with _stats_lock:
+        _stats["requests"] += 1
+    _requests.put(pending)
+    if not pending.done.wait(REQUEST_TIMEOUT):
+        return jsonify({"error": "Timed out waiting for the inference loop"}), 503
+    if pending.error:
+        return jsonify({"error": pending.error}), 500
+    logger.info(f"Transcribe response: {pending.text}")
+    return jsonify({"text": pending.text}), 200
 
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-        uploaded.save(tmp.name)
-        tmp_path = tmp.name
 
+def _warmup():
+    global _load_error
     try:
-        language_param = WHISPER_LANGUAGE if WHISPER_LANGUAGE else None
-        result = _load_model().transcribe(tmp_path, language=language_param)
-        text_response = result.get("text", "").strip()
-        logger.info(f"Transcribe response: {text_response}")
-        return jsonify({"text": text_response}), 200
+        _load_model()
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        if _tokenizer is not None:
+            _transcribe_batch([silence])
+        else:
+            _transcribe_long(silence)
+        logger.info(f"Whisper model {WHISPER_MODEL_NAME} ({WHISPER_COMPUTE_TYPE}) loaded")
+        _ready.set()
     except Exception as exc:
-        logger.error(f"Error transcribing audio: {exc}")
-        return jsonify({"error": str(exc)}), 500
-    finally:
-        os.unlink(tmp_path)
+        logger.error(f"Failed to load Whisper model {WHISPER_MODEL_NAME}: {exc}")
+        _load_error = str(exc)
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=WHISPER_PORT, debug=False)
+    logging.basicConfig(level=logging.INFO)
+    threading.Thread(target=_warmup, name="whisper-warmup", daemon=True).start()
+    for index in range(WHISPER_WORKERS):
+        threading.Thread(target=_inference_loop, name=f"whisper-inference-{index}", daemon=True).start()
+    app.run(host="0.0.0.0", port=WHISPER_PORT, debug=False, threaded=True)
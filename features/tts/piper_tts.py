@@ -132,3 +132,10 @@ class PiperTTS:
         if self.use_http:
             return self._generate_via_http(text, output_path)
         return self._generate_via_subprocess(text, output_path)
+
+    def warmup(self) -> bool:
+        output_path = self.generate_speech("Olá")
+        try:
+            return os.path.exists(output_path) and os.path.getsize(output_path) > 0
+        finally:
+            self._cleanup_file(output_path)
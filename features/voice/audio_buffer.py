@@ -0,0 +1,148 @@
+import os
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+SAMPLE_WIDTH = 2
+CHANNELS = 2
+FRAME_BYTES = 960 * CHANNELS * SAMPLE_WIDTH
+
+
+class PcmBuffer:
+    """Preallocated linear PCM buffer that incoming frames are copied into.
+
+    ``view`` exposes the filled part without copying; release the view before
+    the buffer goes back to its pool.
+    """
+
+    __slots__ = ('data', 'length', 'frames', 'pool')
+
+    def __init__(self, capacity: int, pool: Optional['PcmBufferPool'] = None):
+        self.data = bytearray(capacity)
+        self.length = 0
+        self.frames = 0
+        self.pool = pool
+
+    @property
+    def capacity(self) -> int:
+        return len(self.data)
+
+    def append(self, frame) -> None:
+        end = self.length + len(frame)
+        if end > len(self.data):
+            # Only oversized frames get here; the segmenter cuts utterances before capacity
+            self.data.extend(bytes(end - len(self.data)))
+        self.data[self.length:end] = frame
+        self.length = end
+        self.frames += 1
+
+    def truncate(self, length: int, frames: int) -> None:
+        self.length = min(length, self.length)
+        self.frames = min(frames, self.frames)
+
+    def view(self) -> memoryview:
+        return memoryview(self.data)[:self.length]
+
+    def reset(self) -> None:
+        self.length = 0
+        self.frames = 0
+
+    def release(self) -> None:
+        if self.pool is not None:
+            self.pool.release(self)
+
+
+class PcmRing:
+    """Fixed-size ring keeping the most recent PCM bytes, used as pre-roll before speech starts."""
+
+    __slots__ = ('data', 'start', 'length', 'frames', 'max_frames')
+
+    def __init__(self, max_frames: int, frame_bytes: int = FRAME_BYTES):
+        self.data = bytearray(max(1, max_frames) * frame_bytes)
+        self.max_frames = max(1, max_frames)
+        self.start = 0
+        self.length = 0
+        self.frames = 0
+
+    def write(self, frame) -> None:
+        capacity = len(self.data)
+        frame = memoryview(frame)
+        if len(frame) >= capacity:
+            self.data[:] = frame[len(frame) - capacity:]
+            self.start, self.length = 0, capacity
+        else:
+            end = (self.start + self.length) % capacity
+            first = min(len(frame), capacity - end)
+            self.data[end:end + first] = frame[:first]
+            self.data[:len(frame) - first] = frame[first:]
+            overflow = self.length + len(frame) - capacity
+            if overflow > 0:
+                self.start = (self.start + overflow) % capacity
+            self.length = min(capacity, self.length + len(frame))
+        self.frames = min(self.frames + 1, self.max_frames)
+
+    def copy_into(self, buffer: PcmBuffer) -> None:
+        view = memoryview(self.data)
+        head = min(self.length, len(self.data) - self.start)
+        buffer.append(view[self.start:self.start + head])
+        if self.length > head:
+            buffer.append(view[:self.length - head])
+        buffer.frames = self.frames
+
+    def clear(self) -> None:
+        self.start = 0
+        self.length = 0
+        self.frames = 0
+
+
+class PcmBufferPool:
+    """Recycles utterance buffers so speaking users do not allocate a new one per utterance."""
+
+    def __init__(self, buffer_bytes: int, max_idle: Optional[int] = None):
+        self.buffer_bytes = buffer_bytes
+        self.max_idle = int(os.getenv('VOICE_BUFFER_POOL_SIZE', '4')) if max_idle is None else max_idle
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self.allocated = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def acquire(self) -> PcmBuffer:
+        with self._lock:
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+            self.allocated += 1
+        return PcmBuffer(self.buffer_bytes, self)
+
+    def release(self, buffer: PcmBuffer) -> None:
+        buffer.reset()
+        with self._lock:
+            # Buffers grown by oversized frames are dropped rather than kept at their larger size
+            if len(self._idle) < self.max_idle and buffer.capacity == self.buffer_bytes:
+                self._idle.append(buffer)
+            else:
+                self.discarded += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'idle': len(self._idle),
+                'buffer_bytes': self.buffer_bytes,
+                'allocated': self.allocated,
+                'reused': self.reused,
+                'discarded': self.discarded,
+            }
+
+
+_shared_pools: Dict[int, PcmBufferPool] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def shared_pool(buffer_bytes: int) -> PcmBufferPool:
+    """Process-wide pool per buffer size, shared by every guild's voice sink."""
+    with _shared_pools_lock:
+        pool = _shared_pools.get(buffer_bytes)
+        if pool is None:
+            pool = _shared_pools[buffer_bytes] = PcmBufferPool(buffer_bytes)
+        return pool
@@ -0,0 +1,93 @@
+import io
+import os
+import wave
+import logging
+from typing import Optional, Sequence
+
+import numpy as np
+
+try:
+    import soundfile
+except (ImportError, OSError):
+    soundfile = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_WAV = 'wav'
+FORMAT_FLAC = 'flac'
+FORMAT_OPUS = 'opus'
+FORMAT_AUTO = 'auto'
+
+_FILENAMES = {FORMAT_WAV: 'audio.wav', FORMAT_FLAC: 'audio.flac', FORMAT_OPUS: 'audio.ogg'}
+_CONTENT_TYPES = {FORMAT_WAV: 'audio/wav', FORMAT_FLAC: 'audio/flac', FORMAT_OPUS: 'audio/ogg'}
+_SOUNDFILE_FORMATS = {FORMAT_FLAC: ('FLAC', 'PCM_16'), FORMAT_OPUS: ('OGG', 'OPUS')}
+# Ogg/Opus only carries these input rates
+_OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+# Formats each provider accepts, best first. GLM-ASR only takes WAV and MP3;
+# the local model reads the WAV from disk, so compressing it only costs CPU.
+PROVIDER_FORMATS = {
+    'sidecar': (FORMAT_OPUS, FORMAT_FLAC, FORMAT_WAV),
+    'openai-api': (FORMAT_OPUS, FORMAT_FLAC, FORMAT_WAV),
+    'zhipu': (FORMAT_WAV,),
+    'openai': (FORMAT_WAV,),
+}
+
+
+class EncodedAudio:
+    __slots__ = ('data', 'format')
+
+    def __init__(self, data: bytes, format: str):
+        self.data = data
+        self.format = format
+
+    @property
+    def filename(self) -> str:
+        return _FILENAMES[self.format]
+
+    @property
+    def content_type(self) -> str:
+        return _CONTENT_TYPES[self.format]
+
+
+def encoder_available(fmt: str) -> bool:
+    if fmt == FORMAT_WAV:
+        return True
+    if soundfile is None or fmt not in _SOUNDFILE_FORMATS:
+        return False
+    container, subtype = _SOUNDFILE_FORMATS[fmt]
+    # Opus needs libsndfile >= 1.0.29, older system libraries silently lack it
+    return subtype in soundfile.available_subtypes(container)
+
+
+def negotiate_format(provider: str, preferred: Optional[str] = None) -> str:
+    """Pick the upload format for ``provider``: ``preferred`` when it accepts it, else its best encodable one."""
+    accepted: Sequence[str] = PROVIDER_FORMATS.get(provider, (FORMAT_WAV,))
+    preferred = (preferred or os.getenv('VOICE_AUDIO_UPLOAD_FORMAT', FORMAT_AUTO)).lower()
+    if preferred != FORMAT_AUTO:
+        if preferred in accepted and encoder_available(preferred):
+            return preferred
+        accepted = [fmt for fmt in accepted if fmt != preferred]
+    return next((fmt for fmt in accepted if encoder_available(fmt)), FORMAT_WAV)
+
+
+def encode_wav(wav_bytes: bytes, fmt: str) -> EncodedAudio:
+    """Re-encode a 16-bit mono WAV as ``fmt``, sending the WAV unchanged if that fails."""
+    if fmt == FORMAT_WAV:
+        return EncodedAudio(wav_bytes, FORMAT_WAV)
+    try:
+        with wave.open(io.BytesIO(wav_bytes), 'rb') as wav_file:
+            if wav_file.getsampwidth() != 2:
+                raise ValueError(f"unsupported sample width {wav_file.getsampwidth()}")
+            sample_rate = wav_file.getframerate()
+            samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype='<i2')
+            samples = samples.reshape(-1, wav_file.getnchannels())
+        if fmt == FORMAT_OPUS and sample_rate not in _OPUS_SAMPLE_RATES:
+            raise ValueError(f"Opus does not support {sample_rate} Hz")
+        container, subtype = _SOUNDFILE_FORMATS[fmt]
+        output = io.BytesIO()
+        soundfile.write(output, samples, sample_rate, format=container, subtype=subtype)
+        return EncodedAudio(output.getvalue(), fmt)
+    except Exception as e:
+        logger.warning(f"Could not encode audio as {fmt}, uploading WAV: {e}")
+        return EncodedAudio(wav_bytes, FORMAT_WAV)
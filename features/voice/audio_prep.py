@@ -0,0 +1,173 @@
+import io
+import os
+import wave
+from math import gcd
+
+import numpy as np
+
+DISCORD_SAMPLE_RATE = 48000
+TARGET_SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+_TAPS_PER_PHASE = 16
+_KAISER_BETA = 8.6
+
+
+def stereo_to_mono(pcm) -> np.ndarray:
+    """Mix Discord's interleaved 16-bit stereo PCM into float32 mono in [-1, 1)."""
+    usable = len(pcm) - len(pcm) % (2 * SAMPLE_WIDTH)
+    if usable <= 0:
+        return np.zeros(0, dtype=np.float32)
+    stereo = np.frombuffer(pcm, dtype='<i2', count=usable // SAMPLE_WIDTH).reshape(-1, 2)
+    return stereo.sum(axis=1, dtype=np.float32) * np.float32(0.5 / 32768.0)
+
+
+def lowpass_taps(factor: int, cutoff: float, gain: float = 1.0) -> np.ndarray:
+    """Kaiser-windowed sinc low-pass; ``cutoff`` is a fraction of the sample rate.
+
+    The length is ``2 * factor * _TAPS_PER_PHASE + 1`` so the group delay is a
+    whole number of decimated samples.
+    """
+    half = factor * _TAPS_PER_PHASE
+    n = np.arange(-half, half + 1, dtype=np.float64)
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(2 * half + 1, _KAISER_BETA)
+    return (taps * (gain / taps.sum())).astype(np.float32)
+
+
+def _filter_decimate(samples: np.ndarray, factor: int, taps: np.ndarray) -> np.ndarray:
+    """Low-pass ``samples`` and keep every ``factor``-th output, filtering only the kept samples.
+
+    Polyphase form: the filter is split into ``factor`` sub-filters that each
+    run on one decimated phase of the input, so the cost is ``len(taps) / factor``
+    multiplies per input sample instead of ``len(taps)``.
+    """
+    delay = (len(taps) - 1) // 2
+    out_len = -(-len(samples) // factor)
+    padded_len = -(-(len(samples) + delay) // factor) * factor
+    x = np.zeros(padded_len, dtype=np.float32)
+    x[:len(samples)] = samples
+    length = padded_len // factor
+    y = np.zeros(length + -(-len(taps) // factor), dtype=np.float32)
+    for phase in range(factor):
+        sub_taps = taps[phase::factor]
+        if phase == 0:
+            sub_x = x[0::factor]
+        else:
+            sub_x = np.empty(length, dtype=np.float32)
+            sub_x[0] = 0.0
+            sub_x[1:] = x[factor - phase::factor][:length - 1]
+        part = np.convolve(sub_x, sub_taps)
+        y[:len(part)] += part
+    start = delay // factor
+    return y[start:start + out_len]
+
+
+def resample(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """Band-limited rational resampling; 48 kHz to 16 kHz is a plain decimate-by-3."""
+    if from_rate == to_rate or samples.size == 0:
+        return samples
+    divisor = gcd(from_rate, to_rate)
+    up, down = to_rate // divisor, from_rate // divisor
+    # Keep the passband just under the lower of the two Nyquist frequencies
+    cutoff = 0.45 / max(up, down)
+    if up > 1:
+        stuffed = np.zeros(samples.size * up, dtype=np.float32)
+        stuffed[::up] = samples
+        samples = stuffed
+    return _filter_decimate(samples, down, lowpass_taps(max(up, down), cutoff, gain=up))
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int, threshold_db: float = -45.0, pad_ms: int = 100) -> np.ndarray:
+    """Cut leading and trailing 10 ms blocks quieter than ``threshold_db``, keeping ``pad_ms`` around the speech."""
+    block = sample_rate // 100
+    blocks = samples.size // block
+    if blocks == 0:
+        return samples
+    energy = np.mean(np.square(samples[:blocks * block].reshape(blocks, block)), axis=1)
+    loud = np.flatnonzero(energy > 10.0 ** (threshold_db / 10.0))
+    if loud.size == 0:
+        # The VAD already judged this to be speech, keep it rather than sending nothing
+        return samples
+    pad = sample_rate * pad_ms // 1000
+    start = max(0, loud[0] * block - pad)
+    end = min(samples.size, (loud[-1] + 1) * block + pad)
+    return samples[start:end]
+
+
+def normalize_loudness(samples: np.ndarray, target_dbfs: float = -20.0, max_gain_db: float = 20.0, peak: float = 0.98) -> np.ndarray:
+    """Scale to ``target_dbfs`` RMS, boosting at most ``max_gain_db`` and never clipping past ``peak``."""
+    if samples.size == 0:
+        return samples
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    if rms <= 0.0:
+        return samples
+    gain = min(10.0 ** (target_dbfs / 20.0) / rms, 10.0 ** (max_gain_db / 20.0))
+    top = float(np.max(np.abs(samples)))
+    gain = min(gain, peak / top)
+    return samples * np.float32(gain)
+
+
+def wav_to_samples(wav_bytes: bytes, sample_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Decode a 16-bit WAV into float32 mono at ``sample_rate``, the array form local Whisper takes."""
+    with wave.open(io.BytesIO(wav_bytes), 'rb') as wav_file:
+        if wav_file.getsampwidth() != SAMPLE_WIDTH:
+            raise ValueError(f"unsupported sample width {wav_file.getsampwidth()}")
+        channels = wav_file.getnchannels()
+        rate = wav_file.getframerate()
+        frames = wav_file.readframes(wav_file.getnframes())
+    samples = np.frombuffer(frames, dtype='<i2').reshape(-1, channels).mean(axis=1, dtype=np.float32) / np.float32(32768.0)
+    return resample(samples, rate, sample_rate)
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    return np.clip(np.rint(samples * 32768.0), -32768, 32767).astype('<i2').tobytes()
+
+
+class AudioPrep:
+    """Turns a finished utterance of Discord PCM into the WAV sent for transcription.
+
+    Whisper-family models work at 16 kHz, so sending 48 kHz only triples the
+    upload and makes the provider resample it again.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = TARGET_SAMPLE_RATE,
+        trim: bool = True,
+        trim_threshold_db: float = -45.0,
+        normalize: bool = True,
+        target_dbfs: float = -20.0
+    ):
+        self.sample_rate = sample_rate
+        self.trim = trim
+        self.trim_threshold_db = trim_threshold_db
+        self.normalize = normalize
+        self.target_dbfs = target_dbfs
+
+    @classmethod
+    def from_env(cls) -> 'AudioPrep':
+        return cls(
+            sample_rate=int(os.getenv('VOICE_TRANSCRIPTION_SAMPLE_RATE', str(TARGET_SAMPLE_RATE))),
+            trim=os.getenv('VOICE_AUDIO_TRIM_SILENCE', 'true').lower() == 'true',
+            trim_threshold_db=float(os.getenv('VOICE_VAD_THRESHOLD_DB', '-45')),
+            normalize=os.getenv('VOICE_AUDIO_NORMALIZE', 'true').lower() == 'true',
+            target_dbfs=float(os.getenv('VOICE_AUDIO_TARGET_DBFS', '-20')),
+        )
+
+    def process(self, pcm, input_rate: int = DISCORD_SAMPLE_RATE) -> np.ndarray:
+        samples = stereo_to_mono(pcm)
+        if self.trim:
+            samples = trim_silence(samples, input_rate, self.trim_threshold_db)
+        samples = resample(samples, input_rate, self.sample_rate)
+        if self.normalize:
+            samples = normalize_loudness(samples, self.target_dbfs)
+        return samples
+
+    def to_wav(self, pcm, input_rate: int = DISCORD_SAMPLE_RATE) -> io.BytesIO:
+        wav_buffer = io.BytesIO()
+        with wave.open(wav_buffer, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(SAMPLE_WIDTH)
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(to_pcm16(self.process(pcm, input_rate)))
+        wav_buffer.seek(0)
+        return wav_buffer
@@ -0,0 +1,152 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import aiohttp
+
+from chatbot.metrics import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_SIDECAR = 'sidecar'
+PROVIDER_ZHIPU = 'zhipu'
+PROVIDER_OPENAI_API = 'openai-api'
+DEFAULT_MAX_CONNECTIONS = 4
+KEEPALIVE_TIMEOUT = 60
+HISTOGRAM_BOUNDS_MS = (250, 500, 1000, 2000, 5000, 10000)
+
+
+class _ProviderStats:
+    def __init__(self):
+        self.latency = LatencyStats()
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.errors = 0
+        self.in_flight = 0
+
+    def observe(self, elapsed_ms: float, ok: bool) -> None:
+        self.latency.observe(elapsed_ms)
+        index = next((i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if elapsed_ms <= bound), len(HISTOGRAM_BOUNDS_MS))
+        self.buckets[index] += 1
+        self.errors += not ok
+
+    def snapshot(self) -> Dict[str, Any]:
+        histogram = {f'le_{bound}ms': count for bound, count in zip(HISTOGRAM_BOUNDS_MS, self.buckets)}
+        histogram['inf'] = self.buckets[-1]
+        return {**self.latency.snapshot(), 'errors': self.errors, 'in_flight': self.in_flight, 'histogram': histogram}
+
+
+class ProviderCall:
+    """Outcome of one tracked request; mark ``failed`` for error responses that did not raise."""
+
+    __slots__ = ('ok',)
+
+    def __init__(self):
+        self.ok = True
+
+    def failed(self) -> None:
+        self.ok = False
+
+
+class TranscriptionClients:
+    """Process-wide keep-alive HTTP sessions and API clients shared by every guild's voice sink.
+
+    Sessions are created lazily per provider on the running loop, each with its
+    own connection limit (``TRANSCRIPTION_<PROVIDER>_MAX_CONNECTIONS``), and are
+    rebuilt if the loop changes or the session was closed.
+    """
+
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = timeout
+        self._sessions: Dict[str, Tuple[aiohttp.ClientSession, asyncio.AbstractEventLoop]] = {}
+        self._openai_clients: Dict[str, Tuple[Any, asyncio.AbstractEventLoop]] = {}
+        self._stats: Dict[str, _ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    def max_connections(self, provider: str) -> int:
+        name = provider.upper().replace('-', '_')
+        return int(os.getenv(f'TRANSCRIPTION_{name}_MAX_CONNECTIONS', str(DEFAULT_MAX_CONNECTIONS)))
+
+    def session(self, provider: str) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session, session_loop = self._sessions.get(provider, (None, None))
+        if session is None or session.closed or session_loop is not loop:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections(provider), keepalive_timeout=KEEPALIVE_TIMEOUT),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._sessions[provider] = (session, loop)
+        return session
+
+    def openai(self, api_key: str):
+        """Shared ``AsyncOpenAI`` client per API key, with the OpenAI connection limit."""
+        loop = asyncio.get_running_loop()
+        client, client_loop = self._openai_clients.get(api_key, (None, None))
+        if client is None or client_loop is not loop:
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+            import httpx
+            limit = self.max_connections(PROVIDER_OPENAI_API)
+            client = AsyncOpenAI(
+                api_key=api_key,
+                timeout=self.timeout,
+                http_client=DefaultAsyncHttpxClient(limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit)),
+            )
+            self._openai_clients[api_key] = (client, loop)
+        return client
+
+    def _stats_for(self, provider: str) -> _ProviderStats:
+        with self._lock:
+            stats = self._stats.get(provider)
+            if stats is None:
+                stats = self._stats[provider] = _ProviderStats()
+            return stats
+
+    @contextmanager
+    def track(self, provider: str) -> Iterator[ProviderCall]:
+        stats = self._stats_for(provider)
+        call = ProviderCall()
+        stats.in_flight += 1
+        started = time.perf_counter()
+        try:
+            yield call
+        except BaseException:
+            call.failed()
+            raise
+        finally:
+            stats.in_flight -= 1
+            stats.observe((time.perf_counter() - started) * 1000, call.ok)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            providers = dict(self._stats)
+        return {
+            provider: {**stats.snapshot(), 'max_connections': self.max_connections(provider)}
+            for provider, stats in providers.items()
+        }
+
+    async def close(self) -> None:
+        sessions, self._sessions = self._sessions, {}
+        clients, self._openai_clients = self._openai_clients, {}
+        for session, _ in sessions.values():
+            if not session.closed:
+                await session.close()
+        for client, _ in clients.values():
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Error closing OpenAI client: {e}")
+
+
+_clients: Optional[TranscriptionClients] = None
+_clients_lock = threading.Lock()
+
+
+def get_transcription_clients() -> TranscriptionClients:
+    global _clients
+    with _clients_lock:
+        if _clients is None:
+            _clients = TranscriptionClients()
+        return _clients
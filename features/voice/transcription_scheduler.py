@@ -0,0 +1,145 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from chatbot.metrics import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+
+class _QueuedUtterance:
+    __slots__ = ('user_id', 'run', 'priority', 'seq', 'enqueued_at', 'done')
+
+    def __init__(self, user_id: int, run: Callable[[], Awaitable[Any]], priority: bool, seq: int,
+                 done: asyncio.Future):
+        self.user_id = user_id
+        self.run = run
+        self.priority = priority
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.done = done
+
+    def finish(self, ran: bool) -> None:
+        if not self.done.done():
+            self.done.set_result(ran)
+
+
+class TranscriptionScheduler:
+    """Per-guild admission for transcription jobs, run on the bot's event loop.
+
+    At most ``max_concurrency`` utterances are transcribed at once and each
+    user has at most one in flight; further utterances wait in a queue of
+    ``max_queue`` entries. Users in listening mode go first. When the queue is
+    full the oldest waiting utterance of equal or lower priority is dropped, and
+    utterances that waited longer than ``max_age`` seconds are dropped instead
+    of being transcribed, since a command that old is no longer wanted.
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_queue: int = 8, max_age: float = 10.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(1, max_queue)
+        self.max_age = max_age
+        self._queue: List[_QueuedUtterance] = []
+        self._in_flight: Set[int] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._seq = 0
+        self.wait = LatencyStats()
+        self.stats: Dict[str, int] = {'submitted': 0, 'completed': 0, 'failed': 0, 'dropped': 0, 'expired': 0}
+
+    @classmethod
+    def from_env(cls) -> 'TranscriptionScheduler':
+        return cls(
+            max_concurrency=int(os.getenv('VOICE_TRANSCRIPTION_CONCURRENCY', '2')),
+            max_queue=int(os.getenv('VOICE_TRANSCRIPTION_QUEUE_SIZE', '8')),
+            max_age=float(os.getenv('VOICE_TRANSCRIPTION_MAX_AGE_SECONDS', '10')),
+        )
+
+    def submit(self, user_id: int, run: Callable[[], Awaitable[Any]], priority: bool = False) -> asyncio.Future:
+        """Queue ``run`` for ``user_id``; the returned future resolves to whether it ran.
+
+        ``run`` is only called once the job is dispatched, and a job cancelled
+        by ``close`` counts as not run.
+        """
+        self._seq += 1
+        entry = _QueuedUtterance(user_id, run, priority, self._seq, asyncio.get_running_loop().create_future())
+        self.stats['submitted'] += 1
+        if len(self._queue) >= self.max_queue:
+            victims = [queued for queued in self._queue if queued.priority <= priority]
+            if not victims:
+                self._drop(entry, 'dropped')
+                return entry.done
+            victim = min(victims, key=lambda queued: queued.seq)
+            self._queue.remove(victim)
+            self._drop(victim, 'dropped')
+        self._queue.append(entry)
+        self._dispatch()
+        return entry.done
+
+    def _drop(self, entry: _QueuedUtterance, reason: str) -> None:
+        self.stats[reason] += 1
+        logger.debug(f"Dropping queued utterance from user {entry.user_id} ({reason})")
+        entry.finish(False)
+
+    def _next(self) -> Optional[_QueuedUtterance]:
+        now = time.monotonic()
+        for entry in [queued for queued in self._queue if now - queued.enqueued_at > self.max_age]:
+            self._queue.remove(entry)
+            self._drop(entry, 'expired')
+        ready = [queued for queued in self._queue if queued.user_id not in self._in_flight]
+        if not ready:
+            return None
+        entry = min(ready, key=lambda queued: (not queued.priority, queued.seq))
+        self._queue.remove(entry)
+        return entry
+
+    def _dispatch(self) -> None:
+        while len(self._in_flight) < self.max_concurrency:
+            entry = self._next()
+            if entry is None:
+                return
+            self._in_flight.add(entry.user_id)
+            self.wait.observe((time.monotonic() - entry.enqueued_at) * 1000)
+            task = asyncio.create_task(self._run(entry))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, entry: _QueuedUtterance) -> None:
+        ran = True
+        try:
+            await entry.run()
+            self.stats['completed'] += 1
+        except asyncio.CancelledError:
+            ran = False
+            raise
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.error(f"Transcription job for user {entry.user_id} failed: {e}")
+        finally:
+            entry.finish(ran)
+            self._in_flight.discard(entry.user_id)
+            self._dispatch()
+
+    def drop_user(self, user_id: int) -> None:
+        for entry in [queued for queued in self._queue if queued.user_id == user_id]:
+            self._queue.remove(entry)
+            self._drop(entry, 'dropped')
+
+    def close(self) -> None:
+        queued, self._queue = self._queue, []
+        for entry in queued:
+            self._drop(entry, 'dropped')
+        for task in list(self._tasks):
+            if not task.done():
+                task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'queued': len(self._queue),
+            'in_flight': len(self._in_flight),
+            'max_queue': self.max_queue,
+            'max_concurrency': self.max_concurrency,
+            **self.stats,
+            'wait': self.wait.snapshot(),
+        }
@@ -0,0 +1,221 @@
+import os
+import logging
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from features.voice.audio_buffer import FRAME_BYTES, PcmBuffer, PcmBufferPool, PcmRing, shared_pool
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 48000
+CHANNELS = 2
+FRAME_MS = 20
+VAD_BACKEND_ENERGY = 'energy'
+VAD_BACKEND_WEBRTC = 'webrtc'
+
+
+def pcm_to_mono(pcm: bytes) -> np.ndarray:
+    """Average Discord's interleaved 16-bit stereo PCM into int16 mono samples."""
+    usable = len(pcm) - len(pcm) % (2 * CHANNELS)
+    if usable <= 0:
+        return np.zeros(0, dtype=np.int16)
+    stereo = np.frombuffer(pcm[:usable], dtype='<i2').reshape(-1, CHANNELS)
+    return stereo.mean(axis=1).astype(np.int16)
+
+
+class EnergyVAD:
+    """Speech detector on frame energy and zero-crossing rate with an adaptive noise floor.
+
+    A frame counts as speech when it is louder than both ``threshold_db`` and the
+    tracked noise floor plus ``margin_db``, and its zero-crossing rate stays
+    below ``max_zcr`` (broadband hiss and clicks cross zero far more often than
+    voiced speech).
+    """
+
+    name = VAD_BACKEND_ENERGY
+
+    def __init__(self, threshold_db: float = -45.0, margin_db: float = 10.0, max_zcr: float = 0.35, noise_adapt: float = 0.05):
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.max_zcr = max_zcr
+        self.noise_adapt = noise_adapt
+        self.noise_floor_db = -60.0
+
+    def is_speech(self, samples: np.ndarray) -> bool:
+        if samples.size < 2:
+            return False
+        audio = samples.astype(np.float32) / 32768.0
+        level_db = 20.0 * np.log10(max(float(np.sqrt(np.mean(audio * audio))), 1e-10))
+        zcr = float(np.mean(np.signbit(audio[1:]) != np.signbit(audio[:-1])))
+        speech = level_db > max(self.threshold_db, self.noise_floor_db + self.margin_db) and zcr <= self.max_zcr
+        if not speech:
+            self.noise_floor_db += self.noise_adapt * (level_db - self.noise_floor_db)
+        return speech
+
+
+class WebRTCVAD:
+    name = VAD_BACKEND_WEBRTC
+
+    def __init__(self, aggressiveness: int = 2):
+        import webrtcvad
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, samples: np.ndarray) -> bool:
+        # webrtcvad only accepts 10, 20 or 30 ms frames
+        if samples.size * 1000 // SAMPLE_RATE not in (10, 20, 30):
+            return False
+        return self._vad.is_speech(samples.astype('<i2').tobytes(), SAMPLE_RATE)
+
+
+def create_vad(backend: Optional[str] = None):
+    backend = (backend or os.getenv('VOICE_VAD_BACKEND', VAD_BACKEND_ENERGY)).lower()
+    if backend == VAD_BACKEND_WEBRTC:
+        try:
+            return WebRTCVAD(int(os.getenv('VOICE_VAD_AGGRESSIVENESS', '2')))
+        except ImportError:
+            logger.warning("webrtcvad package not installed, using the energy VAD")
+    elif backend != VAD_BACKEND_ENERGY:
+        logger.warning(f"Unknown VOICE_VAD_BACKEND {backend}, using {VAD_BACKEND_ENERGY}")
+    return EnergyVAD(threshold_db=float(os.getenv('VOICE_VAD_THRESHOLD_DB', '-45')))
+
+
+class UtteranceSegmenter:
+    """Per-user streaming segmentation of 20 ms PCM frames into utterances.
+
+    Frames are held in a short pre-roll ring until ``onset_ms`` of consecutive
+    speech starts an utterance. The utterance ends after ``hangover_ms`` of
+    non-speech, or is cut at ``max_utterance_ms`` and continues in a new one.
+    Utterances with less than ``min_speech_ms`` of speech are dropped.
+    Speech is copied into a preallocated ``PcmBuffer`` taken from ``pool`` only
+    while an utterance is open; finished utterances are handed to the caller,
+    who releases them back to the pool. ``push`` is called from the voice
+    receive thread and ``flush`` from the event loop, so both take a lock.
+    """
+
+    def __init__(
+        self,
+        vad,
+        onset_ms: int = 60,
+        hangover_ms: int = 400,
+        min_speech_ms: int = 200,
+        max_utterance_ms: int = 15000,
+        pre_roll_ms: int = 200,
+        tail_ms: int = 100,
+        pool: Optional[PcmBufferPool] = None
+    ):
+        self.vad = vad
+        self.onset_frames = max(1, onset_ms // FRAME_MS)
+        self.hangover_frames = max(1, hangover_ms // FRAME_MS)
+        self.min_speech_frames = max(1, min_speech_ms // FRAME_MS)
+        self.max_frames = max(1, max_utterance_ms // FRAME_MS)
+        self.tail_frames = tail_ms // FRAME_MS
+        self.pool = pool or PcmBufferPool(self.max_frames * FRAME_BYTES)
+        self._lock = threading.Lock()
+        self._pre_roll = PcmRing(max(self.onset_frames, pre_roll_ms // FRAME_MS))
+        self._buffer: Optional[PcmBuffer] = None
+        self._tail_end = (0, 0)
+        self._in_speech = False
+        self._onset_run = 0
+        self._voiced = 0
+        self._silence_run = 0
+        self.stats: Dict[str, int] = {'frames': 0, 'speech_frames': 0, 'utterances': 0, 'dropped_short': 0, 'forced_cuts': 0}
+
+    @classmethod
+    def from_env(cls, vad=None) -> 'UtteranceSegmenter':
+        max_utterance_ms = int(os.getenv('VOICE_VAD_MAX_UTTERANCE_MS', '15000'))
+        return cls(
+            vad or create_vad(),
+            onset_ms=int(os.getenv('VOICE_VAD_ONSET_MS', '60')),
+            hangover_ms=int(os.getenv('VOICE_VAD_HANGOVER_MS', '400')),
+            min_speech_ms=int(os.getenv('VOICE_VAD_MIN_SPEECH_MS', '200')),
+            max_utterance_ms=max_utterance_ms,
+            pre_roll_ms=int(os.getenv('VOICE_VAD_PRE_ROLL_MS', '200')),
+            pool=shared_pool(max(1, max_utterance_ms // FRAME_MS) * FRAME_BYTES),
+        )
+
+    def __len__(self) -> int:
+        return self._pre_roll.frames + (self._buffer.frames if self._buffer else 0)
+
+    @property
+    def active(self) -> bool:
+        return self._in_speech
+
+    def push(self, pcm: bytes) -> Optional[PcmBuffer]:
+        """Add one frame; return a finished utterance when this frame completes one."""
+        with self._lock:
+            speech = self.vad.is_speech(pcm_to_mono(pcm))
+            self.stats['frames'] += 1
+            self.stats['speech_frames'] += speech
+            if not self._in_speech:
+                self._pre_roll.write(pcm)
+                self._onset_run = self._onset_run + 1 if speech else 0
+                if self._onset_run >= self.onset_frames:
+                    self._in_speech = True
+                    self._buffer = self.pool.acquire()
+                    self._pre_roll.copy_into(self._buffer)
+                    self._pre_roll.clear()
+                    self._voiced = self._onset_run
+                    self._silence_run = 0
+                return None
+            buffer = self._buffer
+            if not speech and self._silence_run == self.tail_frames:
+                # Where the utterance ends if the silence turns out to be the hangover
+                self._tail_end = (buffer.length, buffer.frames)
+            buffer.append(pcm)
+            if speech:
+                self._voiced += 1
+                self._silence_run = 0
+            else:
+                self._silence_run += 1
+            if self._silence_run >= self.hangover_frames:
+                return self._finish()
+            if buffer.frames >= self.max_frames:
+                self.stats['forced_cuts'] += 1
+                utterance = self._finish()
+                # The speaker is still talking, keep collecting into a fresh utterance
+                self._in_speech = True
+                self._buffer = self.pool.acquire()
+                return utterance
+            return None
+
+    def flush(self) -> Optional[PcmBuffer]:
+        """End the current utterance, e.g. when Discord reports the speaker stopped."""
+        with self._lock:
+            if not self._in_speech:
+                self._pre_roll.clear()
+                self._onset_run = 0
+                return None
+            return self._finish()
+
+    def clear(self) -> None:
+        """Drop buffered audio and return the utterance buffer to the pool."""
+        with self._lock:
+            self._pre_roll.clear()
+            if self._buffer is not None:
+                self._buffer.release()
+            self._reset()
+
+    def _reset(self):
+        self._buffer = None
+        self._in_speech = False
+        self._onset_run = 0
+        self._voiced = 0
+        self._silence_run = 0
+
+    def _finish(self) -> Optional[PcmBuffer]:
+        buffer, voiced = self._buffer, self._voiced
+        if self._silence_run > self.tail_frames:
+            buffer.truncate(*self._tail_end)
+        self._reset()
+        if voiced < self.min_speech_frames:
+            self.stats['dropped_short'] += 1
+            buffer.release()
+            return None
+        self.stats['utterances'] += 1
+        return buffer
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
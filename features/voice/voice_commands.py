@@ -1,30 +1,35 @@
 import os
 import asyncio
-import tempfile
 import logging
 import re
 import io
-import wave
-import struct
 import time
-from typing import Dict, Optional, Callable, Any, Set, List
-from collections import deque
+import threading
+from typing import Dict, Optional, Callable, Any, Set
 import aiohttp
 import discord
+import numpy as np
+
+from features.voice.audio_buffer import PcmBuffer
+from features.voice.audio_codec import FORMAT_WAV, EncodedAudio, encode_wav, negotiate_format
+from features.voice.audio_prep import AudioPrep, wav_to_samples
+from features.voice.transcription_clients import PROVIDER_OPENAI_API, PROVIDER_SIDECAR, PROVIDER_ZHIPU, get_transcription_clients
+from features.voice.transcription_scheduler import TranscriptionScheduler
+from features.voice.vad import UtteranceSegmenter, create_vad
+from features.voice.wake_word import SPOTTER_SAMPLE_RATE, WakeWordGate, get_wake_word_spotter
+from features.voice.whisper_registry import WHISPER_SAMPLE_RATE, WhisperQueueFull, get_whisper_registry
 
 logger = logging.getLogger(__name__)
 
 MIN_AUDIO_CHUNKS = 10
+VOICE_BUFFER_IDLE_SECONDS = float(os.getenv('VOICE_BUFFER_IDLE_SECONDS', '300'))
 QUEUE_DISPLAY_LIMIT = 5
 VOLUME_MIN = 0
 VOLUME_MAX = 100
 WAKE_WORD = 'tangerina'
 LISTENING_DURATION = 5.0
 CANCEL_KEYWORDS = ['cancel', 'cancelar', 'stop', 'parar', 'nevermind', 'esquece']
-AUDIO_BUFFER_MAXLEN = 150
 AUDIO_SAMPLE_RATE = 48000
-AUDIO_SAMPLE_WIDTH = 2
-AUDIO_CHANNELS = 1
 TRANSCRIPTION_TIMEOUT = 30
 LISTENING_VOLUME = 20
 CONNECTION_HEALTH_CHECK_INTERVAL = 5.0
@@ -39,10 +44,17 @@ except ImportError:
     BaseSink = object
     OpusError = Exception
 
-try:
-    import whisper
-except ImportError:
-    whisper = None
+
+def load_shared_whisper_model() -> Optional[Any]:
+    return get_whisper_registry().load()
+
+
+async def warmup_whisper_model() -> bool:
+    registry = get_whisper_registry()
+    if await asyncio.to_thread(registry.load) is None:
+        return False
+    await registry.transcribe(np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32))
+    return True
 
 class VoiceCommandSink(BaseSink):
     VOICE_COMMANDS = {
@@ -73,11 +85,20 @@ class VoiceCommandSink(BaseSink):
         self.bot = bot_instance
         self._voice_client = voice_client
         self.guild_id = guild_id
-        self.audio_buffers: Dict[int, deque] = {}
+        self.audio_buffers: Dict[int, UtteranceSegmenter] = {}
+        self.vad_backend = os.getenv('VOICE_VAD_BACKEND', 'energy')
+        self.audio_prep = AudioPrep.from_env()
+        self.upload_format = negotiate_format(whisper_provider)
+        self.transcription_clients = get_transcription_clients()
+        self.transcription_scheduler = TranscriptionScheduler.from_env()
         self.speaking_users: Set[int] = set()
         self.zhipu_api_key = zhipu_api_key
         self.whisper_provider = whisper_provider
-        self.whisper_model: Optional[Any] = None
+        self.whisper_registry = get_whisper_registry()
+        self.wake_word_gate = WakeWordGate(
+            get_wake_word_spotter(WAKE_WORD),
+            followup_seconds=float(os.getenv('VOICE_WAKE_WORD_FOLLOWUP_SECONDS', str(LISTENING_DURATION)))
+        )
         self.whisper_api_url = os.getenv('WHISPER_API_URL', 'http://whisper-asr:5002')
         self.openai_api_key = openai_api_key
         self.music_service = music_service
@@ -97,7 +118,7 @@ class VoiceCommandSink(BaseSink):
     def _validate_provider_config(self) -> None:
         if not self.zhipu_api_key and self.whisper_provider == 'zhipu':
             logger.warning("ZHIPU_API_KEY not set. GLM-ASR-2512 voice transcription unavailable.")
-        if self.whisper_provider == 'openai' and whisper is None:
+        if self.whisper_provider == 'openai' and not self.whisper_registry.available:
             logger.warning("openai-whisper package not installed. Whisper transcription unavailable.")
         if self.whisper_provider == 'openai-api' and not self.openai_api_key:
             logger.warning("OPENAI_API_KEY not set. OpenAI Whisper API transcription unavailable.")
@@ -105,6 +126,8 @@ class VoiceCommandSink(BaseSink):
             logger.info("OpenAI Whisper API provider enabled (whisper-1)")
         if self.whisper_provider == 'sidecar':
             logger.info(f"Whisper sidecar provider enabled, API URL: {self.whisper_api_url}")
+        if self.upload_format != FORMAT_WAV:
+            logger.info(f"Uploading voice audio to {self.whisper_provider} as {self.upload_format}")
 
     def wants_opus(self) -> bool:
         return False
@@ -116,10 +139,14 @@ class VoiceCommandSink(BaseSink):
             self._start_health_monitor()
         try:
             if hasattr(data, 'pcm') and data.pcm:
-                if user.id not in self.audio_buffers:
-                    self.audio_buffers[user.id] = deque(maxlen=AUDIO_BUFFER_MAXLEN)
-                self.audio_buffers[user.id].append(data.pcm)
+                segmenter = self.audio_buffers.get(user.id)
+                if segmenter is None:
+                    segmenter = UtteranceSegmenter.from_env(create_vad(self.vad_backend))
+                    self.audio_buffers[user.id] = segmenter
+                utterance = segmenter.push(data.pcm)
                 self.last_audio_timestamps[user.id] = time.time()
+                if utterance:
+                    self._schedule(self._enqueue_utterance(user, utterance))
         except OpusError as e:
             logger.error(f"OpusError in write() for user {user.id if user else None}: {e}")
             loop = None
@@ -145,6 +172,10 @@ class VoiceCommandSink(BaseSink):
         def on_voice_member_speaking_start(self, member: discord.Member) -> None:
             self.speaking_users.add(member.id)
 
+        @voice_recv.AudioSink.listener()
+        def on_voice_member_disconnect(self, member: discord.Member, ssrc: Optional[int]) -> None:
+            self.handle_member_disconnect(member)
+
         @voice_recv.AudioSink.listener()
         def on_voice_member_speaking_stop(self, member: discord.Member) -> None:
             if member.id not in self.speaking_users:
@@ -152,22 +183,69 @@ class VoiceCommandSink(BaseSink):
             self.speaking_users.remove(member.id)
             if not hasattr(self, 'music_bot_ref'):
                 return
-            music_bot = self.music_bot_ref
-            loop = music_bot.main_loop or getattr(self.bot, 'loop', None)
-            if loop and loop.is_running():
-                asyncio.run_coroutine_threadsafe(self.process_speech(member), loop)
-            else:
-                logger.error("No running event loop available to process speech")
+            self._schedule(self.process_speech(member))
+
+    def handle_member_disconnect(self, member: discord.Member) -> None:
+        self.speaking_users.discard(member.id)
+        # Called from the voice_recv router thread; the segmenters and the
+        # transcription scheduler belong to the event loop
+        loop = self._event_loop()
+        if loop is not None:
+            loop.call_soon_threadsafe(self.evict_user, member.id)
+
+    def _event_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        music_bot = getattr(self, 'music_bot_ref', None)
+        loop = (music_bot.main_loop if music_bot else None) or getattr(self.bot, 'loop', None)
+        if isinstance(loop, asyncio.AbstractEventLoop) and loop.is_running():
+            return loop
+        return None
+
+    def _schedule(self, coro) -> None:
+        loop = self._event_loop()
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(coro, loop)
+        else:
+            coro.close()
+            logger.error("No running event loop available to process speech")
 
     async def process_speech(self, member: discord.Member) -> None:
-        if member.id not in self.audio_buffers:
+        segmenter = self.audio_buffers.get(member.id)
+        if segmenter is None:
             return
-        audio_chunks = list(self.audio_buffers[member.id])
-        self.audio_buffers[member.id].clear()
-        if len(audio_chunks) < MIN_AUDIO_CHUNKS:
+        utterance = segmenter.flush()
+        if utterance:
+            await self._enqueue_utterance(member, utterance)
+
+    async def _enqueue_utterance(self, member: discord.Member, utterance: PcmBuffer) -> None:
+        audio_data = await self._prepare_utterance(member, utterance)
+        if audio_data is None:
+            return
+        # Gate before queueing so noise without the wake word never holds a transcription slot
+        if not await self._admit_utterance(member, audio_data):
             return
+        ran = await self.transcription_scheduler.submit(
+            member.id,
+            lambda: self._transcribe_utterance(member, audio_data),
+            priority=self.listening_mode.get(member.id, False)
+        )
+        if not ran:
+            logger.warning(f"Dropped speech from {member.display_name}, transcription queue is backed up")
+
+    async def _prepare_utterance(self, member: discord.Member, utterance: PcmBuffer) -> Optional[io.BytesIO]:
+        try:
+            if utterance.frames < MIN_AUDIO_CHUNKS:
+                return None
+            with utterance.view() as pcm:
+                return await asyncio.to_thread(self._combine_audio_chunks, pcm)
+        except Exception as e:
+            logger.error(f"Error preparing speech from {member.display_name}: {e}")
+            return None
+        finally:
+            # The WAV copy is independent of the buffer, so it can be reused while we wait and transcribe
+            utterance.release()
+
+    async def _transcribe_utterance(self, member: discord.Member, audio_data: io.BytesIO) -> None:
         try:
-            audio_data = self._combine_audio_chunks(audio_chunks)
             text = await self._transcribe_audio(audio_data)
             if not text or not text.strip():
                 return
@@ -176,6 +254,23 @@ class VoiceCommandSink(BaseSink):
         except Exception as e:
             logger.error(f"Error processing speech from {member.display_name}: {e}")
 
+    def _spot_wake_word(self, user_id: int, wav_bytes: bytes, listening: bool) -> bool:
+        samples = wav_to_samples(wav_bytes, SPOTTER_SAMPLE_RATE) if self.wake_word_gate.enabled else None
+        admitted, _ = self.wake_word_gate.admit(user_id, samples, listening)
+        return admitted
+
+    async def _admit_utterance(self, member: discord.Member, audio_data: io.BytesIO) -> bool:
+        try:
+            admitted = await asyncio.to_thread(
+                self._spot_wake_word, member.id, audio_data.getvalue(), self.listening_mode.get(member.id, False)
+            )
+        except Exception as e:
+            logger.error(f"Error spotting wake word for {member.display_name}: {e}")
+            return False
+        if not admitted:
+            logger.debug(f"Skipping transcription for {member.display_name}, no wake word heard")
+        return admitted
+
     async def _route_speech(self, member: discord.Member, text: str) -> None:
         text_lower = text.lower().strip()
         is_listening = self.listening_mode.get(member.id, False)
@@ -196,39 +291,38 @@ class VoiceCommandSink(BaseSink):
         else:
             await self._handle_voice_command(member, text.strip())
 
-    def _combine_audio_chunks(self, chunks: List[bytes]) -> io.BytesIO:
-        combined = b''.join(chunks)
-        try:
-            import audioop
-            mono_audio = audioop.tomono(combined, 2, 1.0, 1.0)
-        except (ImportError, AttributeError):
-            stereo_samples = struct.unpack(f'<{len(combined)//2}h', combined)
-            mono_samples = [(stereo_samples[i] + stereo_samples[i + 1]) // 2
-                          for i in range(0, len(stereo_samples) - 1, 2)]
-            mono_audio = struct.pack(f'<{len(mono_samples)}h', *mono_samples)
-        wav_buffer = io.BytesIO()
-        with wave.open(wav_buffer, 'wb') as wav_file:
-            wav_file.setnchannels(AUDIO_CHANNELS)
-            wav_file.setsampwidth(AUDIO_SAMPLE_WIDTH)
-            wav_file.setframerate(AUDIO_SAMPLE_RATE)
-            wav_file.writeframes(mono_audio)
-        wav_buffer.seek(0)
-        return wav_buffer
-
-    def _load_whisper_model(self) -> Optional[Any]:
-        if self.whisper_model is not None:
-            return self.whisper_model
-        if whisper is None:
-            logger.error("openai-whisper package not available")
-            return None
-        try:
-            logger.info("Loading Whisper model (medium) for Portuguese transcription...")
-            self.whisper_model = whisper.load_model("medium")
-            logger.info("Whisper model loaded successfully")
-            return self.whisper_model
-        except Exception as e:
-            logger.error(f"Failed to load Whisper model: {e}")
-            return None
+    def segmentation_stats(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for segmenter in list(self.audio_buffers.values()):
+            for name, value in segmenter.snapshot().items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def voice_stats(self) -> Dict[str, Any]:
+        return {
+            'wake_word': self.wake_word_gate.snapshot(),
+            'segmentation': self.segmentation_stats(),
+            'transcription_queue': self.transcription_scheduler.snapshot(),
+        }
+
+    def evict_user(self, user_id: int) -> None:
+        self.wake_word_gate.forget(user_id)
+        self.transcription_scheduler.drop_user(user_id)
+        self.last_audio_timestamps.pop(user_id, None)
+        segmenter = self.audio_buffers.pop(user_id, None)
+        if segmenter is not None:
+            segmenter.clear()
+
+    def _evict_idle_buffers(self, now: float) -> None:
+        for user_id, segmenter in list(self.audio_buffers.items()):
+            if segmenter.active:
+                continue
+            if now - self.last_audio_timestamps.get(user_id, 0) > VOICE_BUFFER_IDLE_SECONDS:
+                self.evict_user(user_id)
+
+    def _combine_audio_chunks(self, chunks: Any) -> io.BytesIO:
+        combined = chunks if isinstance(chunks, (bytes, bytearray, memoryview)) else b''.join(chunks)
+        return self.audio_prep.to_wav(combined, AUDIO_SAMPLE_RATE)
 
     async def _transcribe_audio(self, audio_data: io.BytesIO) -> Optional[str]:
         provider_map: Dict[str, Callable[[io.BytesIO], Any]] = {
@@ -247,66 +341,55 @@ class VoiceCommandSink(BaseSink):
             logger.error("OPENAI_API_KEY not set for OpenAI Whisper API")
             return None
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=self.openai_api_key)
-            audio_data.seek(0)
-            audio_bytes = audio_data.read()
-            tmp_file_path = None
-            try:
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                    tmp_file.write(audio_bytes)
-                    tmp_file_path = tmp_file.name
-                with open(tmp_file_path, 'rb') as audio_file:
-                    result = await asyncio.to_thread(
-                        client.audio.transcriptions.create,
-                        model="whisper-1",
-                        file=audio_file,
-                        language="pt",
-                        prompt="Transcreva o áudio em português de forma clara, mantendo comandos e instruções conforme ouvidos. Você é o Tangerina, um assistente virtual de música brasileiro. Seus comandos são sempre relacionados a música, exemplo: toca a música 'Bohemian Rhapsody', para a música, pula a música, pausa a música, continua a música, etc."
-                    )
-                text = result.text.strip() if hasattr(result, 'text') else ''
-                return text if text else None
-            finally:
-                self._cleanup_temp_file(tmp_file_path)
+            client = self.transcription_clients.openai(self.openai_api_key)
+            upload = await self._encode_upload(audio_data)
+            with self.transcription_clients.track(PROVIDER_OPENAI_API):
+                result = await client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=(upload.filename, upload.data, upload.content_type),
+                    language="pt",
+                    prompt="Transcreva o áudio em português de forma clara, mantendo comandos e instruções conforme ouvidos. Você é o Tangerina, um assistente virtual de música brasileiro. Seus comandos são sempre relacionados a música, exemplo: toca a música 'Bohemian Rhapsody', para a música, pula a música, pausa a música, continua a música, etc."
+                )
+            text = result.text.strip() if hasattr(result, 'text') else ''
+            return text if text else None
         except Exception as e:
             logger.error(f"OpenAI Whisper API transcription error: {e}")
             return None
 
     async def _transcribe_openai_local(self, audio_data: io.BytesIO) -> Optional[str]:
-        if whisper is None:
+        if not self.whisper_registry.available:
             logger.error("openai-whisper package not installed")
             return None
-        model = self._load_whisper_model()
-        if model is None:
-            return None
-        audio_data.seek(0)
-        tmp_file_path = None
         try:
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                tmp_file.write(audio_data.read())
-                tmp_file_path = tmp_file.name
-            result = await asyncio.to_thread(model.transcribe, tmp_file_path, language="pt")
-            text = result.get('text', '').strip()
+            audio_data.seek(0)
+            samples = await asyncio.to_thread(wav_to_samples, audio_data.read(), WHISPER_SAMPLE_RATE)
+            text = await self.whisper_registry.transcribe(samples)
             return text if text else None
+        except WhisperQueueFull as e:
+            logger.warning(f"Dropping utterance, local Whisper is busy: {e}")
+            return None
         except Exception as e:
             logger.error(f"Whisper transcription error: {e}")
             return None
-        finally:
-            self._cleanup_temp_file(tmp_file_path)
 
-    async def _transcribe_sidecar(self, audio_data: io.BytesIO) -> Optional[str]:
+    async def _encode_upload(self, audio_data: io.BytesIO) -> EncodedAudio:
         audio_data.seek(0)
-        audio_bytes = audio_data.read()
+        return await asyncio.to_thread(encode_wav, audio_data.read(), self.upload_format)
+
+    async def _transcribe_sidecar(self, audio_data: io.BytesIO) -> Optional[str]:
+        upload = await self._encode_upload(audio_data)
         url = f"{self.whisper_api_url.rstrip('/')}/transcribe"
         data = aiohttp.FormData()
-        data.add_field('file', audio_bytes, filename='audio.wav', content_type='audio/wav')
+        data.add_field('file', upload.data, filename=upload.filename, content_type=upload.content_type)
         try:
-            async with aiohttp.ClientSession() as session:
+            session = self.transcription_clients.session(PROVIDER_SIDECAR)
+            with self.transcription_clients.track(PROVIDER_SIDECAR) as call:
                 async with session.post(url, data=data, timeout=aiohttp.ClientTimeout(total=TRANSCRIPTION_TIMEOUT)) as response:
                     if response.status == 200:
                         result = await response.json()
                         text = result.get('text', '').strip()
                         return text if text else None
+                    call.failed()
                     error_text = await response.text()
                     logger.error(f"Whisper sidecar transcription error: HTTP {response.status} - {error_text}")
                     return None
@@ -320,21 +403,22 @@ class VoiceCommandSink(BaseSink):
     async def _transcribe_zhipu(self, audio_data: io.BytesIO) -> Optional[str]:
         if not self.zhipu_api_key:
             return None
-        audio_data.seek(0)
-        audio_bytes = audio_data.read()
+        upload = await self._encode_upload(audio_data)
         url = "https://api.z.ai/api/paas/v4/audio/transcriptions"
         headers = {"Authorization": f"Bearer {self.zhipu_api_key}"}
         data = aiohttp.FormData()
         data.add_field('model', 'glm-asr-2512')
         data.add_field('stream', 'false')
-        data.add_field('file', audio_bytes, filename='audio.wav', content_type='audio/wav')
+        data.add_field('file', upload.data, filename=upload.filename, content_type=upload.content_type)
         try:
-            async with aiohttp.ClientSession() as session:
+            session = self.transcription_clients.session(PROVIDER_ZHIPU)
+            with self.transcription_clients.track(PROVIDER_ZHIPU) as call:
                 async with session.post(url, headers=headers, data=data, timeout=aiohttp.ClientTimeout(total=TRANSCRIPTION_TIMEOUT)) as response:
                     if response.status == 200:
                         result = await response.json()
                         text = result.get('text', '')
                         return text if text else None
+                    call.failed()
                     error_text = await response.text()
                     logger.error(f"GLM-ASR-2512 transcription error: HTTP {response.status} - {error_text}")
                     return None
@@ -345,13 +429,6 @@ class VoiceCommandSink(BaseSink):
             logger.error(f"GLM-ASR-2512 transcription error: {e}")
             return None
 
-    def _cleanup_temp_file(self, file_path: Optional[str]) -> None:
-        if file_path:
-            try:
-                os.unlink(file_path)
-            except Exception:
-                pass
-
     def _get_text_channel(self) -> Optional[discord.TextChannel]:
         guild = self.bot.get_guild(self.guild_id)
         if not guild:
@@ -496,7 +573,7 @@ class VoiceCommandSink(BaseSink):
     async def _generate_chatbot_response(self, member: discord.Member, text: str) -> Optional[str]:
         if not self.chatbot.memory_manager:
             return await self.chatbot.generate_response(text)
-        retrieved_memories = await self.chatbot.memory_manager.retrieve_context(
+        retrieved_memories = await self.chatbot.memory_manager.retrieve_for_message(
             text, self.guild_id, None, member.id
         )
         if not isinstance(retrieved_memories, dict):
@@ -553,6 +630,7 @@ class VoiceCommandSink(BaseSink):
                 if not self._voice_client or not self._voice_client.is_connected():
                     continue
                 current_time = time.time()
+                self._evict_idle_buffers(current_time)
                 if self.last_audio_timestamps:
                     last_audio_time = max(self.last_audio_timestamps.values())
                     time_since_last_audio = current_time - last_audio_time
@@ -612,6 +690,9 @@ class VoiceCommandSink(BaseSink):
                 self._reconnection_task.cancel()
             except Exception as e:
                 logger.warning(f"Error canceling reconnection task in cleanup: {e}")
+        self.transcription_scheduler.close()
+        for segmenter in list(self.audio_buffers.values()):
+            segmenter.clear()
         self.audio_buffers.clear()
         self.speaking_users.clear()
         for task in list(self.listening_tasks.values()):
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from features.voice.audio_prep import to_pcm16
+
+logger = logging.getLogger(__name__)
+
+SPOTTER_SAMPLE_RATE = 16000
+ADMIT_UNGATED = 'ungated'
+ADMIT_LISTENING = 'listening'
+ADMIT_FOLLOWUP = 'followup'
+ADMIT_WAKE_WORD = 'wake_word'
+SKIPPED = 'skipped'
+
+
+class VoskWakeWordSpotter:
+    """Keyword spotter on a small Vosk model restricted to a grammar of the wake word plus ``[unk]``.
+
+    Constraining the decoder to one phrase keeps it far cheaper than full
+    transcription, and the word confidence filters out near misses.
+    """
+
+    name = 'vosk'
+
+    def __init__(self, model_path: str, wake_word: str, min_confidence: float = 0.6):
+        import vosk
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self._model = vosk.Model(model_path)
+        self.wake_word = wake_word.lower()
+        self.min_confidence = min_confidence
+        self._grammar = json.dumps([self.wake_word, '[unk]'])
+
+    def detect(self, samples: np.ndarray) -> bool:
+        """Whether 16 kHz float32 mono ``samples`` contain the wake word."""
+        recognizer = self._vosk.KaldiRecognizer(self._model, SPOTTER_SAMPLE_RATE, self._grammar)
+        recognizer.SetWords(True)
+        recognizer.AcceptWaveform(to_pcm16(samples))
+        words = json.loads(recognizer.FinalResult()).get('result', [])
+        return any(word.get('word') in self.wake_word.split() and word.get('conf', 0.0) >= self.min_confidence for word in words)
+
+
+_spotter: Optional[VoskWakeWordSpotter] = None
+_spotter_loaded = False
+_spotter_lock = threading.Lock()
+
+
+def get_wake_word_spotter(wake_word: str) -> Optional[VoskWakeWordSpotter]:
+    """Process-wide spotter, or None when ``VOICE_WAKE_WORD_MODEL_PATH`` is unset or vosk is missing."""
+    global _spotter, _spotter_loaded
+    with _spotter_lock:
+        if _spotter_loaded:
+            return _spotter
+        _spotter_loaded = True
+        model_path = os.getenv('VOICE_WAKE_WORD_MODEL_PATH')
+        if not model_path:
+            return None
+        try:
+            _spotter = VoskWakeWordSpotter(
+                model_path, wake_word, min_confidence=float(os.getenv('VOICE_WAKE_WORD_MIN_CONFIDENCE', '0.6'))
+            )
+            logger.info(f"Wake word spotting enabled for '{wake_word}', only matching utterances are transcribed")
+        except ImportError:
+            logger.warning("vosk package not installed, every utterance will be transcribed")
+        except Exception as e:
+            logger.error(f"Failed to load wake word model from {model_path}: {e}")
+        return _spotter
+
+
+class WakeWordGate:
+    """Decides per utterance whether it is worth a full transcription.
+
+    Utterances pass when the user is in listening mode, when they follow a
+    detected wake word within ``followup_seconds`` (so "tangerina" and the
+    command can be separate utterances), or when the spotter hears the wake
+    word. Without a spotter every utterance passes. ``admit`` runs the spotter
+    and is meant to be called off the event loop, so state is guarded by a lock.
+    """
+
+    def __init__(self, spotter=None, followup_seconds: float = 5.0):
+        self.spotter = spotter
+        self.followup_seconds = followup_seconds
+        self._followups: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.spotter is not None
+
+    def admit(self, user_id: int, samples: Optional[np.ndarray], listening: bool = False) -> Tuple[bool, str]:
+        reason = self._decide(user_id, samples, listening)
+        with self._lock:
+            self.counts[reason] = self.counts.get(reason, 0) + 1
+        return reason != SKIPPED, reason
+
+    def _decide(self, user_id: int, samples: Optional[np.ndarray], listening: bool) -> str:
+        if self.spotter is None:
+            return ADMIT_UNGATED
+        if listening:
+            return ADMIT_LISTENING
+        with self._lock:
+            if self._followups.get(user_id, 0.0) > time.monotonic():
+                return ADMIT_FOLLOWUP
+            self._followups.pop(user_id, None)
+        if samples is not None and samples.size and self.spotter.detect(samples):
+            with self._lock:
+                self._followups[user_id] = time.monotonic() + self.followup_seconds
+            return ADMIT_WAKE_WORD
+        return SKIPPED
+
+    def forget(self, user_id: int) -> None:
+        with self._lock:
+            self._followups.pop(user_id, None)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            counts = dict(self.counts)
+        skipped = counts.get(SKIPPED, 0)
+        return {
+            'enabled': self.enabled,
+            'transcribed': sum(counts.values()) - skipped,
+            'skipped': skipped,
+            'by_reason': counts,
+        }
@@ -0,0 +1,172 @@
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from chatbot.metrics import LatencyStats
+
+try:
+    import whisper
+except ImportError:
+    whisper = None
+
+logger = logging.getLogger(__name__)
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+class WhisperQueueFull(Exception):
+    pass
+
+
+class WhisperRegistry:
+    """Local Whisper models shared by every guild's voice sink.
+
+    Inference runs on a small dedicated thread pool (``workers``) so concurrent
+    utterances queue instead of each loading or running their own model. The
+    decoder installs kv-cache hooks on the model for every call, so a model is
+    never used by two threads at once: each worker checks one out, and extra
+    copies are only loaded when ``workers`` > 1 and they are busy. At most
+    ``max_pending`` utterances wait or run at once; beyond that ``transcribe``
+    raises ``WhisperQueueFull`` so a burst of speakers cannot build an unbounded
+    backlog of stale commands.
+    """
+
+    def __init__(self, model_name: str = 'medium', workers: int = 1, max_pending: int = 4, language: Optional[str] = 'pt'):
+        self.model_name = model_name
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.language = language
+        self._models: List[Any] = []
+        self._idle: 'queue.Queue[Any]' = queue.Queue()
+        self._load_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self.inference = LatencyStats()
+        self.stats: Dict[str, int] = {'completed': 0, 'failed': 0, 'rejected': 0}
+
+    @classmethod
+    def from_env(cls) -> 'WhisperRegistry':
+        return cls(
+            model_name=os.getenv('WHISPER_LOCAL_MODEL', 'medium'),
+            workers=int(os.getenv('WHISPER_LOCAL_WORKERS', '1')),
+            max_pending=int(os.getenv('WHISPER_LOCAL_MAX_PENDING', '4')),
+            language=os.getenv('WHISPER_LANGUAGE', 'pt') or None,
+        )
+
+    @property
+    def available(self) -> bool:
+        return whisper is not None
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._models)
+
+    def _load_copy(self) -> Optional[Any]:
+        try:
+            logger.info(f"Loading Whisper model ({self.model_name}) for Portuguese transcription...")
+            model = whisper.load_model(self.model_name)
+            logger.info("Whisper model loaded successfully")
+        except Exception as e:
+            logger.error(f"Failed to load Whisper model: {e}")
+            return None
+        self._models.append(model)
+        return model
+
+    def load(self) -> Optional[Any]:
+        if self._models:
+            return self._models[0]
+        if whisper is None:
+            logger.error("openai-whisper package not available")
+            return None
+        with self._load_lock:
+            if not self._models:
+                model = self._load_copy()
+                if model is None:
+                    return None
+                self._idle.put(model)
+        return self._models[0]
+
+    def _checkout(self) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._load_lock:
+            if len(self._models) < self.workers:
+                model = self._load_copy()
+                if model is not None:
+                    return model
+        return self._idle.get()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._pending_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='whisper')
+            return self._executor
+
+    def _run(self, samples: np.ndarray) -> str:
+        if self.load() is None:
+            raise RuntimeError("Whisper model not available")
+        model = self._checkout()
+        try:
+            started = time.perf_counter()
+            device = getattr(model, 'device', None)
+            # fp16 is only supported on GPU, on CPU whisper warns and falls back anyway
+            fp16 = getattr(device, 'type', 'cpu') == 'cuda'
+            result = model.transcribe(samples, language=self.language, fp16=fp16)
+            self.inference.observe((time.perf_counter() - started) * 1000)
+        finally:
+            self._idle.put(model)
+        return result.get('text', '').strip()
+
+    async def transcribe(self, samples: np.ndarray) -> str:
+        """Transcribe 16 kHz float32 mono samples in the shared worker pool."""
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                self.stats['rejected'] += 1
+                raise WhisperQueueFull(f"{self._pending} utterances already waiting for Whisper")
+            self._pending += 1
+        try:
+            text = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), self._run, np.ascontiguousarray(samples, dtype=np.float32)
+            )
+            self.stats['completed'] += 1
+            return text
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'model': self.model_name,
+            'loaded': self.loaded,
+            'model_copies': len(self._models),
+            'workers': self.workers,
+            'pending': self._pending,
+            'max_pending': self.max_pending,
+            **self.stats,
+            'inference': self.inference.snapshot(),
+        }
+
+
+_registry: Optional[WhisperRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_whisper_registry() -> WhisperRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = WhisperRegistry.from_env()
+        return _registry
@@ -0,0 +1,74 @@
+import os
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PENDING = 'pending'
+WARMUP_WARMING = 'warming'
+WARMUP_READY = 'ready'
+WARMUP_FAILED = 'failed'
+WARMUP_TIMEOUT = float(os.getenv('WARMUP_TIMEOUT', '600'))
+
+
+class ModelWarmup:
+    def __init__(self, timeout: float = WARMUP_TIMEOUT):
+        self.timeout = timeout
+        self.started = False
+        self._components: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._status_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, warmup_func: Callable[[], Awaitable[Any]]) -> None:
+        self._components[name] = warmup_func
+        self._set_status(name, WARMUP_PENDING)
+
+    def _set_status(self, name: str, state: str, **details: Any) -> None:
+        with self._status_lock:
+            self._status[name] = {'state': state, **details}
+
+    def start(self) -> Optional[asyncio.Task]:
+        if self.started:
+            return self._task
+        self.started = True
+        if not self._components:
+            return None
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def run(self) -> None:
+        await asyncio.gather(*(self._warm_component(name, func) for name, func in self._components.items()))
+
+    async def _warm_component(self, name: str, warmup_func: Callable[[], Awaitable[Any]]) -> None:
+        self._set_status(name, WARMUP_WARMING)
+        started_at = time.monotonic()
+        try:
+            result = await asyncio.wait_for(warmup_func(), timeout=self.timeout)
+            duration_ms = round((time.monotonic() - started_at) * 1000, 1)
+            if result is False:
+                self._set_status(name, WARMUP_FAILED, duration_ms=duration_ms, error='warmup returned no result')
+                logger.warning(f"Warmup of {name} produced no result after {duration_ms}ms")
+                return
+            self._set_status(name, WARMUP_READY, duration_ms=duration_ms)
+            logger.info(f"Warmup of {name} completed in {duration_ms}ms")
+        except asyncio.TimeoutError:
+            self._set_status(name, WARMUP_FAILED, error=f'timed out after {self.timeout}s')
+            logger.error(f"Warmup of {name} timed out after {self.timeout}s")
+        except Exception as e:
+            duration_ms = round((time.monotonic() - started_at) * 1000, 1)
+            self._set_status(name, WARMUP_FAILED, duration_ms=duration_ms, error=str(e))
+            logger.error(f"Warmup of {name} failed: {e}")
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        with self._status_lock:
+            return {name: dict(details) for name, details in self._status.items()}
+
+    def is_ready(self) -> bool:
+        return all(details['state'] in (WARMUP_READY, WARMUP_FAILED) for details in self.status().values())
+
+    def is_degraded(self) -> bool:
+        return any(details['state'] == WARMUP_FAILED for details in self.status().values())
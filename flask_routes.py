@@ -10,7 +10,7 @@ VOLUME_MIN = 0
 VOLUME_MAX = 100
 
 
-def create_flask_app(bot, music_bot: MusicBot, music_service: MusicService, chatbot, speak_tts_func, speak_piper_tts_func):
+def create_flask_app(bot, music_bot: MusicBot, music_service: MusicService, chatbot, speak_tts_func, speak_piper_tts_func, model_warmup=None, metrics_registry=None, memory_manager=None):
     flask_app = Flask(__name__)
     bot_loop = None
 
@@ -42,7 +42,24 @@ def create_flask_app(bot, music_bot: MusicBot, music_service: MusicService, chat
 
     @flask_app.route('/health', methods=['GET'])
     def health():
-        return jsonify({'status': 'ok', 'bot_ready': bot.is_ready()}), 200
+        health_response = {'status': 'ok', 'bot_ready': bot.is_ready()}
+        if model_warmup is None:
+            return jsonify(health_response), 200
+        health_response['ready'] = model_warmup.is_ready()
+        health_response['components'] = model_warmup.status()
+        if not health_response['ready']:
+            # Still alive while models load; readiness checks read the 'ready' field instead of the status code
+            health_response['status'] = 'loading'
+            return jsonify(health_response), 200
+        if model_warmup.is_degraded():
+            health_response['status'] = 'degraded'
+        return jsonify(health_response), 200
+
+    @flask_app.route('/metrics', methods=['GET'])
+    def metrics():
+        if metrics_registry is None:
+            return jsonify({}), 200
+        return jsonify(metrics_registry.collect()), 200
 
     @flask_app.route('/enter-channel', methods=['POST'])
     @require_bot_ready
@@ -253,6 +270,89 @@ def create_flask_app(bot, music_bot: MusicBot, music_service: MusicService, chat
             logger.error(f"Chatbot error: {chatbot_error}")
             return jsonify({'error': 'Chatbot processing failed'}), 500
 
+    @flask_app.route('/memory/purge', methods=['POST'])
+    @require_bot_ready
+    def memory_purge():
+        if not memory_manager:
+            return jsonify({'error': 'Memory not configured'}), 503
+
+        request_data = request.get_json() or {}
+        scopes = [scope for scope in ('guild', 'user') if request_data.get(f'{scope}_id') is not None]
+        if len(scopes) != 1:
+            return jsonify({'error': 'exactly one of guild_id or user_id is required'}), 400
+        scope = scopes[0]
+        try:
+            scope_id = int(request_data.get(f'{scope}_id'))
+        except (ValueError, TypeError):
+            return jsonify({'error': f'{scope}_id must be an integer'}), 400
+
+        job = run_async(memory_manager.start_purge_job(scope, scope_id))
+        return jsonify(job), 202
+
+    @flask_app.route('/memory/purge/<job_id>', methods=['GET'])
+    def memory_purge_status(job_id):
+        if not memory_manager:
+            return jsonify({'error': 'Memory not configured'}), 503
+
+        job = memory_manager.get_purge_job(job_id)
+        if not job:
+            return jsonify({'error': 'Purge job not found'}), 404
+        return jsonify(job), 200
+
+    @flask_app.route('/memory/purge/<job_id>', methods=['DELETE'])
+    @require_bot_ready
+    def memory_purge_cancel(job_id):
+        if not memory_manager:
+            return jsonify({'error': 'Memory not configured'}), 503
+
+        cancelled = run_async(memory_manager.cancel_purge_job(job_id))
+        if not cancelled:
+            return jsonify({'error': 'Purge job is not running'}), 404
+        return jsonify(memory_manager.get_purge_job(job_id)), 200
+
+    @flask_app.route('/memory/reindex', methods=['POST'])
+    @require_bot_ready
+    def memory_reindex():
+        if not memory_manager:
+            return jsonify({'error': 'Memory not configured'}), 503
+
+        request_data = request.get_json() or {}
+        config = {key: request_data.get(key) for key in ('provider', 'model', 'dimensions') if request_data.get(key) is not None}
+        if 'dimensions' in config:
+            try:
+                config['dimensions'] = int(config['dimensions'])
+            except (ValueError, TypeError):
+                return jsonify({'error': 'dimensions must be an integer'}), 400
+
+        from chatbot.embedding_service import create_embedding_service
+        embedding_service = create_embedding_service(**config)
+        if embedding_service is None:
+            return jsonify({'error': 'Embedding service could not be created'}), 400
+
+        job = run_async(memory_manager.start_reindex_job(embedding_service, config))
+        return jsonify(job), 202
+
+    @flask_app.route('/memory/reindex', methods=['GET'])
+    def memory_reindex_status():
+        if not memory_manager:
+            return jsonify({'error': 'Memory not configured'}), 503
+
+        job = memory_manager.get_reindex_job()
+        if not job:
+            return jsonify({'error': 'No reindex job'}), 404
+        return jsonify(job), 200
+
+    @flask_app.route('/memory/reindex', methods=['DELETE'])
+    @require_bot_ready
+    def memory_reindex_cancel():
+        if not memory_manager:
+            return jsonify({'error': 'Memory not configured'}), 503
+
+        cancelled = run_async(memory_manager.cancel_reindex_job())
+        if not cancelled:
+            return jsonify({'error': 'Reindex job is not running'}), 404
+        return jsonify(memory_manager.get_reindex_job()), 200
+
     def set_bot_loop(loop):
         nonlocal bot_loop
         bot_loop = loop
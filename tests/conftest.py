@@ -183,6 +183,20 @@ def memory_manager(ephemeral_chromadb, mock_embedding_service):
     manager._initialized = True
     return manager
 
+@pytest.fixture
+def per_guild_memory_manager(ephemeral_chromadb, mock_embedding_service):
+    import uuid
+    from chatbot.memory_manager import MemoryManager
+    from chatbot.memory_layout import CollectionCache, LAYOUT_PER_GUILD
+    manager = MemoryManager(embedding_service=mock_embedding_service)
+    manager._client = ephemeral_chromadb
+    manager.storage_layout = LAYOUT_PER_GUILD
+    manager._collection = None
+    manager._collections = CollectionCache(ephemeral_chromadb, f"test_{uuid.uuid4().hex[:8]}")
+    manager._legacy_scan_done = True
+    manager._initialized = True
+    return manager
+
 @pytest.fixture
 def mock_embedding_service():
     service = MagicMock()
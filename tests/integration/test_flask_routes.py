@@ -1,5 +1,6 @@
 import pytest
 import json
+from unittest.mock import MagicMock, AsyncMock
 
 @pytest.mark.integration
 class TestHealthEndpoint:
@@ -23,6 +24,47 @@ class TestHealthEndpoint:
         data = json.loads(response.data)
         assert isinstance(data['bot_ready'], bool)
 
+    def _client_with_warmup(self, mock_bot, mock_music_bot, mock_music_service, model_warmup):
+        from flask_routes import create_flask_app
+        app, _ = create_flask_app(
+            mock_bot, mock_music_bot, mock_music_service, MagicMock(),
+            AsyncMock(), AsyncMock(), model_warmup
+        )
+        app.config['TESTING'] = True
+        return app.test_client()
+
+    def test_health_reports_loading_while_warming(self, mock_bot, mock_music_bot, mock_music_service):
+        from features.warmup import ModelWarmup
+        model_warmup = ModelWarmup()
+        model_warmup.register('embedding', AsyncMock(return_value=True))
+        client = self._client_with_warmup(mock_bot, mock_music_bot, mock_music_service, model_warmup)
+
+        response = client.get('/health')
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data['status'] == 'loading'
+        assert data['ready'] is False
+        assert data['components']['embedding']['state'] == 'pending'
+
+    def test_health_reports_component_readiness(self, mock_bot, mock_music_bot, mock_music_service):
+        import asyncio
+        from features.warmup import ModelWarmup
+        model_warmup = ModelWarmup()
+        model_warmup.register('embedding', AsyncMock(return_value=True))
+        model_warmup.register('piper', AsyncMock(side_effect=RuntimeError("model missing")))
+        warmup_loop = asyncio.new_event_loop()
+        warmup_loop.run_until_complete(model_warmup.run())
+        warmup_loop.close()
+        client = self._client_with_warmup(mock_bot, mock_music_bot, mock_music_service, model_warmup)
+
+        response = client.get('/health')
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data['ready'] is True
+        assert data['status'] == 'degraded'
+        assert data['components']['embedding']['state'] == 'ready'
+        assert data['components']['piper']['state'] == 'failed'
+
 
 @pytest.mark.integration
 class TestMusicVolumeEndpoint:
@@ -188,6 +230,66 @@ class TestTTSSpeakEndpoint:
         response = flask_client.post('/tts/speak', json={'guild_id': 123, 'channel_id': 456, 'text': ''})
         assert response.status_code == 400
 
+@pytest.mark.integration
+class TestMemoryPurgeEndpoint:
+    def _client_with_memory(self, mock_bot, mock_music_bot, mock_music_service, memory_manager):
+        from flask_routes import create_flask_app
+        app, set_loop = create_flask_app(
+            mock_bot, mock_music_bot, mock_music_service, MagicMock(),
+            AsyncMock(), AsyncMock(), memory_manager=memory_manager
+        )
+        set_loop(MagicMock())
+        app.config['TESTING'] = True
+        return app.test_client()
+
+    def test_memory_purge_without_memory_returns_503(self, flask_client):
+        response = flask_client.post('/memory/purge', json={'guild_id': 123})
+        assert response.status_code == 503
+
+    def test_memory_purge_requires_single_scope(self, mock_bot, mock_music_bot, mock_music_service):
+        client = self._client_with_memory(mock_bot, mock_music_bot, mock_music_service, MagicMock())
+        assert client.post('/memory/purge', json={}).status_code == 400
+        assert client.post('/memory/purge', json={'guild_id': 1, 'user_id': 2}).status_code == 400
+
+    def test_memory_purge_invalid_id_returns_400(self, mock_bot, mock_music_bot, mock_music_service):
+        client = self._client_with_memory(mock_bot, mock_music_bot, mock_music_service, MagicMock())
+        response = client.post('/memory/purge', json={'guild_id': 'abc'})
+        assert response.status_code == 400
+
+    def test_memory_purge_status_unknown_job_returns_404(self, mock_bot, mock_music_bot, mock_music_service):
+        memory_manager = MagicMock()
+        memory_manager.get_purge_job.return_value = None
+        client = self._client_with_memory(mock_bot, mock_music_bot, mock_music_service, memory_manager)
+        assert client.get('/memory/purge/guild-1').status_code == 404
+
+    def test_memory_purge_status_returns_job(self, mock_bot, mock_music_bot, mock_music_service):
+        memory_manager = MagicMock()
+        memory_manager.get_purge_job.return_value = {'job_id': 'guild-1', 'status': 'running', 'deleted': 500}
+        client = self._client_with_memory(mock_bot, mock_music_bot, mock_music_service, memory_manager)
+        response = client.get('/memory/purge/guild-1')
+        assert response.status_code == 200
+        assert json.loads(response.data)['deleted'] == 500
+
+
+    def test_memory_reindex_invalid_dimensions_returns_400(self, mock_bot, mock_music_bot, mock_music_service):
+        client = self._client_with_memory(mock_bot, mock_music_bot, mock_music_service, MagicMock())
+        response = client.post('/memory/reindex', json={'dimensions': 'many'})
+        assert response.status_code == 400
+
+    def test_memory_reindex_status_without_job_returns_404(self, mock_bot, mock_music_bot, mock_music_service):
+        memory_manager = MagicMock()
+        memory_manager.get_reindex_job.return_value = None
+        client = self._client_with_memory(mock_bot, mock_music_bot, mock_music_service, memory_manager)
+        assert client.get('/memory/reindex').status_code == 404
+
+    def test_memory_reindex_status_returns_job(self, mock_bot, mock_music_bot, mock_music_service):
+        memory_manager = MagicMock()
+        memory_manager.get_reindex_job.return_value = {'job_id': 'reindex-v2', 'status': 'running', 'copied': 1200}
+        client = self._client_with_memory(mock_bot, mock_music_bot, mock_music_service, memory_manager)
+        response = client.get('/memory/reindex')
+        assert response.status_code == 200
+        assert json.loads(response.data)['copied'] == 1200
+
 @pytest.mark.integration
 class TestErrorHandling:
     def test_invalid_json_body_returns_400(self, flask_client):
@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from chatbot.embedding_projection import EmbeddingProjection
+from chatbot.metrics import LatencyStats
+
+SYNTHETIC_LATENT_DIM = 48
+
+
+def synthetic_corpus(size: int, dim: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    latent = rng.standard_normal((size, SYNTHETIC_LATENT_DIM)).astype(np.float32)
+    mixing = rng.standard_normal((SYNTHETIC_LATENT_DIM, dim)).astype(np.float32)
+    vectors = latent @ mixing + 0.3 * rng.standard_normal((size, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def load_collection(path: str, collection_name: str, size: int) -> np.ndarray:
+    from chatbot.memory_cli import _open_store, sample_embeddings
+    store = _open_store(argparse.Namespace(
+        backend='chroma', path=path, collection=collection_name, layout=os.getenv('MEMORY_STORAGE_LAYOUT', 'single').lower(),
+        numpy_path=None, location=None,
+    ))
+    try:
+        return np.asarray(sample_embeddings(store, size), dtype=np.float32)
+    finally:
+        store.close()
+
+
+def top_k(index: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    similarities = queries @ index.T
+    top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    return top
+
+
+def evaluate(name: str, index: np.ndarray, queries: np.ndarray, truth: np.ndarray, k: int) -> dict:
+    # Stored float16 vectors are upcast once when loaded, so the conversion is reported apart from query latency
+    started = time.perf_counter()
+    searchable = np.asarray(index, dtype=np.float32)
+    upcast_ms = (time.perf_counter() - started) * 1000 if index.dtype != np.float32 else 0.0
+    latency = LatencyStats(max_samples=len(queries))
+    hits = 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        found = top_k(searchable, query[None, :], k)[0]
+        latency.observe((time.perf_counter() - started) * 1000)
+        hits += len(set(found.tolist()) & set(expected.tolist()))
+    return {
+        "variant": name,
+        "dimensions": index.shape[1],
+        "dtype": str(index.dtype),
+        "index_bytes": int(index.nbytes),
+        f"recall@{k}": round(hits / (len(queries) * k), 4),
+        "upcast_ms": round(upcast_ms, 3),
+        "query": latency.snapshot(),
+    }
+
+
+def run(corpus: np.ndarray, dims, holdout: int, k: int) -> list:
+    rng = np.random.default_rng(11)
+    order = rng.permutation(len(corpus))
+    queries, index = corpus[order[:holdout]], corpus[order[holdout:]]
+    truth = top_k(index, queries, k)
+
+    results = [
+        evaluate("full", index, queries, truth, k),
+        evaluate("full", index.astype(np.float16), queries, truth, k),
+    ]
+    for dim in dims:
+        projection = EmbeddingProjection.fit(index, dim)
+        projected_index, projected_queries = projection.project(index), projection.project(queries)
+        results.append(evaluate("pca", projected_index, projected_queries, truth, k))
+        results.append(evaluate("pca", projected_index.astype(np.float16), projected_queries, truth, k))
+        truncation = EmbeddingProjection(dim)
+        results.append(evaluate("truncate", truncation.project(index), truncation.project(queries), truth, k))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure index size, latency and recall@k of reduced embeddings")
+    parser.add_argument('--chroma-path', help="Read embeddings from this Chroma database instead of a synthetic corpus")
+    parser.add_argument('--collection', default='tangerina_memory')
+    parser.add_argument('--size', type=int, default=20000)
+    parser.add_argument('--dim', type=int, default=384, help="Dimension of the synthetic corpus")
+    parser.add_argument('--dims', type=int, nargs='+', default=[64, 128, 192])
+    parser.add_argument('--holdout', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+    if args.chroma_path:
+        corpus = load_collection(args.chroma_path, args.collection, args.size)
+    else:
+        corpus = synthetic_corpus(args.size, args.dim)
+    print(json.dumps(run(corpus, args.dims, args.holdout, args.k), indent=2))
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import chromadb
+
+from chatbot.memory_executor import ChromaExecutor
+from chatbot.memory_manager import MemoryManager
+from chatbot.metrics import EventLoopLagMonitor
+from tests.performance.fake_embedding import FakeEmbeddingService
+
+
+def build_manager(inline: bool) -> MemoryManager:
+    manager = MemoryManager(embedding_service=FakeEmbeddingService())
+    manager._executor = ChromaExecutor(inline=inline)
+    manager._client = chromadb.EphemeralClient()
+    manager._collection = manager._client.create_collection(
+        name=f"bench_{uuid.uuid4().hex[:8]}", metadata={"hnsw:space": "cosine"}
+    )
+    manager._initialized = True
+    return manager
+
+
+async def run_workload(inline: bool, operations: int, guilds: int) -> dict:
+    manager = build_manager(inline)
+    monitor = EventLoopLagMonitor(interval=0.005)
+    monitor.start()
+    started = time.perf_counter()
+    for i in range(operations):
+        guild_id = i % guilds
+        await manager.store_conversation(f"mensagem {i}", f"resposta {i}", guild_id, 1, i % 50)
+        await manager.retrieve_context(f"mensagem {i}", guild_id, 1, i % 50)
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    monitor.stop()
+    manager.close()
+    return {
+        "mode": "inline" if inline else "executor",
+        "operations": operations,
+        "elapsed_s": round(elapsed, 3),
+        "loop_lag": monitor.snapshot(),
+    }
+
+
+async def main(operations: int, guilds: int) -> None:
+    results = [await run_workload(True, operations, guilds), await run_workload(False, operations, guilds)]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure event loop blocking caused by Chroma calls")
+    parser.add_argument('--operations', type=int, default=500)
+    parser.add_argument('--guilds', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.operations, args.guilds))
@@ -0,0 +1,224 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from typing import Optional
+
+import numpy as np
+
+from chatbot.metrics import LatencyStats
+from tests.performance.fake_embedding import FakeEmbeddingService
+from tests.performance.synthetic_corpus import generate_batches, topic_centroids, topic_query
+
+RETENTION_DAYS = 30
+COMPARED_METRICS = (
+    ('store_conversation', 'ops_per_s'),
+    ('retrieve_context', 'p50_ms'),
+    ('retrieve_context', 'p95_ms'),
+    ('retrieve_context', 'p99_ms'),
+    ('retrieve_context', 'recall_at_k'),
+    ('cleanup_old_memories', 'duration_s'),
+    ('delete_guild_memories', 'duration_s'),
+    ('peak_rss_mb', None),
+)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def build_manager(backend: str, layout: str, path: str):
+    os.environ.update({
+        'MEMORY_VECTOR_STORE': backend,
+        'MEMORY_STORAGE_LAYOUT': layout,
+        'CHROMADB_PATH': os.path.join(path, 'chromadb'),
+        'MEMORY_NUMPY_PATH': os.path.join(path, 'vectors'),
+        'MEMORY_RETENTION_DAYS': str(RETENTION_DAYS),
+        'MEMORY_SIMILARITY_THRESHOLD': '0',
+    })
+    os.environ.pop('RECENT_MEMORY_DB_PATH', None)
+    from chatbot.memory_manager import MemoryManager
+    return MemoryManager(embedding_service=FakeEmbeddingService())
+
+
+async def load_corpus(manager, size: int, guilds: int, users_per_guild: int) -> tuple:
+    """Load the corpus, returning the load time and how many rows each (guild, channel, user, topic) holds."""
+    members = Counter()
+    started = time.perf_counter()
+    for batch in generate_batches(size, guilds, users_per_guild, retention_days=RETENTION_DAYS):
+        await manager._executor.write(manager._store.add, **batch)
+        members.update(
+            (metadata['guild_id'], metadata['channel_id'], metadata['user_id'], metadata['topic'])
+            for metadata in batch['metadatas']
+        )
+    return time.perf_counter() - started, members
+
+
+async def measure_store(manager, operations: int, guilds: int, users_per_guild: int) -> dict:
+    rng = random.Random(operations)
+    started = time.perf_counter()
+    for i in range(operations):
+        guild_id = rng.randrange(guilds)
+        await manager.store_conversation(
+            f"pergunta de benchmark {i}", f"resposta de benchmark {i}",
+            guild_id, guild_id * 3, guild_id * users_per_guild + rng.randrange(users_per_guild)
+        )
+    elapsed = time.perf_counter() - started
+    return {'operations': operations, 'duration_s': round(elapsed, 3), 'ops_per_s': round(operations / elapsed, 1)}
+
+
+async def measure_retrieve(manager, queries: int, members: Counter) -> dict:
+    """Time topical queries and score them against the corpus rows of the queried topic.
+
+    Each query targets a (guild, channel, user) scope that holds memories of a
+    topic, with an embedding drawn around that topic's centroid like the
+    corpus rows. Recall@k is the share of the top ``k`` results that belong to
+    the topic, out of the ``min(k, members)`` that could.
+    """
+    rng = random.Random(queries)
+    noise = np.random.default_rng(queries)
+    topics = topic_centroids()
+    targets = sorted(members)
+    k = manager.max_results
+    latency = LatencyStats(max_samples=queries)
+    recalls = []
+    for i in range(queries):
+        guild_str, channel_str, user_str, topic = rng.choice(targets)
+        text = f"consulta {i} sobre tópico {topic}"
+        manager.embedding_service.fixed[text] = topic_query(topic, noise, topics)
+        started = time.perf_counter()
+        context = await manager.retrieve_context(text, int(guild_str), int(channel_str), int(user_str), max_results=k)
+        latency.observe((time.perf_counter() - started) * 1000)
+        del manager.embedding_service.fixed[text]
+        hits = sum(1 for memory in context['semantic'][:k] if memory['metadata'].get('topic') == topic)
+        recalls.append(hits / min(k, members[(guild_str, channel_str, user_str, topic)]))
+    return {**latency.snapshot(), 'k': k, 'recall_at_k': round(sum(recalls) / len(recalls), 4) if recalls else None}
+
+
+async def measure_cleanup(manager) -> dict:
+    started = time.perf_counter()
+    deleted = await manager.cleanup_old_memories(time_budget=float('inf'))
+    return {'deleted': deleted, 'duration_s': round(time.perf_counter() - started, 3)}
+
+
+async def measure_delete_guild(manager, guild_id: int) -> dict:
+    started = time.perf_counter()
+    deleted = await manager.delete_guild_memories(guild_id)
+    return {'deleted': deleted, 'duration_s': round(time.perf_counter() - started, 3)}
+
+
+async def run_case(backend: str, layout: str, size: int, guilds: int, users_per_guild: int, operations: int, queries: int) -> dict:
+    with tempfile.TemporaryDirectory() as path:
+        manager = build_manager(backend, layout, path)
+        try:
+            load_s, members = await load_corpus(manager, size, guilds, users_per_guild)
+            result = {
+                'backend': backend,
+                'layout': layout,
+                'memories': size,
+                'guilds': guilds,
+                'users_per_guild': users_per_guild,
+                'load_s': round(load_s, 3),
+                'store_conversation': await measure_store(manager, operations, guilds, users_per_guild),
+                'retrieve_context': await measure_retrieve(manager, queries, members),
+                'cleanup_old_memories': await measure_cleanup(manager),
+                'delete_guild_memories': await measure_delete_guild(manager, 0),
+            }
+        finally:
+            manager.close()
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def run_case_in_process(*args) -> dict:
+    return asyncio.run(run_case(*args))
+
+
+def run_suite(args: argparse.Namespace) -> dict:
+    cases = [
+        (backend, args.layout, size, args.guilds, args.users_per_guild, args.operations, args.queries)
+        for size in args.sizes for backend in args.backends
+    ]
+    results = []
+    # A fresh process per case keeps peak RSS attributable to that case alone
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn'), max_tasks_per_child=1) as pool:
+        for case in cases:
+            print(f"Running {case[0]} with {case[2]} memories...", file=sys.stderr)
+            results.append(pool.submit(run_case_in_process, *case).result())
+    return {
+        'revision': git_revision(),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def _metric(result: dict, section: str, field) -> Optional[float]:
+    return result.get(section) if field is None else result.get(section, {}).get(field)
+
+
+def compare(report: dict, baseline: dict) -> list:
+    baseline_cases = {(r['backend'], r['layout'], r['memories']): r for r in baseline['results']}
+    rows = []
+    for result in report['results']:
+        previous = baseline_cases.get((result['backend'], result['layout'], result['memories']))
+        if previous is None:
+            continue
+        for section, field in COMPARED_METRICS:
+            before, after = _metric(previous, section, field), _metric(result, section, field)
+            if before is None or after is None:
+                # Reports from older revisions may lack newer metrics
+                continue
+            rows.append({
+                'case': f"{result['backend']}/{result['layout']}/{result['memories']}",
+                'metric': section if field is None else f"{section}.{field}",
+                'baseline': before,
+                'current': after,
+                'change_pct': round((after - before) / before * 100, 1) if before else None,
+            })
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the memory subsystem on synthetic conversation corpora")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000])
+    parser.add_argument('--backends', nargs='+', choices=['chroma', 'numpy'], default=['chroma', 'numpy'])
+    parser.add_argument('--layout', choices=['single', 'per_guild'], default='single')
+    parser.add_argument('--guilds', type=int, default=50)
+    parser.add_argument('--users-per-guild', type=int, default=20)
+    parser.add_argument('--operations', type=int, default=500, help="store_conversation calls to time")
+    parser.add_argument('--queries', type=int, default=1000, help="retrieve_context calls to time")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    parser.add_argument('--baseline', help="Compare against a previous JSON report")
+    args = parser.parse_args()
+
+    report = run_suite(args)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            report['comparison'] = compare(report, json.load(f))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import chromadb
+
+from chatbot.memory_layout import CollectionCache, LAYOUT_PER_GUILD, LAYOUT_SINGLE
+from chatbot.memory_manager import MemoryManager
+from chatbot.metrics import LatencyStats
+from tests.performance.fake_embedding import FakeEmbeddingService
+
+CHANNELS_PER_GUILD = 3
+USERS_PER_GUILD = 20
+
+
+def build_manager(client, layout: str) -> MemoryManager:
+    manager = MemoryManager(embedding_service=FakeEmbeddingService())
+    manager._client = client
+    name = f"bench_{uuid.uuid4().hex[:8]}"
+    manager.storage_layout = layout
+    if layout == LAYOUT_PER_GUILD:
+        manager._collection = None
+        manager._collections = CollectionCache(client, name)
+        manager._legacy_scan_done = True
+    else:
+        manager._collection = client.create_collection(name=name, metadata={"hnsw:space": "cosine"})
+    manager._initialized = True
+    return manager
+
+
+async def load_corpus(manager: MemoryManager, embedding_service: FakeEmbeddingService, size: int, guilds: int, batch: int):
+    rng = random.Random(size)
+    epoch = int(time.time())
+    for start in range(0, size, batch):
+        rows = {}
+        for i in range(start, min(start + batch, size)):
+            guild_id = rng.randrange(guilds)
+            document = f"User: mensagem {i} Bot: resposta {i}"
+            metadata = {
+                "guild_id": str(guild_id),
+                "channel_id": str(rng.randrange(CHANNELS_PER_GUILD)),
+                "user_id": str(rng.randrange(USERS_PER_GUILD)),
+                "timestamp_epoch": epoch,
+                "message_type": "conversation",
+            }
+            group = rows.setdefault(guild_id, {'ids': [], 'documents': [], 'metadatas': []})
+            group['ids'].append(f"doc-{i}")
+            group['documents'].append(document)
+            group['metadatas'].append(metadata)
+        for group in rows.values():
+            group['embeddings'] = await embedding_service.embed_batch(group['documents'])
+            manager._store.add(**group)
+
+
+async def measure_queries(manager: MemoryManager, guilds: int, queries: int) -> dict:
+    rng = random.Random(queries)
+    latency = LatencyStats(max_samples=queries)
+    for i in range(queries):
+        guild_id = rng.randrange(guilds)
+        started = time.perf_counter()
+        await manager.retrieve_context(
+            f"mensagem {rng.randrange(100000)}", guild_id, rng.randrange(CHANNELS_PER_GUILD), rng.randrange(USERS_PER_GUILD)
+        )
+        latency.observe((time.perf_counter() - started) * 1000)
+    return latency.snapshot()
+
+
+async def run(sizes, guilds: int, queries: int, batch: int) -> list:
+    embedding_service = FakeEmbeddingService()
+    results = []
+    for size in sizes:
+        for layout in (LAYOUT_SINGLE, LAYOUT_PER_GUILD):
+            client = chromadb.EphemeralClient()
+            manager = build_manager(client, layout)
+            started = time.perf_counter()
+            await load_corpus(manager, embedding_service, size, guilds, batch)
+            load_s = time.perf_counter() - started
+            query_latency = await measure_queries(manager, guilds, queries)
+            results.append({
+                "layout": layout,
+                "corpus_size": size,
+                "guilds": guilds,
+                "load_s": round(load_s, 3),
+                "retrieve_context": query_latency,
+            })
+            for collection in manager._store.partitions():
+                client.delete_collection(collection.name)
+            manager.close()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare query latency of the single and per-guild storage layouts")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--guilds', type=int, default=100)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.sizes, args.guilds, args.queries, args.batch)), indent=2))
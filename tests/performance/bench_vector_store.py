@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+import uuid
+
+import chromadb
+
+from chatbot.memory_manager import MemoryManager
+from chatbot.metrics import LatencyStats
+from chatbot.numpy_vector_store import NumpyVectorStore
+from chatbot.vector_store import ChromaVectorStore
+from tests.performance.fake_embedding import FakeEmbeddingService
+
+
+def build_manager(backend: str, path: str) -> MemoryManager:
+    manager = MemoryManager(embedding_service=FakeEmbeddingService())
+    if backend == 'numpy':
+        manager._store = NumpyVectorStore(path)
+    else:
+        client = chromadb.EphemeralClient()
+        manager._store = ChromaVectorStore(collection=client.create_collection(
+            name=f"bench_{uuid.uuid4().hex[:8]}", metadata={"hnsw:space": "cosine"}
+        ))
+    manager._initialized = True
+    return manager
+
+
+async def run_backend(backend: str, scopes: int, per_scope: int, queries: int) -> dict:
+    embedding_service = FakeEmbeddingService()
+    with tempfile.TemporaryDirectory() as path:
+        manager = build_manager(backend, path)
+        epoch = int(time.time())
+        started = time.perf_counter()
+        for scope in range(scopes):
+            documents = [f"User: mensagem {scope}-{i} Bot: resposta {i}" for i in range(per_scope)]
+            manager._store.add(
+                ids=[f"{scope}-{i}" for i in range(per_scope)],
+                embeddings=await embedding_service.embed_batch(documents),
+                documents=documents,
+                metadatas=[{
+                    "guild_id": str(scope % 10),
+                    "channel_id": str(scope),
+                    "user_id": str(scope),
+                    "timestamp_epoch": epoch,
+                    "message_type": "conversation",
+                } for _ in documents]
+            )
+        load_s = time.perf_counter() - started
+
+        rng = random.Random(queries)
+        latency = LatencyStats(max_samples=queries)
+        for _ in range(queries):
+            scope = rng.randrange(scopes)
+            started = time.perf_counter()
+            await manager.retrieve_context(f"mensagem {rng.randrange(per_scope)}", scope % 10, scope, scope)
+            latency.observe((time.perf_counter() - started) * 1000)
+        manager.close()
+    return {
+        "backend": backend,
+        "scopes": scopes,
+        "memories_per_scope": per_scope,
+        "load_s": round(load_s, 3),
+        "retrieve_context": latency.snapshot(),
+    }
+
+
+async def main(scopes: int, per_scope: int, queries: int) -> None:
+    results = [await run_backend(backend, scopes, per_scope, queries) for backend in ('chroma', 'numpy')]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare retrieve_context latency of the Chroma and NumPy vector stores")
+    parser.add_argument('--scopes', type=int, default=50)
+    parser.add_argument('--per-scope', type=int, default=300)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.scopes, args.per_scope, args.queries))
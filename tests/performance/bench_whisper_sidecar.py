@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import io
+import json
+import time
+import wave
+
+import aiohttp
+import numpy as np
+
+from chatbot.metrics import LatencyStats
+from features.voice.audio_codec import encode_wav
+
+SAMPLE_RATE = 16000
+
+
+def load_wav(path: str) -> bytes:
+    with open(path, 'rb') as audio_file:
+        return audio_file.read()
+
+
+def synthetic_utterance(seconds: float) -> bytes:
+    """Speech-like test signal: a gliding, amplitude-modulated harmonic tone with pauses."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(harmonic * phase) / harmonic for harmonic in range(1, 6))
+    envelope = np.clip(np.sin(2 * np.pi * 2.5 * t), 0, None)
+    samples = (voiced * envelope * 6000).astype('<i2')
+    output = io.BytesIO()
+    with wave.open(output, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes(samples.tobytes())
+    return output.getvalue()
+
+
+def wav_seconds(wav_bytes: bytes) -> float:
+    with wave.open(io.BytesIO(wav_bytes), 'rb') as wav_file:
+        return wav_file.getnframes() / wav_file.getframerate()
+
+
+async def transcribe(session: aiohttp.ClientSession, url: str, upload) -> float:
+    data = aiohttp.FormData()
+    data.add_field('file', upload.data, filename=upload.filename, content_type=upload.content_type)
+    started = time.perf_counter()
+    async with session.post(url, data=data) as response:
+        await response.read()
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+    return time.perf_counter() - started
+
+
+async def run_level(url: str, upload, duration: float, concurrency: int, requests: int) -> dict:
+    latency = LatencyStats()
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(session):
+        nonlocal errors
+        async with semaphore:
+            try:
+                latency.observe(await transcribe(session, url, upload) * 1000)
+            except Exception:
+                errors += 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=300)) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(session) for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    stats = latency.snapshot()
+    completed = stats['count']
+    return {
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': errors,
+        'elapsed_s': round(elapsed, 3),
+        # Wall time per second of audio across all streams; below 1 keeps up with live speech
+        'aggregate_rtf': round(elapsed / (completed * duration), 4) if completed else None,
+        'per_request_rtf_p50': round(stats['p50_ms'] / 1000 / duration, 4),
+        'per_request_rtf_p95': round(stats['p95_ms'] / 1000 / duration, 4),
+        'latency': stats,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    wav_bytes = load_wav(args.audio) if args.audio else synthetic_utterance(args.seconds)
+    upload = encode_wav(wav_bytes, args.format)
+    duration = wav_seconds(wav_bytes)
+    url = f"{args.url.rstrip('/')}/transcribe"
+    async with aiohttp.ClientSession() as session:
+        # One untimed request so model warmup or a cold connection does not skew the first level
+        await transcribe(session, url, upload)
+    results = []
+    for concurrency in args.concurrency:
+        results.append(await run_level(url, upload, duration, concurrency, max(concurrency, args.requests_per_level)))
+    print(json.dumps({
+        'audio_seconds': round(duration, 3),
+        'format': upload.format,
+        'upload_bytes': len(upload.data),
+        'levels': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load-test the whisper sidecar and report real-time factor per concurrency")
+    parser.add_argument('--url', default='http://localhost:5002')
+    parser.add_argument('--audio', help="16-bit WAV to send; defaults to a synthetic speech-like signal")
+    parser.add_argument('--seconds', type=float, default=4.0, help="Length of the synthetic utterance")
+    parser.add_argument('--format', choices=['wav', 'flac', 'opus'], default='wav')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--requests-per-level', type=int, default=32)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,31 @@
+import hashlib
+from typing import Dict, List
+
+import numpy as np
+
+from chatbot.embedding_service import EmbeddingService
+
+FAKE_EMBEDDING_DIM = 384
+
+
+class FakeEmbeddingService(EmbeddingService):
+    def __init__(self, dim: int = FAKE_EMBEDDING_DIM):
+        self.dim = dim
+        # Texts with a known embedding, e.g. benchmark queries built from corpus topics
+        self.fixed: Dict[str, List[float]] = {}
+
+    def _vector(self, text: str) -> List[float]:
+        if text in self.fixed:
+            return self.fixed[text]
+        seed = int.from_bytes(hashlib.sha1(text.encode('utf-8')).digest()[:8], 'little')
+        vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        vector /= np.linalg.norm(vector)
+        return vector.tolist()
+
+    async def embed_text(self, text: str) -> List[float]:
+        if not text or not text.strip():
+            return []
+        return self._vector(text)
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text) if text and text.strip() else [] for text in texts]
@@ -0,0 +1,69 @@
+import time
+from typing import Dict, Iterator
+
+import numpy as np
+
+from tests.performance.fake_embedding import FAKE_EMBEDDING_DIM
+
+TOPICS = 64
+CHANNELS_PER_GUILD = 3
+TOPIC_NOISE = 0.5
+
+
+def topic_centroids(dim: int = FAKE_EMBEDDING_DIM, seed: int = 42) -> np.ndarray:
+    """The topic centroids ``generate_batches`` draws its memories around for the same ``seed``."""
+    return np.random.default_rng(seed).standard_normal((TOPICS, dim)).astype(np.float32)
+
+
+def topic_query(topic: int, rng: np.random.Generator, topics: np.ndarray) -> list:
+    """A query embedding for ``topic``, noised like the corpus rows drawn around its centroid."""
+    vector = topics[topic] + TOPIC_NOISE * rng.standard_normal(topics.shape[1]).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def generate_batches(
+    size: int,
+    guilds: int,
+    users_per_guild: int,
+    batch_size: int = 1000,
+    dim: int = FAKE_EMBEDDING_DIM,
+    expired_fraction: float = 0.2,
+    retention_days: int = 30,
+    seed: int = 42,
+) -> Iterator[Dict[str, list]]:
+    """Yield deterministic store.add batches of synthetic conversation memories.
+
+    Embeddings are drawn around a fixed set of topic centroids so similarity
+    search has realistic structure, and ``expired_fraction`` of the rows are
+    dated past ``retention_days`` so cleanup has work to do. Each row records
+    its topic in ``topic`` metadata as retrieval ground truth.
+    """
+    rng = np.random.default_rng(seed)
+    # Same draw as topic_centroids(dim, seed), keeping the rest of the stream unchanged
+    topics = rng.standard_normal((TOPICS, dim)).astype(np.float32)
+    now = int(time.time())
+    expired_epoch = now - (retention_days + 1) * 86400
+    for start in range(0, size, batch_size):
+        count = min(batch_size, size - start)
+        guild_ids = rng.integers(0, guilds, count)
+        user_ids = rng.integers(0, users_per_guild, count)
+        channel_ids = rng.integers(0, CHANNELS_PER_GUILD, count)
+        topic_ids = rng.integers(0, TOPICS, count)
+        expired = rng.random(count) < expired_fraction
+        vectors = topics[topic_ids] + TOPIC_NOISE * rng.standard_normal((count, dim)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        ids, documents, metadatas = [], [], []
+        for i in range(count):
+            row = start + i
+            guild_id = int(guild_ids[i])
+            ids.append(f"mem-{row}")
+            documents.append(f"User: mensagem {row} sobre tópico {topic_ids[i]} Bot: resposta {row}")
+            metadatas.append({
+                "guild_id": str(guild_id),
+                "channel_id": str(guild_id * CHANNELS_PER_GUILD + int(channel_ids[i])),
+                "user_id": str(guild_id * users_per_guild + int(user_ids[i])),
+                "timestamp_epoch": expired_epoch if expired[i] else now,
+                "message_type": "conversation",
+                "topic": int(topic_ids[i]),
+            })
+        yield {'ids': ids, 'embeddings': vectors, 'documents': documents, 'metadatas': metadatas}
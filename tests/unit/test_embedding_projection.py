@@ -0,0 +1,108 @@
+import pytest
+import numpy as np
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from chatbot.embedding_projection import EmbeddingProjection
+from chatbot.embedding_service import OpenAIEmbeddingService, SentenceTransformerEmbeddingService
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+def _corpus(size=200, dim=32, latent=4, seed=3):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((size, latent)) @ rng.standard_normal((latent, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+@pytest.mark.unit
+class TestEmbeddingProjection:
+    def test_fit_projects_to_normalized_reduced_vectors(self):
+        corpus = _corpus()
+        projection = EmbeddingProjection.fit(corpus, 8)
+
+        projected = projection.project(corpus)
+
+        assert projection.method == 'pca'
+        assert projected.shape == (200, 8)
+        assert np.allclose(np.linalg.norm(projected, axis=1), 1.0, atol=1e-5)
+
+    def test_pca_preserves_nearest_neighbours_of_low_rank_corpus(self):
+        corpus = _corpus()
+        projection = EmbeddingProjection.fit(corpus, 4)
+        projected = projection.project(corpus)
+
+        full_neighbours = np.argsort(-(corpus @ corpus[0]))[:5]
+        reduced_neighbours = np.argsort(-(projected @ projected[0]))[:5]
+
+        assert set(full_neighbours) == set(reduced_neighbours)
+
+    def test_fit_needs_enough_vectors(self):
+        with pytest.raises(ValueError):
+            EmbeddingProjection.fit(_corpus(size=4), 8)
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        path = str(tmp_path / "pca.npz")
+        projection = EmbeddingProjection.fit(_corpus(), 8)
+        projection.save(path)
+
+        loaded = EmbeddingProjection.load(path, 8)
+
+        assert np.allclose(loaded.project_one(_corpus()[0].tolist()), projection.project_one(_corpus()[0].tolist()))
+        with pytest.raises(ValueError):
+            EmbeddingProjection.load(path, 4)
+
+    def test_missing_file_falls_back_to_truncation(self, tmp_path):
+        projection = EmbeddingProjection.load(str(tmp_path / "missing.npz"), 2)
+
+        assert projection.method == 'truncate'
+        assert projection.project_one([3.0, 4.0, 12.0]) == pytest.approx([0.6, 0.8])
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestReducedEmbeddingServices:
+    async def test_openai_passes_dimensions(self):
+        service = OpenAIEmbeddingService("key", dimensions=256)
+        service._client = MagicMock()
+        service._client.embeddings.create = AsyncMock(return_value=SimpleNamespace(
+            data=[SimpleNamespace(index=0, embedding=[0.1] * 256)]
+        ))
+
+        embedding = await service.embed_text("olá")
+
+        assert len(embedding) == 256
+        assert service._client.embeddings.create.await_args.kwargs["dimensions"] == 256
+
+    async def test_openai_omits_dimensions_by_default(self):
+        service = OpenAIEmbeddingService("key")
+        service._client = MagicMock()
+        service._client.embeddings.create = AsyncMock(return_value=SimpleNamespace(
+            data=[SimpleNamespace(index=0, embedding=[0.1] * 4)]
+        ))
+
+        await service.embed_batch(["olá"])
+
+        assert "dimensions" not in service._client.embeddings.create.await_args.kwargs
+
+    async def test_sentence_transformer_applies_projection(self):
+        corpus = _corpus()
+        service = SentenceTransformerEmbeddingService(projection=EmbeddingProjection.fit(corpus, 8))
+        service._model = MagicMock()
+        service._model.encode = MagicMock(side_effect=lambda texts, **_: corpus[:len(texts)] if isinstance(texts, list) else corpus[0])
+
+        single = await service.embed_text("olá")
+        batch = await service.embed_batch(["a", "", "b"])
+
+        assert len(single) == 8
+        assert [len(embedding) for embedding in batch] == [8, 0, 8]
+
+    async def test_create_embedding_service_reads_dimensions(self, monkeypatch, tmp_path):
+        from chatbot.embedding_service import create_embedding_service
+        monkeypatch.setenv('EMBEDDING_PROVIDER', 'sentence_transformers')
+        monkeypatch.setenv('EMBEDDING_DIMENSIONS', '64')
+        monkeypatch.setenv('EMBEDDING_PCA_PATH', str(tmp_path / "missing.npz"))
+
+        service = create_embedding_service()
+
+        assert service.projection.dimensions == 64
+        assert service.projection.method == 'truncate'
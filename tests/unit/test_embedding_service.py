@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from chatbot.embedding_service import HttpEmbeddingService, create_embedding_service
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest.fixture
+async def sidecar():
+    requests = []
+
+    async def embed(request):
+        payload = await request.json()
+        requests.append(payload["texts"])
+        if any(text == "boom" for text in payload["texts"]):
+            return web.json_response({"error": "model crashed"}, status=500)
+        return web.json_response({
+            "model": "all-MiniLM-L6-v2",
+            "embeddings": [[float(len(text)), 1.0, 0.0] for text in payload["texts"]],
+        })
+
+    app = web.Application()
+    app.router.add_post('/embed', embed)
+    server = TestServer(app)
+    await server.start_server()
+    server.requests = requests
+    yield server
+    await server.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestHttpEmbeddingService:
+    async def test_embed_batch_chunks_requests_and_keeps_blank_slots(self, sidecar):
+        service = HttpEmbeddingService(str(sidecar.make_url('')), max_batch_size=2)
+
+        embeddings = await service.embed_batch(["a", "", "bbb", "cc"])
+
+        assert embeddings == [[1.0, 1.0, 0.0], [], [3.0, 1.0, 0.0], [2.0, 1.0, 0.0]]
+        assert sidecar.requests == [["a", "bbb"], ["cc"]]
+        await service.close()
+
+    async def test_session_is_reused(self, sidecar):
+        service = HttpEmbeddingService(str(sidecar.make_url('')))
+
+        await service.embed_text("oi")
+        session = service._session
+        await service.embed_text("olá")
+
+        assert service._session is session
+        await service.close()
+        assert session.closed
+
+    async def test_session_from_a_finished_loop_is_dropped_when_replaced(self, sidecar):
+        service = HttpEmbeddingService(str(sidecar.make_url('')))
+        await asyncio.to_thread(asyncio.run, service.embed_text("oi"))
+        stale = service._session
+
+        assert await service.embed_text("olá") == [3.0, 1.0, 0.0]
+
+        assert stale.closed
+        assert service._session is not stale
+        await service.close()
+
+    async def test_close_from_another_thread_closes_on_the_owning_loop(self, sidecar):
+        service = HttpEmbeddingService(str(sidecar.make_url('')))
+        await service.embed_text("oi")
+        session = service._session
+
+        await asyncio.to_thread(service.release)
+        await asyncio.sleep(0.01)
+
+        assert session.closed
+        assert service._session is None
+
+    async def test_memory_manager_shutdown_closes_the_session(self, sidecar, monkeypatch, tmp_path):
+        from chatbot.memory_manager import MemoryManager
+        monkeypatch.setenv('CHROMADB_PATH', str(tmp_path))
+        service = HttpEmbeddingService(str(sidecar.make_url('')))
+        manager = MemoryManager(embedding_service=service)
+        await service.embed_text("oi")
+        session = service._session
+
+        await manager.shutdown()
+
+        assert session.closed
+
+    async def test_errors_return_empty_embeddings(self, sidecar):
+        service = HttpEmbeddingService(str(sidecar.make_url('')))
+
+        assert await service.embed_text("boom") == []
+        assert await service.embed_batch(["ok", "boom"]) == [[], []]
+        await service.close()
+
+    async def test_model_id_matches_local_sentence_transformer(self, monkeypatch):
+        monkeypatch.setenv('EMBEDDING_PROVIDER', 'http')
+        monkeypatch.setenv('EMBEDDING_API_URL', 'http://embeddings:5003')
+        monkeypatch.setenv('SENTENCE_TRANSFORMER_MODEL', 'all-MiniLM-L6-v2')
+        monkeypatch.delenv('EMBEDDING_DIMENSIONS', raising=False)
+
+        service = create_embedding_service()
+
+        assert isinstance(service, HttpEmbeddingService)
+        assert service.model_id == "sentence_transformers:all-MiniLM-L6-v2"
+
+    async def test_missing_url_falls_back_to_local_model(self, monkeypatch):
+        monkeypatch.setenv('EMBEDDING_PROVIDER', 'http')
+        monkeypatch.delenv('EMBEDDING_API_URL', raising=False)
+        monkeypatch.delenv('EMBEDDING_DIMENSIONS', raising=False)
+
+        assert not isinstance(create_embedding_service(), HttpEmbeddingService)
@@ -0,0 +1,160 @@
+import asyncio
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock
+from chatbot.memory_compaction import SUMMARY_PREFIX, cluster_by_similarity, extractive_summary, summary_metadata
+
+pytest_plugins = ('pytest_asyncio',)
+
+DIM = 384
+
+
+def _vector(index: int, noise: float = 0.0):
+    vector = np.zeros(DIM, dtype=np.float32)
+    vector[index] = 1.0
+    vector[(index + 1) % DIM] = noise
+    return vector.tolist()
+
+
+def _add_old(manager, ids, embeddings, documents, guild_id="123", epoch=1000):
+    manager._collection.add(
+        ids=ids,
+        embeddings=embeddings,
+        documents=documents,
+        metadatas=[{
+            "guild_id": guild_id,
+            "channel_id": "456",
+            "user_id": "789",
+            "timestamp": "2020-01-01T00:00:00",
+            "timestamp_epoch": epoch + i,
+            "message_type": "conversation",
+        } for i in range(len(ids))]
+    )
+
+
+@pytest.mark.unit
+class TestCompactionHelpers:
+    def test_cluster_by_similarity_groups_close_vectors(self):
+        embeddings = [_vector(0), _vector(1), _vector(0, 0.1), _vector(1, 0.1), _vector(2)]
+        assert cluster_by_similarity(embeddings, 0.9, 8) == [[0, 2], [1, 3], [4]]
+
+    def test_cluster_size_is_capped(self):
+        embeddings = [_vector(0)] * 5
+        clusters = cluster_by_similarity(embeddings, 0.9, 2)
+        assert [len(cluster) for cluster in clusters] == [2, 2, 1]
+
+    def test_extractive_summary_keeps_distinct_user_messages(self):
+        documents = ["User: gosto de rock Bot: legal", "User: Gosto de rock Bot: anotado", "User: toca queen Bot: ok"]
+        summary = extractive_summary(documents, [_vector(0), _vector(0), _vector(0, 0.2)], 200)
+        assert summary.startswith(SUMMARY_PREFIX)
+        assert summary.count("rock") == 1
+        assert "toca queen" in summary
+
+    def test_extractive_summary_respects_max_chars(self):
+        documents = [f"User: {'x' * 80} {i} Bot: ok" for i in range(10)]
+        summary = extractive_summary(documents, [_vector(0)] * 10, 200)
+        assert len(summary) <= 200 + len(SUMMARY_PREFIX)
+
+    def test_summary_metadata_uses_newest_member(self):
+        metadata = summary_metadata([
+            {"guild_id": "1", "channel_id": "2", "user_id": "3", "timestamp": "a", "timestamp_epoch": 5},
+            {"guild_id": "1", "channel_id": "2", "user_id": "3", "timestamp": "b", "timestamp_epoch": 9},
+        ])
+        assert metadata["timestamp"] == "b"
+        assert metadata["message_type"] == "summary"
+        assert metadata["source_count"] == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestCompactMemories:
+    async def test_replaces_clusters_with_summaries(self, memory_manager):
+        _add_old(
+            memory_manager,
+            ["a", "b", "c"],
+            [_vector(0), _vector(0, 0.1), _vector(5)],
+            ["User: gosto de rock Bot: legal", "User: rock é o melhor Bot: sim", "User: oi Bot: olá"]
+        )
+
+        compacted = await memory_manager.compact_memories()
+
+        rows = memory_manager._collection.get(include=["documents", "metadatas"])
+        summaries = [meta for meta in rows['metadatas'] if meta["message_type"] == "summary"]
+        assert compacted == 2
+        assert "c" in rows["ids"]
+        assert len(rows['ids']) == 2
+        assert summaries[0]["source_count"] == 2
+        assert summaries[0]["timestamp_epoch"] == 1001
+        memory_manager.embedding_service.embed_batch.assert_awaited()
+
+    async def test_singletons_are_marked_and_skipped_next_run(self, memory_manager):
+        _add_old(memory_manager, ["a", "b"], [_vector(0), _vector(5)], ["User: a Bot: b", "User: c Bot: d"])
+
+        assert await memory_manager.compact_memories() == 0
+        checked = memory_manager._collection.get(ids=["a", "b"], include=["metadatas"])
+        assert all(meta["compaction_checked"] == 1 for meta in checked['metadatas'])
+
+        fetched = []
+        get_records = memory_manager._store.get_records
+        memory_manager._store.get_records = lambda *args: fetched.append(get_records(*args)) or fetched[-1]
+        assert await memory_manager.compact_memories() == 0
+        assert fetched[0]['ids'] == []
+
+    async def test_singleton_mark_sends_only_partition_fields(self, memory_manager):
+        _add_old(memory_manager, ["a"], [_vector(0)], ["User: a Bot: b"])
+        updates = []
+        update_metadatas = memory_manager._store.update_metadatas
+        memory_manager._store.update_metadatas = lambda ids, metadatas: updates.append(metadatas) or update_metadatas(ids, metadatas)
+
+        await memory_manager.compact_memories()
+
+        assert updates == [[{"guild_id": "123", "channel_id": "456", "user_id": "789", "compaction_checked": 1}]]
+        assert memory_manager._collection.get(ids=["a"])['metadatas'][0]["timestamp_epoch"] == 1000
+
+    async def test_clusters_past_the_budget_wait_for_the_next_run(self, memory_manager):
+        _add_old(memory_manager, ["a", "b"], [_vector(0), _vector(0)], ["User: a Bot: b", "User: c Bot: d"])
+        _add_old(memory_manager, ["c", "d"], [_vector(3), _vector(3)], ["User: e Bot: f", "User: g Bot: h"], guild_id="999")
+
+        async def slow_summarizer(documents):
+            await asyncio.sleep(0.05)
+            return "resumo"
+        memory_manager.summarizer = slow_summarizer
+
+        assert await memory_manager.compact_memories(time_budget=0.02) == 2
+        assert memory_manager._collection.count() == 3
+        assert await memory_manager.compact_memories(time_budget=60) == 2
+        assert memory_manager._collection.count() == 2
+
+    async def test_recent_memories_are_not_compacted(self, memory_manager):
+        import time
+        _add_old(memory_manager, ["a", "b"], [_vector(0), _vector(0)], ["User: a Bot: b", "User: a Bot: b"], epoch=int(time.time()))
+
+        assert await memory_manager.compact_memories() == 0
+        assert memory_manager._collection.count() == 2
+
+    async def test_uses_summarizer_and_falls_back_on_error(self, memory_manager):
+        _add_old(memory_manager, ["a", "b"], [_vector(0), _vector(0)], ["User: a Bot: b", "User: c Bot: d"])
+        _add_old(memory_manager, ["c", "d"], [_vector(3), _vector(3)], ["User: e Bot: f", "User: g Bot: h"], guild_id="999")
+        memory_manager.summarizer = AsyncMock(side_effect=["Usuário gosta de rock", Exception("API down")])
+
+        assert await memory_manager.compact_memories() == 4
+
+        documents = sorted(memory_manager._collection.get(include=["documents"])['documents'])
+        assert documents == [f"{SUMMARY_PREFIX} Usuário gosta de rock", f"{SUMMARY_PREFIX} e; g"]
+
+    async def test_compacts_numpy_store(self, mock_embedding_service, monkeypatch, tmp_path):
+        from chatbot.memory_manager import MemoryManager
+        monkeypatch.setenv('MEMORY_VECTOR_STORE', 'numpy')
+        monkeypatch.setenv('MEMORY_NUMPY_PATH', str(tmp_path))
+        manager = MemoryManager(embedding_service=mock_embedding_service)
+        manager._store.add(
+            ids=["a", "b"],
+            embeddings=[_vector(0), _vector(0)],
+            documents=["User: a Bot: b", "User: c Bot: d"],
+            metadatas=[{"guild_id": "1", "channel_id": "2", "user_id": "3", "timestamp_epoch": 10 + i,
+                        "message_type": "conversation"} for i in range(2)]
+        )
+
+        assert await manager.compact_memories() == 2
+        assert manager._store.count() == 1
+        manager.close()
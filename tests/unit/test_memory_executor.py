@@ -0,0 +1,107 @@
+import pytest
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+from chatbot.memory_executor import ChromaExecutor
+from chatbot.metrics import LatencyStats, MetricsRegistry
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestChromaExecutor:
+    async def test_writes_are_serialized_on_single_thread(self):
+        executor = ChromaExecutor(read_workers=4)
+        active = []
+        overlaps = []
+        threads = set()
+
+        def write_op():
+            threads.add(threading.current_thread().name)
+            active.append(1)
+            if len(active) > 1:
+                overlaps.append(True)
+            time.sleep(0.01)
+            active.pop()
+
+        await asyncio.gather(*(executor.write(write_op) for _ in range(5)))
+        executor.shutdown()
+
+        assert overlaps == []
+        assert len(threads) == 1
+        assert next(iter(threads)).startswith('chroma-write')
+
+    async def test_reads_run_concurrently(self):
+        executor = ChromaExecutor(read_workers=4)
+        started = time.perf_counter()
+        await asyncio.gather(*(executor.read(time.sleep, 0.05) for _ in range(4)))
+        elapsed = time.perf_counter() - started
+        executor.shutdown()
+        assert elapsed < 0.15
+
+    async def test_reads_do_not_block_event_loop(self):
+        executor = ChromaExecutor(read_workers=1)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(executor.read(time.sleep, 0.1), ticker())
+        executor.shutdown()
+        assert len(ticks) == 5
+
+    async def test_errors_propagate_and_are_counted(self):
+        executor = ChromaExecutor()
+        failing = MagicMock(side_effect=ValueError("boom"))
+
+        with pytest.raises(ValueError):
+            await executor.write(failing)
+
+        snapshot = executor.snapshot()
+        executor.shutdown()
+        assert snapshot['write']['errors'] == 1
+        assert snapshot['write']['in_flight'] == 0
+
+    async def test_snapshot_reports_latency_per_kind(self):
+        executor = ChromaExecutor()
+        await executor.read(lambda: None)
+        await executor.write(lambda: None)
+        snapshot = executor.snapshot()
+        executor.shutdown()
+
+        assert snapshot['read']['completed'] == 1
+        assert snapshot['write']['completed'] == 1
+        assert snapshot['read']['run_time']['count'] == 1
+        assert 'p95_ms' in snapshot['write']['queue_wait']
+
+    async def test_inline_mode_runs_on_calling_thread(self):
+        executor = ChromaExecutor(inline=True)
+        thread_name = await executor.read(lambda: threading.current_thread().name)
+        executor.shutdown()
+        assert thread_name == threading.current_thread().name
+
+
+@pytest.mark.unit
+class TestMetrics:
+    def test_latency_stats_percentiles(self):
+        stats = LatencyStats()
+        for value in range(1, 101):
+            stats.observe(float(value))
+        snapshot = stats.snapshot()
+        assert snapshot['count'] == 100
+        assert snapshot['p50_ms'] == pytest.approx(50.0, abs=1)
+        assert snapshot['p99_ms'] == pytest.approx(99.0, abs=1)
+        assert snapshot['max_ms'] == 100.0
+
+    def test_registry_isolates_failing_providers(self):
+        registry = MetricsRegistry()
+        registry.register('ok', lambda: {'value': 1})
+        registry.register('broken', MagicMock(side_effect=RuntimeError("down")))
+        collected = registry.collect()
+        assert collected['ok'] == {'value': 1}
+        assert 'error' in collected['broken']
+
@@ -0,0 +1,66 @@
+import pytest
+import uuid
+from chatbot.memory_layout import CollectionCache, guild_collection_name, migrate_to_per_guild
+
+
+@pytest.mark.unit
+class TestCollectionCache:
+    def test_guild_collection_name(self):
+        assert guild_collection_name("tangerina_memory", 123) == "tangerina_memory_g123"
+        assert guild_collection_name("tangerina_memory", None) == "tangerina_memory_gnone"
+        assert guild_collection_name("tangerina_memory", "none") == "tangerina_memory_gnone"
+
+    def test_lru_keeps_bounded_handles(self, ephemeral_chromadb):
+        cache = CollectionCache(ephemeral_chromadb, f"test_{uuid.uuid4().hex[:8]}", max_open=2)
+        cache.get(1)
+        cache.get(2)
+        cache.get(1)
+        cache.get(3)
+
+        assert cache.cached(1) is not None
+        assert cache.cached(2) is None
+        assert cache.snapshot()['evictions'] == 1
+        assert len(cache.names()) == 3
+
+    def test_get_without_create_returns_none_for_unknown_guild(self, ephemeral_chromadb):
+        cache = CollectionCache(ephemeral_chromadb, f"test_{uuid.uuid4().hex[:8]}")
+        assert cache.get(42, create=False) is None
+        assert cache.names() == []
+
+    def test_drop_deletes_collection_and_returns_count(self, ephemeral_chromadb):
+        cache = CollectionCache(ephemeral_chromadb, f"test_{uuid.uuid4().hex[:8]}")
+        cache.get(1).add(ids=["a", "b"], embeddings=[[0.1, 0.2], [0.2, 0.1]])
+
+        assert cache.drop(1) == 2
+        assert cache.names() == []
+        assert cache.drop(1) == 0
+
+
+@pytest.mark.unit
+class TestMigrateToPerGuild:
+    def test_migrates_rows_grouped_by_guild_and_backfills_epoch(self, ephemeral_chromadb):
+        base_name = f"test_{uuid.uuid4().hex[:8]}"
+        source = ephemeral_chromadb.create_collection(name=base_name, metadata={"hnsw:space": "cosine"})
+        source.add(
+            ids=["a", "b", "c"],
+            embeddings=[[0.1, 0.2], [0.2, 0.1], [0.3, 0.3]],
+            documents=["one", "two", "three"],
+            metadatas=[
+                {"guild_id": "1", "timestamp": "2026-01-01T00:00:00"},
+                {"guild_id": "1", "timestamp_epoch": 5},
+                {"guild_id": "none", "timestamp_epoch": 6},
+            ]
+        )
+
+        result = migrate_to_per_guild(ephemeral_chromadb, base_name, batch_size=2)
+        rerun = migrate_to_per_guild(ephemeral_chromadb, base_name, batch_size=2, drop_source=True)
+
+        cache = CollectionCache(ephemeral_chromadb, base_name)
+        guild_rows = cache.get(1, create=False).get(ids=["a"], include=["metadatas", "documents"])
+        assert result == {'migrated': 3, 'guilds': 2}
+        assert rerun == result
+        assert cache.get(1, create=False).count() == 2
+        assert cache.get(None, create=False).count() == 1
+        assert guild_rows['documents'] == ["one"]
+        assert guild_rows['metadatas'][0]['timestamp_epoch'] == 1767225600
+        assert base_name not in [collection.name for collection in ephemeral_chromadb.list_collections()]
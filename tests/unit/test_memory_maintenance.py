@@ -0,0 +1,40 @@
+import pytest
+import asyncio
+from chatbot.memory_maintenance import MaintenanceScheduler
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestMaintenanceScheduler:
+    async def test_job_runs_periodically_and_records_stats(self):
+        scheduler = MaintenanceScheduler()
+        calls = []
+
+        async def cleanup():
+            calls.append(1)
+            return len(calls)
+
+        scheduler.add_job('memory_cleanup', 0.01, cleanup, initial_delay=0)
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        scheduler.stop()
+
+        stats = scheduler.snapshot()['memory_cleanup']
+        assert len(calls) >= 2
+        assert stats['runs'] == len(calls)
+        assert stats['last_result'] == len(calls)
+
+    async def test_failing_job_keeps_running(self):
+        scheduler = MaintenanceScheduler()
+
+        async def failing():
+            raise RuntimeError("chroma down")
+
+        scheduler.add_job('memory_cleanup', 0.01, failing, initial_delay=0)
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        scheduler.stop()
+
+        assert scheduler.snapshot()['memory_cleanup']['errors'] >= 2
@@ -120,6 +120,36 @@ class TestRecentMemoryBuffer:
         assert memory_manager.recent_interactions[key1][0]["user_message"] == "Guild 1 message"
         assert memory_manager.recent_interactions[key2][0]["user_message"] == "Guild 2 message"
 
+    @pytest.mark.asyncio
+    async def test_recent_interactions_survive_restart_with_sqlite_tier(self, mock_embedding_service, tmp_path, monkeypatch):
+        monkeypatch.setenv('CHROMADB_PATH', str(tmp_path / "chromadb"))
+        monkeypatch.setenv('RECENT_MEMORY_DB_PATH', str(tmp_path / "recent.db"))
+        memory_manager = MemoryManager(embedding_service=mock_embedding_service)
+        memory_manager._collection = MagicMock()
+        memory_manager._initialized = True
+        await memory_manager.store_conversation("Before restart", "Ok", 123, 456, 789)
+        memory_manager.close()
+
+        restarted = MemoryManager(embedding_service=mock_embedding_service)
+        assert restarted.recent_interactions == {}
+        recent = await restarted.retrieve_recent_interactions(123, 456, 789)
+        restarted.close()
+
+        assert [mem["content"] for mem in recent] == ["User: Before restart Bot: Ok"]
+        assert recent[0]["metadata"]["guild_id"] == "123"
+
+    @pytest.mark.asyncio
+    async def test_expire_recent_interactions_drops_idle_buffers(self, memory_manager):
+        await memory_manager.store_conversation("Hello", "Hi", 123, 456, 789)
+        key = memory_manager._get_conversation_key(123, 456, 789)
+        memory_manager.recent_interactions[key].last_active -= memory_manager.recent_interactions.idle_seconds + 1
+
+        expired = await memory_manager.expire_recent_interactions()
+
+        assert expired == 1
+        assert memory_manager.recent_interactions == {}
+        assert memory_manager.get_metrics()["recent"]["expired"] == 1
+
     @pytest.mark.asyncio
     async def test_retrieve_context_returns_dict_with_recent_and_semantic(self, memory_manager):
         await memory_manager.store_conversation(
@@ -370,43 +400,226 @@ class TestMemoryDeletion:
         await memory_manager.delete_guild_memories(123)
 
 
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestMemoryPurge:
+    async def _store_many(self, memory_manager, count, guild_id=123, user_id=789):
+        for i in range(count):
+            await memory_manager.store_conversation(f"Message {i}", "Response", guild_id, 456, user_id)
+
+    @pytest.mark.asyncio
+    async def test_purge_fetches_ids_only_and_deletes_in_pages(self, memory_manager):
+        memory_manager.purge_page_size = 2
+        await self._store_many(memory_manager, 5)
+        await self._store_many(memory_manager, 1, guild_id=999)
+        get_spy = MagicMock(wraps=memory_manager._collection.get)
+        delete_spy = MagicMock(wraps=memory_manager._collection.delete)
+        memory_manager._collection.get = get_spy
+        memory_manager._collection.delete = delete_spy
+        progress = []
+
+        deleted = await memory_manager.purge_memories({"guild_id": "123"}, progress.append)
+
+        assert deleted == 5
+        assert progress == [2, 2, 1]
+        assert all(call.kwargs['include'] == [] for call in get_spy.call_args_list)
+        assert all(len(call.kwargs['ids']) <= 2 for call in delete_spy.call_args_list)
+        assert memory_manager._collection.count() == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_guild_memories_forgets_recent_interactions(self, memory_manager):
+        await self._store_many(memory_manager, 1, guild_id=123)
+        await self._store_many(memory_manager, 1, guild_id=999)
+
+        deleted = await memory_manager.delete_guild_memories(123)
+
+        assert deleted == 1
+        assert memory_manager._get_conversation_key(123, 456, 789) not in memory_manager.recent_interactions
+        assert memory_manager._get_conversation_key(999, 456, 789) in memory_manager.recent_interactions
+
+    @pytest.mark.asyncio
+    async def test_purge_job_reports_progress(self, memory_manager):
+        memory_manager.purge_page_size = 2
+        await self._store_many(memory_manager, 3, user_id=555)
+
+        job = await memory_manager.start_purge_job("user", 555)
+        assert job["status"] == "running"
+        await memory_manager._purge_tasks[job["job_id"]]
+
+        finished = memory_manager.get_purge_job(job["job_id"])
+        assert finished["status"] == "completed"
+        assert finished["deleted"] == 3
+        assert memory_manager._collection.count() == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_purge_job_resumes_with_progress(self, memory_manager):
+        memory_manager.purge_page_size = 2
+        await self._store_many(memory_manager, 5)
+        original_delete = memory_manager._collection.delete
+        calls = []
+
+        def flaky_delete(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 2:
+                raise RuntimeError("disk full")
+            return original_delete(**kwargs)
+
+        memory_manager._collection.delete = flaky_delete
+        job = await memory_manager.start_purge_job("guild", 123)
+        await memory_manager._purge_tasks[job["job_id"]]
+        failed = memory_manager.get_purge_job(job["job_id"])
+        assert failed["status"] == "failed"
+        assert failed["deleted"] == 2
+
+        await memory_manager.start_purge_job("guild", 123)
+        await memory_manager._purge_tasks[job["job_id"]]
+        resumed = memory_manager.get_purge_job(job["job_id"])
+        assert resumed["status"] == "completed"
+        assert resumed["deleted"] == 5
+
+    @pytest.mark.asyncio
+    async def test_start_purge_job_rejects_unknown_scope(self, memory_manager):
+        with pytest.raises(ValueError):
+            await memory_manager.start_purge_job("channel", 1)
+
+
 @pytest.mark.unit
 @pytest.mark.asyncio
 class TestMemoryCleanup:
+    async def _store_aged(self, memory_manager, count, age_days):
+        import time
+        for i in range(count):
+            await memory_manager.store_conversation(f"Message {i}", "Response", 123, 456, 789)
+        results = memory_manager._collection.get(include=["metadatas"])
+        aged_epoch = int(time.time()) - age_days * 86400
+        memory_manager._collection.update(
+            ids=results['ids'],
+            metadatas=[{**metadata, "timestamp_epoch": aged_epoch} for metadata in results['metadatas']]
+        )
+
+    @pytest.mark.asyncio
+    async def test_store_conversation_records_timestamp_epoch(self, memory_manager):
+        await memory_manager.store_conversation("Hello", "Hi", 123, 456, 789)
+        metadata = memory_manager._collection.get(include=["metadatas"])['metadatas'][0]
+        assert isinstance(metadata['timestamp_epoch'], int)
+
     @pytest.mark.asyncio
     async def test_cleanup_old_memories(self, memory_manager):
-        from datetime import datetime, timedelta
+        await self._store_aged(memory_manager, 2, age_days=50)
+        await memory_manager.store_conversation("Fresh", "Response", 123, 456, 789)
+
+        deleted = await memory_manager.cleanup_old_memories()
 
-        memory_manager._collection.get = MagicMock(return_value={
-            'ids': ['id1', 'id2'],
-            'metadatas': [
+        assert deleted == 2
+        assert memory_manager._collection.count() == 1
+
+    @pytest.mark.asyncio
+    async def test_cleanup_uses_range_filter_and_fetches_ids_only(self, memory_manager):
+        memory_manager._legacy_scan_done = True
+        memory_manager._collection.get = MagicMock(return_value={'ids': ['id1', 'id2']})
+        memory_manager._collection.delete = MagicMock()
+
+        await memory_manager.cleanup_old_memories()
+
+        call_kwargs = memory_manager._collection.get.call_args.kwargs
+        assert '$lt' in call_kwargs['where']['timestamp_epoch']
+        assert call_kwargs['include'] == []
+        assert call_kwargs['limit'] == memory_manager.cleanup_page_size
+        memory_manager._collection.delete.assert_called_once_with(ids=['id1', 'id2'])
+
+    @pytest.mark.asyncio
+    async def test_cleanup_deletes_in_bounded_pages(self, memory_manager):
+        memory_manager.cleanup_page_size = 2
+        await self._store_aged(memory_manager, 5, age_days=50)
+        memory_manager._legacy_scan_done = True
+        delete_spy = MagicMock(wraps=memory_manager._collection.delete)
+        memory_manager._collection.delete = delete_spy
+
+        deleted = await memory_manager.cleanup_old_memories()
+
+        assert deleted == 5
+        assert delete_spy.call_count == 3
+        assert all(len(call.kwargs['ids']) <= 2 for call in delete_spy.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_cleanup_respects_time_budget(self, memory_manager):
+        await self._store_aged(memory_manager, 2, age_days=50)
+
+        deleted = await memory_manager.cleanup_old_memories(time_budget=0)
+
+        assert deleted == 0
+        assert memory_manager._collection.count() == 2
+
+    @pytest.mark.asyncio
+    async def test_cleanup_backfills_legacy_memories(self, memory_manager):
+        from datetime import datetime, timedelta
+        memory_manager._collection.add(
+            ids=['old', 'recent'],
+            embeddings=[[0.1] * 384, [0.2] * 384],
+            documents=['old doc', 'recent doc'],
+            metadatas=[
                 {'timestamp': (datetime.utcnow() - timedelta(days=50)).isoformat()},
                 {'timestamp': datetime.utcnow().isoformat()}
             ]
-        })
-        memory_manager._collection.delete = MagicMock()
+        )
 
-        await memory_manager.cleanup_old_memories()
-        memory_manager._collection.delete.assert_called_once()
+        deleted = await memory_manager.cleanup_old_memories()
+
+        assert deleted == 1
+        remaining = memory_manager._collection.get(include=["metadatas"])
+        assert remaining['ids'] == ['recent']
+        assert 'timestamp_epoch' in remaining['metadatas'][0]
+        assert memory_manager._legacy_scan_done is True
+
+    @pytest.mark.asyncio
+    async def test_legacy_scan_repeats_until_a_clean_pass_and_records_completion(self, memory_manager, tmp_path):
+        from datetime import datetime
+        from chatbot.memory_reindex import legacy_scan_done
+        memory_manager.chromadb_path = str(tmp_path)
+        memory_manager.cleanup_page_size = 2
+        memory_manager._collection.add(
+            ids=[f'legacy{i}' for i in range(4)],
+            embeddings=[[0.1 * (i + 1)] * 384 for i in range(4)],
+            documents=[f'doc {i}' for i in range(4)],
+            metadatas=[{'timestamp': datetime.utcnow().isoformat(), 'user_id': '789'} for _ in range(4)]
+        )
+        # Rows before the cursor were deleted by another job since the previous run
+        memory_manager._legacy_scan_offset = 2
+
+        await memory_manager.cleanup_old_memories(time_budget=60)
+
+        metadatas = memory_manager._collection.get(include=["metadatas"])['metadatas']
+        assert all('timestamp_epoch' in metadata and metadata['user_id'] == '789' for metadata in metadatas)
+        assert memory_manager._legacy_scan_done is True
+        assert legacy_scan_done(str(tmp_path), memory_manager._collection.name)
+
+    def test_restart_skips_a_completed_legacy_scan(self, mock_embedding_service, monkeypatch, tmp_path):
+        from chatbot.memory_reindex import mark_legacy_scan_done
+        monkeypatch.setenv('CHROMADB_PATH', str(tmp_path))
+        assert MemoryManager(embedding_service=mock_embedding_service)._legacy_scan_done is False
+
+        mark_legacy_scan_done(str(tmp_path), 'tangerina_memory')
+
+        assert MemoryManager(embedding_service=mock_embedding_service)._legacy_scan_done is True
 
     @pytest.mark.asyncio
     async def test_cleanup_old_memories_not_initialized(self, mock_embedding_service):
         manager = MemoryManager(embedding_service=mock_embedding_service)
         manager._initialized = False
 
-        await manager.cleanup_old_memories()
+        assert await manager.cleanup_old_memories() == 0
 
     @pytest.mark.asyncio
     async def test_cleanup_old_memories_no_results(self, memory_manager):
         memory_manager._collection.get = MagicMock(return_value=None)
-        await memory_manager.cleanup_old_memories()
+        assert await memory_manager.cleanup_old_memories() == 0
 
     @pytest.mark.asyncio
     async def test_cleanup_old_memories_invalid_timestamp(self, memory_manager):
-        memory_manager._collection.get = MagicMock(return_value={
-            'ids': ['id1'],
-            'metadatas': [{'timestamp': 'invalid'}]
-        })
+        memory_manager._collection.get = MagicMock(side_effect=[
+            {'ids': []},
+            {'ids': ['id1'], 'metadatas': [{'timestamp': 'invalid'}]}
+        ])
         memory_manager._collection.delete = MagicMock()
 
         await memory_manager.cleanup_old_memories()
@@ -416,3 +629,84 @@ class TestMemoryCleanup:
     async def test_cleanup_old_memories_with_error(self, memory_manager):
         memory_manager._collection.get = MagicMock(side_effect=Exception("Cleanup error"))
         await memory_manager.cleanup_old_memories()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestPerGuildLayout:
+    async def test_layout_selected_from_env(self, mock_embedding_service, monkeypatch, tmp_path):
+        monkeypatch.setenv('CHROMADB_PATH', str(tmp_path))
+        monkeypatch.setenv('MEMORY_STORAGE_LAYOUT', 'per_guild')
+        manager = MemoryManager(embedding_service=mock_embedding_service)
+
+        assert manager._initialized is True
+        assert manager._collection is None
+        assert manager._collections is not None
+
+        monkeypatch.setenv('MEMORY_STORAGE_LAYOUT', 'sharded')
+        assert MemoryManager(embedding_service=mock_embedding_service).storage_layout == 'single'
+
+    async def test_store_routes_to_guild_collection(self, per_guild_memory_manager):
+        await per_guild_memory_manager.store_conversation("Hello", "Hi", 111, 456, 789)
+        await per_guild_memory_manager.store_conversation("Oi", "Olá", 222, 456, 789)
+        await per_guild_memory_manager.store_conversation("DM", "Ok", None, 456, 789)
+
+        collections = per_guild_memory_manager._collections
+        assert len(collections.names()) == 3
+        assert collections.get(111, create=False).count() == 1
+        assert collections.get(None, create=False).count() == 1
+
+    async def test_retrieve_context_queries_only_guild_collection(self, per_guild_memory_manager):
+        await per_guild_memory_manager.store_conversation("Hello", "Hi", 111, 456, 789)
+        await per_guild_memory_manager.store_conversation("Oi", "Olá", 222, 456, 789)
+
+        context = await per_guild_memory_manager.retrieve_context("Hello", 111, 456, 789)
+        unknown = await per_guild_memory_manager.retrieve_context("Hello", 333, 456, 789)
+
+        assert [mem["metadata"]["guild_id"] for mem in context["semantic"]] == ["111"]
+        assert unknown["semantic"] == []
+        assert per_guild_memory_manager._collections.get(333, create=False) is None
+
+    async def test_delete_guild_memories_drops_collection(self, per_guild_memory_manager):
+        await per_guild_memory_manager.store_conversation("Hello", "Hi", 111, 456, 789)
+        await per_guild_memory_manager.store_conversation("Again", "Hi", 111, 456, 790)
+        await per_guild_memory_manager.store_conversation("Oi", "Olá", 222, 456, 789)
+
+        deleted = await per_guild_memory_manager.delete_guild_memories(111)
+
+        assert deleted == 2
+        assert per_guild_memory_manager._collections.get(111, create=False) is None
+        assert per_guild_memory_manager._collections.get(222, create=False).count() == 1
+
+    async def test_metadata_update_after_drop_does_not_recreate_collection(self, per_guild_memory_manager):
+        await per_guild_memory_manager.store_conversation("Hello", "Hi", 111, 456, 789)
+        doc_id = per_guild_memory_manager._collections.get(111, create=False).get()['ids'][0]
+        await per_guild_memory_manager.delete_guild_memories(111)
+
+        per_guild_memory_manager._store.update_metadatas([doc_id], [{"guild_id": "111", "last_retrieved_epoch": 1}])
+
+        assert per_guild_memory_manager._collections.get(111, create=False) is None
+
+    async def test_delete_user_memories_spans_guild_collections(self, per_guild_memory_manager):
+        await per_guild_memory_manager.store_conversation("Hello", "Hi", 111, 456, 789)
+        await per_guild_memory_manager.store_conversation("Oi", "Olá", 222, 456, 789)
+        await per_guild_memory_manager.store_conversation("Other", "Ok", 222, 456, 790)
+
+        assert await per_guild_memory_manager.delete_user_memories(789) == 2
+        assert per_guild_memory_manager._collections.get(222, create=False).count() == 1
+
+    async def test_cleanup_spans_guild_collections(self, per_guild_memory_manager):
+        for guild_id in (111, 222):
+            collection = per_guild_memory_manager._collections.get(guild_id)
+            collection.add(
+                ids=[f"old-{guild_id}", f"new-{guild_id}"],
+                embeddings=[[0.1] * 384, [0.2] * 384],
+                documents=["old", "new"],
+                metadatas=[{"guild_id": str(guild_id), "timestamp_epoch": 0},
+                           {"guild_id": str(guild_id), "timestamp_epoch": 2 ** 31}]
+            )
+
+        deleted = await per_guild_memory_manager.cleanup_old_memories()
+
+        assert deleted == 2
+        assert per_guild_memory_manager.get_metrics()["store"]["collections"]["open"] == 2
@@ -0,0 +1,208 @@
+import time
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock
+from chatbot.memory_manager import MemoryManager
+from chatbot.memory_quota import LAST_RETRIEVED_FIELD, EvictionScan, QuotaScan, guild_scope, select_evictions, usefulness, user_scope
+from chatbot.numpy_vector_store import NumpyVectorStore
+from chatbot.vector_store import ChromaVectorStore
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+def _metadata(guild_id="1", channel_id="10", user_id="100", epoch=0):
+    return {"guild_id": guild_id, "channel_id": channel_id, "user_id": user_id, "timestamp_epoch": epoch}
+
+
+def _unit(index: int, dim: int = 8):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[index] = 1.0
+    return vector.tolist()
+
+
+@pytest.mark.unit
+class TestQuotaHelpers:
+    def test_usefulness_prefers_last_retrieved_over_timestamp(self):
+        assert usefulness({"timestamp_epoch": 10}) == 10
+        assert usefulness({"timestamp_epoch": 10, LAST_RETRIEVED_FIELD: 50}) == 50
+
+    def test_scan_counts_guilds_and_users_across_pages(self):
+        scan = QuotaScan(["p0", "p1"])
+        scan.add_page([_metadata(user_id="1"), _metadata(user_id="2")], page_size=2)
+        scan.add_page([_metadata(user_id="1")], page_size=2)
+        scan.add_page([_metadata(guild_id="2", user_id="1")], page_size=2)
+
+        assert scan.counted
+        assert scan.counts[guild_scope("1")] == 3
+        assert scan.counts[user_scope("1", "1")] == 2
+        assert scan.locations[guild_scope("2")] == {1}
+        assert scan.queue_over_quota(guild_quota=2, user_quota=1) == [user_scope("1", "1"), guild_scope("1")]
+
+    def test_select_evictions_takes_least_useful_excess(self):
+        candidates = [(30, "c", 0), (10, "a", 1), (20, "b", 0)]
+
+        assert select_evictions(candidates, 1) == {1: ["a"], 0: ["b"]}
+        assert select_evictions(candidates, 3) == {}
+
+    def test_eviction_scan_keeps_only_the_least_useful_rows(self):
+        eviction = EvictionScan(guild_scope("1"), [1, 0], keep=2)
+        eviction.add_page(["c", "a"], [_metadata(epoch=30), _metadata(epoch=10)], page_size=2)
+        eviction.add_page(["e"], [_metadata(epoch=50)], page_size=2)
+        eviction.add_page(["b", "d"], [_metadata(epoch=20), {**_metadata(epoch=5), LAST_RETRIEVED_FIELD: 40}], page_size=3)
+
+        assert eviction.done
+        assert eviction.seen == 5
+        assert eviction.victims(quota=3) == {0: ["a"], 1: ["b"]}
+        assert eviction.victims(quota=5) == {}
+
+
+@pytest.mark.unit
+class TestGetMetadatas:
+    def test_numpy_pages_filtered_metadata(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path))
+        store.add(["a", "b", "c"], [_unit(0), _unit(1), _unit(2)], ["x", "y", "z"], [_metadata(epoch=i) for i in range(3)])
+        store.delete(("1", "10", "100"), ["b"])
+
+        page = store.get_metadatas(("1", "10", "100"), {"user_id": "100"}, 1, 5)
+
+        assert page['ids'] == ["c"]
+        assert page['metadatas'][0]["timestamp_epoch"] == 2
+
+    def test_chroma_pages_metadata_without_embeddings(self, ephemeral_chromadb):
+        collection = ephemeral_chromadb.get_or_create_collection("quota_test")
+        store = ChromaVectorStore(collection=collection)
+        store.add(["a", "b"], [_unit(0), _unit(1)], ["x", "y"], [_metadata(user_id="1"), _metadata(user_id="2")])
+
+        page = store.get_metadatas(collection, {"user_id": "2"}, 0, 5)
+
+        assert page == {'ids': ["b"], 'metadatas': [_metadata(user_id="2")]}
+        assert len(store.get_metadatas(collection, {}, 0, 5)['ids']) == 2
+
+
+@pytest.mark.unit
+class TestMemoryManagerQuotas:
+    @pytest.fixture
+    def manager(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('MEMORY_VECTOR_STORE', 'numpy')
+        monkeypatch.setenv('MEMORY_NUMPY_PATH', str(tmp_path))
+        monkeypatch.setenv('MEMORY_SIMILARITY_THRESHOLD', '0')
+        monkeypatch.setenv('MEMORY_QUOTA_PAGE_SIZE', '2')
+        embedding_service = AsyncMock()
+        embedding_service.embed_text.return_value = _unit(0)
+        manager = MemoryManager(embedding_service=embedding_service)
+        yield manager
+        manager.close()
+
+    def _add(self, manager, rows):
+        manager._store.add(
+            ids=[doc_id for doc_id, _ in rows],
+            embeddings=[_unit(i) for i in range(len(rows))],
+            documents=[f"doc {doc_id}" for doc_id, _ in rows],
+            metadatas=[metadata for _, metadata in rows],
+        )
+
+    def _ids(self, manager):
+        return sorted(
+            doc_id for partition in manager._store.partitions()
+            for doc_id in manager._store.get_metadatas(partition, {}, 0, 100)['ids']
+        )
+
+    async def test_disabled_by_default(self, manager):
+        assert not manager.quotas_enabled
+        assert await manager.enforce_memory_quotas() == 0
+        assert "quota" not in manager.get_metrics()
+
+    async def test_user_quota_evicts_oldest_memories_across_channels(self, manager):
+        manager.user_quota = 2
+        self._add(manager, [
+            ("a", _metadata(channel_id="10", epoch=1)),
+            ("b", _metadata(channel_id="11", epoch=2)),
+            ("c", _metadata(channel_id="10", epoch=3)),
+            ("d", _metadata(user_id="200", epoch=0)),
+        ])
+
+        assert await manager.enforce_memory_quotas(time_budget=60) == 1
+
+        assert self._ids(manager) == ["b", "c", "d"]
+        assert manager.get_metrics()["quota"]["evicted"] == 1
+
+    async def test_recently_retrieved_memory_survives_guild_quota(self, manager):
+        manager.guild_quota = 2
+        self._add(manager, [
+            ("a", _metadata(epoch=1)),
+            ("b", _metadata(epoch=2)),
+            ("c", _metadata(epoch=3)),
+        ])
+
+        result = await manager.retrieve_context("pergunta", 1, 10, 100, max_results=1)
+        assert [memory["id"] for memory in result["semantic"]] == ["a"]
+        assert manager.get_metrics()["quota"]["pending_retrieval_updates"] == 1
+
+        assert await manager.enforce_memory_quotas(time_budget=60) == 1
+
+        assert self._ids(manager) == ["a", "c"]
+        assert manager.quota_stats['retrieval_updates'] == 1
+
+    async def test_retrieval_mark_keeps_fields_written_after_the_query(self, manager, tmp_path):
+        manager.user_quota = 5
+        self._add(manager, [("a", _metadata(epoch=1))])
+        await manager.retrieve_context("pergunta", 1, 10, 100)
+        manager._store.update_metadatas(["a"], [{**_metadata(epoch=1), "compaction_checked": 1}])
+
+        assert await manager.flush_retrieval_marks() == 1
+
+        for store in (manager._store, NumpyVectorStore(str(tmp_path))):
+            metadata = store.get_metadatas(("1", "10", "100"), {}, 0, 1)['metadatas'][0]
+            assert metadata["compaction_checked"] == 1
+            assert metadata[LAST_RETRIEVED_FIELD] > 0
+            assert metadata["timestamp_epoch"] == 1
+
+    async def test_scan_resumes_across_runs(self, manager):
+        manager.guild_quota = 2
+        self._add(manager, [(doc_id, _metadata(epoch=i)) for i, doc_id in enumerate("abcde")])
+
+        assert await manager.enforce_memory_quotas(time_budget=0) == 0
+        assert manager.get_metrics()["quota"]["scan_in_progress"]
+
+        evicted = 0
+        for _ in range(10):
+            evicted += await manager.enforce_memory_quotas(time_budget=60)
+            if manager._quota_scan is None:
+                break
+
+        assert evicted == 3
+        assert self._ids(manager) == ["d", "e"]
+        assert manager.quota_stats['passes'] == 1
+
+    async def test_eviction_pages_resume_and_delete_after_the_pass(self, manager):
+        manager.guild_quota = 2
+        self._add(manager, [(doc_id, _metadata(epoch=i)) for i, doc_id in enumerate("abcde")])
+        scan = QuotaScan(manager._store.partitions())
+        while not scan.counted:
+            page = manager._store.get_metadatas(scan.partitions[scan.index], {}, scan.offset, 2)
+            scan.add_page(page['metadatas'], 2)
+        scan.queue_over_quota(manager.guild_quota, 0)
+        get_metadatas = manager._store.get_metadatas
+        deletes = []
+
+        def slow_page(*args):
+            time.sleep(0.05)
+            return get_metadatas(*args)
+        manager._store.get_metadatas = slow_page
+        manager._store.delete = lambda partition, ids: deletes.append(list(ids))
+
+        assert await manager._evict_over_quota(scan, time.monotonic() + 0.02) == 0
+        assert scan.eviction.offset == 2
+        assert deletes == []
+        assert await manager._evict_over_quota(scan, time.monotonic() + 60) == 3
+        assert deletes == [["a", "b", "c"]]
+        assert scan.pending == [] and scan.eviction is None
+
+    async def test_purge_drops_pending_retrieval_marks(self, manager):
+        manager.user_quota = 5
+        self._add(manager, [("a", _metadata(epoch=1))])
+        await manager.retrieve_context("pergunta", 1, 10, 100)
+
+        await manager.delete_user_memories(100)
+
+        assert manager._retrieved == {}
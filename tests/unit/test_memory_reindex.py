@@ -0,0 +1,247 @@
+import asyncio
+import json
+import hashlib
+import pytest
+import numpy as np
+from typing import List
+from chatbot.embedding_service import EmbeddingService, OpenAIEmbeddingService, create_embedding_service
+from chatbot.memory_manager import MemoryManager
+from chatbot.memory_reindex import CHECKPOINT_FILE, INDEX_STATE_FILE, load_index_state, save_index_state
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class _HashEmbeddingService(EmbeddingService):
+    def __init__(self, name: str, dim: int):
+        self.name = name
+        self.dim = dim
+        self.batches = 0
+        self.fail_after = None
+        self.gate = None
+
+    @property
+    def model_id(self) -> str:
+        return self.name
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha1(f"{self.name}:{text}".encode()).digest()[:8], 'little')
+        vector = np.random.default_rng(seed).standard_normal(self.dim)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    async def embed_text(self, text: str) -> List[float]:
+        return self._vector(text) if text and text.strip() else []
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        self.batches += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail_after is not None and self.batches > self.fail_after:
+            raise RuntimeError("embedding backend down")
+        return [self._vector(text) for text in texts]
+
+
+@pytest.fixture
+def numpy_manager(monkeypatch, tmp_path):
+    monkeypatch.setenv('MEMORY_VECTOR_STORE', 'numpy')
+    monkeypatch.setenv('MEMORY_NUMPY_PATH', str(tmp_path))
+    monkeypatch.setenv('MEMORY_REINDEX_PAGE_SIZE', '1')
+    monkeypatch.setenv('MEMORY_REINDEX_CONCURRENCY', '2')
+    manager = MemoryManager(embedding_service=_HashEmbeddingService("old-model", 4))
+    yield manager
+    manager.close()
+
+
+async def _store(manager, count, user_id=789):
+    for i in range(count):
+        await manager.store_conversation(f"pergunta {i}", f"resposta {i}", 123, 456, user_id)
+
+
+@pytest.mark.unit
+class TestEmbeddingModelIds:
+    def test_model_ids_include_provider_model_and_dimensions(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('EMBEDDING_PCA_PATH', str(tmp_path / "missing.npz"))
+        assert OpenAIEmbeddingService("key", "text-embedding-3-large", 256).model_id == "openai:text-embedding-3-large@256"
+        service = create_embedding_service(provider='sentence_transformers', model='paraphrase-MiniLM', dimensions=64)
+        assert service.model_id == "sentence_transformers:paraphrase-MiniLM@truncate64"
+
+    def test_startup_records_model_and_flags_mismatch(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('MEMORY_VECTOR_STORE', 'numpy')
+        monkeypatch.setenv('MEMORY_NUMPY_PATH', str(tmp_path))
+        first = MemoryManager(embedding_service=_HashEmbeddingService("model-a", 4))
+        assert load_index_state(str(tmp_path))['embedding_model'] == "model-a"
+        assert not first.embedding_mismatch
+
+        second = MemoryManager(embedding_service=_HashEmbeddingService("model-b", 4))
+        assert second.embedding_mismatch
+        assert second.get_metrics()["index"]["embedding_mismatch"] is True
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestReindexJob:
+    async def test_reindex_switches_store_and_model(self, numpy_manager, tmp_path):
+        await _store(numpy_manager, 3)
+        new_service = _HashEmbeddingService("new-model", 6)
+
+        job = await numpy_manager.start_reindex_job(new_service, {'model': 'new-model'})
+        await numpy_manager._reindex_task
+
+        state = json.loads((tmp_path / INDEX_STATE_FILE).read_text())
+        assert job["status"] == "running"
+        assert numpy_manager.get_reindex_job()["status"] == "completed"
+        assert numpy_manager.get_reindex_job()["copied"] == 3
+        assert state == {'version': 1, 'location': 'v1', 'embedding_model': 'new-model', 'previous_location': None}
+        assert not (tmp_path / CHECKPOINT_FILE).exists()
+        assert numpy_manager.embedding_service is new_service
+        assert numpy_manager._store.count() == 3
+        context = await numpy_manager.retrieve_context("User: pergunta 1 Bot: resposta 1", 123, 456, 789)
+        assert context["semantic"][0]["content"] == "User: pergunta 1 Bot: resposta 1"
+
+    async def test_reopened_manager_uses_new_index(self, numpy_manager, monkeypatch):
+        await _store(numpy_manager, 2)
+        await numpy_manager.start_reindex_job(_HashEmbeddingService("new-model", 6))
+        await numpy_manager._reindex_task
+
+        reopened = MemoryManager(embedding_service=_HashEmbeddingService("new-model", 6))
+
+        assert reopened.index_state['location'] == 'v1'
+        assert reopened._store.count() == 2
+        assert not reopened.embedding_mismatch
+        reopened.close()
+
+    async def test_writes_and_purges_during_reindex_are_mirrored(self, numpy_manager):
+        await _store(numpy_manager, 2)
+        await _store(numpy_manager, 1, user_id=111)
+        new_service = _HashEmbeddingService("new-model", 6)
+        new_service.gate = asyncio.Event()
+
+        await numpy_manager.start_reindex_job(new_service)
+        await asyncio.sleep(0)
+        await numpy_manager.store_conversation("durante", "reindex", 123, 456, 789)
+        purge = asyncio.create_task(numpy_manager.delete_user_memories(111))
+        await asyncio.sleep(0)
+        assert not purge.done()
+        new_service.gate.set()
+        await numpy_manager._reindex_task
+
+        assert await purge == 1
+
+        documents = [page_doc for partition in numpy_manager._store.partitions()
+                     for page_doc in numpy_manager._store.get_page(partition, 0, 100)['documents']]
+        assert sorted(documents) == [
+            "User: durante Bot: reindex", "User: pergunta 0 Bot: resposta 0", "User: pergunta 1 Bot: resposta 1"
+        ]
+
+    async def test_purge_between_pages_keeps_other_scopes(self, memory_manager, tmp_path):
+        memory_manager.chromadb_path = str(tmp_path)
+        memory_manager.embedding_service = _HashEmbeddingService("old-model", 4)
+        memory_manager.reindex_page_size = 10
+        memory_manager.reindex_concurrency = 1
+        for i in range(30):
+            await memory_manager.store_conversation(f"primeiro {i}", "ok", 123, 456, 1)
+            await memory_manager.store_conversation(f"segundo {i}", "ok", 123, 456, 2)
+        previous = memory_manager._collection
+        new_service = _HashEmbeddingService("new-model", 6)
+        new_service.gate = asyncio.Event()
+
+        await memory_manager.start_reindex_job(new_service)
+        await asyncio.sleep(0)
+        purge = asyncio.create_task(memory_manager.delete_user_memories(1))
+        await asyncio.sleep(0)
+        context = await memory_manager.retrieve_context("User: primeiro 3 Bot: ok", 123, 456, 1)
+        new_service.gate.set()
+        await memory_manager._reindex_task
+
+        assert context["semantic"] == []
+        assert await purge == 30
+        assert memory_manager.get_reindex_job()["copied"] == 60
+        assert memory_manager._collection.count() == 30
+        assert len(memory_manager._collection.get(where={"user_id": "2"})['ids']) == 30
+        assert previous.get(where={"user_id": "1"})['ids'] == []
+
+    async def test_purge_during_failed_reindex_restarts_it(self, numpy_manager, tmp_path):
+        await _store(numpy_manager, 3)
+        await _store(numpy_manager, 2, user_id=111)
+        flaky = _HashEmbeddingService("new-model", 6)
+        flaky.gate = asyncio.Event()
+        flaky.fail_after = 1
+
+        await numpy_manager.start_reindex_job(flaky)
+        await asyncio.sleep(0)
+        purge = asyncio.create_task(numpy_manager.delete_user_memories(111))
+        await asyncio.sleep(0)
+        flaky.gate.set()
+        await numpy_manager._reindex_task
+
+        assert numpy_manager.get_reindex_job()["status"] == "failed"
+        assert await purge == 2
+        assert not (tmp_path / CHECKPOINT_FILE).exists()
+        job = await numpy_manager.start_reindex_job(_HashEmbeddingService("new-model", 6))
+        await numpy_manager._reindex_task
+        assert job["resumed"] is False
+        assert numpy_manager._store.count() == 3
+
+    async def test_maintenance_waits_for_reindex(self, numpy_manager):
+        await _store(numpy_manager, 3)
+        numpy_manager.retention_days = -1
+        new_service = _HashEmbeddingService("new-model", 6)
+        new_service.gate = asyncio.Event()
+
+        await numpy_manager.start_reindex_job(new_service)
+        await asyncio.sleep(0)
+        assert await numpy_manager.cleanup_old_memories(time_budget=60) == 0
+        assert await numpy_manager.compact_memories(time_budget=60) == 0
+        new_service.gate.set()
+        await numpy_manager._reindex_task
+
+        assert numpy_manager.get_reindex_job()["copied"] == 3
+        assert numpy_manager._store.count() == 3
+        assert await numpy_manager.cleanup_old_memories(time_budget=60) == 3
+
+    async def test_failed_job_resumes_from_checkpoint(self, numpy_manager, tmp_path):
+        await _store(numpy_manager, 5)
+        flaky = _HashEmbeddingService("new-model", 6)
+        flaky.fail_after = 2
+
+        await numpy_manager.start_reindex_job(flaky)
+        await numpy_manager._reindex_task
+
+        checkpoint = json.loads((tmp_path / CHECKPOINT_FILE).read_text())
+        assert numpy_manager.get_reindex_job()["status"] == "failed"
+        assert checkpoint['offset'] == 2
+        assert numpy_manager.embedding_service.model_id == "old-model"
+
+        job = await numpy_manager.start_reindex_job(_HashEmbeddingService("new-model", 6))
+        await numpy_manager._reindex_task
+
+        assert job["resumed"] is True
+        assert numpy_manager.get_reindex_job()["status"] == "completed"
+        assert numpy_manager._store.count() == 5
+
+    async def test_checkpoint_for_other_model_is_discarded(self, numpy_manager, tmp_path):
+        await _store(numpy_manager, 3)
+        flaky = _HashEmbeddingService("model-x", 6)
+        flaky.fail_after = 1
+        await numpy_manager.start_reindex_job(flaky)
+        await numpy_manager._reindex_task
+
+        job = await numpy_manager.start_reindex_job(_HashEmbeddingService("model-y", 8))
+        await numpy_manager._reindex_task
+
+        assert job["resumed"] is False
+        assert numpy_manager._store.count() == 3
+        assert load_index_state(str(tmp_path))['embedding_model'] == "model-y"
+
+    async def test_chroma_collection_records_model_version(self, memory_manager, tmp_path):
+        memory_manager.chromadb_path = str(tmp_path)
+        memory_manager.embedding_service = _HashEmbeddingService("old-model", 4)
+        await _store(memory_manager, 2)
+
+        await memory_manager.start_reindex_job(_HashEmbeddingService("new-model", 6))
+        await memory_manager._reindex_task
+
+        metadata = memory_manager._collection.metadata
+        assert memory_manager._collection.name == "tangerina_memory_v1"
+        assert metadata["embedding_model"] == "new-model"
+        assert metadata["index_version"] == 1
+        assert memory_manager._collection.count() == 2
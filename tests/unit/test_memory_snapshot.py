@@ -0,0 +1,201 @@
+import json
+import pytest
+import numpy as np
+from chatbot import memory_cli
+from chatbot.memory_manager import MemoryManager
+from chatbot.memory_snapshot import SnapshotReader, SnapshotWriter, export_store, import_store
+from chatbot.memory_reindex import save_index_state
+from chatbot.numpy_vector_store import NumpyVectorStore
+from chatbot.vector_store import ChromaVectorStore
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+def _metadata(guild_id="1", channel_id="10", user_id="100"):
+    return {"guild_id": guild_id, "channel_id": channel_id, "user_id": user_id, "timestamp_epoch": 5, "message_type": "conversation"}
+
+
+def _page(count, start=0, dim=4):
+    rng = np.random.default_rng(start)
+    return {
+        'ids': [f"id-{start + i}" for i in range(count)],
+        'embeddings': rng.standard_normal((count, dim)).astype(np.float32),
+        'documents': [f"doc {start + i}" for i in range(count)],
+        'metadatas': [_metadata(guild_id=str(i % 2)) for i in range(count)],
+    }
+
+
+def _rows(store):
+    rows = {}
+    for partition in store.partitions():
+        page = store.get_page(partition, 0, 100)
+        for doc_id, embedding, document in zip(page['ids'], page['embeddings'], page['documents']):
+            rows[doc_id] = (np.asarray(embedding, dtype=np.float32), document)
+    return rows
+
+
+@pytest.mark.unit
+class TestSnapshotFiles:
+    def test_round_trip_between_numpy_and_chroma(self, tmp_path, ephemeral_chromadb):
+        source = NumpyVectorStore(str(tmp_path / "source"))
+        source.add(**_page(7))
+        target = ChromaVectorStore(collection=ephemeral_chromadb.create_collection(name="snapshot_target", metadata={"hnsw:space": "cosine"}))
+
+        manifest = export_store(source, str(tmp_path / "snap"), page_size=2)
+        imported = import_store(target, str(tmp_path / "snap"), batch_size=3)
+
+        assert manifest['count'] == imported == 7
+        assert manifest['dimensions'] == 4
+        assert manifest['source']['backend'] == 'numpy'
+        assert np.load(tmp_path / "snap" / "embeddings.npy").shape == (7, 4)
+        expected, actual = _rows(source), _rows(target)
+        assert expected.keys() == actual.keys()
+        for doc_id, (embedding, document) in expected.items():
+            assert actual[doc_id][1] == document
+            assert np.allclose(actual[doc_id][0], embedding, atol=1e-6)
+
+    def test_short_export_is_truncated(self, tmp_path):
+        writer = SnapshotWriter(str(tmp_path), expected_rows=5)
+        writer.write(_page(3))
+        manifest = writer.close()
+
+        reader = SnapshotReader(str(tmp_path))
+        batches = list(reader.batches(2))
+
+        assert manifest['count'] == 3
+        assert reader.embeddings.shape == (3, 4)
+        assert [len(batch['ids']) for batch in batches] == [2, 1]
+
+    def test_rows_beyond_expected_are_skipped(self, tmp_path):
+        writer = SnapshotWriter(str(tmp_path), expected_rows=2)
+        writer.write(_page(3))
+
+        assert writer.close()['count'] == 2
+        assert len((tmp_path / "records.jsonl").read_text().splitlines()) == 2
+
+    def test_empty_store(self, tmp_path):
+        manifest = export_store(NumpyVectorStore(str(tmp_path / "empty")), str(tmp_path / "snap"))
+
+        assert manifest['count'] == 0
+        assert import_store(NumpyVectorStore(str(tmp_path / "target")), str(tmp_path / "snap")) == 0
+
+    def test_rejects_mismatched_manifest(self, tmp_path):
+        writer = SnapshotWriter(str(tmp_path), expected_rows=2)
+        writer.write(_page(2))
+        writer.close()
+        manifest = json.loads((tmp_path / "manifest.json").read_text())
+        manifest['count'] = 3
+        (tmp_path / "manifest.json").write_text(json.dumps(manifest))
+
+        with pytest.raises(ValueError):
+            list(SnapshotReader(str(tmp_path)).batches(10))
+
+    def test_refuses_non_empty_target(self, tmp_path):
+        (tmp_path / "snap").mkdir()
+        (tmp_path / "snap" / "notes.txt").write_text("keep me")
+
+        with pytest.raises(FileExistsError):
+            SnapshotWriter(str(tmp_path / "snap"), expected_rows=2)
+        assert (tmp_path / "snap" / "notes.txt").read_text() == "keep me"
+
+    def test_failed_export_leaves_target_and_siblings_untouched(self, tmp_path):
+        source = NumpyVectorStore(str(tmp_path / "source"))
+        source.add(**_page(4))
+        (tmp_path / "unrelated.txt").write_text("keep me")
+
+        def broken_page(partition, offset, limit):
+            raise OSError("disk full")
+        source.get_page = broken_page
+
+        with pytest.raises(OSError):
+            export_store(source, str(tmp_path / "snap"))
+
+        assert not (tmp_path / "snap").exists()
+        assert (tmp_path / "unrelated.txt").read_text() == "keep me"
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["source", "unrelated.txt"]
+
+    def test_snapshot_appears_only_on_close(self, tmp_path):
+        writer = SnapshotWriter(str(tmp_path / "snap"), expected_rows=2)
+        writer.write(_page(2))
+
+        assert not (tmp_path / "snap").exists()
+        writer.close()
+        assert SnapshotReader(str(tmp_path / "snap")).count == 2
+        assert [path.name for path in tmp_path.iterdir()] == ["snap"]
+
+    def test_parquet_records(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        source = NumpyVectorStore(str(tmp_path / "source"))
+        source.add(**_page(5))
+
+        export_store(source, str(tmp_path / "snap"), records_format='parquet')
+
+        target = NumpyVectorStore(str(tmp_path / "target"))
+        assert import_store(target, str(tmp_path / "snap")) == 5
+        assert _rows(target).keys() == _rows(source).keys()
+
+    def test_cli_refuses_non_empty_target(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path / "source"))
+        store.add(**_page(2))
+        memory_cli.main(['--backend', 'numpy', '--numpy-path', str(tmp_path / "source"), 'export', '--output', str(tmp_path / "snap")])
+
+        with pytest.raises(SystemExit):
+            memory_cli.main(['--backend', 'numpy', '--numpy-path', str(tmp_path / "source"), 'import', '--input', str(tmp_path / "snap")])
+        memory_cli.main(['--backend', 'numpy', '--numpy-path', str(tmp_path / "copy"), 'import', '--input', str(tmp_path / "snap")])
+        with pytest.raises(SystemExit):
+            memory_cli.main(['--backend', 'numpy', '--numpy-path', str(tmp_path / "source"), 'export', '--output', str(tmp_path / "snap")])
+
+        assert NumpyVectorStore(str(tmp_path / "copy")).count() == 2
+        assert SnapshotReader(str(tmp_path / "snap")).count == 2
+
+
+    def test_cli_follows_active_index_after_reindex(self, tmp_path):
+        NumpyVectorStore(str(tmp_path / "vectors")).add(**_page(1))
+        NumpyVectorStore(str(tmp_path / "vectors" / "v1")).add(**_page(3, start=10))
+        save_index_state(str(tmp_path / "vectors"), {'version': 1, 'location': 'v1', 'embedding_model': None, 'previous_location': None})
+        base = ['--backend', 'numpy', '--numpy-path', str(tmp_path / "vectors")]
+
+        memory_cli.main(base + ['export', '--output', str(tmp_path / "active")])
+        memory_cli.main(base + ['--location', '', 'export', '--output', str(tmp_path / "stale")])
+        memory_cli.main(base + ['import', '--append', '--input', str(tmp_path / "stale")])
+
+        assert SnapshotReader(str(tmp_path / "active")).count == 3
+        assert SnapshotReader(str(tmp_path / "stale")).count == 1
+        assert NumpyVectorStore(str(tmp_path / "vectors" / "v1")).count() == 4
+
+    def test_fit_projection_samples_every_partition_of_the_active_store(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path / "vectors" / "v1"))
+        store.add(**_page(20, dim=8))
+        save_index_state(str(tmp_path / "vectors"), {'version': 1, 'location': 'v1', 'embedding_model': None, 'previous_location': None})
+
+        read = []
+        get_page = store.get_page
+        store.get_page = lambda partition, offset, limit: read.append(partition) or get_page(partition, offset, limit)
+
+        sample = memory_cli.sample_embeddings(store, 6, batch_size=2)
+        memory_cli.main(['--backend', 'numpy', '--numpy-path', str(tmp_path / "vectors"), 'fit-projection',
+                         '--dimensions', '2', '--sample', '10', '--output', str(tmp_path / "pca.npz")])
+
+        assert len(sample) == 6
+        assert set(read) == set(store.partitions())
+        assert (tmp_path / "pca.npz").exists()
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestMemoryManagerSnapshot:
+    async def test_export_and_import_across_backends(self, memory_manager, mock_embedding_service, monkeypatch, tmp_path):
+        await memory_manager.store_conversation("Hello", "Hi", 123, 456, 789)
+        await memory_manager.store_conversation("Oi", "Olá", 999, 456, 789)
+        memory_manager.snapshot_page_size = 1
+
+        manifest = await memory_manager.export_snapshot(str(tmp_path / "snap"))
+
+        monkeypatch.setenv('MEMORY_VECTOR_STORE', 'numpy')
+        monkeypatch.setenv('MEMORY_NUMPY_PATH', str(tmp_path / "vectors"))
+        replica = MemoryManager(embedding_service=mock_embedding_service)
+        replica.snapshot_page_size = 1
+        assert manifest['count'] == 2
+        assert await replica.import_snapshot(str(tmp_path / "snap")) == 2
+        context = await replica.retrieve_context("Oi", 999, 456, 789)
+        assert [memory["content"] for memory in context["semantic"]] == ["User: Oi Bot: Olá"]
+        replica.close()
@@ -0,0 +1,109 @@
+import pytest
+import time
+from chatbot.recent_buffer import (
+    ConversationBuffer, RecentInteraction, RecentInteractionBuffer, RecentInteractionStore,
+)
+
+
+def _record(message: str, guild_id=123, channel_id=456, user_id=789, epoch=None) -> RecentInteraction:
+    return RecentInteraction(
+        message, f"Re: {message}", "2026-01-01T00:00:00", epoch or int(time.time()), guild_id, channel_id, user_id
+    )
+
+
+@pytest.mark.unit
+class TestRecentInteraction:
+    def test_uses_slots(self):
+        record = _record("Hello")
+        assert not hasattr(record, '__dict__')
+
+    def test_interns_repeated_ids(self):
+        first = _record("a", guild_id=int("987654321"))
+        second = _record("b", guild_id=int("987654321"))
+        assert first.guild_id is second.guild_id
+
+    def test_dict_style_access_builds_metadata(self):
+        record = RecentInteraction("Hi", "Hello", "2026-01-01T00:00:00", 1767225600, None, 456, 789, "2")
+        assert record["user_message"] == "Hi"
+        assert record["metadata"] == {
+            "guild_id": "none",
+            "channel_id": "456",
+            "user_id": "789",
+            "timestamp": "2026-01-01T00:00:00",
+            "timestamp_epoch": 1767225600,
+            "message_type": "conversation",
+            "tool_calls": "2",
+        }
+        with pytest.raises(KeyError):
+            record["missing"]
+
+
+@pytest.mark.unit
+class TestRecentInteractionBuffer:
+    def test_evicts_least_recently_used_conversation(self):
+        buffer = RecentInteractionBuffer(max_conversations=2)
+        buffer.append("1_1_1", _record("a"), 3)
+        buffer.append("2_2_2", _record("b"), 3)
+        buffer.lookup("1_1_1")
+        buffer.append("3_3_3", _record("c"), 3)
+
+        assert list(buffer) == ["1_1_1", "3_3_3"]
+        assert buffer.snapshot()['evicted'] == 1
+
+    def test_expire_idle_drops_only_idle_conversations(self):
+        buffer = RecentInteractionBuffer(idle_seconds=60)
+        buffer.append("1_1_1", _record("a"), 3)
+        buffer.append("2_2_2", _record("b"), 3)
+        buffer["1_1_1"].last_active -= 120
+        buffer.move_to_end("2_2_2")
+
+        assert buffer.expire_idle() == 1
+        assert list(buffer) == ["2_2_2"]
+        assert buffer.snapshot()['expired'] == 1
+
+    def test_append_resizes_buffer_when_maxlen_changes(self):
+        buffer = RecentInteractionBuffer()
+        for i in range(3):
+            buffer.append("1_1_1", _record(f"m{i}"), 3)
+        buffer.append("1_1_1", _record("m3"), 2)
+
+        conversation = buffer["1_1_1"]
+        assert isinstance(conversation, ConversationBuffer)
+        assert conversation.maxlen == 2
+        assert [item.user_message for item in conversation] == ["m2", "m3"]
+
+    def test_forget_by_scope(self):
+        buffer = RecentInteractionBuffer()
+        buffer.append("123_456_789", _record("a"), 3)
+        buffer.append("999_456_789", _record("b"), 3)
+        buffer.append("123_456_111", _record("c"), 3)
+
+        assert buffer.forget("user", 789) == 2
+        assert list(buffer) == ["123_456_111"]
+        assert buffer.forget("guild", 123) == 1
+        assert buffer == {}
+
+
+@pytest.mark.unit
+class TestRecentInteractionStore:
+    def test_keeps_only_last_n_per_conversation(self, tmp_path):
+        store = RecentInteractionStore(str(tmp_path / "recent.db"))
+        for i in range(5):
+            store.append("123_456_789", _record(f"m{i}"), 3)
+
+        loaded = store.load("123_456_789", 3)
+        store.close()
+
+        assert [item.user_message for item in loaded] == ["m2", "m3", "m4"]
+        assert loaded[0].metadata["guild_id"] == "123"
+
+    def test_delete_older_than_and_forget(self, tmp_path):
+        store = RecentInteractionStore(str(tmp_path / "recent.db"))
+        store.append("123_456_789", _record("old", epoch=100), 3)
+        store.append("123_456_789", _record("new"), 3)
+        store.append("999_456_111", _record("other", guild_id=999, user_id=111), 3)
+
+        assert store.delete_older_than(1000) == 1
+        assert store.forget("guild", 999) == 1
+        assert [item.user_message for item in store.load("123_456_789", 3)] == ["new"]
+        store.close()
@@ -0,0 +1,120 @@
+import pytest
+from unittest.mock import AsyncMock
+from chatbot.memory_manager import MemoryManager
+from chatbot.retrieval_cache import RetrievalCache, embedding_digest, retrieval_scope
+
+pytest_plugins = ('pytest_asyncio',)
+
+SCOPE = retrieval_scope(123, 456, 789)
+DIGEST = embedding_digest([1.0, 0.0, 0.0])
+
+
+@pytest.mark.unit
+class TestRetrievalCache:
+    def test_hit_after_put_and_hit_rate(self):
+        cache = RetrievalCache(max_entries=8, ttl_seconds=60)
+        assert cache.get(SCOPE, DIGEST, 5) is None
+
+        cache.put(SCOPE, DIGEST, 5, [{"content": "a"}], cache.generation)
+
+        assert cache.get(SCOPE, DIGEST, 5) == [{"content": "a"}]
+        assert cache.get(SCOPE, DIGEST, 3) is None
+        assert cache.snapshot()['hit_rate'] == pytest.approx(1 / 3, abs=1e-4)
+
+    def test_entries_expire_after_ttl(self, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr('chatbot.retrieval_cache.time.monotonic', lambda: clock[0])
+        cache = RetrievalCache(max_entries=8, ttl_seconds=10)
+        cache.put(SCOPE, DIGEST, 5, [], cache.generation)
+
+        clock[0] += 11
+
+        assert cache.get(SCOPE, DIGEST, 5) is None
+        assert cache.snapshot()['entries'] == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = RetrievalCache(max_entries=2, ttl_seconds=60)
+        for user_id in (1, 2):
+            cache.put(retrieval_scope(1, 1, user_id), DIGEST, 5, [], cache.generation)
+        cache.get(retrieval_scope(1, 1, 1), DIGEST, 5)
+
+        cache.put(retrieval_scope(1, 1, 3), DIGEST, 5, [], cache.generation)
+
+        assert cache.get(retrieval_scope(1, 1, 2), DIGEST, 5) is None
+        assert cache.get(retrieval_scope(1, 1, 1), DIGEST, 5) == []
+        assert cache.evicted == 1
+
+    def test_forget_drops_matching_user_and_guild_scopes(self):
+        cache = RetrievalCache(max_entries=8, ttl_seconds=60)
+        for scope in (retrieval_scope(1, 10, 100), retrieval_scope(1, 10, 200), retrieval_scope(2, 20, 100)):
+            cache.put(scope, DIGEST, 5, [], cache.generation)
+
+        assert cache.forget("user", 100) == 2
+        assert cache.forget("guild", 1) == 1
+        assert cache.snapshot()['entries'] == 0
+
+    def test_put_from_query_that_raced_an_invalidation_is_discarded(self):
+        cache = RetrievalCache(max_entries=8, ttl_seconds=60)
+        generation = cache.generation
+        cache.invalidate_scope(SCOPE)
+
+        cache.put(SCOPE, DIGEST, 5, [{"content": "stale"}], generation)
+
+        assert cache.get(SCOPE, DIGEST, 5) is None
+
+    def test_zero_size_disables_cache(self):
+        cache = RetrievalCache(max_entries=0, ttl_seconds=60)
+        cache.put(SCOPE, DIGEST, 5, [], cache.generation)
+
+        assert cache.get(SCOPE, DIGEST, 5) is None
+        assert cache.snapshot()['misses'] == 0
+
+
+@pytest.mark.unit
+class TestMemoryManagerRetrievalCache:
+    @pytest.fixture
+    def manager(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('MEMORY_VECTOR_STORE', 'numpy')
+        monkeypatch.setenv('MEMORY_NUMPY_PATH', str(tmp_path))
+        monkeypatch.setenv('MEMORY_SIMILARITY_THRESHOLD', '0')
+        embedding_service = AsyncMock()
+        embedding_service.embed_text.return_value = [1.0, 0.0, 0.0]
+        manager = MemoryManager(embedding_service=embedding_service)
+        queries = []
+        query = manager._store.query
+        manager._store.query = lambda *args: queries.append(args) or query(*args)
+        manager.queries = queries
+        yield manager
+        manager.close()
+
+    async def test_repeated_query_is_served_from_cache(self, manager):
+        await manager.store_conversation("oi", "olá", 123, 456, 789)
+
+        first = await manager.retrieve_context("pergunta", 123, 456, 789)
+        second = await manager.retrieve_context("pergunta", 123, 456, 789)
+
+        assert second["semantic"] == first["semantic"]
+        assert len(second["semantic"]) == 1
+        assert len(manager.queries) == 1
+        assert manager.get_metrics()["retrieval_cache"]["hits"] == 1
+
+    async def test_store_conversation_invalidates_only_its_scope(self, manager):
+        await manager.retrieve_context("pergunta", 123, 456, 789)
+        await manager.retrieve_context("pergunta", 123, 456, 111)
+
+        await manager.store_conversation("oi", "olá", 123, 456, 789)
+        result = await manager.retrieve_context("pergunta", 123, 456, 789)
+        await manager.retrieve_context("pergunta", 123, 456, 111)
+
+        assert len(result["semantic"]) == 1
+        assert len(manager.queries) == 3
+
+    async def test_delete_user_memories_invalidates_cached_results(self, manager):
+        await manager.store_conversation("oi", "olá", 123, 456, 789)
+        await manager.retrieve_context("pergunta", 123, 456, 789)
+
+        await manager.delete_user_memories(789)
+        result = await manager.retrieve_context("pergunta", 123, 456, 789)
+
+        assert result["semantic"] == []
+        assert len(manager.queries) == 2
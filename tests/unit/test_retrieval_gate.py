@@ -0,0 +1,119 @@
+import pytest
+from unittest.mock import AsyncMock
+from chatbot.memory_manager import MemoryManager
+from chatbot.retrieval_gate import MODE_NONE, MODE_RECENT, MODE_SEMANTIC, HashedNgramClassifier, RetrievalGate
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest.mark.unit
+class TestRetrievalGateRules:
+    @pytest.mark.parametrize("text", ["<@123456>", "<@!123456> tangerina", "tangerina pula", "Tangerina, para!", "volume 50", ""])
+    def test_skips_retrieval_for_mentions_and_controls(self, text):
+        assert RetrievalGate().decide(text) == MODE_NONE
+
+    @pytest.mark.parametrize("text", ["tangerina toca legião urbana", "oi tangerina", "valeu!", "tudo bem?"])
+    def test_uses_recent_only_for_play_requests_and_small_talk(self, text):
+        assert RetrievalGate().decide(text) == MODE_RECENT
+
+    @pytest.mark.parametrize("text", ["lembra?", "toca aquela música de ontem", "qual é meu nome", "o que acha de jogar hoje à noite"])
+    def test_uses_semantic_retrieval_for_memory_cues_and_longer_messages(self, text):
+        assert RetrievalGate().decide(text) == MODE_SEMANTIC
+
+    def test_disabled_gate_always_retrieves_semantically(self):
+        gate = RetrievalGate(enabled=False)
+
+        assert gate.decide("tangerina pula") == MODE_SEMANTIC
+        assert gate.snapshot()['reasons'] == {'disabled': 1}
+
+    def test_counts_decisions_and_reasons(self):
+        gate = RetrievalGate()
+        for text in ["tangerina pula", "<@1>", "oi", "lembra de mim?"]:
+            gate.decide(text)
+
+        snapshot = gate.snapshot()
+
+        assert snapshot['decisions'] == {MODE_SEMANTIC: 1, MODE_RECENT: 1, MODE_NONE: 2}
+        assert snapshot['reasons'] == {'control': 1, 'bare_mention': 1, 'small_talk': 1, 'memory_cue': 1}
+
+
+@pytest.mark.unit
+class TestHashedNgramClassifier:
+    TEXTS = [
+        "qual a capital da frança", "me explica como funciona a fotossíntese", "quem ganhou a copa de 2002",
+        "bora jogar", "kkkkkk boa", "tô saindo galera",
+        "desliga aí", "cala a boca", "chega de música",
+    ]
+    LABELS = [MODE_SEMANTIC] * 3 + [MODE_RECENT] * 3 + [MODE_NONE] * 3
+
+    def test_fit_separates_training_examples(self):
+        classifier = HashedNgramClassifier.fit(self.TEXTS, self.LABELS, n_features=512)
+
+        assert [classifier.predict(text)[0] for text in self.TEXTS] == self.LABELS
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        classifier = HashedNgramClassifier.fit(self.TEXTS, self.LABELS, n_features=512)
+        path = str(tmp_path / "gate.npz")
+        classifier.save(path)
+
+        loaded = HashedNgramClassifier.load(path, threshold=0.5)
+
+        assert loaded.labels == classifier.labels
+        assert loaded.threshold == 0.5
+        assert loaded.predict("chega de música") == pytest.approx(classifier.predict("chega de música"))
+
+    def test_rejects_unknown_labels(self):
+        with pytest.raises(ValueError):
+            HashedNgramClassifier.fit(["oi"], ["maybe"])
+
+    def test_gate_uses_confident_model_before_length_heuristic(self):
+        classifier = HashedNgramClassifier.fit(self.TEXTS, self.LABELS, n_features=512)
+        classifier.threshold = 0.0
+        gate = RetrievalGate(classifier=classifier)
+
+        assert gate.decide("desliga aí") == MODE_NONE
+        assert gate.snapshot()['reasons'] == {'model': 1}
+
+    def test_from_env_falls_back_to_rules_when_model_missing(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('RETRIEVAL_GATE_MODEL_PATH', str(tmp_path / "missing.npz"))
+
+        gate = RetrievalGate.from_env()
+
+        assert gate.classifier is None
+        assert gate.decide("tangerina pula") == MODE_NONE
+
+
+@pytest.mark.unit
+class TestRetrieveForMessage:
+    @pytest.fixture
+    def manager(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('MEMORY_VECTOR_STORE', 'numpy')
+        monkeypatch.setenv('MEMORY_NUMPY_PATH', str(tmp_path))
+        embedding_service = AsyncMock()
+        embedding_service.embed_text.return_value = [1.0, 0.0, 0.0]
+        manager = MemoryManager(embedding_service=embedding_service)
+        yield manager
+        manager.close()
+
+    async def test_control_command_skips_embedding_and_recent(self, manager):
+        result = await manager.retrieve_for_message("tangerina pula", 123, 456, 789)
+
+        assert result == {"recent": [], "semantic": []}
+        manager.embedding_service.embed_text.assert_not_called()
+
+    async def test_small_talk_returns_recent_without_embedding(self, manager):
+        await manager.store_conversation("oi", "olá!", 123, 456, 789)
+        manager.embedding_service.embed_text.reset_mock()
+
+        result = await manager.retrieve_for_message("valeu", 123, 456, 789)
+
+        assert len(result["recent"]) == 1
+        assert result["semantic"] == []
+        manager.embedding_service.embed_text.assert_not_called()
+
+    async def test_memory_question_runs_semantic_search(self, manager):
+        result = await manager.retrieve_for_message("você lembra do que eu te disse ontem?", 123, 456, 789)
+
+        assert "semantic" in result
+        manager.embedding_service.embed_text.assert_awaited_once()
+        assert manager.get_metrics()["retrieval_gate"]["decisions"][MODE_SEMANTIC] == 1
@@ -0,0 +1,161 @@
+import pytest
+import numpy as np
+from chatbot.memory_manager import MemoryManager
+from chatbot.numpy_vector_store import COMPACTION_MIN_DEAD, NumpyVectorStore
+from chatbot.vector_store import ChromaVectorStore, vector_store_backend
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+def _metadata(guild_id="1", channel_id="10", user_id="100", epoch=0):
+    return {"guild_id": guild_id, "channel_id": channel_id, "user_id": user_id, "timestamp_epoch": epoch}
+
+
+def _unit(index: int, dim: int = 8):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[index] = 1.0
+    return vector.tolist()
+
+
+@pytest.mark.unit
+class TestNumpyVectorStore:
+    def test_query_returns_top_k_by_cosine_similarity(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path))
+        store.add(
+            ids=["a", "b", "c"],
+            embeddings=[_unit(0), _unit(1), [1.0, 1.0] + [0.0] * 6],
+            documents=["doc a", "doc b", "doc c"],
+            metadatas=[_metadata(), _metadata(), _metadata()]
+        )
+
+        results = store.query(_unit(0), 1, 10, 100, n_results=2)
+
+        assert [result["content"] for result in results] == ["doc a", "doc c"]
+        assert results[0]["distance"] == pytest.approx(0.0, abs=1e-6)
+        assert results[1]["distance"] == pytest.approx(1 - 1 / np.sqrt(2), abs=1e-6)
+
+    def test_scopes_are_isolated(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path))
+        store.add(["a"], [_unit(0)], ["guild 1"], [_metadata(guild_id="1")])
+        store.add(["b"], [_unit(0)], ["guild 2"], [_metadata(guild_id="2")])
+
+        assert [r["content"] for r in store.query(_unit(0), 2, 10, 100, 5)] == ["guild 2"]
+        assert store.query(_unit(0), None, 10, 100, 5) == []
+        assert store.count() == 2
+
+    def test_data_survives_reopen(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path))
+        store.add(["a", "b"], [_unit(0), _unit(1)], ["doc a", "doc b"], [_metadata(), _metadata()])
+        store.delete(("1", "10", "100"), ["b"])
+        store.close()
+
+        reopened = NumpyVectorStore(str(tmp_path))
+
+        assert reopened.partitions() == [("1", "10", "100")]
+        assert [r["content"] for r in reopened.query(_unit(1), 1, 10, 100, 5)] == ["doc a"]
+
+    def test_get_ids_filters_and_limits(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path))
+        store.add(
+            ids=["old1", "old2", "new"],
+            embeddings=[_unit(0), _unit(1), _unit(2)],
+            documents=["x", "y", "z"],
+            metadatas=[_metadata(epoch=1), _metadata(epoch=2), _metadata(epoch=100)]
+        )
+        partition = ("1", "10", "100")
+
+        assert store.get_ids(partition, {"timestamp_epoch": {"$lt": 50}}, 10) == ["old1", "old2"]
+        assert store.get_ids(partition, {"user_id": "100"}, 1) == ["old1"]
+        assert store.get_ids(partition, {"$and": [{"user_id": "100"}, {"timestamp_epoch": {"$lt": 2}}]}, 10) == ["old1"]
+
+    def test_delete_compacts_when_many_rows_are_dead(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path))
+        total = COMPACTION_MIN_DEAD * 2
+        ids = [f"id{i}" for i in range(total)]
+        store.add(ids, [_unit(i % 8) for i in range(total)], ids, [_metadata() for _ in ids])
+
+        store.delete(("1", "10", "100"), ids[:COMPACTION_MIN_DEAD])
+
+        assert store.snapshot()["compactions"] == 1
+        assert store.count() == COMPACTION_MIN_DEAD
+        vectors_size = (tmp_path / "g1" / "c10_u100" / "vectors.f32").stat().st_size
+        assert vectors_size == COMPACTION_MIN_DEAD * 8 * 4
+
+    def test_drop_guild_removes_all_scopes(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path))
+        store.add(["a", "b"], [_unit(0), _unit(1)], ["x", "y"], [_metadata(user_id="100"), _metadata(user_id="200")])
+        store.add(["c"], [_unit(0)], ["z"], [_metadata(guild_id="2")])
+
+        assert store.drop_guild(1) == 2
+        assert store.partitions() == [("2", "10", "100")]
+
+    def test_rejects_mismatched_dimension(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path))
+        store.add(["a"], [_unit(0)], ["x"], [_metadata()])
+
+        with pytest.raises(ValueError):
+            store.add(["b"], [[1.0, 0.0]], ["y"], [_metadata()])
+
+    def test_float16_storage_halves_vector_file_and_reopens(self, tmp_path):
+        store = NumpyVectorStore(str(tmp_path), dtype='float16')
+        store.add(["a", "b"], [_unit(0), _unit(1)], ["doc a", "doc b"], [_metadata(), _metadata()])
+        store.close()
+
+        reopened = NumpyVectorStore(str(tmp_path))
+        vectors = tmp_path / "g1" / "c10_u100" / "vectors.f16"
+
+        assert vectors.stat().st_size == 2 * 8 * 2
+        assert [r["content"] for r in reopened.query(_unit(1), 1, 10, 100, 1)] == ["doc b"]
+
+    def test_rejects_unknown_dtype(self, tmp_path):
+        with pytest.raises(ValueError):
+            NumpyVectorStore(str(tmp_path), dtype='int8')
+
+
+@pytest.mark.unit
+class TestVectorStoreSelection:
+    def test_backend_from_env(self, monkeypatch):
+        monkeypatch.setenv('MEMORY_VECTOR_STORE', 'NumPy')
+        assert vector_store_backend() == 'numpy'
+        monkeypatch.setenv('MEMORY_VECTOR_STORE', 'faiss')
+        assert vector_store_backend() == 'chroma'
+
+    def test_chroma_store_without_guild_collection_returns_nothing(self, ephemeral_chromadb):
+        from chatbot.memory_layout import CollectionCache
+        store = ChromaVectorStore(collections=CollectionCache(ephemeral_chromadb, "test_unused"))
+        assert store.query(_unit(0), 1, 10, 100, 5) == []
+        assert store.drop_guild(1) == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestMemoryManagerWithNumpyStore:
+    @pytest.fixture
+    def numpy_memory_manager(self, mock_embedding_service, monkeypatch, tmp_path):
+        monkeypatch.setenv('MEMORY_VECTOR_STORE', 'numpy')
+        monkeypatch.setenv('MEMORY_NUMPY_PATH', str(tmp_path))
+        manager = MemoryManager(embedding_service=mock_embedding_service)
+        yield manager
+        manager.close()
+
+    async def test_store_and_retrieve(self, numpy_memory_manager):
+        assert isinstance(numpy_memory_manager._store, NumpyVectorStore)
+        assert numpy_memory_manager._collection is None
+
+        await numpy_memory_manager.store_conversation("Hello", "Hi", 123, 456, 789)
+        context = await numpy_memory_manager.retrieve_context("Hello", 123, 456, 789)
+
+        assert [mem["content"] for mem in context["semantic"]] == ["User: Hello Bot: Hi"]
+        assert context["semantic"][0]["similarity"] == pytest.approx(1.0, abs=1e-5)
+        assert numpy_memory_manager.get_metrics()["store"]["backend"] == "numpy"
+
+    async def test_purge_and_cleanup(self, numpy_memory_manager):
+        await numpy_memory_manager.store_conversation("Hello", "Hi", 123, 456, 789)
+        await numpy_memory_manager.store_conversation("Oi", "Olá", 999, 456, 789)
+        await numpy_memory_manager.store_conversation("Bye", "Tchau", 999, 456, 111)
+
+        assert await numpy_memory_manager.delete_guild_memories(123) == 1
+        assert await numpy_memory_manager.delete_user_memories(789) == 1
+        numpy_memory_manager.retention_days = -1
+        assert await numpy_memory_manager.cleanup_old_memories() == 1
+        assert numpy_memory_manager._store.count() == 0
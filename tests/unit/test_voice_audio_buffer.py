@@ -0,0 +1,134 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from features.voice.audio_buffer import PcmBuffer, PcmBufferPool, PcmRing
+from features.voice.vad import UtteranceSegmenter
+from features.voice.voice_commands import VoiceCommandSink
+from tests.conftest import TEST_GUILD_ID
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class _AlwaysSpeech:
+    def is_speech(self, samples):
+        return True
+
+
+@pytest.mark.unit
+class TestPcmRing:
+    def test_keeps_most_recent_bytes_across_wraparound(self):
+        ring = PcmRing(max_frames=3, frame_bytes=2)
+        for frame in (b'aa', b'bb', b'cc', b'dd', b'ee'):
+            ring.write(frame)
+        buffer = PcmBuffer(16)
+
+        ring.copy_into(buffer)
+
+        assert bytes(buffer.view()) == b'ccddee'
+        assert buffer.frames == 3
+
+    def test_oversized_frame_keeps_its_tail(self):
+        ring = PcmRing(max_frames=2, frame_bytes=2)
+        ring.write(b'123456')
+        buffer = PcmBuffer(4)
+
+        ring.copy_into(buffer)
+
+        assert bytes(buffer.view()) == b'3456'
+
+
+@pytest.mark.unit
+class TestPcmBufferPool:
+    def test_released_buffers_are_reused_and_reset(self):
+        pool = PcmBufferPool(8, max_idle=1)
+        buffer = pool.acquire()
+        buffer.append(b'abcd')
+
+        buffer.release()
+        reused = pool.acquire()
+
+        assert reused is buffer
+        assert reused.length == 0 and reused.frames == 0
+        assert pool.snapshot()['reused'] == 1
+
+    def test_grown_and_surplus_buffers_are_discarded(self):
+        pool = PcmBufferPool(4, max_idle=1)
+        grown, surplus = pool.acquire(), pool.acquire()
+        grown.append(b'123456')
+
+        grown.release()
+        surplus.release()
+        pool.acquire().release()
+
+        assert pool.snapshot() == {'idle': 1, 'buffer_bytes': 4, 'allocated': 2, 'reused': 1, 'discarded': 1}
+
+    def test_segmenter_returns_dropped_utterances_to_pool(self):
+        pool = PcmBufferPool(4096)
+        segmenter = UtteranceSegmenter(_AlwaysSpeech(), min_speech_ms=1000, pool=pool)
+        for _ in range(5):
+            segmenter.push(b'chunk')
+
+        assert segmenter.flush() is None
+        assert pool.snapshot()['idle'] == 1
+
+
+@pytest.mark.unit
+class TestSinkBufferEviction:
+    @pytest.fixture
+    def sink(self):
+        sink = VoiceCommandSink(
+            bot_instance=MagicMock(),
+            voice_client=MagicMock(),
+            guild_id=TEST_GUILD_ID,
+            zhipu_api_key=None,
+            whisper_provider='sidecar',
+            music_service=MagicMock()
+        )
+        sink._health_monitor_started = True
+        return sink
+
+    def _speaking(self, pool):
+        segmenter = UtteranceSegmenter(_AlwaysSpeech(), pool=pool)
+        for _ in range(15):
+            segmenter.push(b'\x01\x00\x03\x00')
+        return segmenter
+
+    def test_evict_user_releases_open_utterance(self, sink):
+        pool = PcmBufferPool(4096)
+        sink.audio_buffers[999] = self._speaking(pool)
+        sink.last_audio_timestamps[999] = 1.0
+
+        sink.evict_user(999)
+        sink.evict_user(999)
+
+        assert 999 not in sink.audio_buffers
+        assert 999 not in sink.last_audio_timestamps
+        assert pool.snapshot()['idle'] == 1
+
+    def test_idle_eviction_keeps_active_speakers(self, sink):
+        pool = PcmBufferPool(4096)
+        sink.audio_buffers[999] = self._speaking(pool)
+        sink.audio_buffers[888] = UtteranceSegmenter(_AlwaysSpeech(), pool=pool)
+        sink.last_audio_timestamps = {999: 0.0, 888: 0.0}
+
+        sink._evict_idle_buffers(now=10_000.0)
+
+        assert list(sink.audio_buffers) == [999]
+        assert sink.last_audio_timestamps == {999: 0.0}
+
+    async def test_processed_utterance_is_released_before_transcription(self, sink):
+        pool = PcmBufferPool(4096)
+        utterance = self._speaking(pool).flush()
+        member = MagicMock()
+        member.id = 999
+        member.display_name = 'tester'
+
+        async def transcribe(audio_data):
+            assert pool.snapshot()['idle'] == 1
+            return None
+
+        sink._transcribe_audio = AsyncMock(side_effect=transcribe)
+
+        await sink._enqueue_utterance(member, utterance)
+
+        sink._transcribe_audio.assert_awaited_once()
+        assert pool.snapshot()['idle'] == 1
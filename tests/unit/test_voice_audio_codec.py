@@ -0,0 +1,93 @@
+import io
+import wave
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+from features.voice import audio_codec
+from features.voice.audio_codec import FORMAT_FLAC, FORMAT_OPUS, FORMAT_WAV, encode_wav, negotiate_format
+from features.voice.voice_commands import VoiceCommandSink
+from tests.conftest import TEST_GUILD_ID
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+def _wav(seconds: float = 1.0, rate: int = 16000) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    samples = (np.sin(2 * np.pi * 300 * t) * 6000).astype('<i2')
+    output = io.BytesIO()
+    with wave.open(output, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(samples.tobytes())
+    return output.getvalue()
+
+
+@pytest.mark.unit
+class TestUploadFormatNegotiation:
+    @pytest.fixture
+    def all_encoders(self, monkeypatch):
+        monkeypatch.delenv('VOICE_AUDIO_UPLOAD_FORMAT', raising=False)
+        monkeypatch.setattr(audio_codec, 'encoder_available', lambda fmt: True)
+
+    def test_prefers_opus_where_accepted(self, all_encoders):
+        assert negotiate_format('sidecar') == FORMAT_OPUS
+        assert negotiate_format('openai-api') == FORMAT_OPUS
+        assert negotiate_format('zhipu') == FORMAT_WAV
+        assert negotiate_format('openai') == FORMAT_WAV
+
+    def test_configured_format_is_used_only_when_provider_accepts_it(self, all_encoders, monkeypatch):
+        monkeypatch.setenv('VOICE_AUDIO_UPLOAD_FORMAT', 'flac')
+
+        assert negotiate_format('sidecar') == FORMAT_FLAC
+        assert negotiate_format('zhipu') == FORMAT_WAV
+        assert negotiate_format('sidecar', preferred='wav') == FORMAT_WAV
+
+    def test_falls_back_to_wav_without_soundfile(self, monkeypatch):
+        monkeypatch.setattr(audio_codec, 'soundfile', None)
+
+        assert negotiate_format('sidecar') == FORMAT_WAV
+        assert negotiate_format('sidecar', preferred='opus') == FORMAT_WAV
+
+
+@pytest.mark.unit
+class TestEncodeWav:
+    def test_wav_and_unreadable_input_are_sent_unchanged(self):
+        assert encode_wav(b'RIFF', FORMAT_WAV).data == b'RIFF'
+        fallback = encode_wav(b'not a wav', FORMAT_FLAC)
+
+        assert (fallback.data, fallback.format, fallback.filename) == (b'not a wav', FORMAT_WAV, 'audio.wav')
+
+    @pytest.mark.parametrize('fmt, content_type', [(FORMAT_FLAC, 'audio/flac'), (FORMAT_OPUS, 'audio/ogg')])
+    def test_compressed_upload_is_smaller(self, fmt, content_type):
+        soundfile = pytest.importorskip('soundfile')
+        if not audio_codec.encoder_available(fmt):
+            pytest.skip(f"libsndfile cannot encode {fmt}")
+        wav_bytes = _wav()
+
+        encoded = encode_wav(wav_bytes, fmt)
+
+        assert encoded.format == fmt and encoded.content_type == content_type
+        assert len(encoded.data) < len(wav_bytes) // 2
+        decoded, rate = soundfile.read(io.BytesIO(encoded.data), dtype='int16')
+        assert rate == 16000 and abs(len(decoded) - 16000) < 1000
+
+
+@pytest.mark.unit
+class TestSinkUpload:
+    async def test_sidecar_upload_uses_negotiated_format(self, monkeypatch):
+        monkeypatch.setattr(audio_codec, 'encoder_available', lambda fmt: fmt != FORMAT_OPUS)
+        sink = VoiceCommandSink(
+            bot_instance=MagicMock(),
+            voice_client=MagicMock(),
+            guild_id=TEST_GUILD_ID,
+            zhipu_api_key=None,
+            whisper_provider='sidecar',
+            music_service=MagicMock()
+        )
+        monkeypatch.setattr('features.voice.voice_commands.encode_wav', lambda data, fmt: audio_codec.EncodedAudio(data, fmt))
+
+        upload = await sink._encode_upload(io.BytesIO(b'wav'))
+
+        assert sink.upload_format == FORMAT_FLAC
+        assert (upload.data, upload.filename, upload.content_type) == (b'wav', 'audio.flac', 'audio/flac')
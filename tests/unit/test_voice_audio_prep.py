@@ -0,0 +1,81 @@
+import wave
+import pytest
+import numpy as np
+from features.voice.audio_prep import AudioPrep, _filter_decimate, lowpass_taps, normalize_loudness, resample, stereo_to_mono, trim_silence
+
+
+def _sine(frequency: float, seconds: float = 1.0, rate: int = 48000, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * rate)) / rate
+    return (np.sin(2 * np.pi * frequency * t) * amplitude).astype(np.float32)
+
+
+def _stereo_pcm(samples: np.ndarray) -> bytes:
+    return np.repeat(np.rint(samples * 32767).astype('<i2'), 2).tobytes()
+
+
+def _amplitude(samples: np.ndarray) -> float:
+    inner = samples[len(samples) // 10:-len(samples) // 10]
+    return float(np.sqrt(2 * np.mean(np.square(inner))))
+
+
+@pytest.mark.unit
+class TestAudioPrep:
+    def test_stereo_to_mono_mixes_channels(self):
+        pcm = np.array([16384, -16384, 8192, 8192], dtype='<i2').tobytes() + b'\x01'
+
+        assert stereo_to_mono(pcm).tolist() == [0.0, 0.25]
+        assert stereo_to_mono(memoryview(b'\x00\x01')).size == 0
+
+    def test_polyphase_decimation_matches_direct_filtering(self):
+        samples = np.random.default_rng(0).standard_normal(1001).astype(np.float32)
+        taps = lowpass_taps(3, 0.15)
+
+        direct = np.convolve(samples, taps)[(len(taps) - 1) // 2:][:len(samples)][::3]
+
+        np.testing.assert_allclose(_filter_decimate(samples, 3, taps), direct, atol=1e-5)
+
+    def test_resample_keeps_speech_band_and_removes_aliases(self):
+        speech = resample(_sine(1000), 48000, 16000)
+        alias = resample(_sine(12000), 48000, 16000)
+
+        assert speech.size == 16000
+        assert _amplitude(speech) == pytest.approx(0.5, rel=0.01)
+        assert _amplitude(alias) < 0.001
+        assert resample(_sine(1000, rate=16000), 16000, 24000).size == 24000
+
+    def test_trim_silence_keeps_padding_around_speech(self):
+        samples = np.concatenate([np.zeros(48000), _sine(440, 0.5), np.zeros(48000)])
+
+        trimmed = trim_silence(samples, 48000, pad_ms=100)
+
+        assert trimmed.size == 24000 + 2 * 4800
+        assert trim_silence(np.zeros(48000, dtype=np.float32), 48000).size == 48000
+
+    def test_normalize_boosts_quiet_speech_within_limits(self):
+        quiet = _sine(440, amplitude=0.03)
+
+        louder = normalize_loudness(quiet, target_dbfs=-20)
+        capped = normalize_loudness(quiet, target_dbfs=0, max_gain_db=6)
+
+        assert 20 * np.log10(np.sqrt(np.mean(np.square(louder)))) == pytest.approx(-20, abs=0.1)
+        assert np.max(np.abs(capped)) == pytest.approx(0.06, rel=0.01)
+        assert np.max(np.abs(normalize_loudness(_sine(440, amplitude=0.9), target_dbfs=0))) <= 0.98
+
+    def test_to_wav_writes_16khz_mono(self):
+        pcm = _stereo_pcm(np.concatenate([np.zeros(4800), _sine(300, 1.0, amplitude=0.1), np.zeros(4800)]))
+
+        result = AudioPrep().to_wav(pcm)
+
+        with wave.open(result, 'rb') as wav_file:
+            assert (wav_file.getnchannels(), wav_file.getframerate(), wav_file.getsampwidth()) == (1, 16000, 2)
+            assert wav_file.getnframes() < len(pcm) // 4 // 2
+
+    def test_from_env_can_disable_stages(self, monkeypatch):
+        monkeypatch.setenv('VOICE_TRANSCRIPTION_SAMPLE_RATE', '48000')
+        monkeypatch.setenv('VOICE_AUDIO_NORMALIZE', 'false')
+        monkeypatch.setenv('VOICE_AUDIO_TRIM_SILENCE', 'false')
+        samples = np.concatenate([np.zeros(4800), _sine(300, 0.1, amplitude=0.1)])
+
+        prep = AudioPrep.from_env()
+
+        np.testing.assert_allclose(prep.process(_stereo_pcm(samples)), samples, atol=1e-4)
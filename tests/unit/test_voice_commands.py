@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import numpy as np
 from unittest.mock import AsyncMock, MagicMock, patch
 import discord
 from features.voice.voice_commands import (
@@ -10,8 +11,21 @@ from features.voice.voice_commands import (
     LISTENING_DURATION,
     VoiceCommandSink
 )
+from features.voice.vad import UtteranceSegmenter
 from tests.conftest import TEST_GUILD_ID
 
+
+class _AlwaysSpeech:
+    def is_speech(self, samples):
+        return True
+
+
+def _speech_buffer(chunks):
+    segmenter = UtteranceSegmenter(_AlwaysSpeech())
+    for chunk in chunks:
+        segmenter.push(chunk)
+    return segmenter
+
 @pytest.mark.unit
 class TestVoiceCommandConstants:
     def test_wake_word_is_tangerina(self):
@@ -242,9 +256,7 @@ class TestVoiceCommandSinkTranscription:
         mock_member = MagicMock(spec=discord.Member)
         mock_member.id = 999
 
-        from collections import deque
-        sink.audio_buffers[999] = deque(maxlen=150)
-        sink.audio_buffers[999].append(b'chunk1')
+        sink.audio_buffers[999] = _speech_buffer([b'chunk1'])
         await sink.process_speech(mock_member)
         
         sink._transcribe_audio.assert_not_called()
@@ -260,10 +272,7 @@ class TestVoiceCommandSinkTranscription:
         mock_member.id = 999
         mock_member.display_name = "TestUser"
 
-        from collections import deque
-        sink.audio_buffers[999] = deque(maxlen=150)
-        for _ in range(15):
-            sink.audio_buffers[999].append(b'chunk')
+        sink.audio_buffers[999] = _speech_buffer([b'chunk'] * 15)
         
         await sink.process_speech(mock_member)
         assert len(sink.audio_buffers[999]) == 0
@@ -492,8 +501,9 @@ class TestVoiceCommandSinkTranscriptionProviders:
         import io
         audio_data = io.BytesIO(b'test')
         
-        with patch('aiohttp.ClientSession') as mock_session:
-            mock_session.return_value.__aenter__.return_value.post.side_effect = RuntimeError()
+        session = MagicMock()
+        session.post.side_effect = RuntimeError()
+        with patch.object(sink.transcription_clients, 'session', return_value=session):
             result = await sink._transcribe_sidecar(audio_data)
             assert result is None
 
@@ -554,8 +564,9 @@ class TestVoiceCommandErrorHandling:
         import io
         audio_data = io.BytesIO(b'test')
         
-        with patch('aiohttp.ClientSession') as mock_session:
-            mock_session.return_value.__aenter__.return_value.post.side_effect = asyncio.TimeoutError()
+        session = MagicMock()
+        session.post.side_effect = asyncio.TimeoutError()
+        with patch.object(sink.transcription_clients, 'session', return_value=session):
             result = await sink._transcribe_sidecar(audio_data)
             assert result is None
 
@@ -566,16 +577,18 @@ class TestVoiceCommandErrorHandling:
         import io
         audio_data = io.BytesIO(b'test')
         
-        with patch('aiohttp.ClientSession') as mock_session:
-            mock_response = AsyncMock()
-            mock_response.status = 500
-            mock_response.text = AsyncMock(return_value='Internal Server Error')
-            
-            mock_post = AsyncMock(return_value=mock_response)
-            mock_session.return_value.__aenter__.return_value.post = mock_post
-            
+        mock_response = MagicMock()
+        mock_response.status = 500
+        mock_response.text = AsyncMock(return_value='Internal Server Error')
+        session = MagicMock()
+        session.post.return_value.__aenter__.return_value = mock_response
+        errors_before = sink.transcription_clients.snapshot().get('sidecar', {}).get('errors', 0)
+
+        with patch.object(sink.transcription_clients, 'session', return_value=session):
             result = await sink._transcribe_sidecar(audio_data)
             assert result is None
+        mock_response.text.assert_awaited_once()
+        assert sink.transcription_clients.snapshot()['sidecar']['errors'] == errors_before + 1
 
     @pytest.mark.asyncio
     async def test_transcribe_zhipu_network_timeout(self):
@@ -595,8 +608,9 @@ class TestVoiceCommandErrorHandling:
         import io
         audio_data = io.BytesIO(b'test')
         
-        with patch('aiohttp.ClientSession') as mock_session:
-            mock_session.return_value.__aenter__.return_value.post.side_effect = asyncio.TimeoutError()
+        session = MagicMock()
+        session.post.side_effect = asyncio.TimeoutError()
+        with patch.object(sink.transcription_clients, 'session', return_value=session):
             result = await sink._transcribe_zhipu(audio_data)
             assert result is None
 
@@ -618,16 +632,18 @@ class TestVoiceCommandErrorHandling:
         import io
         audio_data = io.BytesIO(b'test')
         
-        with patch('aiohttp.ClientSession') as mock_session:
-            mock_response = AsyncMock()
-            mock_response.status = 500
-            mock_response.text = AsyncMock(return_value='Internal Server Error')
-            
-            mock_post = AsyncMock(return_value=mock_response)
-            mock_session.return_value.__aenter__.return_value.post = mock_post
-            
+        mock_response = MagicMock()
+        mock_response.status = 500
+        mock_response.text = AsyncMock(return_value='Internal Server Error')
+        session = MagicMock()
+        session.post.return_value.__aenter__.return_value = mock_response
+        errors_before = sink.transcription_clients.snapshot().get('zhipu', {}).get('errors', 0)
+
+        with patch.object(sink.transcription_clients, 'session', return_value=session):
             result = await sink._transcribe_zhipu(audio_data)
             assert result is None
+        mock_response.text.assert_awaited_once()
+        assert sink.transcription_clients.snapshot()['zhipu']['errors'] == errors_before + 1
 
     def test_write_corrupt_audio_data(self, sink_instance):
         sink, _, _, _ = sink_instance
@@ -670,12 +686,8 @@ class TestVoiceCommandErrorHandling:
         mock_member2.id = 888
         mock_member2.display_name = "User2"
 
-        from collections import deque
-        sink.audio_buffers[999] = deque(maxlen=150)
-        sink.audio_buffers[888] = deque(maxlen=150)
-        for _ in range(15):
-            sink.audio_buffers[999].append(b'chunk')
-            sink.audio_buffers[888].append(b'chunk')
+        sink.audio_buffers[999] = _speech_buffer([b'chunk'] * 15)
+        sink.audio_buffers[888] = _speech_buffer([b'chunk'] * 15)
         
         await asyncio.gather(
             sink.process_speech(mock_member1),
@@ -696,10 +708,7 @@ class TestVoiceCommandErrorHandling:
         mock_member.id = 999
         mock_member.display_name = "TestUser"
 
-        from collections import deque
-        sink.audio_buffers[999] = deque(maxlen=150)
-        for _ in range(15):
-            sink.audio_buffers[999].append(b'chunk')
+        sink.audio_buffers[999] = _speech_buffer([b'chunk'] * 15)
 
         mock_vc.is_connected.return_value = False
         sink._voice_client = None
@@ -709,18 +718,22 @@ class TestVoiceCommandErrorHandling:
         assert sink._transcribe_audio.called
         assert sink._route_speech.called
 
-    def test_audio_buffer_overflow(self, sink_instance):
+    def test_audio_buffer_overflow(self, sink_instance, monkeypatch):
+        monkeypatch.setenv('VOICE_VAD_MAX_UTTERANCE_MS', '3000')
         sink, _, _, _ = sink_instance
+        sink._schedule = MagicMock(side_effect=lambda coro: coro.close())
         
         mock_user = MagicMock(spec=discord.Member)
         mock_user.id = 999
         mock_audio_data = MagicMock()
-        mock_audio_data.pcm = b'audio_data'
+        tone = (np.sin(2 * np.pi * 220 * np.arange(960) / 48000) * 8000).astype('<i2')
+        mock_audio_data.pcm = np.repeat(tone, 2).tobytes()
         
         for _ in range(200):
             sink.write(mock_user, mock_audio_data)
         
         assert len(sink.audio_buffers[999]) <= 150
+        sink._schedule.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_process_speech_handles_transcription_failure(self, sink_instance):
@@ -733,10 +746,7 @@ class TestVoiceCommandErrorHandling:
         mock_member.id = 999
         mock_member.display_name = "TestUser"
 
-        from collections import deque
-        sink.audio_buffers[999] = deque(maxlen=150)
-        for _ in range(15):
-            sink.audio_buffers[999].append(b'chunk')
+        sink.audio_buffers[999] = _speech_buffer([b'chunk'] * 15)
         
         await sink.process_speech(mock_member)
         
@@ -754,10 +764,7 @@ class TestVoiceCommandErrorHandling:
         mock_member.id = 999
         mock_member.display_name = "TestUser"
 
-        from collections import deque
-        sink.audio_buffers[999] = deque(maxlen=150)
-        for _ in range(15):
-            sink.audio_buffers[999].append(b'chunk')
+        sink.audio_buffers[999] = _speech_buffer([b'chunk'] * 15)
         
         await sink.process_speech(mock_member)
         
@@ -775,10 +782,7 @@ class TestVoiceCommandErrorHandling:
         mock_member.id = 999
         mock_member.display_name = "TestUser"
 
-        from collections import deque
-        sink.audio_buffers[999] = deque(maxlen=150)
-        for _ in range(15):
-            sink.audio_buffers[999].append(b'chunk')
+        sink.audio_buffers[999] = _speech_buffer([b'chunk'] * 15)
         
         await sink.process_speech(mock_member)
         
@@ -0,0 +1,84 @@
+import io
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from features.voice.transcription_clients import TranscriptionClients, get_transcription_clients
+from features.voice.voice_commands import VoiceCommandSink
+from tests.conftest import TEST_GUILD_ID
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest.mark.unit
+class TestTranscriptionClients:
+    async def test_sessions_are_reused_per_provider_with_their_limits(self, monkeypatch):
+        monkeypatch.setenv('TRANSCRIPTION_SIDECAR_MAX_CONNECTIONS', '2')
+        clients = TranscriptionClients()
+        try:
+            sidecar = clients.session('sidecar')
+
+            assert clients.session('sidecar') is sidecar
+            assert clients.session('zhipu') is not sidecar
+            assert sidecar.connector.limit == 2
+            assert clients.session('zhipu').connector.limit == 4
+
+            await sidecar.close()
+            assert clients.session('sidecar') is not sidecar
+        finally:
+            await clients.close()
+
+    async def test_openai_client_is_reused_per_key(self, monkeypatch):
+        monkeypatch.setenv('TRANSCRIPTION_OPENAI_API_MAX_CONNECTIONS', '3')
+        clients = TranscriptionClients()
+        try:
+            client = clients.openai('key-a')
+
+            assert clients.openai('key-a') is client
+            assert clients.openai('key-b') is not client
+        finally:
+            await clients.close()
+
+    def test_track_records_latency_histogram_and_errors(self):
+        clients = TranscriptionClients()
+        with patch('features.voice.transcription_clients.time.perf_counter', side_effect=[0.0, 0.3, 0.0, 20.0, 0.0, 0.1]):
+            with clients.track('sidecar'):
+                pass
+            with clients.track('sidecar') as call:
+                call.failed()
+            with pytest.raises(RuntimeError):
+                with clients.track('sidecar'):
+                    raise RuntimeError()
+
+        stats = clients.snapshot()['sidecar']
+
+        assert (stats['count'], stats['errors'], stats['in_flight']) == (3, 2, 0)
+        assert stats['histogram']['le_250ms'] == 1
+        assert stats['histogram']['le_500ms'] == 1
+        assert stats['histogram']['inf'] == 1
+        assert stats['max_connections'] == 4
+
+    def test_registry_is_process_wide(self):
+        assert get_transcription_clients() is get_transcription_clients()
+
+
+@pytest.mark.unit
+class TestOpenAIApiTranscription:
+    async def test_uploads_in_memory_file_with_shared_client(self):
+        sink = VoiceCommandSink(
+            bot_instance=MagicMock(),
+            voice_client=MagicMock(),
+            guild_id=TEST_GUILD_ID,
+            zhipu_api_key=None,
+            whisper_provider='openai-api',
+            music_service=MagicMock(),
+            openai_api_key='test-key'
+        )
+        client = MagicMock()
+        client.audio.transcriptions.create = AsyncMock(return_value=MagicMock(text=' toca música '))
+
+        with patch.object(sink.transcription_clients, 'openai', return_value=client) as get_client:
+            result = await sink._transcribe_openai_api(io.BytesIO(b'RIFFwav'))
+
+        assert result == 'toca música'
+        get_client.assert_called_once_with('test-key')
+        upload = client.audio.transcriptions.create.await_args.kwargs['file']
+        assert upload[1] == b'RIFFwav' and upload[0].startswith('audio.')
@@ -0,0 +1,191 @@
+import asyncio
+import io
+import threading
+import pytest
+import discord
+from unittest.mock import AsyncMock, MagicMock
+from features.voice.transcription_scheduler import TranscriptionScheduler
+from features.voice.voice_commands import VoiceCommandSink
+from tests.conftest import TEST_GUILD_ID
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class _Jobs:
+    """Transcription stand-ins that block until released, recording start order."""
+
+    def __init__(self):
+        self.started = []
+        self.release = asyncio.Event()
+
+    def job(self, name):
+        async def run():
+            self.started.append(name)
+            await self.release.wait()
+        return run
+
+
+@pytest.mark.unit
+class TestTranscriptionScheduler:
+    async def test_limits_concurrency_and_runs_everything(self):
+        scheduler = TranscriptionScheduler(max_concurrency=2, max_queue=8)
+        jobs = _Jobs()
+
+        done = [scheduler.submit(user_id, jobs.job(user_id)) for user_id in range(4)]
+        await asyncio.sleep(0)
+
+        assert jobs.started == [0, 1]
+        assert scheduler.snapshot()['queued'] == 2
+        jobs.release.set()
+        assert await asyncio.gather(*done) == [True] * 4
+        assert jobs.started == [0, 1, 2, 3]
+        assert scheduler.snapshot()['completed'] == 4
+
+    async def test_one_in_flight_request_per_user(self):
+        scheduler = TranscriptionScheduler(max_concurrency=4)
+        jobs = _Jobs()
+
+        done = [scheduler.submit(1, jobs.job('first')), scheduler.submit(1, jobs.job('second'))]
+        done.append(scheduler.submit(2, jobs.job('other')))
+        await asyncio.sleep(0)
+
+        assert jobs.started == ['first', 'other']
+        jobs.release.set()
+        await asyncio.gather(*done)
+        assert jobs.started == ['first', 'other', 'second']
+
+    async def test_listening_users_are_served_first(self):
+        scheduler = TranscriptionScheduler(max_concurrency=1)
+        jobs = _Jobs()
+
+        done = [
+            scheduler.submit(1, jobs.job('busy')),
+            scheduler.submit(2, jobs.job('chatter')),
+            scheduler.submit(3, jobs.job('listening'), priority=True),
+        ]
+        jobs.release.set()
+        await asyncio.gather(*done)
+
+        assert jobs.started == ['busy', 'listening', 'chatter']
+
+    async def test_overflow_drops_the_oldest_waiting_utterance(self):
+        scheduler = TranscriptionScheduler(max_concurrency=1, max_queue=2)
+        jobs = _Jobs()
+
+        done = [scheduler.submit(user_id, jobs.job(user_id)) for user_id in range(4)]
+        await asyncio.sleep(0)
+
+        assert done[1].done()
+        assert await done[1] is False
+        jobs.release.set()
+        assert await asyncio.gather(*done) == [True, False, True, True]
+        assert scheduler.snapshot()['dropped'] == 1
+
+    async def test_overflow_never_evicts_listening_users_for_chatter(self):
+        scheduler = TranscriptionScheduler(max_concurrency=1, max_queue=1)
+        jobs = _Jobs()
+
+        done = [
+            scheduler.submit(1, jobs.job('busy')),
+            scheduler.submit(2, jobs.job('listening'), priority=True),
+            scheduler.submit(3, jobs.job('chatter')),
+        ]
+        jobs.release.set()
+
+        assert await asyncio.gather(*done) == [True, True, False]
+        assert 'chatter' not in jobs.started
+
+    async def test_stale_utterances_expire_before_dispatch(self):
+        scheduler = TranscriptionScheduler(max_concurrency=1, max_age=0.005)
+        jobs = _Jobs()
+
+        first = scheduler.submit(1, jobs.job('first'))
+        stale = scheduler.submit(2, jobs.job('stale'))
+        await asyncio.sleep(0.02)
+        jobs.release.set()
+
+        assert await first is True
+        assert await stale is False
+        assert scheduler.snapshot()['expired'] == 1
+
+    async def test_close_discards_queue_and_cancels_running(self):
+        scheduler = TranscriptionScheduler(max_concurrency=1)
+        jobs = _Jobs()
+
+        running = scheduler.submit(1, jobs.job('running'))
+        queued = scheduler.submit(2, jobs.job('queued'))
+        await asyncio.sleep(0)
+        scheduler.close()
+
+        assert await queued is False
+        assert await running is False
+        assert jobs.started == ['running']
+        assert scheduler.snapshot()['completed'] == 0
+
+
+@pytest.mark.unit
+class TestVoiceCommandSinkScheduling:
+    async def test_burst_of_speakers_is_bounded(self, monkeypatch):
+        monkeypatch.setenv('VOICE_TRANSCRIPTION_CONCURRENCY', '1')
+        monkeypatch.setenv('VOICE_TRANSCRIPTION_QUEUE_SIZE', '1')
+        sink = VoiceCommandSink(
+            bot_instance=MagicMock(),
+            voice_client=MagicMock(),
+            guild_id=TEST_GUILD_ID,
+            zhipu_api_key=None,
+            whisper_provider='sidecar',
+            music_service=MagicMock()
+        )
+        release = asyncio.Event()
+
+        async def transcribe(member, audio_data):
+            await release.wait()
+        sink._prepare_utterance = AsyncMock(side_effect=lambda member, utterance: io.BytesIO(b'wav'))
+        sink._transcribe_utterance = AsyncMock(side_effect=transcribe)
+        members = []
+        for user_id in range(3):
+            member = MagicMock(spec=discord.Member)
+            member.id = user_id
+            member.display_name = f"User{user_id}"
+            members.append(member)
+        utterances = [MagicMock() for _ in members]
+
+        pending = [asyncio.create_task(sink._enqueue_utterance(member, utterance))
+                   for member, utterance in zip(members, utterances)]
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(*pending)
+
+        assert [call.args[0].id for call in sink._transcribe_utterance.await_args_list] == [0, 2]
+        stats = sink.voice_stats()['transcription_queue']
+        assert stats['dropped'] == 1 and stats['completed'] == 2
+
+    async def test_disconnect_from_router_thread_evicts_on_the_loop(self):
+        sink = VoiceCommandSink(
+            bot_instance=MagicMock(),
+            voice_client=MagicMock(),
+            guild_id=TEST_GUILD_ID,
+            zhipu_api_key=None,
+            whisper_provider='sidecar',
+            music_service=MagicMock()
+        )
+        sink.music_bot_ref = MagicMock(main_loop=asyncio.get_running_loop())
+        jobs = _Jobs()
+        sink.transcription_scheduler = TranscriptionScheduler(max_concurrency=1)
+        running = sink.transcription_scheduler.submit(1, jobs.job('other'))
+        queued = sink.transcription_scheduler.submit(999, jobs.job('queued'))
+        sink.audio_buffers[999] = MagicMock()
+        sink.last_audio_timestamps[999] = 1.0
+        member = MagicMock(spec=discord.Member)
+        member.id = 999
+
+        router = threading.Thread(target=sink.handle_member_disconnect, args=(member,))
+        router.start()
+        router.join()
+
+        assert 999 in sink.audio_buffers
+        assert not queued.done()
+        assert await queued is False
+        assert 999 not in sink.audio_buffers
+        jobs.release.set()
+        assert await running is True
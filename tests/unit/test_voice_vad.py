@@ -0,0 +1,157 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+import discord
+from features.voice.vad import EnergyVAD, UtteranceSegmenter, create_vad, pcm_to_mono
+from features.voice.voice_commands import VoiceCommandSink
+from tests.conftest import TEST_GUILD_ID
+
+FRAME_SAMPLES = 960
+
+
+def _frame(samples: np.ndarray) -> bytes:
+    return np.repeat(samples.astype('<i2'), 2).tobytes()
+
+
+def _tone(amplitude: int = 8000, frequency: float = 220.0) -> bytes:
+    t = np.arange(FRAME_SAMPLES) / 48000
+    return _frame(np.sin(2 * np.pi * frequency * t) * amplitude)
+
+
+def _silence() -> bytes:
+    return _frame(np.zeros(FRAME_SAMPLES))
+
+
+def _hiss(amplitude: int = 8000, seed: int = 0) -> bytes:
+    return _frame(np.random.default_rng(seed).uniform(-amplitude, amplitude, FRAME_SAMPLES))
+
+
+def _segmenter(**kwargs) -> UtteranceSegmenter:
+    return UtteranceSegmenter(EnergyVAD(), **kwargs)
+
+
+@pytest.mark.unit
+class TestEnergyVAD:
+    def test_pcm_to_mono_averages_channels_and_ignores_partial_samples(self):
+        pcm = np.array([100, 300, -50, 50], dtype='<i2').tobytes() + b'\x01'
+
+        assert pcm_to_mono(pcm).tolist() == [200, 0]
+        assert pcm_to_mono(b'\x00').size == 0
+
+    def test_detects_tone_but_not_silence_or_hiss(self):
+        vad = EnergyVAD()
+
+        assert not vad.is_speech(pcm_to_mono(_silence()))
+        assert vad.is_speech(pcm_to_mono(_tone()))
+        assert not vad.is_speech(pcm_to_mono(_hiss()))
+
+    def test_noise_floor_adapts_to_steady_background(self):
+        vad = EnergyVAD(threshold_db=-60, margin_db=10, noise_adapt=0.5)
+        hum = pcm_to_mono(_tone(amplitude=300))
+        # Quieter than the speech threshold at first, the floor rises towards the hum
+        for _ in range(20):
+            vad.is_speech(pcm_to_mono(_tone(amplitude=100)))
+
+        assert vad.noise_floor_db > -60
+        assert not vad.is_speech(hum)
+
+    def test_create_vad_falls_back_to_energy(self, monkeypatch):
+        monkeypatch.setenv('VOICE_VAD_BACKEND', 'webrtc')
+        monkeypatch.setitem(__import__('sys').modules, 'webrtcvad', None)
+
+        assert isinstance(create_vad(), EnergyVAD)
+        assert isinstance(create_vad('unknown'), EnergyVAD)
+
+
+@pytest.mark.unit
+class TestUtteranceSegmenter:
+    def test_emits_utterance_after_hangover_with_trimmed_tail(self):
+        segmenter = _segmenter(hangover_ms=200, tail_ms=40, pre_roll_ms=60)
+        results = [segmenter.push(_silence()) for _ in range(5)]
+        results += [segmenter.push(_tone()) for _ in range(20)]
+        results += [segmenter.push(_silence()) for _ in range(10)]
+
+        utterances = [result for result in results if result]
+
+        assert len(utterances) == 1
+        # 20 voiced frames plus 2 kept frames of trailing silence
+        assert utterances[0].frames == 22
+        assert utterances[0].length == 22 * len(_tone())
+        assert bytes(utterances[0].view()[:len(_tone())]) == _tone()
+        assert segmenter.snapshot()['utterances'] == 1
+        assert len(segmenter) == 0
+
+    def test_short_blips_and_noise_are_dropped(self):
+        segmenter = _segmenter(min_speech_ms=200)
+        for _ in range(4):
+            segmenter.push(_tone())
+        results = [segmenter.push(_silence()) for _ in range(30)]
+        results += [segmenter.push(_hiss(seed=i)) for i in range(50)]
+
+        assert not any(results)
+        assert segmenter.flush() is None
+        assert segmenter.snapshot()['dropped_short'] == 1
+
+    def test_long_speech_is_cut_at_max_length_and_continues(self):
+        segmenter = _segmenter(max_utterance_ms=1000)
+        results = [segmenter.push(_tone()) for _ in range(120)]
+
+        utterances = [result for result in results if result]
+
+        assert [utterance.frames for utterance in utterances] == [50, 50]
+        assert segmenter.flush().frames == 20
+        assert segmenter.snapshot()['forced_cuts'] == 2
+
+    def test_flush_ends_utterance_and_discards_pre_roll(self):
+        segmenter = _segmenter(pre_roll_ms=100)
+        for _ in range(30):
+            segmenter.push(_silence())
+        assert len(segmenter) == 5
+        assert segmenter.flush() is None
+        assert len(segmenter) == 0
+
+        for _ in range(15):
+            segmenter.push(_tone())
+
+        assert segmenter.flush().frames == 15
+
+
+@pytest.mark.unit
+class TestVoiceCommandSinkSegmentation:
+    @pytest.fixture
+    def sink(self):
+        sink = VoiceCommandSink(
+            bot_instance=MagicMock(),
+            voice_client=MagicMock(),
+            guild_id=TEST_GUILD_ID,
+            zhipu_api_key=None,
+            whisper_provider='sidecar',
+            music_service=MagicMock()
+        )
+        sink._health_monitor_started = True
+        sink._schedule = MagicMock(side_effect=lambda coro: coro.close())
+        return sink
+
+    def _write(self, sink, user, frames):
+        for pcm in frames:
+            data = MagicMock()
+            data.pcm = pcm
+            sink.write(user, data)
+
+    def test_pause_in_speech_schedules_transcription(self, sink):
+        user = MagicMock(spec=discord.Member)
+        user.id = 999
+
+        self._write(sink, user, [_tone()] * 25 + [_silence()] * 25)
+
+        sink._schedule.assert_called_once()
+        assert sink.segmentation_stats()['utterances'] == 1
+
+    def test_background_noise_never_reaches_transcription(self, sink):
+        user = MagicMock(spec=discord.Member)
+        user.id = 999
+
+        self._write(sink, user, [_hiss(seed=i) for i in range(200)])
+
+        sink._schedule.assert_not_called()
+        assert sink.segmentation_stats()['speech_frames'] == 0
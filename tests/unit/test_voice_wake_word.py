@@ -0,0 +1,132 @@
+import pytest
+import numpy as np
+import discord
+from unittest.mock import AsyncMock, MagicMock
+from features.voice import wake_word
+from features.voice.audio_buffer import PcmBuffer, PcmBufferPool
+from features.voice.voice_commands import VoiceCommandSink
+from features.voice.wake_word import (
+    ADMIT_FOLLOWUP, ADMIT_LISTENING, ADMIT_UNGATED, ADMIT_WAKE_WORD, SKIPPED, WakeWordGate, get_wake_word_spotter
+)
+from tests.conftest import TEST_GUILD_ID
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class _FakeSpotter:
+    def __init__(self, *heard):
+        self.heard = list(heard)
+        self.calls = 0
+
+    def detect(self, samples):
+        self.calls += 1
+        return self.heard.pop(0) if self.heard else False
+
+
+def _samples():
+    return np.zeros(1600, dtype=np.float32)
+
+
+@pytest.mark.unit
+class TestWakeWordGate:
+    def test_without_spotter_every_utterance_passes(self):
+        gate = WakeWordGate()
+
+        assert gate.admit(1, None) == (True, ADMIT_UNGATED)
+        assert gate.snapshot() == {'enabled': False, 'transcribed': 1, 'skipped': 0, 'by_reason': {ADMIT_UNGATED: 1}}
+
+    def test_skips_utterances_without_wake_word(self):
+        spotter = _FakeSpotter(False, True)
+        gate = WakeWordGate(spotter)
+
+        assert gate.admit(1, _samples()) == (False, SKIPPED)
+        assert gate.admit(1, _samples()) == (True, ADMIT_WAKE_WORD)
+        assert gate.snapshot()['skipped'] == 1
+        assert gate.snapshot()['transcribed'] == 1
+
+    def test_followup_window_admits_the_command_after_the_wake_word(self):
+        spotter = _FakeSpotter(True)
+        gate = WakeWordGate(spotter, followup_seconds=5.0)
+
+        gate.admit(1, _samples())
+
+        assert gate.admit(1, _samples()) == (True, ADMIT_FOLLOWUP)
+        assert gate.admit(2, _samples()) == (False, SKIPPED)
+        assert spotter.calls == 2
+
+    def test_followup_window_expires_and_can_be_forgotten(self):
+        gate = WakeWordGate(_FakeSpotter(True, True), followup_seconds=0.0)
+        gate.admit(1, _samples())
+        assert gate.admit(1, _samples()) == (True, ADMIT_WAKE_WORD)
+
+        gate.followup_seconds = 60.0
+        gate.forget(1)
+
+        assert gate.admit(1, _samples()) == (False, SKIPPED)
+
+    def test_listening_mode_bypasses_spotter(self):
+        spotter = _FakeSpotter()
+        gate = WakeWordGate(spotter)
+
+        assert gate.admit(1, _samples(), listening=True) == (True, ADMIT_LISTENING)
+        assert spotter.calls == 0
+
+    def test_spotter_disabled_without_model_path(self, monkeypatch):
+        monkeypatch.delenv('VOICE_WAKE_WORD_MODEL_PATH', raising=False)
+        monkeypatch.setattr(wake_word, '_spotter', None)
+        monkeypatch.setattr(wake_word, '_spotter_loaded', False)
+
+        assert get_wake_word_spotter('tangerina') is None
+
+
+@pytest.mark.unit
+class TestVoiceCommandSinkWakeWord:
+    @pytest.fixture
+    def sink(self):
+        sink = VoiceCommandSink(
+            bot_instance=MagicMock(),
+            voice_client=MagicMock(),
+            guild_id=TEST_GUILD_ID,
+            zhipu_api_key=None,
+            whisper_provider='sidecar',
+            music_service=MagicMock()
+        )
+        sink._transcribe_audio = AsyncMock(return_value='tangerina toca música')
+        sink._route_speech = AsyncMock()
+        return sink
+
+    def _utterance(self, pool=None):
+        t = np.arange(48000) / 48000
+        pcm = np.repeat((np.sin(2 * np.pi * 300 * t) * 8000).astype('<i2'), 2).tobytes()
+        buffer = pool.acquire() if pool else PcmBuffer(len(pcm))
+        for start in range(0, len(pcm), 3840):
+            buffer.append(pcm[start:start + 3840])
+        return buffer
+
+    def _member(self):
+        member = MagicMock(spec=discord.Member)
+        member.id = 999
+        member.display_name = 'Tester'
+        return member
+
+    async def test_utterance_without_wake_word_never_reaches_the_queue(self, sink):
+        sink.wake_word_gate = WakeWordGate(_FakeSpotter(False))
+        sink.transcription_scheduler.submit = MagicMock()
+        pool = PcmBufferPool(4 * 48000)
+        utterance = self._utterance(pool)
+
+        await sink._enqueue_utterance(self._member(), utterance)
+
+        sink.transcription_scheduler.submit.assert_not_called()
+        sink._transcribe_audio.assert_not_called()
+        assert pool.snapshot()['idle'] == 1
+        assert sink.voice_stats()['wake_word']['skipped'] == 1
+
+    async def test_utterance_with_wake_word_is_transcribed(self, sink):
+        sink.wake_word_gate = WakeWordGate(_FakeSpotter(True))
+
+        await sink._enqueue_utterance(self._member(), self._utterance())
+
+        sink._transcribe_audio.assert_awaited_once()
+        sink._route_speech.assert_awaited_once()
+        assert sink.voice_stats()['wake_word']['transcribed'] == 1
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+from features.voice import whisper_registry
+from features.voice.audio_prep import AudioPrep
+from features.voice.voice_commands import VoiceCommandSink
+from features.voice.whisper_registry import WhisperQueueFull, WhisperRegistry
+from tests.conftest import TEST_GUILD_ID
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+class _FakeModel:
+    def __init__(self, release: threading.Event = None):
+        self.calls = []
+        self.release = release
+        self.active = 0
+        self.overlapped = False
+
+    def transcribe(self, audio, **kwargs):
+        self.active += 1
+        self.overlapped = self.overlapped or self.active > 1
+        self.calls.append((audio, kwargs))
+        if self.release is not None:
+            self.release.wait(5)
+        self.active -= 1
+        return {'text': ' toca música '}
+
+
+@pytest.fixture
+def fake_whisper(monkeypatch):
+    module = MagicMock()
+    module.load_model.return_value = _FakeModel()
+    monkeypatch.setattr(whisper_registry, 'whisper', module)
+    return module
+
+
+@pytest.mark.unit
+class TestWhisperRegistry:
+    async def test_model_is_loaded_once_and_fed_arrays(self, fake_whisper):
+        registry = WhisperRegistry(model_name='small')
+
+        assert await registry.transcribe(np.zeros(16000, dtype=np.int16)) == 'toca música'
+        assert await registry.transcribe(np.zeros(8000, dtype=np.float32)) == 'toca música'
+
+        fake_whisper.load_model.assert_called_once_with('small')
+        audio, kwargs = fake_whisper.load_model.return_value.calls[0]
+        assert audio.dtype == np.float32 and audio.shape == (16000,)
+        assert kwargs == {'language': 'pt', 'fp16': False}
+        assert registry.snapshot()['completed'] == 2
+
+    async def test_rejects_utterances_beyond_pending_limit(self, fake_whisper):
+        release = threading.Event()
+        fake_whisper.load_model.return_value = _FakeModel(release)
+        registry = WhisperRegistry(workers=1, max_pending=2)
+
+        running = [asyncio.create_task(registry.transcribe(np.zeros(160, dtype=np.float32))) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(WhisperQueueFull):
+            await registry.transcribe(np.zeros(160, dtype=np.float32))
+        release.set()
+
+        assert await asyncio.gather(*running) == ['toca música', 'toca música']
+        assert registry.snapshot()['rejected'] == 1
+        assert registry.snapshot()['pending'] == 0
+
+    async def test_concurrent_workers_never_share_a_model(self, fake_whisper):
+        release = threading.Event()
+        fake_whisper.load_model.side_effect = lambda name: _FakeModel(release)
+        registry = WhisperRegistry(workers=2, max_pending=4)
+
+        running = [asyncio.create_task(registry.transcribe(np.zeros(160, dtype=np.float32))) for _ in range(4)]
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.gather(*running)
+
+        models = registry._models
+        assert len(models) == 2
+        assert sum(len(model.calls) for model in models) == 4
+        assert not any(model.overlapped for model in models)
+        assert registry.snapshot()['model_copies'] == 2
+
+    def test_unavailable_without_package(self, monkeypatch):
+        monkeypatch.setattr(whisper_registry, 'whisper', None)
+        registry = WhisperRegistry()
+
+        assert not registry.available
+        assert registry.load() is None
+
+
+@pytest.mark.unit
+class TestLocalWhisperSinks:
+    async def test_sinks_share_one_model_and_skip_temp_files(self, fake_whisper, monkeypatch):
+        registry = WhisperRegistry()
+        monkeypatch.setattr('features.voice.voice_commands.get_whisper_registry', lambda: registry)
+        sinks = [
+            VoiceCommandSink(
+                bot_instance=MagicMock(),
+                voice_client=MagicMock(),
+                guild_id=TEST_GUILD_ID + offset,
+                zhipu_api_key=None,
+                whisper_provider='openai',
+                music_service=MagicMock()
+            )
+            for offset in range(3)
+        ]
+        t = np.arange(48000) / 48000
+        pcm = np.repeat((np.sin(2 * np.pi * 300 * t) * 8000).astype('<i2'), 2).tobytes()
+
+        results = [await sink._transcribe_openai_local(AudioPrep(trim=False).to_wav(pcm)) for sink in sinks]
+
+        assert results == ['toca música'] * 3
+        fake_whisper.load_model.assert_called_once()
+        audio, _ = fake_whisper.load_model.return_value.calls[0]
+        assert audio.shape == (16000,)
@@ -0,0 +1,91 @@
+import pytest
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+from features.warmup import ModelWarmup, WARMUP_READY, WARMUP_FAILED, WARMUP_PENDING
+from chatbot.embedding_service import SentenceTransformerEmbeddingService
+
+pytest_plugins = ('pytest_asyncio',)
+
+
+@pytest.mark.unit
+class TestModelWarmup:
+    def test_registered_components_start_pending(self):
+        warmup = ModelWarmup()
+        warmup.register('embedding', AsyncMock(return_value=True))
+        assert warmup.status()['embedding']['state'] == WARMUP_PENDING
+        assert warmup.is_ready() is False
+
+    @pytest.mark.asyncio
+    async def test_run_marks_components_ready(self):
+        warmup = ModelWarmup()
+        embedding_warmup = AsyncMock(return_value=True)
+        warmup.register('embedding', embedding_warmup)
+
+        await warmup.run()
+
+        embedding_warmup.assert_awaited_once()
+        status = warmup.status()['embedding']
+        assert status['state'] == WARMUP_READY
+        assert 'duration_ms' in status
+        assert warmup.is_ready() is True
+        assert warmup.is_degraded() is False
+
+    @pytest.mark.asyncio
+    async def test_failed_component_reports_error(self):
+        warmup = ModelWarmup()
+        warmup.register('whisper', AsyncMock(side_effect=RuntimeError("load failed")))
+        warmup.register('embedding', AsyncMock(return_value=False))
+
+        await warmup.run()
+
+        status = warmup.status()
+        assert status['whisper']['state'] == WARMUP_FAILED
+        assert 'load failed' in status['whisper']['error']
+        assert status['embedding']['state'] == WARMUP_FAILED
+        assert warmup.is_ready() is True
+        assert warmup.is_degraded() is True
+
+    @pytest.mark.asyncio
+    async def test_timeout_marks_component_failed(self):
+        async def slow_warmup():
+            await asyncio.sleep(1)
+
+        warmup = ModelWarmup(timeout=0.01)
+        warmup.register('piper', slow_warmup)
+        await warmup.run()
+        assert warmup.status()['piper']['state'] == WARMUP_FAILED
+
+    @pytest.mark.asyncio
+    async def test_start_only_runs_once(self):
+        warmup = ModelWarmup()
+        component = AsyncMock(return_value=True)
+        warmup.register('embedding', component)
+
+        task = warmup.start()
+        assert warmup.start() is task
+        await task
+        component.assert_awaited_once()
+
+
+@pytest.mark.unit
+class TestSentenceTransformerModelLoading:
+    def test_concurrent_first_calls_load_model_once(self):
+        service = SentenceTransformerEmbeddingService("test-model")
+        load_started = threading.Event()
+
+        def slow_constructor(name):
+            load_started.set()
+            threading.Event().wait(0.05)
+            return MagicMock()
+
+        fake_module = MagicMock()
+        fake_module.SentenceTransformer = MagicMock(side_effect=slow_constructor)
+        with patch.dict('sys.modules', {'sentence_transformers': fake_module}):
+            threads = [threading.Thread(target=service._get_model) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert fake_module.SentenceTransformer.call_count == 1